@@ -0,0 +1,143 @@
+"""
+AzabBot - Arabic Text Normalization
+===================================
+
+Arabic normalization and script statistics compiled once, memoized per text.
+
+DESIGN:
+    strip_arabic_tashkeel built a new string through a per-character
+    generator, and is_mostly_arabic walked the text twice with ord()
+    range tests - several times per message across detectors. Everything
+    here runs on tables compiled once at import (one str.translate table
+    for deletions + letter unification, a regex for elongation) and
+    C-level map() counts:
+    - strip tashkeel and tatweel
+    - unify alef (أ إ آ ٱ -> ا), alef maqsura (ى -> ي) and ta marbuta (ة -> ه)
+    - collapse letter elongation ("هههههه" -> "ه", "baaaad" -> "bad");
+      digits, punctuation and URLs are left alone so "1000" and
+      "www.example.com" keep their meaning (and their cache key)
+    - count Arabic-script characters and letters for the "mostly Arabic" test
+    Results for short strings (most chat messages) are memoized, since the
+    same text is analyzed by several detectors and repeats across users.
+
+    Used by the anti-spam detectors and the content-moderation verdict
+    cache key; normalize_arabic() is also the form to feed a search index.
+
+Author: حَـــــنَّـــــا
+Server: discord.gg/syria
+"""
+
+import re
+from functools import lru_cache
+from typing import Callable, Dict, FrozenSet, Match, NamedTuple, Optional, Pattern
+
+from .constants import ARABIC_RANGE, ARABIC_TASHKEEL
+
+
+# =============================================================================
+# Constants
+# =============================================================================
+
+MEMO_MAX_LENGTH: int = 256          # Only memoize strings up to this length
+MEMO_SIZE: int = 8192               # Memoized analyses kept
+MOSTLY_ARABIC_RATIO: float = 0.3    # Lenient threshold - 30% Arabic is enough
+
+TATWEEL: str = 'ـ'
+LETTER_UNIFICATION: Dict[str, str] = {
+    'أ': 'ا', 'إ': 'ا', 'آ': 'ا', 'ٱ': 'ا',
+    'ى': 'ي',
+    'ة': 'ه',
+}
+
+# A URL is matched whole (and kept) so its letters are never collapsed
+ELONGATION_PATTERN: Pattern = re.compile(r'(https?://\S+|www\.\S+)|([^\W\d_])\2{2,}', re.IGNORECASE)
+TASHKEEL_PATTERN: Pattern = re.compile('[' + re.escape(''.join(sorted(ARABIC_TASHKEEL))) + ']')
+ARABIC_CHARS: FrozenSet[str] = frozenset(chr(code) for code in ARABIC_RANGE)
+
+
+# =============================================================================
+# Translate Table
+# =============================================================================
+
+NORMALIZE_TABLE: Dict[int, Optional[str]] = {
+    **{ord(c): None for c in ARABIC_TASHKEEL},
+    ord(TATWEEL): None,
+    **{ord(src): dst for src, dst in LETTER_UNIFICATION.items()},
+}
+
+
+# =============================================================================
+# Models
+# =============================================================================
+
+class ArabicAnalysis(NamedTuple):
+    """Normalized text plus script statistics of the original text."""
+    normalized: str
+    arabic_chars: int
+    letters: int
+
+    @property
+    def arabic_ratio(self) -> float:
+        return self.arabic_chars / self.letters if self.letters else 0.0
+
+    @property
+    def mostly_arabic(self) -> bool:
+        return self.letters > 0 and self.arabic_ratio >= MOSTLY_ARABIC_RATIO
+
+
+# =============================================================================
+# Normalization
+# =============================================================================
+
+def strip_tashkeel(text: str) -> str:
+    """Remove Arabic diacritical marks (tashkeel) only."""
+    # Deletion-only: a regex scan beats str.translate's per-char table lookups
+    return TASHKEEL_PATTERN.sub('', text)
+
+
+def _collapse(match: Match) -> str:
+    return match.group(1) or match.group(2)
+
+
+def _analyze(text: str) -> ArabicAnalysis:
+    normalized = ELONGATION_PATTERN.sub(_collapse, text.translate(NORMALIZE_TABLE))
+    return ArabicAnalysis(
+        normalized,
+        sum(map(ARABIC_CHARS.__contains__, text)),
+        sum(map(str.isalpha, text)),
+    )
+
+
+_analyze_memo: Callable[[str], ArabicAnalysis] = lru_cache(maxsize=MEMO_SIZE)(_analyze)
+
+
+def analyze_arabic(text: str) -> ArabicAnalysis:
+    """
+    Normalize text and count its Arabic characters in one call.
+
+    Args:
+        text: Raw text.
+
+    Returns:
+        ArabicAnalysis (memoized for texts up to MEMO_MAX_LENGTH chars).
+    """
+    if len(text) <= MEMO_MAX_LENGTH:
+        return _analyze_memo(text)
+    return _analyze(text)
+
+
+def normalize_arabic(text: str) -> str:
+    """Fully normalized form (no tashkeel/tatweel, unified letters, no elongation)."""
+    return analyze_arabic(text).normalized
+
+
+# =============================================================================
+# Module Export
+# =============================================================================
+
+__all__ = [
+    "ArabicAnalysis",
+    "analyze_arabic",
+    "normalize_arabic",
+    "strip_tashkeel",
+]
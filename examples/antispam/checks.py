@@ -0,0 +1,203 @@
+"""
+AzabBot - Anti-Spam Detector Definitions
+========================================
+
+The detectors check_message runs, registered on the detector registry.
+
+Adding a detector is a registration here - pick the cost class honestly,
+declare the features it reads, and return True on a hit. Order within a
+cost class is the order below. Detectors only read; history the next
+message is checked against is written by the recorders at the bottom.
+
+Author: حَـــــنَّـــــا
+Server: discord.gg/syria
+"""
+
+from typing import TYPE_CHECKING
+
+from .constants import (
+    ATTACHMENT_LIMIT,
+    ATTACHMENT_TIME_WINDOW,
+    DUPLICATE_TIME_WINDOW,
+    EMOJI_LIMIT,
+    FLOOD_TIME_WINDOW,
+    LINK_LIMIT,
+    LINK_TIME_WINDOW,
+    NEWLINE_LIMIT,
+    STICKER_SPAM_LIMIT,
+    STICKER_SPAM_TIME_WINDOW,
+)
+from .detectors import analyze_content, count_newlines, is_mostly_arabic
+from .executor import should_offload
+from .registry import CostClass, DETECTORS, DetectionContext
+
+if TYPE_CHECKING:
+    from .service import AntiSpamService
+
+
+# =============================================================================
+# Helpers
+# =============================================================================
+
+def _recent(ctx: DetectionContext, window: float, attr: str = "") -> int:
+    """Count the user's messages inside a window, optionally with a flag set."""
+    return sum(
+        1 for m in ctx.state.messages
+        if (not attr or getattr(m, attr))
+        and (ctx.now - m.timestamp).total_seconds() < window
+    )
+
+
+# =============================================================================
+# Feature Providers
+# =============================================================================
+
+@DETECTORS.provider("analysis")
+async def provide_analysis(service: "AntiSpamService", ctx: DetectionContext) -> None:
+    """
+    Run the CPU-heavy text detectors as one job, offloaded to the detector
+    pool when the message is long or the duplicate history is large.
+    """
+    ctx.history = tuple(
+        m.content for m in ctx.state.messages
+        if m is not ctx.record and (ctx.now - m.timestamp).total_seconds() < DUPLICATE_TIME_WINDOW
+    )
+    ctx.analysis = await service._detector_executor.run(
+        analyze_content, ctx.content, ctx.record.content, ctx.history,
+        offload=should_offload(ctx.content, sum(len(h) for h in ctx.history)),
+    )
+
+
+@DETECTORS.provider("invites")
+async def provide_invites(service: "AntiSpamService", ctx: DetectionContext) -> None:
+    """Resolve the message's invites to the ones pointing at other servers."""
+    if ctx.record.has_invites and ctx.guild_id != service.config.mod_server_id:
+        ctx.external_invites = await service._resolve_external_invites(ctx.content, ctx.guild_id)
+
+
+@DETECTORS.provider("image_hashes")
+async def provide_image_hashes(service: "AntiSpamService", ctx: DetectionContext) -> None:
+    """Download and perceptually hash the message's images."""
+    ctx.image_hashes = await service._hash_images(ctx.message)
+
+
+# =============================================================================
+# Cheap: MessageRecord Fields
+# =============================================================================
+
+@DETECTORS.detector("mention_spam", CostClass.CHEAP)
+def detect_mention_spam(service: "AntiSpamService", ctx: DetectionContext) -> bool:
+    exempt_channels = service.config.mention_spam_exempt_channel_ids
+    if exempt_channels and ctx.message.channel.id in exempt_channels:
+        return False
+    return ctx.record.mention_count >= ctx.mention_limit
+
+
+@DETECTORS.detector("emoji_spam", CostClass.CHEAP)
+def detect_emoji_spam(service: "AntiSpamService", ctx: DetectionContext) -> bool:
+    return ctx.record.emoji_count >= int(EMOJI_LIMIT * ctx.total_multiplier)
+
+
+@DETECTORS.detector("newline_spam", CostClass.CHEAP)
+def detect_newline_spam(service: "AntiSpamService", ctx: DetectionContext) -> bool:
+    # Arabic test last - it's memoized but still the dearer half
+    return (
+        count_newlines(ctx.content) >= int(NEWLINE_LIMIT * ctx.total_multiplier)
+        and not is_mostly_arabic(ctx.content)
+    )
+
+
+# =============================================================================
+# Memory: Recent History
+# =============================================================================
+
+@DETECTORS.detector("message_flood", CostClass.MEMORY)
+def detect_message_flood(service: "AntiSpamService", ctx: DetectionContext) -> bool:
+    return _recent(ctx, FLOOD_TIME_WINDOW) > ctx.flood_limit
+
+
+@DETECTORS.detector("image_duplicate", CostClass.MEMORY)
+def detect_image_duplicate(service: "AntiSpamService", ctx: DetectionContext) -> bool:
+    return bool(ctx.record.attachment_hashes) and service._check_image_duplicate(ctx.message, ctx.now)
+
+
+@DETECTORS.detector("link_flood", CostClass.MEMORY)
+def detect_link_flood(service: "AntiSpamService", ctx: DetectionContext) -> bool:
+    return ctx.record.has_links and _recent(ctx, LINK_TIME_WINDOW, "has_links") >= int(LINK_LIMIT * ctx.total_multiplier)
+
+
+@DETECTORS.detector("attachment_flood", CostClass.MEMORY)
+def detect_attachment_flood(service: "AntiSpamService", ctx: DetectionContext) -> bool:
+    return (
+        ctx.record.has_attachments
+        and _recent(ctx, ATTACHMENT_TIME_WINDOW, "has_attachments") >= int(ATTACHMENT_LIMIT * ctx.total_multiplier)
+    )
+
+
+@DETECTORS.detector("sticker_spam", CostClass.MEMORY)
+def detect_sticker_spam(service: "AntiSpamService", ctx: DetectionContext) -> bool:
+    return ctx.record.has_stickers and _recent(ctx, STICKER_SPAM_TIME_WINDOW, "has_stickers") >= STICKER_SPAM_LIMIT
+
+
+# =============================================================================
+# CPU: Text Analysis
+# =============================================================================
+
+@DETECTORS.detector("scam", CostClass.CPU, needs=("analysis",))
+def detect_scam(service: "AntiSpamService", ctx: DetectionContext) -> bool:
+    return ctx.analysis.is_scam
+
+
+@DETECTORS.detector("zalgo", CostClass.CPU, needs=("analysis",))
+def detect_zalgo(service: "AntiSpamService", ctx: DetectionContext) -> bool:
+    return ctx.analysis.is_zalgo
+
+
+@DETECTORS.detector("duplicate", CostClass.CPU, needs=("analysis",))
+def detect_duplicate(service: "AntiSpamService", ctx: DetectionContext) -> bool:
+    # similar_count is 0 for short/Arabic/emoji-only messages
+    return ctx.analysis.similar_count >= ctx.duplicate_limit - 1
+
+
+# =============================================================================
+# Network
+# =============================================================================
+
+@DETECTORS.detector("invite_spam", CostClass.NETWORK, needs=("invites",))
+def detect_invite_spam(service: "AntiSpamService", ctx: DetectionContext) -> bool:
+    return bool(ctx.external_invites) and service._check_invite_spam(ctx.external_invites, ctx.state, ctx.now)
+
+
+@DETECTORS.detector("perceptual_duplicate", CostClass.NETWORK, spam_type="image_duplicate", needs=("image_hashes",))
+def detect_perceptual_duplicate(service: "AntiSpamService", ctx: DetectionContext) -> bool:
+    # Many accounts posting one image only counts against new or
+    # negative-reputation posters (memes get shared)
+    cross_user = ctx.is_new or ctx.rep_multiplier < 1.0
+    return service._check_perceptual_duplicate(ctx.message, ctx.image_hashes, ctx.now, cross_user)
+
+
+# =============================================================================
+# Recorders
+# =============================================================================
+
+@DETECTORS.recorder("image_hashes")
+def record_image_hashes(service: "AntiSpamService", ctx: DetectionContext) -> None:
+    if ctx.record.attachment_hashes:
+        service._record_image_hashes(ctx.message, ctx.now)
+
+
+@DETECTORS.recorder("invites", needs=("invites",))
+def record_invites(service: "AntiSpamService", ctx: DetectionContext) -> None:
+    service._record_invites(ctx.external_invites, ctx.state, ctx.now)
+
+
+@DETECTORS.recorder("perceptual_hashes", needs=("image_hashes",))
+def record_perceptual_hashes(service: "AntiSpamService", ctx: DetectionContext) -> None:
+    service._record_perceptual_hashes(ctx.message, ctx.image_hashes, ctx.now)
+
+
+# =============================================================================
+# Module Export
+# =============================================================================
+
+__all__ = ["provide_analysis", "provide_image_hashes", "provide_invites"]
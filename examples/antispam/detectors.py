@@ -9,13 +9,20 @@ Server: discord.gg/syria
 """
 
 import hashlib
+import io
 import re
 import unicodedata
 from difflib import SequenceMatcher
-from typing import List, Pattern
+from typing import List, NamedTuple, Optional, Pattern, Tuple
 
 import discord
 
+try:
+    from PIL import Image
+except ImportError:  # Pillow is optional - perceptual hashing is disabled without it
+    Image = None
+
+from .arabic import analyze_arabic, strip_tashkeel
 from .constants import (
     ARABIC_RANGE,
     ARABIC_TASHKEEL,
@@ -24,6 +31,7 @@ from .constants import (
     CRYPTO_WALLET_PATTERN,
     DISCORD_INVITE_PATTERN,
     INVITE_SITE_PATTERN,
+    DUPLICATE_MIN_LENGTH,
     DUPLICATE_SIMILARITY_THRESHOLD,
     EXEMPT_ARABIC_GREETINGS,
     PHISHING_DOMAINS,
@@ -114,7 +122,7 @@ def is_arabic_char(char: str) -> bool:
 
 def strip_arabic_tashkeel(text: str) -> str:
     """Remove Arabic diacritical marks (tashkeel) from text."""
-    return ''.join(c for c in text if c not in ARABIC_TASHKEEL)
+    return strip_tashkeel(text)
 
 
 def is_exempt_greeting(text: str) -> bool:
@@ -131,12 +139,7 @@ def is_mostly_arabic(text: str) -> bool:
     """Check if text is mostly Arabic (exempt from some spam checks)."""
     if not text:
         return False
-    arabic_chars = sum(1 for c in text if ord(c) in ARABIC_RANGE)
-    total_letters = sum(1 for c in text if c.isalpha())
-    if total_letters == 0:
-        return False
-    # Lenient threshold - 30% Arabic is enough
-    return (arabic_chars / total_letters) >= 0.3
+    return analyze_arabic(text).mostly_arabic
 
 
 # =============================================================================
@@ -266,12 +269,97 @@ def has_non_whitelisted_invites(content: str) -> bool:
 # Image/Attachment Hashing
 # =============================================================================
 
+DHASH_SIZE: int = 8  # 8x8 gradient grid -> 64-bit hash
+
+
 def hash_attachment(attachment: discord.Attachment) -> str:
-    """Generate a hash for an attachment based on URL and size."""
+    """Generate a metadata fingerprint (filename, size, type) for an attachment."""
     data = f"{attachment.filename}:{attachment.size}:{attachment.content_type}"
     return hashlib.md5(data.encode()).hexdigest()[:16]
 
 
+def compute_dhash(data: bytes) -> Optional[int]:
+    """
+    Compute a 64-bit difference hash (dHash) of raw image bytes.
+
+    Survives re-encoding, resizing, renaming and small edits, unlike
+    hash_attachment. CPU-bound - run via DetectorExecutor.
+
+    Returns:
+        Hash as an int, or None if Pillow is missing or the image can't be decoded.
+    """
+    if Image is None:
+        return None
+    try:
+        with Image.open(io.BytesIO(data)) as img:
+            # JPEG draft mode decodes at reduced scale - much cheaper than full decode
+            img.draft("L", (DHASH_SIZE * 4, DHASH_SIZE * 4))
+            gray = img.convert("L").resize(
+                (DHASH_SIZE + 1, DHASH_SIZE), Image.Resampling.LANCZOS
+            )
+    except (OSError, ValueError, Image.DecompressionBombError):
+        return None
+
+    pixels = gray.tobytes()
+    value = 0
+    for row in range(DHASH_SIZE):
+        offset = row * (DHASH_SIZE + 1)
+        for col in range(DHASH_SIZE):
+            value = (value << 1) | (pixels[offset + col] > pixels[offset + col + 1])
+    return value
+
+
+def hamming_distance(hash1: int, hash2: int) -> int:
+    """Count differing bits between two perceptual hashes."""
+    return (hash1 ^ hash2).bit_count()
+
+
+# =============================================================================
+# Batched Content Analysis
+# =============================================================================
+
+class ContentAnalysis(NamedTuple):
+    """Results of the CPU-heavy text detectors for one message."""
+    is_scam: bool
+    is_zalgo: bool
+    is_arabic: bool
+    is_emoji_only: bool
+    similar_count: int
+
+
+def analyze_content(content: str, normalized: str, history: Tuple[str, ...]) -> ContentAnalysis:
+    """
+    Run the CPU-heavy text detectors in one call.
+
+    Pure and picklable so it can run inline or in a worker process with
+    identical results (see executor.DetectorExecutor).
+
+    Args:
+        content: Raw message content.
+        normalized: Lowercased/stripped content (MessageRecord.content).
+        history: Normalized content of the user's other messages inside
+            DUPLICATE_TIME_WINDOW.
+
+    Returns:
+        ContentAnalysis. similar_count is 0 when duplicate checks don't
+        apply (short, Arabic or emoji-only messages).
+    """
+    arabic = is_mostly_arabic(content)
+    emoji_only = is_emoji_only(content)
+
+    similar_count = 0
+    if normalized and len(normalized) >= DUPLICATE_MIN_LENGTH and not arabic and not emoji_only:
+        similar_count = sum(1 for previous in history if is_similar(previous, normalized))
+
+    return ContentAnalysis(
+        is_scam=is_scam(content),
+        is_zalgo=is_zalgo(content),
+        is_arabic=arabic,
+        is_emoji_only=emoji_only,
+        similar_count=similar_count,
+    )
+
+
 # =============================================================================
 # Module Export
 # =============================================================================
@@ -309,5 +397,11 @@ __all__ = [
     "is_whitelisted_invite",
     "has_non_whitelisted_invites",
     # Image/Attachment Hashing
+    "DHASH_SIZE",
     "hash_attachment",
+    "compute_dhash",
+    "hamming_distance",
+    # Batched Content Analysis
+    "ContentAnalysis",
+    "analyze_content",
 ]
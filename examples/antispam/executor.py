@@ -0,0 +1,231 @@
+"""
+AzabBot - Anti-Spam Detector Executor
+=====================================
+
+Runs CPU-heavy pure detectors off the event loop.
+
+DESIGN:
+    Similarity scoring, Unicode scans and image decoding used to run on the
+    asyncio thread, so a burst of long messages delayed gateway heartbeats
+    and every other handler. DetectorExecutor wraps a ProcessPoolExecutor:
+    - Workers are spawned and pre-warmed at startup (imports + regex compile)
+    - Callers decide per message whether a job is heavy enough to offload;
+      cheap jobs run inline since a process round trip costs ~0.2ms
+    - If the pool is unavailable or breaks, offloaded jobs fall back to a
+      worker thread and the pool is rebuilt
+    - Queue depth and round-trip latency are tracked for the dashboard
+
+    Only pure, module-level functions from detectors.py are submitted, so
+    offloaded and inline execution return identical results.
+
+Author: حَـــــنَّـــــا
+Server: discord.gg/syria
+"""
+
+import asyncio
+import multiprocessing
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Deque, Dict, Optional, TypeVar
+
+from src.core.logger import logger
+
+from .detectors import analyze_content
+
+T = TypeVar("T")
+
+
+# =============================================================================
+# Constants
+# =============================================================================
+
+DETECTOR_POOL_WORKERS: int = max(1, min(2, (os.cpu_count() or 2) - 1))
+OFFLOAD_MIN_CHARS: int = 1500               # Long messages always offload
+OFFLOAD_MIN_SIMILARITY_WORK: int = 150_000  # len(content) x history chars
+LATENCY_SAMPLES: int = 512                  # Rolling window for avg / p99
+
+
+# =============================================================================
+# Worker Functions
+# =============================================================================
+
+def _warm_worker() -> None:
+    """Pool initializer - pay import and regex compile cost before traffic."""
+    analyze_content("warmup", "warmup", ("warmup",))
+
+
+def _ping() -> int:
+    """No-op job used to force every worker process to start."""
+    return os.getpid()
+
+
+def should_offload(content: str, history_chars: int, has_images: bool = False) -> bool:
+    """
+    Decide whether a message's detector work is worth a process round trip.
+
+    Args:
+        content: Raw message content.
+        history_chars: Total characters of history compared for duplicates.
+        has_images: Whether the message carries images to decode.
+
+    Returns:
+        True if the work should run in the pool.
+    """
+    if has_images or len(content) >= OFFLOAD_MIN_CHARS:
+        return True
+    return len(content) * history_chars >= OFFLOAD_MIN_SIMILARITY_WORK
+
+
+# =============================================================================
+# Detector Executor
+# =============================================================================
+
+class DetectorExecutor:
+    """Process pool for pure detector functions with inline fallback."""
+
+    def __init__(self, workers: int = DETECTOR_POOL_WORKERS) -> None:
+        self._workers = workers
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+        # Stats
+        self._queue_depth: int = 0
+        self._max_queue_depth: int = 0
+        self._offloaded: int = 0
+        self._inline: int = 0
+        self._fallbacks: int = 0
+        self._latencies: Deque[float] = deque(maxlen=LATENCY_SAMPLES)
+
+    @property
+    def available(self) -> bool:
+        return self._pool is not None
+
+    # =========================================================================
+    # Lifecycle
+    # =========================================================================
+
+    def _create_pool(self) -> None:
+        # spawn, not fork: forking a process with a running loop and threads
+        # can deadlock the child on inherited locks
+        self._pool = ProcessPoolExecutor(
+            max_workers=self._workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_warm_worker,
+        )
+
+    async def start(self) -> None:
+        """Create the pool and wait until every worker is up and warm."""
+        if self._pool is not None:
+            return
+        start = time.perf_counter()
+        try:
+            self._create_pool()
+            loop = asyncio.get_running_loop()
+            pids = await asyncio.gather(*(
+                loop.run_in_executor(self._pool, _ping) for _ in range(self._workers)
+            ))
+        except (OSError, BrokenProcessPool) as e:
+            self._pool = None
+            logger.warning("Detector Pool Unavailable", [
+                ("Fallback", "Threads"),
+                ("Error", str(e)[:50]),
+            ])
+            return
+
+        logger.tree("Detector Pool Ready", [
+            ("Workers", str(len(set(pids)))),
+            ("Warmup", f"{(time.perf_counter() - start) * 1000:.0f}ms"),
+        ], emoji="⚙️")
+
+    def shutdown(self) -> None:
+        """Stop worker processes without waiting for queued jobs."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    # =========================================================================
+    # Execution
+    # =========================================================================
+
+    async def run(self, fn: Callable[..., T], *args: Any, offload: bool) -> T:
+        """
+        Run a pure detector function.
+
+        Args:
+            fn: Module-level (picklable) function from detectors.py.
+            *args: Picklable arguments.
+            offload: Run in the pool (or a thread if the pool is down).
+                False runs inline on the event loop.
+
+        Returns:
+            Whatever fn returns - identical regardless of where it ran.
+        """
+        if not offload:
+            self._inline += 1
+            return fn(*args)
+
+        if self._pool is None:
+            self._fallbacks += 1
+            return await asyncio.to_thread(fn, *args)
+
+        loop = asyncio.get_running_loop()
+        self._queue_depth += 1
+        self._max_queue_depth = max(self._max_queue_depth, self._queue_depth)
+        start = time.perf_counter()
+        try:
+            result = await loop.run_in_executor(self._pool, fn, *args)
+        except BrokenProcessPool:
+            # A worker died (OOM, killed) - rebuild and answer from a thread
+            logger.warning("Detector Pool Broken", [
+                ("Function", fn.__name__),
+                ("Action", "Rebuilding pool"),
+            ])
+            self._fallbacks += 1
+            self.shutdown()
+            try:
+                self._create_pool()
+            except OSError as e:
+                # Out of processes/fds - stay on threads until the next start()
+                self._pool = None
+                logger.warning("Detector Pool Rebuild Failed", [
+                    ("Fallback", "Threads"),
+                    ("Error", str(e)[:50]),
+                ])
+            return await asyncio.to_thread(fn, *args)
+        finally:
+            self._queue_depth -= 1
+
+        self._offloaded += 1
+        self._latencies.append((time.perf_counter() - start) * 1000)
+        return result
+
+    # =========================================================================
+    # Stats
+    # =========================================================================
+
+    def get_stats(self) -> Dict[str, float]:
+        """Snapshot of executor counters for logging / the dashboard API."""
+        samples = sorted(self._latencies)
+        return {
+            "workers": self._workers if self._pool else 0,
+            "queue_depth": self._queue_depth,
+            "max_queue_depth": self._max_queue_depth,
+            "offloaded": self._offloaded,
+            "inline": self._inline,
+            "fallbacks": self._fallbacks,
+            "avg_ms": round(sum(samples) / len(samples), 2) if samples else 0.0,
+            "p99_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.99))], 2) if samples else 0.0,
+        }
+
+
+# =============================================================================
+# Module Export
+# =============================================================================
+
+__all__ = [
+    "DetectorExecutor",
+    "should_offload",
+    "DETECTOR_POOL_WORKERS",
+]
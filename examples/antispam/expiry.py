@@ -0,0 +1,131 @@
+"""
+AzabBot - Anti-Spam State Expiry
+================================
+
+Bounded, self-expiring maps for per-user / per-webhook anti-spam state.
+
+DESIGN:
+    The cleanup loop used to walk every tracked user, image hash list and
+    webhook, rebuild lists, and sort whole dicts to enforce size caps - cost
+    proportional to everything tracked, not to what actually expired.
+
+    ExpiringLRU is an OrderedDict kept in last-touch order. Every entry in a
+    map shares one TTL, so last-touch order IS deadline order:
+    - Expiry pops from the front until it hits a live entry (O(expired))
+    - Size cap evicts the least-recently-used entry on insert (O(1))
+    - Inserts also expire a few stale entries, so state ages out
+      continuously instead of only on the periodic sweep
+
+Author: حَـــــنَّـــــا
+Server: discord.gg/syria
+"""
+
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Generic, Iterator, Optional, Tuple, TypeVar
+
+K = TypeVar("K")
+V = TypeVar("V")
+
+
+# =============================================================================
+# Constants
+# =============================================================================
+
+EXPIRE_ON_INSERT: int = 8  # Stale entries reclaimed per insert (amortized expiry)
+
+
+# =============================================================================
+# Expiring LRU
+# =============================================================================
+
+class ExpiringLRU(Generic[K, V]):
+    """
+    LRU map with a shared idle TTL and a hard size cap.
+
+    Indexing a missing key creates it via factory (like defaultdict), and
+    every index refreshes the entry's deadline.
+    """
+
+    def __init__(self, ttl: float, max_entries: int, factory: Callable[[], V]) -> None:
+        self._ttl = ttl
+        self._max_entries = max_entries
+        self._factory = factory
+        self._data: "OrderedDict[K, Tuple[float, V]]" = OrderedDict()
+
+        # Stats
+        self.expired: int = 0
+        self.evicted: int = 0
+
+    def __getitem__(self, key: K) -> V:
+        now = time.monotonic()
+        entry = self._data.get(key)
+        if entry is not None:
+            value = entry[1]
+            self._data[key] = (now, value)
+            self._data.move_to_end(key)
+            return value
+
+        self._expire(now, limit=EXPIRE_ON_INSERT)
+        value = self._factory()
+        self._data[key] = (now, value)
+        if len(self._data) > self._max_entries:
+            self._data.popitem(last=False)
+            self.evicted += 1
+        return value
+
+    def get(self, key: K) -> Optional[V]:
+        """Look up without creating or refreshing."""
+        entry = self._data.get(key)
+        return entry[1] if entry is not None else None
+
+    def pop(self, key: K, default: Optional[V] = None) -> Optional[V]:
+        entry = self._data.pop(key, None)
+        return entry[1] if entry is not None else default
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._data
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __iter__(self) -> Iterator[K]:
+        return iter(self._data)
+
+    def items(self) -> Iterator[Tuple[K, V]]:
+        return ((key, entry[1]) for key, entry in self._data.items())
+
+    def expire(self) -> int:
+        """
+        Drop every entry idle for longer than the TTL.
+
+        Returns:
+            Number of entries removed.
+        """
+        return self._expire(time.monotonic())
+
+    def _expire(self, now: float, limit: Optional[int] = None) -> int:
+        deadline = now - self._ttl
+        removed = 0
+        while self._data and (limit is None or removed < limit):
+            key, (touched, _) = next(iter(self._data.items()))
+            if touched > deadline:
+                break
+            del self._data[key]
+            removed += 1
+        self.expired += removed
+        return removed
+
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            "entries": len(self._data),
+            "expired": self.expired,
+            "evicted": self.evicted,
+        }
+
+
+# =============================================================================
+# Module Export
+# =============================================================================
+
+__all__ = ["ExpiringLRU"]
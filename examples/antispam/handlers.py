@@ -9,8 +9,10 @@ Server: discord.gg/syria
 """
 
 import asyncio
+import time
+from collections import deque
 from datetime import datetime, timedelta
-from typing import Optional, TYPE_CHECKING
+from typing import Any, Awaitable, Deque, Dict, Optional, TYPE_CHECKING
 
 import discord
 
@@ -21,6 +23,7 @@ from src.core.constants import (
     DELETE_AFTER_LONG)
 from src.core.logger import logger
 from src.api.services.event_logger import event_logger
+from src.utils.async_utils import gather_with_logging
 from src.utils.snipe_blocker import block_from_snipe
 from src.utils.discord_rate_limit import log_http_error
 from src.services.server_logs.categories import LogCategory
@@ -34,6 +37,11 @@ from .constants import (
     REP_LOSS_WARNING,
     SPAM_DISPLAY_NAMES,
     STICKER_SPAM_TIME_WINDOW)
+from .raid_enforcement import BulkDeleteKind
+
+MUTE_LATENCY_SAMPLES: int = 512  # Rolling window for time-to-mute percentiles
+WEBHOOK_ACTION_RETRY: float = 60.0  # Seconds between webhook removal attempts
+WEBHOOK_BULK_DELETE = BulkDeleteKind(reason="Webhook spam", label="Webhook Bulk Delete")
 
 if TYPE_CHECKING:
     from src.bot import AzabBot
@@ -52,6 +60,7 @@ class SpamHandlerMixin:
         if not message.guild or not isinstance(message.author, discord.Member):
             return
 
+        detected_at = time.monotonic()
         guild_id = message.guild.id
         user_id = message.author.id
         db: "Database" = self.db  # type: ignore
@@ -67,40 +76,53 @@ class SpamHandlerMixin:
         # Reduce reputation
         self.update_reputation(user_id, guild_id, -REP_LOSS_WARNING)  # type: ignore
 
-        # Delete the spam message (block from snipe first)
-        try:
-            await block_from_snipe(
-                message.id,
-                reason=f"Spam ({spam_type})",
-                user_id=message.author.id,
-                channel_name=f"#{message.channel.name}" if hasattr(message.channel, 'name') else None)
-            await message.delete()
-        except discord.HTTPException as e:
-            log_http_error(e, "Spam Message Delete", [
-                ("User", str(message.author)),
-                ("Channel", f"#{message.channel.name}" if hasattr(message.channel, 'name') else "Unknown"),
-            ])
-
         # Determine punishment
         mute_level = min(violation_count, 5)
         mute_duration = MUTE_DURATIONS.get(mute_level, 86400)
 
         spam_display = SPAM_DISPLAY_NAMES.get(spam_type, spam_type)
 
+        # During a raid, skip per-user notifications and batch the REST calls
+        if self._raid_mode_active(guild_id, user_id):  # type: ignore
+            if mute_duration > 0:
+                self.update_reputation(user_id, guild_id, -REP_LOSS_MUTE)  # type: ignore
+            await self._enforce_raid_spam(message, spam_display, violation_count, mute_duration)  # type: ignore
+            return
+
         if mute_duration == 0:
+            await self._delete_spam_message(message, spam_type)
             await self._send_warning(message.author, spam_display, message.channel)
             await self._log_spam(message, spam_type, "warning", violation_count)
         else:
             self.update_reputation(user_id, guild_id, -REP_LOSS_MUTE)  # type: ignore
-            await self._apply_mute(
-                message.author,
-                mute_duration,
-                spam_display,
-                message.channel,
-                violation_count,
-                message_content=message.content or "")
+            # Delete and mute concurrently so the role isn't waiting on the delete
+            await asyncio.gather(
+                self._delete_spam_message(message, spam_type),
+                self._apply_mute(
+                    message.author,
+                    mute_duration,
+                    spam_display,
+                    message.channel,
+                    violation_count,
+                    message_content=message.content or "",
+                    detected_at=detected_at))
             await self._log_spam(message, spam_type, "mute", violation_count, mute_duration)
 
+    async def _delete_spam_message(self, message: discord.Message, spam_type: str) -> None:
+        """Delete the spam message (block from snipe first)."""
+        try:
+            await block_from_snipe(
+                message.id,
+                reason=f"Spam ({spam_type})",
+                user_id=message.author.id,
+                channel_name=f"#{message.channel.name}" if hasattr(message.channel, 'name') else None)
+            await message.delete()
+        except discord.HTTPException as e:
+            log_http_error(e, "Spam Message Delete", [
+                ("User", str(message.author)),
+                ("Channel", f"#{message.channel.name}" if hasattr(message.channel, 'name') else "Unknown"),
+            ])
+
     async def _handle_sticker_spam(self, message: discord.Message) -> None:
         """
         Handle sticker spam with custom punishment:
@@ -338,27 +360,65 @@ class SpamHandlerMixin:
             ])
 
     async def handle_webhook_spam(self, message: discord.Message) -> None:
-        """Handle spam from a webhook."""
+        """
+        Handle spam from a webhook.
+
+        DESIGN:
+            A compromised integration can post hundreds of messages a second,
+            so messages aren't handled one by one. Every spam message goes
+            into the per-channel bulk-delete buffer (shared with raid
+            enforcement), and the first one triggers removal of the webhook
+            itself - one log entry per webhook, not per message. A failed
+            removal is retried at most every WEBHOOK_ACTION_RETRY seconds.
+        """
+        state = self._webhook_states.get(message.webhook_id)  # type: ignore
+        self._queue_bulk_delete(message, WEBHOOK_BULK_DELETE)  # type: ignore
+
+        if state is None:
+            return
+        now = time.monotonic()
+        if state.removed or (state.action_at is not None and now - state.action_at < WEBHOOK_ACTION_RETRY):
+            state.suppressed += 1
+            return
+
+        state.action_at = now
+        state.removed = await self._remove_webhook(message, state.suppressed)
+
+    async def _remove_webhook(self, message: discord.Message, suppressed: int) -> bool:
+        """
+        Delete a spamming webhook and log it once.
+
+        Returns:
+            True if the webhook was deleted.
+        """
         bot: "AzabBot" = self.bot  # type: ignore
+        channel_name = f"#{message.channel.name}" if hasattr(message.channel, 'name') else "Unknown"
 
-        # Block from snipe first
+        removed = False
         try:
-            await block_from_snipe(
-                message.id,
-                reason="Webhook spam",
-                user_id=None,  # Webhook messages don't have a real user
-                channel_name=f"#{message.channel.name}" if hasattr(message.channel, 'name') else None)
-            await message.delete()
+            webhook = await bot.fetch_webhook(message.webhook_id)
+            await webhook.delete(reason="Anti-spam: webhook spam")
+            removed = True
+        except discord.NotFound:
+            removed = True  # Already gone
+        except discord.Forbidden:
+            logger.warning("Webhook Removal Permission Denied", [
+                ("Webhook ID", str(message.webhook_id)),
+                ("Channel", channel_name),
+                ("Fallback", "Bulk-deleting its messages"),
+            ])
         except discord.HTTPException as e:
-            log_http_error(e, "Webhook Spam Message Delete", [
+            log_http_error(e, "Webhook Removal", [
                 ("Webhook ID", str(message.webhook_id)),
-                ("Channel", f"#{message.channel.name}" if hasattr(message.channel, 'name') else "Unknown"),
+                ("Channel", channel_name),
             ])
 
+        action = "Webhook deleted" if removed else "Messages deleted (webhook removal failed)"
         logger.tree("WEBHOOK SPAM DETECTED", [
             ("Webhook ID", str(message.webhook_id)),
-            ("Channel", f"#{message.channel.name}" if hasattr(message.channel, 'name') else "Unknown"),
-            ("Action", "Message deleted"),
+            ("Channel", channel_name),
+            ("Action", action),
+            ("Suppressed", str(suppressed)),
         ], emoji="🛡️")
 
         if bot.logging_service and bot.logging_service.enabled:
@@ -369,7 +429,7 @@ class SpamHandlerMixin:
                 )
                 embed.add_field(name="Webhook ID", value=str(message.webhook_id), inline=True)
                 embed.add_field(name="Channel", value=f"<#{message.channel.id}>", inline=True)
-                embed.add_field(name="Action", value="Message deleted", inline=True)
+                embed.add_field(name="Action", value=action, inline=True)
                 if message.content:
                     content_preview = message.content[:200] + ("..." if len(message.content) > 200 else "")
                     embed.add_field(name="Content", value=f"```{content_preview}```", inline=False)
@@ -381,6 +441,8 @@ class SpamHandlerMixin:
             except Exception as e:
                 logger.debug("Webhook Spam Log Failed", [("Error", str(e)[:50])])
 
+        return removed
+
     async def _send_warning(
         self,
         member: discord.Member,
@@ -409,6 +471,11 @@ class SpamHandlerMixin:
                 ("Type", spam_type),
             ])
 
+    def _init_spam_handlers(self) -> None:
+        """Initialize punishment metrics. Called from AntiSpamService.__init__."""
+        self._mute_latencies: Deque[float] = deque(maxlen=MUTE_LATENCY_SAMPLES)
+        self._mute_step_ms: Dict[str, float] = {}
+
     async def _apply_mute(
         self,
         member: discord.Member,
@@ -416,10 +483,30 @@ class SpamHandlerMixin:
         spam_type: str,
         channel: discord.abc.Messageable,
         violation_count: int,
-        message_content: str = "") -> None:
-        """Apply mute role to the user."""
+        message_content: str = "",
+        detected_at: Optional[float] = None) -> None:
+        """
+        Apply mute role to the user.
+
+        DESIGN:
+            Only the role and the mute record are on the critical path -
+            the spammer is silenced as soon as the role lands. The case,
+            channel notice, DM, audit log and dashboard event don't depend
+            on each other and run concurrently afterwards.
+
+        Args:
+            member: Member to mute.
+            duration: Mute duration in seconds.
+            spam_type: Display name of the spam type.
+            channel: Channel to post the mute notice in.
+            violation_count: Number of violations.
+            message_content: The triggering message content for evidence.
+            detected_at: time.monotonic() when the spam was detected, for
+                the time-to-mute metric.
+        """
         config: "Config" = self.config  # type: ignore
         db: "Database" = self.db  # type: ignore
+        bot: "AzabBot" = self.bot  # type: ignore
 
         if not config.muted_role_id:
             return
@@ -428,101 +515,32 @@ class SpamHandlerMixin:
         if not mute_role:
             return
 
+        if duration >= 3600:
+            duration_str = f"{duration // 3600}h"
+        else:
+            duration_str = f"{duration // 60}m"
+
+        # ---------------------------------------------------------------------
+        # Critical Section: Role + Mute Record
+        # ---------------------------------------------------------------------
+
+        timings: Dict[str, float] = {}
         try:
+            start = time.perf_counter()
             await member.add_roles(
                 mute_role,
                 reason=f"Anti-spam: {spam_type} (violation #{violation_count})")
+            timings["Add Role"] = (time.perf_counter() - start) * 1000
+            time_to_mute = (time.monotonic() - detected_at) * 1000 if detected_at else timings["Add Role"]
 
-            if duration >= 3600:
-                duration_str = f"{duration // 3600}h"
-            else:
-                duration_str = f"{duration // 60}m"
-
+            start = time.perf_counter()
             expires_at = db.add_mute(
                 user_id=member.id,
                 guild_id=member.guild.id,
-                moderator_id=self.bot.user.id,
-                reason=f"Auto-spam: {spam_type}",
-                duration_seconds=duration)
-
-            # Log to permanent audit log
-            db.log_moderation_action(
-                user_id=member.id,
-                guild_id=member.guild.id,
-                moderator_id=self.bot.user.id,  # type: ignore
-                action_type="mute",
-                action_source="auto_spam",
-                reason=f"Auto-spam: {spam_type}",
-                duration_seconds=duration,
-                details={"spam_type": spam_type, "violation_count": violation_count})
-
-            # Log to dashboard events
-            event_logger.log_timeout(
-                guild=member.guild,
-                target=member,
-                moderator=None,
+                moderator_id=bot.user.id,
                 reason=f"Auto-spam: {spam_type}",
                 duration_seconds=duration)
-
-            case_info = await self._open_spam_case(member, spam_type, duration, violation_count, message_content)
-
-            embed = discord.Embed(
-                title=f"🔇 {spam_type}",
-                description=f"{embed_mention(member)} has been muted.",
-                color=EmbedColors.WARNING)
-            embed.add_field(name="Duration", value=duration_str, inline=True)
-            embed.add_field(name="Violation", value=f"#{violation_count}", inline=True)
-            if expires_at:
-                unmute_ts = int(expires_at)
-                embed.add_field(name="Unmutes", value=f"<t:{unmute_ts}:F> (<t:{unmute_ts}:R>)", inline=False)
-
-            view = None
-            if case_info and case_info.get("thread_id"):
-                case_url = f"https://discord.com/channels/{member.guild.id}/{case_info['thread_id']}"
-                view = discord.ui.View(timeout=None)
-                view.add_item(discord.ui.Button(
-                    label="Case",
-                    url=case_url,
-                    style=discord.ButtonStyle.link,
-                    emoji=CASE_EMOJI))
-
-            await channel.send(embed=embed, view=view, delete_after=DELETE_AFTER_LONG)
-
-            # DM the user about the mute
-            dm_sent = False
-            try:
-                dm_embed = discord.Embed(
-                    title=f"🔇 You've been muted in {member.guild.name}",
-                    color=EmbedColors.WARNING)
-                dm_embed.add_field(name="Reason", value=spam_type, inline=True)
-                dm_embed.add_field(name="Duration", value=duration_str, inline=True)
-                dm_embed.add_field(name="Violation", value=f"#{violation_count}", inline=True)
-                if expires_at:
-                    unmute_ts = int(expires_at)
-                    dm_embed.add_field(name="Unmutes", value=f"<t:{unmute_ts}:F> (<t:{unmute_ts}:R>)", inline=False)
-                await member.send(embed=dm_embed)
-                dm_sent = True
-            except discord.Forbidden:
-                logger.debug("Auto-Mute DM Blocked", [("User", str(member.id))])
-            except discord.HTTPException as e:
-                log_http_error(e, "Auto-Mute DM", [("User", str(member.id))])
-
-            logger.tree("AUTO-MUTE APPLIED", [
-                ("User", f"{member.name} ({member.nick})" if member.nick else member.name),
-                ("User ID", str(member.id)),
-                ("Type", spam_type),
-                ("Duration", duration_str),
-                ("Violation", f"#{violation_count}"),
-                ("DM Sent", "Yes" if dm_sent else "No (DMs disabled)"),
-            ], emoji="🔇")
-
-            # Log to dashboard events
-            event_logger.log_timeout(
-                guild=member.guild,
-                target=member,
-                moderator=None,  # Auto-action
-                reason=f"Auto-mute: {spam_type} (violation #{violation_count})",
-                duration_seconds=duration)
+            timings["Mute Record"] = (time.perf_counter() - start) * 1000
 
         except discord.Forbidden:
             logger.warning("Auto-Mute Permission Denied", [
@@ -530,12 +548,14 @@ class SpamHandlerMixin:
                 ("User ID", str(member.id)),
                 ("Type", spam_type),
             ])
+            return
         except discord.HTTPException as e:
             log_http_error(e, "Auto-Mute", [
                 ("User", f"{member.name} ({member.nick})" if member.nick else member.name),
                 ("User ID", str(member.id)),
                 ("Type", spam_type),
             ])
+            return
         except Exception as e:
             logger.error("Auto-Mute Exception", [
                 ("User", f"{member.name} ({member.nick})" if member.nick else member.name),
@@ -544,6 +564,146 @@ class SpamHandlerMixin:
                 ("Error", str(e)[:100]),
                 ("Type", type(e).__name__),
             ])
+            return
+
+        self._mute_latencies.append(time_to_mute)
+
+        # ---------------------------------------------------------------------
+        # Concurrent Side Effects
+        # ---------------------------------------------------------------------
+
+        outcome = {"dm_sent": False}
+
+        async def timed(label: str, coro: Awaitable[Any]) -> None:
+            step_start = time.perf_counter()
+            try:
+                await coro
+            finally:
+                timings[label] = (time.perf_counter() - step_start) * 1000
+
+        async def case_and_notice() -> None:
+            case_info = await self._open_spam_case(member, spam_type, duration, violation_count, message_content)
+            await self._send_mute_notice(member, spam_type, channel, violation_count, duration_str, expires_at, case_info)
+
+        async def dm_user() -> None:
+            outcome["dm_sent"] = await self._send_mute_dm(member, spam_type, violation_count, duration_str, expires_at)
+
+        async def audit_log() -> None:
+            await asyncio.to_thread(
+                db.log_moderation_action,
+                user_id=member.id,
+                guild_id=member.guild.id,
+                moderator_id=bot.user.id,
+                action_type="mute",
+                action_source="auto_spam",
+                reason=f"Auto-spam: {spam_type}",
+                duration_seconds=duration,
+                details={"spam_type": spam_type, "violation_count": violation_count})
+
+        async def dashboard_event() -> None:
+            event_logger.log_timeout(
+                guild=member.guild,
+                target=member,
+                moderator=None,  # Auto-action
+                reason=f"Auto-mute: {spam_type} (violation #{violation_count})",
+                duration_seconds=duration)
+
+        fanout_start = time.perf_counter()
+        await gather_with_logging(
+            ("Case + Notice", timed("Case + Notice", case_and_notice())),
+            ("DM User", timed("DM User", dm_user())),
+            ("Audit Log", timed("Audit Log", audit_log())),
+            ("Dashboard Event", timed("Dashboard Event", dashboard_event())),
+            context="Auto-Mute",
+        )
+        timings["Fan-out"] = (time.perf_counter() - fanout_start) * 1000
+
+        # Rolling average per step for get_mute_timing_stats()
+        for label, ms in timings.items():
+            previous = self._mute_step_ms.get(label)
+            self._mute_step_ms[label] = ms if previous is None else previous * 0.8 + ms * 0.2
+
+        logger.tree("AUTO-MUTE APPLIED", [
+            ("User", f"{member.name} ({member.nick})" if member.nick else member.name),
+            ("User ID", str(member.id)),
+            ("Type", spam_type),
+            ("Duration", duration_str),
+            ("Violation", f"#{violation_count}"),
+            ("DM Sent", "Yes" if outcome["dm_sent"] else "No (DMs disabled)"),
+            ("Time To Mute", f"{time_to_mute:.0f}ms"),
+            ("Steps", ", ".join(f"{label} {ms:.0f}ms" for label, ms in timings.items())),
+        ], emoji="🔇")
+
+    async def _send_mute_notice(
+        self,
+        member: discord.Member,
+        spam_type: str,
+        channel: discord.abc.Messageable,
+        violation_count: int,
+        duration_str: str,
+        expires_at: Optional[float],
+        case_info: Optional[dict]) -> None:
+        """Post the public mute notice, linking the case thread if one was opened."""
+        embed = discord.Embed(
+            title=f"🔇 {spam_type}",
+            description=f"{embed_mention(member)} has been muted.",
+            color=EmbedColors.WARNING)
+        embed.add_field(name="Duration", value=duration_str, inline=True)
+        embed.add_field(name="Violation", value=f"#{violation_count}", inline=True)
+        if expires_at:
+            unmute_ts = int(expires_at)
+            embed.add_field(name="Unmutes", value=f"<t:{unmute_ts}:F> (<t:{unmute_ts}:R>)", inline=False)
+
+        view = None
+        if case_info and case_info.get("thread_id"):
+            case_url = f"https://discord.com/channels/{member.guild.id}/{case_info['thread_id']}"
+            view = discord.ui.View(timeout=None)
+            view.add_item(discord.ui.Button(
+                label="Case",
+                url=case_url,
+                style=discord.ButtonStyle.link,
+                emoji=CASE_EMOJI))
+
+        try:
+            await channel.send(embed=embed, view=view, delete_after=DELETE_AFTER_LONG)
+        except discord.HTTPException as e:
+            log_http_error(e, "Auto-Mute Notice", [("User", str(member.id))])
+
+    async def _send_mute_dm(
+        self,
+        member: discord.Member,
+        spam_type: str,
+        violation_count: int,
+        duration_str: str,
+        expires_at: Optional[float]) -> bool:
+        """DM the user about the mute. Returns True if the DM was delivered."""
+        try:
+            dm_embed = discord.Embed(
+                title=f"🔇 You've been muted in {member.guild.name}",
+                color=EmbedColors.WARNING)
+            dm_embed.add_field(name="Reason", value=spam_type, inline=True)
+            dm_embed.add_field(name="Duration", value=duration_str, inline=True)
+            dm_embed.add_field(name="Violation", value=f"#{violation_count}", inline=True)
+            if expires_at:
+                unmute_ts = int(expires_at)
+                dm_embed.add_field(name="Unmutes", value=f"<t:{unmute_ts}:F> (<t:{unmute_ts}:R>)", inline=False)
+            await member.send(embed=dm_embed)
+            return True
+        except discord.Forbidden:
+            logger.debug("Auto-Mute DM Blocked", [("User", str(member.id))])
+        except discord.HTTPException as e:
+            log_http_error(e, "Auto-Mute DM", [("User", str(member.id))])
+        return False
+
+    def get_mute_timing_stats(self) -> Dict[str, Any]:
+        """Time-to-mute percentiles and rolling per-step averages (ms)."""
+        samples = sorted(self._mute_latencies)
+        return {
+            "mutes": len(samples),
+            "time_to_mute_p50_ms": round(samples[len(samples) // 2], 1) if samples else 0.0,
+            "time_to_mute_p95_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 1) if samples else 0.0,
+            "steps_ms": {label: round(ms, 1) for label, ms in self._mute_step_ms.items()},
+        }
 
     async def _open_spam_case(
         self,
@@ -0,0 +1,323 @@
+"""
+AzabBot - Anti-Spam Perceptual Image Hashing
+============================================
+
+Content-based duplicate image detection across accounts.
+
+DESIGN:
+    hash_attachment() only fingerprints filename/size/type, so a re-encoded,
+    renamed or cropped copy of the same scam image slips through, and it is
+    tracked per user so a raid of accounts posting one image each is never
+    linked. This module adds:
+    - ImageHasher: bounded-concurrency download worker with a byte cap that
+      fetches a downscaled copy from Discord's media proxy and computes a
+      dHash in the detector process pool
+    - PerceptualHashIndex: guild-wide multi-index hash table answering
+      "which recent images are within N bits of this one?" without a
+      linear scan, with O(1) insertion-order expiry
+
+    The index splits each 64-bit hash into PHASH_BANDS bands. By pigeonhole,
+    two hashes within PHASH_MAX_DISTANCE < PHASH_BANDS bits share at least one
+    identical band, so only hashes sharing a band are ever compared.
+
+    False positives:
+    - Solid, blank or near-uniform images have a dHash of (almost) all
+      zeros, so they all match each other. Hashes with fewer than
+      PHASH_MIN_SET_BITS set or unset bits are dropped before indexing
+    - A popular meme is legitimately posted by many members. The
+      cross-account rule only counts against new or low-reputation
+      members; established members are held to the same-user limit
+
+Author: حَـــــنَّـــــا
+Server: discord.gg/syria
+"""
+
+import asyncio
+import time
+from collections import defaultdict, deque
+from datetime import datetime
+from typing import Deque, Dict, List, Optional, Set, Tuple, TYPE_CHECKING
+
+import aiohttp
+import discord
+
+from src.core.logger import logger
+from src.utils.http import http_session, DOWNLOAD_TIMEOUT
+
+from .detectors import Image, compute_dhash, hamming_distance
+
+if TYPE_CHECKING:
+    from .executor import DetectorExecutor
+
+
+# =============================================================================
+# Constants
+# =============================================================================
+
+PHASH_MAX_DISTANCE: int = 6               # Bits of difference still counted as "same image"
+PHASH_BANDS: int = 8                      # 8 bands x 8 bits (must exceed PHASH_MAX_DISTANCE)
+PHASH_CROSS_USER_ACCOUNTS: int = 3        # Distinct accounts posting one image -> spam (new/low-rep poster)
+PHASH_MIN_SET_BITS: int = 4               # Fewer set (or unset) bits -> near-constant image, not hashed
+PHASH_MAX_ENTRIES_PER_GUILD: int = 5000   # Oldest entries evicted beyond this
+PHASH_MAX_DOWNLOAD_BYTES: int = 2 * 1024 * 1024  # Byte cap per download
+PHASH_MAX_SOURCE_BYTES: int = 25 * 1024 * 1024   # Skip attachments larger than this outright
+PHASH_DOWNLOAD_CONCURRENCY: int = 4       # Parallel image downloads
+PHASH_PROXY_SIZE: int = 128               # Media proxy resize target (px)
+PHASH_TIMEOUT: float = 5.0                # Max time spent hashing one message
+
+_BAND_BITS: int = 64 // PHASH_BANDS
+_BAND_MASK: int = (1 << _BAND_BITS) - 1
+
+
+# =============================================================================
+# Helpers
+# =============================================================================
+
+def is_near_constant(value: int) -> bool:
+    """Check if a dHash is (almost) all zeros or ones, e.g. a blank image."""
+    set_bits = bin(value).count("1")
+    return set_bits < PHASH_MIN_SET_BITS or set_bits > 64 - PHASH_MIN_SET_BITS
+
+
+# =============================================================================
+# Perceptual Hash Index
+# =============================================================================
+
+class PerceptualHashIndex:
+    """
+    Time-windowed multi-index hash table of recent image hashes for one guild.
+
+    Entries are (hash, user_id, timestamp). Expiry and the size cap pop from
+    an insertion-ordered deque, so cleanup cost is proportional to the number
+    of entries removed rather than the index size. Each distinct hash also
+    keeps its own posts in insertion order, so a query reads only the posts
+    of matched hashes.
+    """
+
+    def __init__(self) -> None:
+        self._entries: Deque[Tuple[int, int, datetime]] = deque()
+        self._by_hash: Dict[int, Deque[Tuple[int, datetime]]] = {}  # hash -> (user_id, timestamp) posts
+        self._bands: List[Dict[int, Set[int]]] = [defaultdict(set) for _ in range(PHASH_BANDS)]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def _band_keys(value: int) -> List[int]:
+        return [(value >> (i * _BAND_BITS)) & _BAND_MASK for i in range(PHASH_BANDS)]
+
+    def add(self, value: int, user_id: int, timestamp: datetime) -> None:
+        """Record an image hash posted by user_id."""
+        self._entries.append((value, user_id, timestamp))
+        posts = self._by_hash.get(value)
+        if posts is None:
+            posts = self._by_hash[value] = deque()
+            for band, key in zip(self._bands, self._band_keys(value)):
+                band[key].add(value)
+        posts.append((user_id, timestamp))
+
+        while len(self._entries) > PHASH_MAX_ENTRIES_PER_GUILD:
+            self._pop_oldest()
+
+    def query(self, value: int, since: datetime) -> List[Tuple[int, datetime]]:
+        """
+        Find recent posts of images within PHASH_MAX_DISTANCE of value.
+
+        Args:
+            value: dHash of the new image.
+            since: Only entries newer than this are returned.
+
+        Returns:
+            List of (user_id, timestamp) for matching posts.
+        """
+        candidates: Set[int] = set()
+        for band, key in zip(self._bands, self._band_keys(value)):
+            bucket = band.get(key)
+            if bucket:
+                candidates.update(bucket)
+
+        matches: List[Tuple[int, datetime]] = []
+        for h in candidates:
+            if hamming_distance(h, value) <= PHASH_MAX_DISTANCE:
+                matches.extend((uid, ts) for uid, ts in self._by_hash[h] if ts > since)
+        return matches
+
+    def find_duplicate(
+        self,
+        value: int,
+        user_id: int,
+        since: datetime,
+        own_limit: int,
+        cross_user: bool,
+    ) -> Optional[Tuple[int, int]]:
+        """
+        Decide whether posting value now counts as duplicate image spam.
+
+        Args:
+            value: dHash of the new image.
+            user_id: Account posting it.
+            since: Only entries newer than this count.
+            own_limit: Posts of the image by this account (including this one)
+                that count as spam.
+            cross_user: Whether PHASH_CROSS_USER_ACCOUNTS distinct accounts
+                also count (only for new or low-reputation posters).
+
+        Returns:
+            (accounts, posts) including this post if it is a duplicate,
+            None otherwise.
+        """
+        matches = self.query(value, since)
+        own_matches = sum(1 for uid, _ in matches if uid == user_id)
+        accounts = {uid for uid, _ in matches} | {user_id}
+        if own_matches >= own_limit - 1 or (cross_user and len(accounts) >= PHASH_CROSS_USER_ACCOUNTS):
+            return len(accounts), len(matches) + 1
+        return None
+
+    def expire(self, cutoff: datetime) -> int:
+        """
+        Drop entries older than cutoff.
+
+        Returns:
+            Number of entries removed.
+        """
+        removed = 0
+        while self._entries and self._entries[0][2] <= cutoff:
+            self._pop_oldest()
+            removed += 1
+        return removed
+
+    def _pop_oldest(self) -> None:
+        value, _, _ = self._entries.popleft()
+        posts = self._by_hash[value]
+        posts.popleft()  # Global insertion order, so this hash's oldest post
+        if posts:
+            return
+        del self._by_hash[value]
+        for band, key in zip(self._bands, self._band_keys(value)):
+            bucket = band.get(key)
+            if bucket is not None:
+                bucket.discard(value)
+                if not bucket:
+                    del band[key]
+
+
+# =============================================================================
+# Image Hasher
+# =============================================================================
+
+class ImageHasher:
+    """
+    Downloads image attachments and computes their perceptual hashes.
+
+    Downloads are bounded by a semaphore and a byte cap; decoding runs in the
+    detector pool (or a thread) so large images never block the event loop.
+    """
+
+    def __init__(self, executor: "DetectorExecutor") -> None:
+        self._executor = executor
+        self._semaphore = asyncio.Semaphore(PHASH_DOWNLOAD_CONCURRENCY)
+
+        # Stats
+        self._hashed: int = 0
+        self._skipped: int = 0
+        self._failed: int = 0
+        self._total_ms: float = 0.0
+
+    @property
+    def enabled(self) -> bool:
+        """Perceptual hashing requires Pillow."""
+        return Image is not None
+
+    @staticmethod
+    def is_hashable(attachment: discord.Attachment) -> bool:
+        """Check whether an attachment is an image worth downloading."""
+        content_type = attachment.content_type or ""
+        return content_type.startswith("image/") and attachment.size <= PHASH_MAX_SOURCE_BYTES
+
+    async def hash_attachments(self, attachments: List[discord.Attachment]) -> List[int]:
+        """
+        Compute dHashes for the image attachments of one message.
+
+        Args:
+            attachments: Message attachments (non-images are skipped).
+
+        Returns:
+            List of hashes for images that downloaded and decoded successfully.
+        """
+        targets = [a for a in attachments if self.is_hashable(a)]
+        self._skipped += len(attachments) - len(targets)
+        if not targets:
+            return []
+
+        results = await asyncio.gather(*(self._hash_one(a) for a in targets))
+        return [h for h in results if h is not None]
+
+    async def _hash_one(self, attachment: discord.Attachment) -> Optional[int]:
+        start = time.perf_counter()
+        data = await self._download(attachment)
+        if data is None:
+            self._failed += 1
+            return None
+
+        value = await self._executor.run(compute_dhash, data, offload=True)
+        if value is None:
+            self._failed += 1
+            return None
+
+        self._hashed += 1
+        self._total_ms += (time.perf_counter() - start) * 1000
+        if is_near_constant(value):
+            # Blank/solid images all hash alike; they'd match each other
+            self._skipped += 1
+            return None
+        return value
+
+    async def _download(self, attachment: discord.Attachment) -> Optional[bytes]:
+        """Stream a downscaled copy of the attachment, aborting past the byte cap."""
+        # The media proxy resizes server-side, so we usually pull a few KB
+        # instead of the original upload
+        separator = "&" if "?" in attachment.proxy_url else "?"
+        url = f"{attachment.proxy_url}{separator}width={PHASH_PROXY_SIZE}&height={PHASH_PROXY_SIZE}"
+
+        async with self._semaphore:
+            try:
+                async with http_session.get(url, timeout=DOWNLOAD_TIMEOUT) as resp:
+                    if resp.status != 200:
+                        return None
+                    if resp.content_length and resp.content_length > PHASH_MAX_DOWNLOAD_BYTES:
+                        return None
+                    buffer = bytearray()
+                    async for chunk in resp.content.iter_chunked(64 * 1024):
+                        buffer.extend(chunk)
+                        if len(buffer) > PHASH_MAX_DOWNLOAD_BYTES:
+                            return None
+                    return bytes(buffer)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                logger.debug("Image Hash Download Failed", [
+                    ("File", attachment.filename[:30]),
+                    ("Error", str(e)[:50]),
+                ])
+                return None
+
+    def get_stats(self) -> Dict[str, float]:
+        """Snapshot of hasher counters for logging / the dashboard API."""
+        return {
+            "hashed": self._hashed,
+            "skipped": self._skipped,
+            "failed": self._failed,
+            "avg_ms": round(self._total_ms / self._hashed, 2) if self._hashed else 0.0,
+        }
+
+
+# =============================================================================
+# Module Export
+# =============================================================================
+
+__all__ = [
+    "ImageHasher",
+    "PerceptualHashIndex",
+    "PHASH_MAX_DISTANCE",
+    "PHASH_CROSS_USER_ACCOUNTS",
+    "is_near_constant",
+    "PHASH_TIMEOUT",
+]
@@ -0,0 +1,252 @@
+"""
+AzabBot - Anti-Spam Invite Resolver
+===================================
+
+TTL cache in front of bot.fetch_invite() for invite spam checks.
+
+DESIGN:
+    Every non-whitelisted invite used to cost one REST round trip, so a
+    raid pasting the same invite 200 times burned 200 API calls against
+    the global rate limit. Resolutions are now cached per invite code:
+    - Positive entries map code -> target guild for INVITE_CACHE_TTL
+    - NotFound is cached as a negative entry for INVITE_NEGATIVE_TTL
+    - Other HTTP errors are never cached (lenient, retried next time)
+    - Concurrent lookups for the same code share one in-flight fetch
+    - Multi-invite messages resolve concurrently behind a semaphore
+
+Author: حَـــــنَّـــــا
+Server: discord.gg/syria
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Iterable, Optional, TYPE_CHECKING
+
+import discord
+
+from src.core.logger import logger
+
+if TYPE_CHECKING:
+    from src.bot import AzabBot
+
+
+# =============================================================================
+# Constants
+# =============================================================================
+
+INVITE_CACHE_TTL: int = 3600          # Positive entries (guild rarely changes)
+INVITE_NEGATIVE_TTL: int = 600        # NotFound entries (invite may be recreated)
+INVITE_CACHE_MAX_ENTRIES: int = 5000  # LRU cap on cached codes
+INVITE_LOOKUP_CONCURRENCY: int = 4    # Max parallel fetch_invite calls
+
+
+# =============================================================================
+# Models
+# =============================================================================
+
+@dataclass
+class ResolvedInvite:
+    """Cached result of a single invite lookup."""
+    code: str
+    found: bool
+    guild_id: Optional[int] = None
+    guild_name: Optional[str] = None
+    channel_name: Optional[str] = None
+    expires_at: float = 0.0
+
+
+# =============================================================================
+# Invite Resolver
+# =============================================================================
+
+class InviteResolver:
+    """
+    Resolves invite codes to their target guild with caching.
+
+    Returns None for a code when the lookup failed with a non-404 HTTP
+    error - callers should treat that as "unknown" and not count it.
+    """
+
+    def __init__(self, bot: "AzabBot") -> None:
+        self.bot = bot
+        self._cache: "OrderedDict[str, ResolvedInvite]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._semaphore = asyncio.Semaphore(INVITE_LOOKUP_CONCURRENCY)
+
+        # Stats
+        self._hits: int = 0
+        self._misses: int = 0
+        self._coalesced: int = 0
+        self._api_calls: int = 0
+        self._api_errors: int = 0
+
+    # =========================================================================
+    # Lookup
+    # =========================================================================
+
+    async def resolve(self, code: str) -> Optional[ResolvedInvite]:
+        """
+        Resolve one invite code, using the cache when possible.
+
+        Args:
+            code: Invite code (case-sensitive, as extracted from the message).
+
+        Returns:
+            ResolvedInvite (found or negative), or None on transient API error.
+        """
+        entry = self._get_cached(code)
+        if entry is not None:
+            self._hits += 1
+            return entry
+
+        # Single-flight: piggyback on an in-progress lookup for this code
+        pending = self._inflight.get(code)
+        if pending is not None:
+            self._coalesced += 1
+            return await asyncio.shield(pending)
+
+        self._misses += 1
+        # Fetch runs as its own task so a cancelled caller (e.g. the message
+        # handler timing out) doesn't cancel the lookup for everyone waiting
+        task = asyncio.ensure_future(self._fetch(code))
+        self._inflight[code] = task
+        task.add_done_callback(lambda t: self._clear_inflight(code, t))
+        return await asyncio.shield(task)
+
+    def _clear_inflight(self, code: str, task: asyncio.Future) -> None:
+        """Forget a finished lookup (only if it's still the registered one)."""
+        if self._inflight.get(code) is task:
+            del self._inflight[code]
+
+    async def resolve_many(self, codes: Iterable[str]) -> Dict[str, Optional[ResolvedInvite]]:
+        """
+        Resolve several invite codes concurrently (bounded by semaphore).
+
+        Duplicate codes in the input are looked up once.
+
+        Args:
+            codes: Invite codes from a single message.
+
+        Returns:
+            Dict mapping each unique code to its resolution (or None).
+        """
+        unique = list(dict.fromkeys(codes))
+        if not unique:
+            return {}
+        results = await asyncio.gather(*(self.resolve(c) for c in unique))
+        return dict(zip(unique, results))
+
+    async def _fetch(self, code: str) -> Optional[ResolvedInvite]:
+        """Fetch an invite from Discord and cache the outcome."""
+        async with self._semaphore:
+            self._api_calls += 1
+            try:
+                invite = await self.bot.fetch_invite(code, with_counts=False)
+            except discord.NotFound:
+                entry = ResolvedInvite(
+                    code=code,
+                    found=False,
+                    expires_at=time.monotonic() + INVITE_NEGATIVE_TTL,
+                )
+                self._store(entry)
+                return entry
+            except discord.HTTPException as e:
+                # API error - don't cache, caller stays lenient
+                self._api_errors += 1
+                logger.warning("Invite Fetch Failed", [
+                    ("Code", code),
+                    ("Error", str(e)[:50]),
+                ])
+                return None
+
+        entry = ResolvedInvite(
+            code=code,
+            found=True,
+            guild_id=invite.guild.id if invite.guild else None,
+            guild_name=invite.guild.name if invite.guild else None,
+            channel_name=getattr(invite.channel, "name", None),
+            expires_at=time.monotonic() + INVITE_CACHE_TTL,
+        )
+        self._store(entry)
+        return entry
+
+    # =========================================================================
+    # Cache Management
+    # =========================================================================
+
+    def _get_cached(self, code: str) -> Optional[ResolvedInvite]:
+        """Return a live cache entry for code, dropping it if expired."""
+        entry = self._cache.get(code)
+        if entry is None:
+            return None
+        if entry.expires_at <= time.monotonic():
+            del self._cache[code]
+            return None
+        self._cache.move_to_end(code)
+        return entry
+
+    def _store(self, entry: ResolvedInvite) -> None:
+        """Insert an entry, evicting least-recently-used codes over the cap."""
+        self._cache[entry.code] = entry
+        self._cache.move_to_end(entry.code)
+        while len(self._cache) > INVITE_CACHE_MAX_ENTRIES:
+            self._cache.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    def prune(self) -> int:
+        """
+        Drop expired entries.
+
+        Returns:
+            Number of entries removed.
+        """
+        now = time.monotonic()
+        expired = [code for code, entry in self._cache.items() if entry.expires_at <= now]
+        for code in expired:
+            del self._cache[code]
+        return len(expired)
+
+    # =========================================================================
+    # Stats
+    # =========================================================================
+
+    @property
+    def api_calls_saved(self) -> int:
+        """Lookups answered without a REST call (cache hits + coalesced)."""
+        return self._hits + self._coalesced
+
+    @property
+    def hit_ratio(self) -> float:
+        """Fraction of lookups served without a REST call."""
+        total = self._hits + self._coalesced + self._misses
+        return self.api_calls_saved / total if total else 0.0
+
+    def get_stats(self) -> Dict[str, float]:
+        """Snapshot of cache counters for logging / the dashboard API."""
+        return {
+            "entries": len(self._cache),
+            "inflight": len(self._inflight),
+            "hits": self._hits,
+            "misses": self._misses,
+            "coalesced": self._coalesced,
+            "api_calls": self._api_calls,
+            "api_errors": self._api_errors,
+            "api_calls_saved": self.api_calls_saved,
+            "hit_ratio": round(self.hit_ratio, 4),
+        }
+
+
+# =============================================================================
+# Module Export
+# =============================================================================
+
+__all__ = [
+    "InviteResolver",
+    "ResolvedInvite",
+    "INVITE_CACHE_TTL",
+    "INVITE_NEGATIVE_TTL",
+]
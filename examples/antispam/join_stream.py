@@ -0,0 +1,270 @@
+"""
+AzabBot - Streaming Raid Detector
+=================================
+
+Incremental join-rate counters and join clustering over JoinRecords.
+
+DESIGN:
+    Raid checks used to rescan the recent join list on every join and
+    relied on a periodic sweep (cleanup_raid_records) to trim it. The
+    streaming detector keeps everything incremental, so each join is O(1)
+    amortized and nothing is swept:
+    - Join rate over 10s / 60s / 10m from one ring of per-second buckets
+      with a running sum per window - advancing a second subtracts the
+      buckets that left each window
+    - Clusters of recent joins keyed on:
+        avatar:<hash>      same uploaded avatar
+        name:<skeleton>    username with confusables folded and
+                           digits/separators stripped ("spammer_1234" and
+                           Cyrillic "ѕрammеr99" share "spammer")
+        created:<hour>     young accounts created in the same hour
+      Each cluster is a deque of (time, user_id) trimmed from the front;
+      idle clusters age out of an OrderedDict in last-touch order
+    - A raid is flagged when a cluster or a rate window crosses its
+      threshold. The first crossing reports every member of the cluster,
+      later joins into a flagged cluster report just the new member
+
+    Time is the JoinRecord's join_time, so replays of recorded or
+    synthetic streams behave exactly like live traffic.
+
+Author: حَـــــنَّـــــا
+Server: discord.gg/syria
+"""
+
+import unicodedata
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Deque, Dict, List, NamedTuple, Optional, Tuple
+
+from .models import JoinRecord
+
+
+# =============================================================================
+# Constants
+# =============================================================================
+
+RATE_WINDOWS: Tuple[int, ...] = (10, 60, 600)          # Seconds
+RATE_THRESHOLDS: Dict[int, int] = {10: 15, 60: 40, 600: 150}
+
+CLUSTER_WINDOW: float = 120.0           # Seconds a join counts towards its clusters
+CLUSTER_THRESHOLDS: Dict[str, int] = {
+    "avatar": 4,                        # Identical custom avatars are a strong signal
+    "name": 5,
+    "created": 8,                       # Same-hour young accounts, weaker signal
+}
+YOUNG_ACCOUNT_AGE: timedelta = timedelta(days=30)
+MIN_SKELETON_LENGTH: int = 3            # Shorter skeletons are too generic to cluster
+MAX_CLUSTERS: int = 100_000             # Hard cap on tracked cluster keys
+
+CONFUSABLES: Dict[int, str] = str.maketrans({
+    # Cyrillic / Greek lookalikes
+    'а': 'a', 'е': 'e', 'о': 'o', 'р': 'p', 'с': 'c', 'х': 'x', 'у': 'y',
+    'і': 'i', 'ј': 'j', 'ѕ': 's', 'ԁ': 'd', 'ɡ': 'g', 'һ': 'h', 'ⅼ': 'l',
+    'α': 'a', 'ο': 'o', 'ρ': 'p', 'ν': 'v', 'τ': 't', 'κ': 'k', 'ι': 'i',
+    # Leetspeak letters (digits that stand for letters inside words)
+    '@': 'a', '$': 's',
+})
+SKELETON_DROP: Dict[int, None] = str.maketrans('', '', '0123456789_.-· ')
+
+
+# =============================================================================
+# Models
+# =============================================================================
+
+class RaidSignal(NamedTuple):
+    """A raid threshold crossing."""
+    reason: str                 # "rate:10s", "avatar", "name", "created"
+    key: str                    # Cluster key or window
+    count: int                  # Joins in the cluster/window
+    user_ids: Tuple[int, ...]   # Members to act on (empty for rate alerts)
+    first: bool                 # True on the crossing, False for stragglers
+
+
+@dataclass
+class _Cluster:
+    joins: Deque[Tuple[float, int]]
+    flagged: bool = False
+
+
+# =============================================================================
+# Helpers
+# =============================================================================
+
+def name_skeleton(username: str) -> str:
+    """
+    Fold a username to its raid-template skeleton.
+
+    NFKD + combining marks removed, lowercased, confusables folded, then
+    digits and separators stripped.
+    """
+    decomposed = unicodedata.normalize("NFKD", username.lower())
+    base = ''.join(c for c in decomposed if not unicodedata.combining(c))
+    return base.translate(CONFUSABLES).translate(SKELETON_DROP)
+
+
+# =============================================================================
+# Windowed Counter
+# =============================================================================
+
+class WindowedCounter:
+    """
+    Event counts over several trailing windows in O(1) amortized per event.
+
+    One ring of per-second buckets sized to the longest window plus a
+    running sum per window.
+    """
+
+    def __init__(self, windows: Tuple[int, ...] = RATE_WINDOWS) -> None:
+        self._windows = tuple(sorted(windows))
+        self._size = self._windows[-1]
+        self._ring: List[int] = [0] * self._size
+        self._sums: Dict[int, int] = {w: 0 for w in self._windows}
+        self._tick: Optional[int] = None
+
+    def add(self, now: float, count: int = 1) -> None:
+        self._advance(int(now))
+        self._ring[self._tick % self._size] += count
+        for window in self._windows:
+            self._sums[window] += count
+
+    def counts(self, now: float) -> Dict[int, int]:
+        self._advance(int(now))
+        return dict(self._sums)
+
+    def _advance(self, tick: int) -> None:
+        if self._tick is None:
+            self._tick = tick
+            return
+        if tick <= self._tick:
+            return  # Same second (or slightly out-of-order event)
+        if tick - self._tick >= self._size:
+            self._ring = [0] * self._size
+            self._sums = {w: 0 for w in self._windows}
+            self._tick = tick
+            return
+        while self._tick < tick:
+            self._tick += 1
+            # Bucket (tick - w) just left window w
+            for window in self._windows:
+                self._sums[window] -= self._ring[(self._tick - window) % self._size]
+            self._ring[self._tick % self._size] = 0
+
+
+# =============================================================================
+# Streaming Raid Detector
+# =============================================================================
+
+class StreamingRaidDetector:
+    """Per-guild incremental raid detection over the join stream."""
+
+    def __init__(self) -> None:
+        self._rate = WindowedCounter()
+        self._rate_flagged: Dict[int, bool] = {w: False for w in RATE_WINDOWS}
+        self._clusters: "OrderedDict[str, _Cluster]" = OrderedDict()
+
+        # Stats
+        self.joins: int = 0
+        self.signals: int = 0
+
+    def observe(self, record: JoinRecord) -> List[RaidSignal]:
+        """
+        Feed one join.
+
+        Args:
+            record: The join.
+
+        Returns:
+            Raid signals triggered or extended by this join (usually empty).
+        """
+        now = record.join_time.timestamp()
+        self.joins += 1
+        signals: List[RaidSignal] = []
+
+        # Rate windows
+        self._rate.add(now)
+        for window, count in self._rate.counts(now).items():
+            threshold = RATE_THRESHOLDS[window]
+            if count >= threshold and not self._rate_flagged[window]:
+                self._rate_flagged[window] = True
+                # Guild-level alert - a join rate doesn't identify members
+                signals.append(RaidSignal(f"rate:{window}s", f"{window}s", count, (), True))
+            elif count < threshold // 2:
+                self._rate_flagged[window] = False  # Hysteresis before re-arming
+
+        # Clusters
+        self._expire_clusters(now)
+        for kind, key in self._cluster_keys(record):
+            signal = self._add_to_cluster(kind, key, record.user_id, now)
+            if signal is not None:
+                signals.append(signal)
+
+        self.signals += len(signals)
+        return signals
+
+    def _cluster_keys(self, record: JoinRecord) -> List[Tuple[str, str]]:
+        keys = []
+        if record.avatar_hash and not record.has_default_avatar:
+            keys.append(("avatar", f"avatar:{record.avatar_hash}"))
+
+        skeleton = name_skeleton(record.username)
+        if len(skeleton) >= MIN_SKELETON_LENGTH:
+            keys.append(("name", f"name:{skeleton}"))
+
+        if record.join_time - record.account_created < YOUNG_ACCOUNT_AGE:
+            hour = record.account_created.replace(minute=0, second=0, microsecond=0)
+            keys.append(("created", f"created:{hour.isoformat()}"))
+        return keys
+
+    def _add_to_cluster(self, kind: str, key: str, user_id: int, now: float) -> Optional[RaidSignal]:
+        cluster = self._clusters.get(key)
+        if cluster is None:
+            cluster = self._clusters[key] = _Cluster(deque())
+            if len(self._clusters) > MAX_CLUSTERS:
+                self._clusters.popitem(last=False)
+        else:
+            self._clusters.move_to_end(key)
+
+        joins = cluster.joins
+        joins.append((now, user_id))
+        cutoff = now - CLUSTER_WINDOW
+        while joins and joins[0][0] < cutoff:
+            joins.popleft()
+
+        if cluster.flagged:
+            return RaidSignal(kind, key, len(joins), (user_id,), False)
+        if len(joins) >= CLUSTER_THRESHOLDS[kind]:
+            cluster.flagged = True
+            return RaidSignal(kind, key, len(joins), tuple(uid for _, uid in joins), True)
+        return None
+
+    def _expire_clusters(self, now: float) -> None:
+        """Drop clusters idle for a full window (front of the OrderedDict)."""
+        cutoff = now - CLUSTER_WINDOW
+        while self._clusters:
+            key, cluster = next(iter(self._clusters.items()))
+            if cluster.joins and cluster.joins[-1][0] >= cutoff:
+                break
+            del self._clusters[key]
+
+    def get_stats(self, now: Optional[datetime] = None) -> Dict[str, int]:
+        """Current join rates and tracked cluster count."""
+        counts = self._rate.counts((now or datetime.now()).timestamp()) if self.joins else {}
+        return {
+            "joins": self.joins,
+            "signals": self.signals,
+            "clusters": len(self._clusters),
+            **{f"rate_{window}s": count for window, count in counts.items()},
+        }
+
+
+# =============================================================================
+# Module Export
+# =============================================================================
+
+__all__ = [
+    "RaidSignal",
+    "StreamingRaidDetector",
+    "WindowedCounter",
+    "name_skeleton",
+]
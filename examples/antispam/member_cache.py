@@ -0,0 +1,143 @@
+"""
+AzabBot - Anti-Spam Member Classification Cache
+===============================================
+
+Per-(guild, member) exemption and new-member classification.
+
+DESIGN:
+    _is_exempt walked every role of the author and read guild_permissions
+    on every message, and _is_new_member did two datetime subtractions per
+    message. Both answers only change on role/permission updates and joins,
+    so they are computed once per member and cached:
+    - exempt: has an exempt role or administrator
+    - new_until: the instant the member stops being "new", so is_new is a
+      single comparison and expires on its own without invalidation
+    Entries are invalidated by member/role events (see AntiSpamService
+    invalidate_* methods) and also carry a TTL as a safety net in case an
+    event is missed.
+
+Author: حَـــــنَّـــــا
+Server: discord.gg/syria
+"""
+
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Set
+
+import discord
+
+from .constants import NEW_MEMBER_ACCOUNT_AGE, NEW_MEMBER_SERVER_AGE
+
+
+# =============================================================================
+# Constants
+# =============================================================================
+
+MEMBER_CLASS_TTL: float = 1800.0        # Backstop for a missed member/role event
+MEMBER_CLASS_MAX_PER_GUILD: int = 20_000
+
+
+# =============================================================================
+# Models
+# =============================================================================
+
+@dataclass
+class MemberClass:
+    """Cached classification for one member."""
+    exempt: bool
+    new_until: Optional[datetime]
+    cached_at: float
+
+    def is_new(self, now: datetime) -> bool:
+        return self.new_until is not None and now < self.new_until
+
+
+# =============================================================================
+# Member Classification Cache
+# =============================================================================
+
+class MemberClassCache:
+    """LRU cache of MemberClass per guild."""
+
+    def __init__(self) -> None:
+        self._guilds: Dict[int, "OrderedDict[int, MemberClass]"] = {}
+        self.hits: int = 0
+        self.misses: int = 0
+
+    def get(self, member: discord.Member, exempt_roles: Set[int]) -> MemberClass:
+        """
+        Get a member's classification, computing it on a miss.
+
+        Args:
+            member: Guild member.
+            exempt_roles: Role IDs that exempt a member from detection.
+
+        Returns:
+            MemberClass for the member.
+        """
+        guild_cache = self._guilds.get(member.guild.id)
+        if guild_cache is None:
+            guild_cache = self._guilds[member.guild.id] = OrderedDict()
+
+        entry = guild_cache.get(member.id)
+        if entry is not None and time.monotonic() - entry.cached_at < MEMBER_CLASS_TTL:
+            self.hits += 1
+            guild_cache.move_to_end(member.id)
+            return entry
+
+        self.misses += 1
+        entry = self._classify(member, exempt_roles)
+        guild_cache[member.id] = entry
+        guild_cache.move_to_end(member.id)
+        if len(guild_cache) > MEMBER_CLASS_MAX_PER_GUILD:
+            guild_cache.popitem(last=False)
+        return entry
+
+    @staticmethod
+    def _classify(member: discord.Member, exempt_roles: Set[int]) -> MemberClass:
+        exempt = (
+            any(role.id in exempt_roles for role in member.roles)
+            or member.guild_permissions.administrator
+        )
+
+        # A member is new until BOTH the account and server-age windows pass
+        deadlines = []
+        if member.created_at:
+            deadlines.append(member.created_at + timedelta(days=NEW_MEMBER_ACCOUNT_AGE))
+        if member.joined_at:
+            deadlines.append(member.joined_at + timedelta(days=NEW_MEMBER_SERVER_AGE))
+
+        return MemberClass(
+            exempt=exempt,
+            new_until=max(deadlines) if deadlines else None,
+            cached_at=time.monotonic(),
+        )
+
+    # =========================================================================
+    # Invalidation
+    # =========================================================================
+
+    def invalidate_member(self, guild_id: int, user_id: int) -> None:
+        """Drop one member (role change, join, leave)."""
+        guild_cache = self._guilds.get(guild_id)
+        if guild_cache is not None:
+            guild_cache.pop(user_id, None)
+
+    def invalidate_guild(self, guild_id: int) -> None:
+        """Drop a whole guild (role permissions or exempt roles changed)."""
+        self._guilds.pop(guild_id, None)
+
+    def clear(self) -> None:
+        self._guilds.clear()
+
+    def __len__(self) -> int:
+        return sum(len(g) for g in self._guilds.values())
+
+
+# =============================================================================
+# Module Export
+# =============================================================================
+
+__all__ = ["MemberClass", "MemberClassCache"]
@@ -8,9 +8,12 @@ Author: حَـــــنَّـــــا
 Server: discord.gg/syria
 """
 
+from collections import deque
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import List, Optional
+from typing import Deque, List, Optional
+
+from .constants import WEBHOOK_MESSAGE_LIMIT
 
 
 @dataclass
@@ -49,8 +52,17 @@ class JoinRecord:
 
 @dataclass
 class WebhookState:
-    """Tracks webhook message state."""
-    messages: List[datetime] = field(default_factory=list)
+    """
+    Tracks webhook message state.
+
+    times is a ring of the last WEBHOOK_MESSAGE_LIMIT + 1 monotonic
+    timestamps - the limit is exceeded when the oldest one is still
+    inside the window, so no per-message list rebuild is needed.
+    """
+    times: Deque[float] = field(default_factory=lambda: deque(maxlen=WEBHOOK_MESSAGE_LIMIT + 1))
+    action_at: Optional[float] = None   # Monotonic time of the last removal attempt
+    removed: bool = False               # Webhook deleted
+    suppressed: int = 0                 # Messages swept up after the action started
 
 
 # =============================================================================
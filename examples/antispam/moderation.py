@@ -0,0 +1,468 @@
+"""
+AzabBot - Content Moderation Gateway
+====================================
+
+Verdict cache, micro-batching and failure isolation in front of the
+content-moderation classifier.
+
+DESIGN:
+    The classifier used to be called once per message. Copypasta and
+    repeated phrases were classified again and again, and each call added
+    hundreds of milliseconds. ModerationGateway sits in front of any
+    ContentClassifier:
+    - Verdicts are cached by a hash of the normalized text (tashkeel
+      stripped, elongation and whitespace collapsed) with a TTL
+    - Identical texts already being classified share one in-flight request
+    - Messages arriving within BATCH_WINDOW are sent as one batch request
+      with per-item results
+    - A semaphore caps concurrent requests and a circuit breaker stops
+      calling a failing backend, falling back to the local classifier
+    LocalClassifier is a dependency-free stand-in (term lists per category)
+    so the whole path runs offline and in tests.
+
+    The gateway only produces verdicts. The content-moderation service
+    owns the per-class thresholds and the mute path, so it configures the
+    shared gateway at startup (configure_moderation_gateway) and calls
+    classify() where it used to call the API per message. Anti-spam does
+    not act on verdicts - that would punish the same message twice.
+
+Author: حَـــــنَّـــــا
+Server: discord.gg/syria
+"""
+
+import asyncio
+import hashlib
+import re
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Pattern, Protocol, Sequence, Set, Tuple
+
+from src.core.logger import logger
+from src.utils.async_utils import create_safe_task
+
+from .arabic import normalize_arabic
+
+
+# =============================================================================
+# Constants
+# =============================================================================
+
+VERDICT_CACHE_TTL: float = 3600.0       # Seconds a verdict stays valid
+VERDICT_CACHE_MAX: int = 20_000         # LRU cap on cached verdicts
+BATCH_WINDOW: float = 0.05              # Collect messages this long before a request
+BATCH_MAX_SIZE: int = 16                # Flush early at this many queued texts
+CLASSIFIER_CONCURRENCY: int = 2         # Concurrent classifier requests
+CLASSIFIER_TIMEOUT: float = 10.0        # Seconds per batch request
+BREAKER_FAILURE_THRESHOLD: int = 5      # Consecutive failures that open the breaker
+BREAKER_RESET_TIMEOUT: float = 60.0     # Seconds before a half-open probe
+
+WHITESPACE_PATTERN: Pattern = re.compile(r'\s+')
+
+
+# =============================================================================
+# Models
+# =============================================================================
+
+class ModerationVerdict(NamedTuple):
+    """Classifier result for one text."""
+    flagged: bool
+    category: Optional[str] = None
+    score: float = 0.0
+    source: str = ""
+
+
+class ContentClassifier(Protocol):
+    """Anything that can classify a batch of texts, one verdict per text."""
+    name: str
+
+    async def classify_batch(self, texts: Sequence[str]) -> List[ModerationVerdict]:
+        ...
+
+
+# =============================================================================
+# Normalization
+# =============================================================================
+
+def normalize_for_verdict(text: str) -> str:
+    """
+    Canonical form used as the verdict cache key.
+
+    Arabic-normalized (see arabic.normalize_arabic), lowercased, with
+    whitespace collapsed to single spaces.
+    """
+    return WHITESPACE_PATTERN.sub(' ', normalize_arabic(text.lower())).strip()
+
+
+def verdict_key(normalized: str) -> bytes:
+    """Fixed-size key for a normalized text."""
+    return hashlib.blake2b(normalized.encode('utf-8'), digest_size=16).digest()
+
+
+# =============================================================================
+# Local Classifier
+# =============================================================================
+
+class LocalClassifier:
+    """
+    Offline stand-in classifier matching normalized term lists per category.
+
+    Also used as the fallback while the circuit breaker is open.
+    """
+
+    name = "local"
+
+    def __init__(
+        self,
+        terms: Optional[Dict[str, Iterable[str]]] = None,
+        latency: float = 0.0,
+    ) -> None:
+        """
+        Args:
+            terms: Category -> terms that flag it. Terms are normalized the
+                same way as message text.
+            latency: Artificial per-request delay, for simulating a remote
+                backend in benchmarks.
+        """
+        self._latency = latency
+        self._patterns: List[Tuple[str, Pattern]] = []
+        for category, words in (terms or {}).items():
+            normalized = sorted({normalize_for_verdict(w) for w in words if w}, key=len, reverse=True)
+            if normalized:
+                self._patterns.append((
+                    category,
+                    re.compile(r'(?<!\w)(?:' + '|'.join(map(re.escape, normalized)) + r')(?!\w)'),
+                ))
+        self.requests: int = 0
+
+    async def classify_batch(self, texts: Sequence[str]) -> List[ModerationVerdict]:
+        self.requests += 1
+        if self._latency:
+            await asyncio.sleep(self._latency)
+        return [self.classify(text) for text in texts]
+
+    def classify(self, text: str) -> ModerationVerdict:
+        normalized = normalize_for_verdict(text)
+        for category, pattern in self._patterns:
+            if pattern.search(normalized):
+                return ModerationVerdict(True, category, 1.0, self.name)
+        return ModerationVerdict(False, None, 0.0, self.name)
+
+
+# =============================================================================
+# Verdict Cache
+# =============================================================================
+
+class VerdictCache:
+    """TTL + LRU cache of verdicts keyed by normalized-text hash."""
+
+    def __init__(self, ttl: float = VERDICT_CACHE_TTL, max_entries: int = VERDICT_CACHE_MAX) -> None:
+        self._ttl = ttl
+        self._max_entries = max_entries
+        self._entries: "OrderedDict[bytes, Tuple[ModerationVerdict, float]]" = OrderedDict()
+        self.hits: int = 0
+        self.misses: int = 0
+
+    def get(self, key: bytes) -> Optional[ModerationVerdict]:
+        entry = self._entries.get(key)
+        if entry is None or time.monotonic() - entry[1] > self._ttl:
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return entry[0]
+
+    def put(self, key: bytes, verdict: ModerationVerdict) -> None:
+        self._entries[key] = (verdict, time.monotonic())
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# =============================================================================
+# Circuit Breaker
+# =============================================================================
+
+class CircuitBreaker:
+    """
+    Consecutive-failure breaker.
+
+    closed -> open after BREAKER_FAILURE_THRESHOLD failures; open -> one
+    half-open probe after BREAKER_RESET_TIMEOUT; a successful probe closes it.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = BREAKER_FAILURE_THRESHOLD,
+        reset_timeout: float = BREAKER_RESET_TIMEOUT,
+    ) -> None:
+        self._failure_threshold = failure_threshold
+        self._reset_timeout = reset_timeout
+        self._failures: int = 0
+        self._opened_at: Optional[float] = None
+        self._probing: bool = False
+        self.trips: int = 0
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        if self._probing or time.monotonic() - self._opened_at >= self._reset_timeout:
+            return "half-open"
+        return "open"
+
+    def allow(self) -> bool:
+        """Whether a request may go to the backend now."""
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half-open" and not self._probing:
+            self._probing = True
+            return True
+        return False
+
+    def record_success(self) -> None:
+        self._failures = 0
+        self._opened_at = None
+        self._probing = False
+
+    def record_failure(self) -> None:
+        self._failures += 1
+        if self._probing or self._failures >= self._failure_threshold:
+            if self._opened_at is None or self._probing:
+                self.trips += 1
+            self._opened_at = time.monotonic()
+            self._probing = False
+
+
+# =============================================================================
+# Moderation Gateway
+# =============================================================================
+
+class ModerationGateway:
+    """Cached, batched, failure-isolated access to a content classifier."""
+
+    def __init__(
+        self,
+        classifier: ContentClassifier,
+        fallback: Optional[ContentClassifier] = None,
+        batch_window: float = BATCH_WINDOW,
+        batch_max_size: int = BATCH_MAX_SIZE,
+        concurrency: int = CLASSIFIER_CONCURRENCY,
+        timeout: float = CLASSIFIER_TIMEOUT,
+    ) -> None:
+        """
+        Args:
+            classifier: Primary backend (e.g. the OpenAI classifier).
+            fallback: Used while the breaker is open. None means texts are
+                left unclassified (verdict None) during an outage.
+            batch_window: Seconds to collect texts before a request.
+            batch_max_size: Flush as soon as this many texts are queued.
+            concurrency: Max concurrent backend requests.
+            timeout: Seconds per backend request.
+        """
+        self._classifier = classifier
+        self._fallback = fallback
+        self._batch_window = batch_window
+        self._batch_max_size = batch_max_size
+        self._timeout = timeout
+        self._semaphore = asyncio.Semaphore(concurrency)
+
+        self.cache = VerdictCache()
+        self.breaker = CircuitBreaker()
+
+        self._pending: List[Tuple[bytes, str]] = []
+        self._inflight: Dict[bytes, "asyncio.Future[Optional[ModerationVerdict]]"] = {}
+        self._flush_task: Optional[asyncio.Task] = None
+        self._batch_tasks: Set[asyncio.Task] = set()  # Referenced until done
+
+        # Stats
+        self._requests: int = 0
+        self._batched_texts: int = 0
+        self._coalesced: int = 0
+        self._fallbacks: int = 0
+        self._failures: int = 0
+
+    # =========================================================================
+    # Public API
+    # =========================================================================
+
+    async def classify(self, text: str) -> Optional[ModerationVerdict]:
+        """
+        Classify one text.
+
+        Returns:
+            The verdict, or None if the backend is unavailable and there is
+            no fallback.
+        """
+        key = verdict_key(normalize_for_verdict(text))
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached._replace(source="cache")
+
+        future = self._inflight.get(key)
+        if future is not None:
+            self._coalesced += 1
+            return await asyncio.shield(future)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        self._pending.append((key, text))
+
+        if len(self._pending) >= self._batch_max_size:
+            self._flush_now()
+        elif self._flush_task is None:
+            self._flush_task = create_safe_task(self._flush_after_window(), "Moderation Batch Window")
+
+        return await asyncio.shield(future)
+
+    # =========================================================================
+    # Batching
+    # =========================================================================
+
+    async def _flush_after_window(self) -> None:
+        await asyncio.sleep(self._batch_window)
+        self._flush_task = None
+        self._flush_now()
+
+    def _flush_now(self) -> None:
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            self._flush_task = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = create_safe_task(self._run_batch(batch), "Moderation Batch")
+            self._batch_tasks.add(task)
+            task.add_done_callback(self._batch_tasks.discard)
+
+    async def stop(self) -> None:
+        """Send queued texts now and wait for every in-flight batch."""
+        self._flush_now()
+        if self._batch_tasks:
+            await asyncio.gather(*self._batch_tasks, return_exceptions=True)
+
+    async def _run_batch(self, batch: List[Tuple[bytes, str]]) -> None:
+        verdicts: Optional[List[ModerationVerdict]] = None
+        cache_results = False
+        try:
+            verdicts, cache_results = await self._classify_texts([text for _, text in batch])
+        finally:
+            # Waiters are resolved even if this task is cancelled mid-request
+            # (CancelledError is not an Exception); they see None, as in an outage
+            for index, (key, _) in enumerate(batch):
+                verdict = verdicts[index] if verdicts is not None else None
+                # Only cache primary verdicts so the backend re-checks after an outage
+                if cache_results and verdict is not None:
+                    self.cache.put(key, verdict)
+                future = self._inflight.pop(key, None)
+                if future is not None and not future.done():
+                    future.set_result(verdict)
+
+    async def _classify_texts(self, texts: List[str]) -> Tuple[Optional[List[ModerationVerdict]], bool]:
+        """Classify through the primary backend, else the fallback. Returns (verdicts, from_primary)."""
+        if self.breaker.allow():
+            try:
+                async with self._semaphore:
+                    self._requests += 1
+                    self._batched_texts += len(texts)
+                    verdicts = await asyncio.wait_for(
+                        self._classifier.classify_batch(texts), timeout=self._timeout,
+                    )
+                if len(verdicts) != len(texts):
+                    raise ValueError(f"expected {len(texts)} verdicts, got {len(verdicts)}")
+                self.breaker.record_success()
+                return verdicts, True
+            except asyncio.CancelledError:
+                # Release a half-open probe so the breaker isn't stuck probing
+                self.breaker.record_failure()
+                raise
+            except Exception as e:
+                self._failures += 1
+                self.breaker.record_failure()
+                logger.warning("Moderation Classifier Failed", [
+                    ("Backend", self._classifier.name),
+                    ("Batch", str(len(texts))),
+                    ("Breaker", self.breaker.state),
+                    ("Error", str(e)[:50]),
+                ])
+
+        if self._fallback is None:
+            return None, False
+        self._fallbacks += 1
+        try:
+            return await self._fallback.classify_batch(texts), False
+        except Exception as e:
+            logger.warning("Moderation Fallback Failed", [
+                ("Backend", self._fallback.name),
+                ("Error", str(e)[:50]),
+            ])
+            return None, False
+
+    # =========================================================================
+    # Stats
+    # =========================================================================
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Snapshot of cache, batching and breaker counters."""
+        lookups = self.cache.hits + self.cache.misses
+        return {
+            "cached": len(self.cache),
+            "cache_hit_rate": round(self.cache.hits / lookups, 3) if lookups else 0.0,
+            "requests": self._requests,
+            "avg_batch": round(self._batched_texts / self._requests, 2) if self._requests else 0.0,
+            "coalesced": self._coalesced,
+            "failures": self._failures,
+            "fallbacks": self._fallbacks,
+            "breaker": self.breaker.state,
+            "breaker_trips": self.breaker.trips,
+        }
+
+
+# =============================================================================
+# Singleton
+# =============================================================================
+
+_gateway: Optional[ModerationGateway] = None
+
+
+def configure_moderation_gateway(
+    classifier: ContentClassifier,
+    fallback: Optional[ContentClassifier] = None,
+) -> ModerationGateway:
+    """
+    Create the shared gateway in front of a classifier (called once at startup).
+
+    Args:
+        classifier: Primary backend.
+        fallback: Used while the breaker is open (e.g. a LocalClassifier
+            over the fast-path term lists).
+    """
+    global _gateway
+    _gateway = ModerationGateway(classifier, fallback)
+    return _gateway
+
+
+def get_moderation_gateway() -> Optional[ModerationGateway]:
+    """Get the shared gateway, or None if no classifier is configured."""
+    return _gateway
+
+
+# =============================================================================
+# Module Export
+# =============================================================================
+
+__all__ = [
+    "CircuitBreaker",
+    "ContentClassifier",
+    "LocalClassifier",
+    "ModerationGateway",
+    "ModerationVerdict",
+    "VerdictCache",
+    "configure_moderation_gateway",
+    "get_moderation_gateway",
+    "normalize_for_verdict",
+]
@@ -0,0 +1,468 @@
+"""
+AzabBot - Anti-Spam Raid Enforcement
+====================================
+
+Bulk enforcement path used while a guild is under a spam raid.
+
+DESIGN:
+    handle_spam treats every offender independently: one message.delete(),
+    add_roles, a case thread, a channel embed and a DM each. Fifty raiders
+    means hundreds of serialized REST calls that trip rate limits while
+    the raid is still posting. Once RAID_MODE_OFFENDERS distinct users are
+    punished within RAID_MODE_WINDOW, the guild enters raid mode:
+    - Offending messages are buffered per channel and removed with
+      channel.delete_messages() in chunks of 100
+    - Mutes go onto a queue drained by a few workers that back off on 429s
+    - One aggregated raid summary (member list, counts) replaces per-user
+      case threads and channel embeds
+    - Per-member cases are opened lazily in the background after the raid,
+      each followed by the member's mute DM
+    Raid mode ends after RAID_MODE_QUIET_PERIOD seconds with no offenders.
+    Each session counts its own outstanding mute jobs, so winding one guild's
+    raid down never waits on another guild's queue.
+
+    The bulk-delete buffer is shared with webhook spam; callers pass a
+    BulkDeleteKind so each batch is logged and snipe-blocked as what it is.
+
+Author: حَـــــنَّـــــا
+Server: discord.gg/syria
+"""
+
+import asyncio
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Deque, Dict, List, Optional, Tuple, TYPE_CHECKING
+
+import discord
+
+from src.core.config import EmbedColors, NY_TZ
+from src.core.logger import logger
+from src.api.services.event_logger import event_logger
+from src.services.server_logs.categories import LogCategory
+from src.utils.async_utils import create_safe_task
+from src.utils.discord_rate_limit import log_http_error
+from src.utils.snipe_blocker import block_from_snipe
+
+if TYPE_CHECKING:
+    from src.bot import AzabBot
+    from src.core.config import Config
+    from src.core.database import Database
+
+
+# =============================================================================
+# Constants
+# =============================================================================
+
+RAID_MODE_OFFENDERS: int = 5            # Distinct offenders that switch raid mode on
+RAID_MODE_WINDOW: float = 30.0          # ...within this many seconds
+RAID_MODE_QUIET_PERIOD: float = 60.0    # Raid mode ends after this long without offenders
+RAID_DELETE_BATCH_DELAY: float = 1.0    # Collect messages this long before a bulk delete
+RAID_DELETE_CHUNK: int = 100            # Discord bulk-delete limit
+RAID_MUTE_WORKERS: int = 2              # Concurrent add_roles calls
+RAID_SUMMARY_INTERVAL: float = 10.0     # Raid summary refresh interval
+RAID_SUMMARY_MEMBER_LIMIT: int = 40     # Members listed in the summary embed
+RAID_CASE_SPACING: float = 2.0          # Delay between lazy per-member cases
+
+
+# =============================================================================
+# Models
+# =============================================================================
+
+@dataclass(frozen=True)
+class BulkDeleteKind:
+    """Why a channel's buffered messages are being bulk-deleted."""
+    reason: str             # Snipe-block / audit log reason
+    label: str              # Log title and task name
+    raid: bool = False      # Counted in the guild's raid summary
+
+
+RAID_BULK_DELETE = BulkDeleteKind(reason="Raid spam", label="Raid Bulk Delete", raid=True)
+
+
+@dataclass
+class RaidMuteJob:
+    """One queued raid mute."""
+    member: discord.Member
+    duration: int
+    spam_type: str
+    violation_count: int
+    content: str
+    session: Optional["RaidSession"] = None
+    queued_at: float = field(default_factory=time.monotonic)
+    muted: bool = False
+    expires_at: Optional[float] = None
+
+
+@dataclass
+class RaidSession:
+    """Aggregated state for one guild's raid."""
+    guild: discord.Guild
+    started_at: datetime
+    offenders: Dict[int, RaidMuteJob] = field(default_factory=dict)
+    enforced: Dict[int, int] = field(default_factory=dict)     # member_id -> longest mute queued
+    spam_types: Dict[str, int] = field(default_factory=dict)
+    deleted: int = 0
+    muted: int = 0
+    summary_message: Optional[discord.Message] = None
+    pending: int = 0                                           # Mute jobs queued, not yet finished
+    idle: asyncio.Event = field(default_factory=asyncio.Event)  # Set whenever pending drops to 0
+
+    def job_queued(self) -> None:
+        self.pending += 1
+        self.idle.clear()
+
+    def job_done(self) -> None:
+        self.pending -= 1
+        if self.pending == 0:
+            self.idle.set()
+
+    async def wait_idle(self) -> None:
+        """Wait until every mute queued for this session has been applied."""
+        if self.pending:
+            await self.idle.wait()
+
+
+# =============================================================================
+# Raid Enforcement Mixin
+# =============================================================================
+
+class RaidEnforcementMixin:
+    """Mixin providing the raid-mode bulk enforcement pipeline."""
+
+    def _init_raid_enforcement(self) -> None:
+        """Initialize raid enforcement state. Called from AntiSpamService.__init__."""
+        self._raid_offenders: Dict[int, Deque[Tuple[float, int]]] = {}
+        self._raid_mode_until: Dict[int, float] = {}
+        self._raid_sessions: Dict[int, RaidSession] = {}
+        self._raid_delete_buffers: Dict[Tuple[int, BulkDeleteKind], List[discord.Message]] = {}
+        self._raid_delete_tasks: Dict[Tuple[int, BulkDeleteKind], asyncio.Task] = {}
+        self._raid_mute_queue: "asyncio.Queue[RaidMuteJob]" = asyncio.Queue()
+        self._raid_mute_workers: List[asyncio.Task] = []
+
+        # Stats
+        self._raid_bulk_deletes: int = 0
+        self._raid_time_to_mute: Deque[float] = deque(maxlen=512)
+
+    # =========================================================================
+    # Raid Mode
+    # =========================================================================
+
+    def _raid_mode_active(self, guild_id: int, user_id: int) -> bool:
+        """
+        Record an offender and report whether the guild is in raid mode.
+
+        Args:
+            guild_id: Guild the offence happened in.
+            user_id: Offending user.
+
+        Returns:
+            True if this offence should take the bulk enforcement path.
+        """
+        now = time.monotonic()
+        offenders = self._raid_offenders.setdefault(guild_id, deque())
+        offenders.append((now, user_id))
+        while offenders and now - offenders[0][0] > RAID_MODE_WINDOW:
+            offenders.popleft()
+
+        if now < self._raid_mode_until.get(guild_id, 0.0):
+            self._raid_mode_until[guild_id] = now + RAID_MODE_QUIET_PERIOD
+            return True
+
+        if len({uid for _, uid in offenders}) >= RAID_MODE_OFFENDERS:
+            self._raid_mode_until[guild_id] = now + RAID_MODE_QUIET_PERIOD
+            logger.tree("RAID MODE ENABLED", [
+                ("Guild ID", str(guild_id)),
+                ("Offenders", f"{len(offenders)} in {RAID_MODE_WINDOW:.0f}s"),
+                ("Path", "Bulk delete + mute queue"),
+            ], emoji="🚨")
+            return True
+
+        return False
+
+    async def _enforce_raid_spam(
+        self,
+        message: discord.Message,
+        spam_type: str,
+        violation_count: int,
+        mute_duration: int,
+    ) -> None:
+        """
+        Handle one raid offence: queue the delete and mute, record it in the raid summary.
+
+        Args:
+            message: Offending message.
+            spam_type: Display name of the spam type.
+            violation_count: Offender's violation count.
+            mute_duration: Mute length in seconds (0 = delete only).
+        """
+        member: discord.Member = message.author  # type: ignore
+        guild = message.guild
+
+        session = self._raid_sessions.get(guild.id)
+        if session is None:
+            session = self._raid_sessions[guild.id] = RaidSession(
+                guild=guild, started_at=datetime.now(NY_TZ),
+            )
+            create_safe_task(self._raid_session_watch(guild.id), "Raid Session Watch")
+
+        session.spam_types[spam_type] = session.spam_types.get(spam_type, 0) + 1
+        self._queue_bulk_delete(message, RAID_BULK_DELETE)
+
+        job = RaidMuteJob(
+            member=member,
+            duration=mute_duration,
+            spam_type=spam_type,
+            violation_count=violation_count,
+            content=(message.content or "")[:500],
+            session=session,
+        )
+        previous = session.offenders.get(member.id)
+        if previous is None or mute_duration > previous.duration:
+            session.offenders[member.id] = job
+
+        # Escalations (warning -> mute, or a longer mute) are queued too;
+        # handle_spam has already recorded the reputation loss for them
+        if mute_duration > session.enforced.get(member.id, 0):
+            session.enforced[member.id] = mute_duration
+            session.job_queued()
+            self._ensure_raid_mute_workers()
+            self._raid_mute_queue.put_nowait(job)
+
+    # =========================================================================
+    # Bulk Deletes
+    # =========================================================================
+
+    def _queue_bulk_delete(self, message: discord.Message, kind: BulkDeleteKind) -> None:
+        """Buffer a message for the next bulk delete of this kind in its channel."""
+        key = (message.channel.id, kind)
+        buffer = self._raid_delete_buffers.setdefault(key, [])
+        buffer.append(message)
+
+        if len(buffer) >= RAID_DELETE_CHUNK:
+            create_safe_task(self._flush_bulk_delete(message.channel, kind), kind.label)
+        elif key not in self._raid_delete_tasks:
+            self._raid_delete_tasks[key] = create_safe_task(
+                self._delayed_bulk_delete(message.channel, kind), kind.label,
+            )
+
+    async def _delayed_bulk_delete(self, channel: discord.TextChannel, kind: BulkDeleteKind) -> None:
+        try:
+            await asyncio.sleep(RAID_DELETE_BATCH_DELAY)
+        finally:
+            self._raid_delete_tasks.pop((channel.id, kind), None)
+        await self._flush_bulk_delete(channel, kind)
+
+    async def _flush_bulk_delete(self, channel: discord.TextChannel, kind: BulkDeleteKind) -> None:
+        """Delete every buffered message of this kind in a channel, 100 per request."""
+        messages = self._raid_delete_buffers.pop((channel.id, kind), [])
+        if not messages:
+            return
+
+        for msg in messages:
+            await block_from_snipe(
+                msg.id,
+                reason=kind.reason,
+                user_id=msg.author.id,
+                channel_name=f"#{channel.name}" if hasattr(channel, 'name') else None)
+
+        deleted = 0
+        for start in range(0, len(messages), RAID_DELETE_CHUNK):
+            chunk = messages[start:start + RAID_DELETE_CHUNK]
+            try:
+                await channel.delete_messages(chunk, reason=f"Anti-spam: {kind.reason.lower()}")
+                deleted += len(chunk)
+                self._raid_bulk_deletes += 1
+            except discord.HTTPException as e:
+                log_http_error(e, kind.label, [
+                    ("Channel", f"#{channel.name}" if hasattr(channel, 'name') else "Unknown"),
+                    ("Messages", str(len(chunk))),
+                ])
+
+        if kind.raid:
+            session = self._raid_sessions.get(channel.guild.id)
+            if session is not None:
+                session.deleted += deleted
+
+        logger.tree(kind.label, [
+            ("Channel", f"#{channel.name}" if hasattr(channel, 'name') else "Unknown"),
+            ("Deleted", f"{deleted}/{len(messages)}"),
+        ], emoji="🧹")
+
+    # =========================================================================
+    # Mute Queue
+    # =========================================================================
+
+    def _ensure_raid_mute_workers(self) -> None:
+        self._raid_mute_workers = [t for t in self._raid_mute_workers if not t.done()]
+        while len(self._raid_mute_workers) < RAID_MUTE_WORKERS:
+            self._raid_mute_workers.append(
+                create_safe_task(self._raid_mute_worker(), "Raid Mute Worker")
+            )
+
+    async def _raid_mute_worker(self) -> None:
+        """Drain the raid mute queue; exits once the queue stays empty."""
+        while True:
+            try:
+                job = await asyncio.wait_for(self._raid_mute_queue.get(), timeout=RAID_MODE_QUIET_PERIOD)
+            except asyncio.TimeoutError:
+                return
+            try:
+                await self._apply_raid_mute(job)
+            finally:
+                self._raid_mute_queue.task_done()
+                if job.session is not None:
+                    job.session.job_done()
+
+    async def _apply_raid_mute(self, job: RaidMuteJob, retry: bool = True) -> None:
+        """Role + DB record only; the DM goes out with the member's lazy case."""
+        config: "Config" = self.config  # type: ignore
+        db: "Database" = self.db  # type: ignore
+        bot: "AzabBot" = self.bot  # type: ignore
+        member = job.member
+
+        mute_role = member.guild.get_role(config.muted_role_id) if config.muted_role_id else None
+        if not mute_role:
+            return
+
+        try:
+            await member.add_roles(mute_role, reason=f"Anti-spam raid: {job.spam_type}")
+        except discord.HTTPException as e:
+            if e.status == 429 and retry:
+                retry_after = getattr(e, "retry_after", None) or 1.0
+                await asyncio.sleep(retry_after)
+                await self._apply_raid_mute(job, retry=False)
+                return
+            log_http_error(e, "Raid Mute", [("User ID", str(member.id))])
+            return
+
+        self._raid_time_to_mute.append((time.monotonic() - job.queued_at) * 1000)
+        job.muted = True
+
+        job.expires_at = await asyncio.to_thread(
+            db.add_mute,
+            user_id=member.id,
+            guild_id=member.guild.id,
+            moderator_id=bot.user.id,
+            reason=f"Auto-spam (raid): {job.spam_type}",
+            duration_seconds=job.duration)
+        await asyncio.to_thread(
+            db.log_moderation_action,
+            user_id=member.id,
+            guild_id=member.guild.id,
+            moderator_id=bot.user.id,
+            action_type="mute",
+            action_source="auto_spam_raid",
+            reason=f"Auto-spam (raid): {job.spam_type}",
+            duration_seconds=job.duration,
+            details={"spam_type": job.spam_type, "violation_count": job.violation_count})
+        event_logger.log_timeout(
+            guild=member.guild,
+            target=member,
+            moderator=None,
+            reason=f"Auto-spam (raid): {job.spam_type}",
+            duration_seconds=job.duration)
+
+        if job.session is not None:
+            job.session.muted += 1
+
+    # =========================================================================
+    # Aggregated Raid Case
+    # =========================================================================
+
+    async def _raid_session_watch(self, guild_id: int) -> None:
+        """Keep the raid summary fresh, then close the session once raid mode ends."""
+        while time.monotonic() < self._raid_mode_until.get(guild_id, 0.0):
+            session = self._raid_sessions.get(guild_id)
+            if session is not None:
+                await self._post_raid_summary(session, final=False)
+            await asyncio.sleep(RAID_SUMMARY_INTERVAL)
+
+        # Detach before awaiting anything: spam after this point starts a
+        # fresh session instead of joining one that is being wound down
+        session = self._raid_sessions.pop(guild_id, None)
+        self._raid_offenders.pop(guild_id, None)
+        self._raid_mode_until.pop(guild_id, None)
+        if session is None:
+            return
+
+        await session.wait_idle()
+        await self._post_raid_summary(session, final=True)
+
+        logger.tree("RAID MODE ENDED", [
+            ("Guild", session.guild.name),
+            ("Offenders", str(len(session.offenders))),
+            ("Deleted", str(session.deleted)),
+            ("Muted", str(session.muted)),
+        ], emoji="✅")
+
+        # Per-member cases and DMs, lazily and one at a time so they never
+        # compete with live moderation for rate limits
+        for job in session.offenders.values():
+            if job.duration <= 0:
+                continue
+            await self._open_spam_case(  # type: ignore
+                job.member, job.spam_type, job.duration, job.violation_count, job.content,
+            )
+            if job.muted:
+                duration_str = f"{job.duration // 3600}h" if job.duration >= 3600 else f"{job.duration // 60}m"
+                await self._send_mute_dm(  # type: ignore
+                    job.member, job.spam_type, job.violation_count, duration_str, job.expires_at,
+                )
+            await asyncio.sleep(RAID_CASE_SPACING)
+
+    async def _post_raid_summary(self, session: RaidSession, final: bool) -> None:
+        """Send or edit the single automod summary for a raid."""
+        bot: "AzabBot" = self.bot  # type: ignore
+        if not (bot.logging_service and bot.logging_service.enabled):
+            return
+
+        embed = discord.Embed(
+            title="✅ Raid Ended" if final else "🚨 Raid In Progress",
+            color=EmbedColors.SUCCESS if final else EmbedColors.WARNING,
+            timestamp=session.started_at)
+        embed.add_field(name="Offenders", value=str(len(session.offenders)), inline=True)
+        embed.add_field(name="Messages Deleted", value=str(session.deleted), inline=True)
+        embed.add_field(name="Muted", value=str(session.muted), inline=True)
+        embed.add_field(
+            name="Types",
+            value="\n".join(f"{name}: {count}" for name, count in session.spam_types.items()) or "None",
+            inline=False)
+
+        listed = list(session.offenders.values())[:RAID_SUMMARY_MEMBER_LIMIT]
+        members = "\n".join(f"<@{job.member.id}> `{job.member.id}`" for job in listed)
+        extra = len(session.offenders) - len(listed)
+        if extra > 0:
+            members += f"\n…and {extra} more"
+        embed.add_field(name="Members", value=members[:1024] or "None", inline=False)
+
+        try:
+            if session.summary_message is None:
+                session.summary_message = await bot.logging_service._send_log(LogCategory.AUTOMOD, embed)
+            else:
+                await session.summary_message.edit(embed=embed)
+        except discord.HTTPException as e:
+            log_http_error(e, "Raid Summary", [("Guild ID", str(session.guild.id))])
+
+    # =========================================================================
+    # Stats
+    # =========================================================================
+
+    def get_raid_enforcement_stats(self) -> Dict[str, float]:
+        """Raid pipeline counters (queue depth, bulk deletes, time-to-mute)."""
+        samples = sorted(self._raid_time_to_mute)
+        return {
+            "active_raids": len(self._raid_sessions),
+            "mute_queue": self._raid_mute_queue.qsize(),
+            "bulk_deletes": self._raid_bulk_deletes,
+            "time_to_mute_p50_ms": round(samples[len(samples) // 2], 1) if samples else 0.0,
+            "time_to_mute_max_ms": round(samples[-1], 1) if samples else 0.0,
+        }
+
+
+# =============================================================================
+# Module Export
+# =============================================================================
+
+__all__ = ["BulkDeleteKind", "RAID_BULK_DELETE", "RaidEnforcementMixin", "RaidMuteJob", "RaidSession"]
@@ -0,0 +1,153 @@
+"""
+AzabBot - Anti-Spam Channel Rate Tracker
+========================================
+
+Per-channel message rate estimation for auto-slowmode and the dashboard.
+
+DESIGN:
+    Auto-slowmode used to append every message timestamp to a per-channel
+    list under one global lock and rebuild the list per message to drop
+    stale entries. Each channel now keeps an exponentially weighted moving
+    average (EWMA) of its message rate:
+    - O(1) update: rate = rate * exp(-dt / tau) + 1 / tau
+    - No lock: updates never await, so they are atomic on the event loop
+    - Steady-state value equals the true arrival rate in msgs/sec
+    - Hysteresis: a channel turns "hot" at the trigger rate and only
+      cools down once the rate drops below SLOWMODE_RELEASE_RATIO of it,
+      so a channel hovering at the threshold doesn't flap
+
+Author: حَـــــنَّـــــا
+Server: discord.gg/syria
+"""
+
+import math
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from .constants import SLOWMODE_TIME_WINDOW, SLOWMODE_TRIGGER_MESSAGES
+
+
+# =============================================================================
+# Constants
+# =============================================================================
+
+SLOWMODE_TRIGGER_RATE: float = SLOWMODE_TRIGGER_MESSAGES / SLOWMODE_TIME_WINDOW  # msgs/sec
+SLOWMODE_RELEASE_RATIO: float = 0.5   # Hot channel cools below this fraction of trigger rate
+RATE_IDLE_THRESHOLD: float = 0.01     # Channels below this rate are forgotten on prune
+
+
+# =============================================================================
+# Models
+# =============================================================================
+
+@dataclass
+class ChannelRate:
+    """EWMA message rate for one channel."""
+    guild_id: int
+    rate: float = 0.0
+    updated_at: float = field(default_factory=time.monotonic)
+    hot: bool = False
+
+    def decayed(self, now: float) -> float:
+        """Rate as of now, without recording a message."""
+        return self.rate * math.exp(-(now - self.updated_at) / SLOWMODE_TIME_WINDOW)
+
+
+# =============================================================================
+# Channel Rate Tracker
+# =============================================================================
+
+class ChannelRateTracker:
+    """Tracks msgs/sec per channel and whether each channel is hot."""
+
+    def __init__(self) -> None:
+        self._channels: Dict[int, ChannelRate] = {}
+
+    def record(self, channel_id: int, guild_id: int, now: Optional[float] = None) -> bool:
+        """
+        Record one message and update the channel's hot state.
+
+        Args:
+            channel_id: Channel the message was sent in.
+            guild_id: Guild the channel belongs to.
+            now: Monotonic timestamp (defaults to time.monotonic()).
+
+        Returns:
+            True while the channel is hot. The caller's cooldown decides
+            when to (re)apply slowmode, so a flood that turns hot during a
+            cooldown and outlasts it still gets slowmode afterwards.
+        """
+        now = time.monotonic() if now is None else now
+        state = self._channels.get(channel_id)
+        if state is None:
+            state = self._channels[channel_id] = ChannelRate(guild_id=guild_id, updated_at=now)
+
+        state.rate = state.decayed(now) + 1.0 / SLOWMODE_TIME_WINDOW
+        state.updated_at = now
+
+        if state.hot:
+            if state.rate < SLOWMODE_TRIGGER_RATE * SLOWMODE_RELEASE_RATIO:
+                state.hot = False
+        elif state.rate >= SLOWMODE_TRIGGER_RATE:
+            state.hot = True
+        return state.hot
+
+    def get_rate(self, channel_id: int) -> float:
+        """Current msgs/sec for a channel (0.0 if untracked)."""
+        state = self._channels.get(channel_id)
+        return state.decayed(time.monotonic()) if state else 0.0
+
+    def get_rates(
+        self,
+        guild_id: Optional[int] = None,
+        limit: int = 20,
+    ) -> List[Tuple[int, float, bool]]:
+        """
+        Busiest channels right now.
+
+        Args:
+            guild_id: Restrict to one guild (None for all).
+            limit: Max channels returned.
+
+        Returns:
+            List of (channel_id, msgs_per_sec, hot), busiest first.
+        """
+        now = time.monotonic()
+        rates = [
+            (channel_id, state.decayed(now), state.hot)
+            for channel_id, state in self._channels.items()
+            if guild_id is None or state.guild_id == guild_id
+        ]
+        rates.sort(key=lambda r: r[1], reverse=True)
+        return rates[:limit]
+
+    def prune(self) -> int:
+        """
+        Forget idle channels.
+
+        Returns:
+            Number of channels removed.
+        """
+        now = time.monotonic()
+        idle = [
+            channel_id for channel_id, state in self._channels.items()
+            if state.decayed(now) < RATE_IDLE_THRESHOLD
+        ]
+        for channel_id in idle:
+            del self._channels[channel_id]
+        return len(idle)
+
+    def __len__(self) -> int:
+        return len(self._channels)
+
+
+# =============================================================================
+# Module Export
+# =============================================================================
+
+__all__ = [
+    "ChannelRateTracker",
+    "SLOWMODE_TRIGGER_RATE",
+    "SLOWMODE_RELEASE_RATIO",
+]
@@ -0,0 +1,326 @@
+"""
+AzabBot - Anti-Spam Detector Registry
+=====================================
+
+Declarative detector registration and a cost-ordered detection engine.
+
+DESIGN:
+    check_message used to be a hand-ordered chain of `if not spam_type and`
+    blocks, so cheap checks (mention count, sticker flag) ran after the
+    scam scan, similarity scoring and network invite lookups, and nothing
+    recorded which detector cost what. Detectors now register themselves
+    with:
+    - a cost class (CHEAP < MEMORY < CPU < NETWORK)
+    - the features they need (e.g. "analysis" = the batched text job),
+      computed lazily by a registered provider the first time a detector
+      needs them - a cheap hit skips the CPU job entirely
+    - whether they touch the network
+    The engine runs detectors cheapest first (registration order breaks
+    ties), stops at the first verdict, and keeps per-detector invocation
+    counts, hit rates and latency histograms.
+
+    When several detectors would fire on one message, the reported spam
+    type is the cheapest one's. Punishment escalation only depends on the
+    violation count, not the type.
+
+    Detectors are pure checks. State a later message is judged against
+    (invite counts, image hashes) is written by recorders, which run after
+    the detectors on every message whatever the verdict - otherwise a cheap
+    hit would leave those histories short. On a hit they run in the
+    background so punishment isn't held up by their network features.
+
+Author: حَـــــنَّـــــا
+Server: discord.gg/syria
+"""
+
+import inspect
+import time
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from datetime import datetime
+from enum import IntEnum
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple, TYPE_CHECKING
+
+import discord
+
+from src.utils.async_utils import create_safe_task
+
+from .models import MessageRecord, UserSpamState
+
+if TYPE_CHECKING:
+    from .detectors import ContentAnalysis
+    from .service import AntiSpamService
+
+
+# =============================================================================
+# Constants
+# =============================================================================
+
+LATENCY_BUCKETS_MS: Tuple[float, ...] = (0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 50.0, 100.0, 500.0)
+
+
+class CostClass(IntEnum):
+    """Relative detector cost - lower runs first."""
+    CHEAP = 0       # Fields already on the MessageRecord
+    MEMORY = 1      # Scans of the user's recent history / in-memory indexes
+    CPU = 2         # Text analysis (may be offloaded to the detector pool)
+    NETWORK = 3     # Discord API / CDN round trips
+
+
+# =============================================================================
+# Models
+# =============================================================================
+
+@dataclass
+class DetectionContext:
+    """Everything a detector may read about the message being checked."""
+    message: discord.Message
+    content: str
+    record: MessageRecord
+    state: UserSpamState
+    now: datetime
+    guild_id: int
+    total_multiplier: float
+    is_new: bool
+    rep_multiplier: float
+    flood_limit: int
+    duplicate_limit: int
+    mention_limit: int
+    history: Tuple[str, ...] = ()
+    analysis: Optional["ContentAnalysis"] = None
+    external_invites: List[str] = field(default_factory=list)
+    image_hashes: List[int] = field(default_factory=list)
+    features: Set[str] = field(default_factory=set)
+
+
+DetectorFn = Callable[["AntiSpamService", DetectionContext], Any]
+ProviderFn = Callable[["AntiSpamService", DetectionContext], Awaitable[None]]
+
+
+@dataclass
+class DetectorSpec:
+    """A registered detector."""
+    name: str
+    spam_type: str
+    cost: CostClass
+    fn: DetectorFn
+    needs: Tuple[str, ...] = ()
+    network: bool = False
+    order: int = 0
+    is_async: bool = False
+
+
+@dataclass
+class RecorderSpec:
+    """A registered state recorder."""
+    name: str
+    fn: DetectorFn
+    needs: Tuple[str, ...] = ()
+    is_async: bool = False
+
+
+@dataclass
+class DetectorStats:
+    """Per-detector counters."""
+    calls: int = 0
+    hits: int = 0
+    total_ms: float = 0.0
+    histogram: List[int] = field(default_factory=lambda: [0] * (len(LATENCY_BUCKETS_MS) + 1))
+
+    def record(self, elapsed_ms: float, hit: bool) -> None:
+        self.calls += 1
+        self.hits += hit
+        self.total_ms += elapsed_ms
+        self.histogram[bisect_left(LATENCY_BUCKETS_MS, elapsed_ms)] += 1
+
+
+# =============================================================================
+# Registry
+# =============================================================================
+
+class DetectorRegistry:
+    """Detector, recorder and feature-provider declarations."""
+
+    def __init__(self) -> None:
+        self._detectors: Dict[str, DetectorSpec] = {}
+        self._recorders: Dict[str, RecorderSpec] = {}
+        self._providers: Dict[str, ProviderFn] = {}
+        self._ordered: Optional[List[DetectorSpec]] = None
+
+    def detector(
+        self,
+        name: str,
+        cost: CostClass,
+        spam_type: Optional[str] = None,
+        needs: Tuple[str, ...] = (),
+        network: bool = False,
+    ) -> Callable[[DetectorFn], DetectorFn]:
+        """
+        Register a detector.
+
+        Args:
+            name: Unique detector name (used in stats).
+            cost: Cost class; cheaper detectors run first.
+            spam_type: Verdict returned on a hit (defaults to name).
+            needs: Feature names that must be provided before it runs.
+            network: Whether the detector makes network calls.
+
+        The decorated function takes (service, ctx) and returns a truthy
+        value (or awaitable of one) on a hit.
+        """
+        def decorator(fn: DetectorFn) -> DetectorFn:
+            if name in self._detectors:
+                raise ValueError(f"Detector already registered: {name}")
+            self._detectors[name] = DetectorSpec(
+                name=name,
+                spam_type=spam_type or name,
+                cost=cost,
+                fn=fn,
+                needs=needs,
+                network=network or cost == CostClass.NETWORK,
+                order=len(self._detectors),
+                is_async=inspect.iscoroutinefunction(fn),
+            )
+            self._ordered = None
+            return fn
+        return decorator
+
+    def recorder(self, name: str, needs: Tuple[str, ...] = ()) -> Callable[[DetectorFn], DetectorFn]:
+        """
+        Register a recorder: takes (service, ctx), updates per-user/guild
+        state, and runs for every checked message in registration order.
+        """
+        def decorator(fn: DetectorFn) -> DetectorFn:
+            if name in self._recorders:
+                raise ValueError(f"Recorder already registered: {name}")
+            self._recorders[name] = RecorderSpec(
+                name=name,
+                fn=fn,
+                needs=needs,
+                is_async=inspect.iscoroutinefunction(fn),
+            )
+            return fn
+        return decorator
+
+    def provider(self, feature: str) -> Callable[[ProviderFn], ProviderFn]:
+        """Register the async function that fills in a feature on the context."""
+        def decorator(fn: ProviderFn) -> ProviderFn:
+            self._providers[feature] = fn
+            return fn
+        return decorator
+
+    def ordered(self) -> List[DetectorSpec]:
+        """Detectors in execution order (cost, then registration)."""
+        if self._ordered is None:
+            self._ordered = sorted(self._detectors.values(), key=lambda d: (d.cost, d.order))
+        return self._ordered
+
+    def recorders(self) -> List[RecorderSpec]:
+        """Recorders in registration order."""
+        return list(self._recorders.values())
+
+    def get_provider(self, feature: str) -> ProviderFn:
+        return self._providers[feature]
+
+
+DETECTORS: DetectorRegistry = DetectorRegistry()
+
+
+# =============================================================================
+# Engine
+# =============================================================================
+
+class DetectionEngine:
+    """Runs registered detectors in cost order with per-detector stats."""
+
+    def __init__(self, registry: DetectorRegistry = DETECTORS) -> None:
+        self._registry = registry
+        self._stats: Dict[str, DetectorStats] = {}
+
+    async def run(self, service: "AntiSpamService", ctx: DetectionContext) -> Optional[str]:
+        """
+        Run detectors until the first hit, then the recorders.
+
+        Recorders run inline on a clean message and as a background task
+        on a hit, so the caller can punish straight away.
+
+        Returns:
+            Spam type of the first detector that fired, or None.
+        """
+        for spec in self._registry.ordered():
+            await self._ensure(spec.needs, service, ctx)
+
+            start = time.perf_counter()
+            result = spec.fn(service, ctx)
+            if spec.is_async:
+                result = await result
+            hit = bool(result)
+            self._stat(spec.name).record((time.perf_counter() - start) * 1000, hit)
+
+            if hit:
+                create_safe_task(self.record(service, ctx), "Spam State Recording")
+                return spec.spam_type
+
+        await self.record(service, ctx)
+        return None
+
+    async def record(self, service: "AntiSpamService", ctx: DetectionContext) -> None:
+        """Run every recorder against the context."""
+        for spec in self._registry.recorders():
+            await self._ensure(spec.needs, service, ctx)
+
+            start = time.perf_counter()
+            result = spec.fn(service, ctx)
+            if spec.is_async:
+                await result
+            self._stat(f"recorder:{spec.name}").record((time.perf_counter() - start) * 1000, False)
+
+    async def _ensure(self, needs: Tuple[str, ...], service: "AntiSpamService", ctx: DetectionContext) -> None:
+        for feature in needs:
+            if feature not in ctx.features:
+                await self._provide(feature, service, ctx)
+
+    async def _provide(self, feature: str, service: "AntiSpamService", ctx: DetectionContext) -> None:
+        start = time.perf_counter()
+        await self._registry.get_provider(feature)(service, ctx)
+        ctx.features.add(feature)
+        self._stat(f"feature:{feature}").record((time.perf_counter() - start) * 1000, False)
+
+    def _stat(self, name: str) -> DetectorStats:
+        stats = self._stats.get(name)
+        if stats is None:
+            stats = self._stats[name] = DetectorStats()
+        return stats
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per-detector calls, hit rate, mean latency and histogram."""
+        return {
+            name: {
+                "calls": s.calls,
+                "hits": s.hits,
+                "hit_rate": round(s.hits / s.calls, 4) if s.calls else 0.0,
+                "avg_ms": round(s.total_ms / s.calls, 4) if s.calls else 0.0,
+                "histogram": dict(zip([f"<={b}ms" for b in LATENCY_BUCKETS_MS] + ["inf"], s.histogram)),
+            }
+            for name, s in self._stats.items()
+        }
+
+    def describe(self) -> List[Dict[str, Any]]:
+        """Execution plan, for logs and the dashboard."""
+        return [
+            {"name": d.name, "cost": d.cost.name, "needs": list(d.needs), "network": d.network}
+            for d in self._registry.ordered()
+        ]
+
+
+# =============================================================================
+# Module Export
+# =============================================================================
+
+__all__ = [
+    "CostClass",
+    "DetectionContext",
+    "DetectionEngine",
+    "DetectorRegistry",
+    "DETECTORS",
+]
@@ -0,0 +1,202 @@
+"""
+AzabBot - Anti-Spam Reputation Mixin
+====================================
+
+User reputation scores that scale spam thresholds.
+
+DESIGN:
+    Reputation used to cost a DB write per clean message, and the whole
+    cache was thrown away every REPUTATION_UPDATE_INTERVAL, so every
+    active user was cold-loaded again right after. Scores are now cached
+    in memory and changes are batched:
+    - Scores decay toward neutral over time (REPUTATION_HALF_LIFE), so
+      old violations and old good behaviour both fade. A stored score is
+      decayed from its updated_at when read or merged
+    - update_reputation() never reads: it adds to a pending delta for the
+      key (and to the cached score if there is one)
+    - A cache miss loads from the DB off the event loop
+    - flush_reputation() applies all pending deltas in one transaction
+    - No periodic cache clear; the table is LRU-capped instead
+    - Crash-safety: at most one flush interval of score changes is lost
+
+Author: حَـــــنَّـــــا
+Server: discord.gg/syria
+"""
+
+import asyncio
+import math
+import time
+from collections import OrderedDict
+from typing import Dict, Tuple, TYPE_CHECKING
+
+from src.core.database.reputation import reputation_decay
+from src.core.logger import logger
+
+if TYPE_CHECKING:
+    from src.core.database import Database
+
+
+# =============================================================================
+# Constants
+# =============================================================================
+
+REPUTATION_DEFAULT: float = 0.0
+REPUTATION_HALF_LIFE: float = 7 * 86400   # Seconds for a score to decay halfway to neutral
+REPUTATION_SCALE: float = 100.0           # Score at which the multiplier is ~3/4 of its range
+REPUTATION_MULTIPLIER_RANGE: float = 0.5  # Threshold multiplier stays within x0.5 .. x1.5
+REPUTATION_CACHE_MAX: int = 50_000        # LRU cap on in-memory scores
+
+_Key = Tuple[int, int]            # (guild_id, user_id)
+_Timed = Tuple[float, float]      # (score or delta, as of unix time)
+
+
+def _decay(value: float, since: float, now: float) -> float:
+    """Decay a score (or pending delta) from `since` to `now`."""
+    return reputation_decay(value, since, now, REPUTATION_HALF_LIFE)
+
+
+# =============================================================================
+# Reputation Mixin
+# =============================================================================
+
+class ReputationMixin:
+    """Mixin for cached, decaying reputation scores with batched persistence."""
+
+    def _init_reputation(self) -> None:
+        """Initialize the score table. Called from AntiSpamService.__init__."""
+        self._rep_scores: "OrderedDict[_Key, _Timed]" = OrderedDict()
+        self._rep_pending: Dict[_Key, _Timed] = {}
+        self._rep_loads: int = 0
+        self._rep_hits: int = 0
+        self._rep_flushed: int = 0
+
+    # =========================================================================
+    # Reads
+    # =========================================================================
+
+    async def _get_reputation(self, user_id: int, guild_id: int) -> float:
+        """Current (decayed) score, loading from the DB off-loop on a miss."""
+        key = (guild_id, user_id)
+        now = time.time()
+        cached = self._rep_scores.get(key)
+        if cached is not None:
+            self._rep_hits += 1
+            self._rep_scores.move_to_end(key)
+            return _decay(cached[0], cached[1], now)
+
+        db: "Database" = self.db  # type: ignore
+        stored = await asyncio.to_thread(db.get_user_reputation, user_id, guild_id)
+        self._rep_loads += 1
+
+        # Read pending after the load so updates made meanwhile are included
+        now = time.time()
+        score = _decay(stored[0], stored[1], now) if stored else REPUTATION_DEFAULT
+        pending = self._rep_pending.get(key)
+        if pending is not None:
+            score += _decay(pending[0], pending[1], now)
+
+        self._cache_reputation(key, (score, now))
+        return score
+
+    def _cache_reputation(self, key: _Key, value: _Timed) -> None:
+        self._rep_scores[key] = value
+        self._rep_scores.move_to_end(key)
+        while len(self._rep_scores) > REPUTATION_CACHE_MAX:
+            self._rep_scores.popitem(last=False)
+
+    async def get_reputation_multiplier(self, user_id: int, guild_id: int) -> float:
+        """
+        Get threshold multiplier from a user's reputation.
+
+        Returns:
+            Float in (1 - REPUTATION_MULTIPLIER_RANGE, 1 + REPUTATION_MULTIPLIER_RANGE).
+            >1.0 means more lenient thresholds.
+        """
+        score = await self._get_reputation(user_id, guild_id)
+        return 1.0 + math.tanh(score / REPUTATION_SCALE) * REPUTATION_MULTIPLIER_RANGE
+
+    # =========================================================================
+    # Writes
+    # =========================================================================
+
+    def update_reputation(self, user_id: int, guild_id: int, delta: float) -> None:
+        """
+        Apply a reputation change in memory (persisted on next flush).
+
+        Never touches the DB: the delta is queued, and added to the cached
+        score if the user has one.
+
+        Args:
+            user_id: Discord user ID.
+            guild_id: Guild ID.
+            delta: Score change (negative for violations).
+        """
+        key = (guild_id, user_id)
+        now = time.time()
+
+        pending = self._rep_pending.get(key)
+        self._rep_pending[key] = (delta + (_decay(pending[0], pending[1], now) if pending else 0.0), now)
+
+        cached = self._rep_scores.get(key)
+        if cached is not None:
+            self._rep_scores[key] = (_decay(cached[0], cached[1], now) + delta, now)
+
+    async def flush_reputation(self) -> int:
+        """
+        Apply all pending deltas to the stored scores in one transaction.
+
+        Returns:
+            Number of scores written.
+        """
+        if not self._rep_pending:
+            return 0
+
+        # Swap first so updates during the write land in the next batch
+        batch, self._rep_pending = self._rep_pending, {}
+        rows = [(user_id, guild_id, delta, at) for (guild_id, user_id), (delta, at) in batch.items()]
+
+        db: "Database" = self.db  # type: ignore
+        try:
+            await asyncio.to_thread(db.apply_reputation_deltas, rows, REPUTATION_HALF_LIFE)
+        except Exception as e:
+            # Merge the batch back into whatever was queued meanwhile
+            for key, (delta, at) in batch.items():
+                newer = self._rep_pending.get(key)
+                if newer is None:
+                    self._rep_pending[key] = (delta, at)
+                else:
+                    self._rep_pending[key] = (newer[0] + _decay(delta, at, newer[1]), newer[1])
+            logger.warning("Reputation Flush Failed", [
+                ("Pending", str(len(self._rep_pending))),
+                ("Error", str(e)[:50]),
+            ])
+            return 0
+
+        self._rep_flushed += len(rows)
+        return len(rows)
+
+    def clear_reputation_cache(self) -> None:
+        """
+        Drop cached scores (pending deltas are kept until flushed).
+
+        No longer called periodically - kept for manual resets, e.g. after
+        editing scores directly in the database.
+        """
+        self._rep_scores.clear()
+
+    def get_reputation_stats(self) -> Dict[str, int]:
+        """Snapshot of reputation table counters."""
+        return {
+            "cached": len(self._rep_scores),
+            "pending": len(self._rep_pending),
+            "hits": self._rep_hits,
+            "loads": self._rep_loads,
+            "flushed": self._rep_flushed,
+        }
+
+
+# =============================================================================
+# Module Export
+# =============================================================================
+
+__all__ = ["ReputationMixin"]
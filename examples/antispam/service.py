@@ -9,9 +9,10 @@ Server: discord.gg/syria
 """
 
 import asyncio
+import time
 from collections import defaultdict
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Set, Tuple, TYPE_CHECKING
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple, TYPE_CHECKING
 
 import discord
 
@@ -22,69 +23,90 @@ from src.core.logger import logger
 from src.utils.async_utils import create_safe_task
 
 from .constants import (
-    ATTACHMENT_LIMIT,
     ATTACHMENT_TIME_WINDOW,
     CHANNEL_TYPE_MULTIPLIERS,
     DUPLICATE_LIMIT,
-    DUPLICATE_MIN_LENGTH,
     DUPLICATE_TIME_WINDOW,
-    EMOJI_LIMIT,
     FLOOD_MESSAGE_LIMIT,
     FLOOD_TIME_WINDOW,
     IMAGE_DUPLICATE_LIMIT,
     IMAGE_DUPLICATE_TIME_WINDOW,
     INVITE_LIMIT,
     INVITE_TIME_WINDOW,
-    LINK_LIMIT,
     LINK_TIME_WINDOW,
     MAX_IMAGE_HASHES_PER_USER,
     MAX_TRACKED_USERS_PER_GUILD,
     MENTION_LIMIT,
     MESSAGE_HISTORY_CLEANUP,
-    NEW_MEMBER_ACCOUNT_AGE,
     NEW_MEMBER_DUPLICATE_LIMIT,
     NEW_MEMBER_FLOOD_LIMIT,
     NEW_MEMBER_MENTION_LIMIT,
-    NEW_MEMBER_SERVER_AGE,
-    NEWLINE_LIMIT,
     REP_GAIN_MESSAGE,
     REPUTATION_UPDATE_INTERVAL,
     SLOWMODE_COOLDOWN,
     SLOWMODE_DURATION,
-    SLOWMODE_TIME_WINDOW,
-    SLOWMODE_TRIGGER_MESSAGES,
-    STICKER_SPAM_LIMIT,
-    STICKER_SPAM_TIME_WINDOW,
     VIOLATION_DECAY_TIME,
     WEBHOOK_MESSAGE_LIMIT,
     WEBHOOK_TIME_WINDOW,
 )
+from . import checks  # noqa: F401 - registers the detectors
 from .detectors import (
     count_emojis,
-    count_newlines,
     extract_invites,
     hash_attachment,
     has_links,
     has_unsafe_links,
-    is_emoji_only,
     is_exempt_greeting,
-    is_mostly_arabic,
-    is_scam,
-    is_similar,
     is_whitelisted_invite,
-    is_zalgo,
     LINK_PATTERN,
 )
+from .executor import DetectorExecutor
+from .expiry import ExpiringLRU
 from .handlers import SpamHandlerMixin
-from .models import MessageRecord, UserSpamState, WebhookState
+from .image_hash import ImageHasher, PerceptualHashIndex, PHASH_TIMEOUT
+from .invite_cache import InviteResolver
+from .join_stream import RaidSignal, StreamingRaidDetector
+from .member_cache import MemberClassCache
+from .models import JoinRecord, MessageRecord, UserSpamState, WebhookState
 from .raid import RaidDetectionMixin
+from .raid_enforcement import RaidEnforcementMixin
+from .rate_tracker import ChannelRateTracker, SLOWMODE_TRIGGER_RATE
+from .registry import DetectionContext, DetectionEngine
 from .reputation import ReputationMixin
 
 if TYPE_CHECKING:
     from src.bot import AzabBot
+    from src.core.database import Database
 
 
-class AntiSpamService(ReputationMixin, RaidDetectionMixin, SpamHandlerMixin):
+# =============================================================================
+# Constants
+# =============================================================================
+
+# Message records are kept for 2x the longest detection window
+HISTORY_RETENTION: int = max(
+    FLOOD_TIME_WINDOW,
+    DUPLICATE_TIME_WINDOW,
+    LINK_TIME_WINDOW,
+    ATTACHMENT_TIME_WINDOW,
+    INVITE_TIME_WINDOW,
+    IMAGE_DUPLICATE_TIME_WINDOW,
+) * 2
+MAX_WEBHOOK_STATES: int = 1000
+
+
+def _drop_older_than(items: List, cutoff: datetime, key: Callable) -> None:
+    """Trim a time-ordered list in place, touching only the stale prefix."""
+    stale = 0
+    for item in items:
+        if key(item) > cutoff:
+            break
+        stale += 1
+    if stale:
+        del items[:stale]
+
+
+class AntiSpamService(ReputationMixin, RaidDetectionMixin, RaidEnforcementMixin, SpamHandlerMixin):
     """
     Advanced spam detection and prevention.
 
@@ -98,7 +120,7 @@ class AntiSpamService(ReputationMixin, RaidDetectionMixin, SpamHandlerMixin):
     - Webhook spam protection
     """
 
-    def __init__(self, bot: "AzabBot") -> None:
+    def __init__(self, bot: "AzabBot", db: Optional["Database"] = None) -> None:
         """
         Initialize the anti-spam service.
 
@@ -113,42 +135,74 @@ class AntiSpamService(ReputationMixin, RaidDetectionMixin, SpamHandlerMixin):
 
         Args:
             bot: Main bot instance for Discord API access.
+            db: Database to use instead of the global one (the replay
+                benchmark passes one that refuses every call).
         """
         self.bot = bot
         self.config = get_config()
-        self.db = get_db()
+        self.db = db if db is not None else get_db()
 
         # Initialize mixins
         self._init_reputation()
         self._init_raid_detection()
+        self._init_raid_enforcement()
+        self._init_spam_handlers()
 
-        # User state tracking (guild_id -> user_id -> state)
-        self._user_states: Dict[int, Dict[int, UserSpamState]] = defaultdict(
-            lambda: defaultdict(UserSpamState)
+        # User state tracking (guild_id -> user_id -> state), LRU-capped per guild
+        self._user_states: Dict[int, ExpiringLRU[int, UserSpamState]] = defaultdict(
+            lambda: ExpiringLRU(HISTORY_RETENTION, MAX_TRACKED_USERS_PER_GUILD, UserSpamState)
         )
 
-        # Channel message tracking for auto-slowmode (channel_id -> list of timestamps)
-        self._channel_messages: Dict[int, List[datetime]] = defaultdict(list)
-        self._slowmode_lock = asyncio.Lock()
+        # Per-channel EWMA message rate for auto-slowmode and dashboard heat
+        self._channel_rates = ChannelRateTracker()
 
         # Slowmode cooldowns (channel_id -> last slowmode time)
         self._slowmode_cooldowns: Dict[int, datetime] = {}
 
         # Webhook tracking (webhook_id -> WebhookState)
-        self._webhook_states: Dict[int, WebhookState] = defaultdict(WebhookState)
+        self._webhook_states: ExpiringLRU[int, WebhookState] = ExpiringLRU(
+            WEBHOOK_TIME_WINDOW * 2, MAX_WEBHOOK_STATES, WebhookState
+        )
 
         # Image hash cache (guild_id -> user_id -> list of (hash, timestamp))
-        self._image_hashes: Dict[int, Dict[int, List[Tuple[str, datetime]]]] = defaultdict(
-            lambda: defaultdict(list)
+        self._image_hashes: Dict[int, ExpiringLRU[int, List[Tuple[str, datetime]]]] = defaultdict(
+            lambda: ExpiringLRU(IMAGE_DUPLICATE_TIME_WINDOW * 2, MAX_TRACKED_USERS_PER_GUILD, list)
         )
 
+        # Process pool for CPU-heavy detectors (similarity, zalgo, image decode)
+        self._detector_executor = DetectorExecutor()
+        create_safe_task(self._detector_executor.start(), "AntiSpam Detector Pool Warmup")
+
+        # Cost-ordered detector pipeline (detectors are registered in checks.py)
+        self._detection_engine = DetectionEngine()
+
+        # Perceptual image hashes (guild_id -> index), shared by all members
+        self._image_hasher = ImageHasher(self._detector_executor)
+        self._phash_indexes: Dict[int, PerceptualHashIndex] = defaultdict(PerceptualHashIndex)
+
+        # Invite code -> target guild cache (shared across guilds)
+        self._invite_resolver = InviteResolver(bot)
+
         # Per-channel threshold overrides (channel_id -> multiplier)
         self._channel_multipliers: Dict[int, float] = {}
 
+        # Channel multipliers derived from names (channel_id -> multiplier)
+        self._channel_multiplier_cache: Dict[int, float] = {}
+
         # Exempt channels and roles
         self._exempt_channels: Set[int] = set()
         self._exempt_roles: Set[int] = set()
 
+        # Per-member exempt / new-member classification
+        self._member_classes = MemberClassCache()
+
+        # Streaming join-rate counters and join clusters (guild_id -> detector)
+        self._join_streams: Dict[int, StreamingRaidDetector] = defaultdict(StreamingRaidDetector)
+
+        # Background loops (cancelled by stop())
+        self._cleanup_task: Optional[asyncio.Task] = None
+        self._reputation_task: Optional[asyncio.Task] = None
+
         self._load_exemptions()
         self._load_channel_multipliers()
         self._start_cleanup_task()
@@ -159,7 +213,7 @@ class AntiSpamService(ReputationMixin, RaidDetectionMixin, SpamHandlerMixin):
             ("Duplicate Limit", f"{DUPLICATE_LIMIT}x"),
             ("Invite Detection", "Enabled with whitelist"),
             ("Reputation System", "Enabled"),
-            ("Image Hashing", "Enabled"),
+            ("Image Hashing", "Perceptual" if self._image_hasher.enabled else "Metadata only"),
             ("Raid Detection", "Enhanced"),
             ("Webhook Protection", "Enabled"),
         ], emoji="🛡️")
@@ -218,6 +272,17 @@ class AntiSpamService(ReputationMixin, RaidDetectionMixin, SpamHandlerMixin):
         if channel.id in self._channel_multipliers:
             return self._channel_multipliers[channel.id]
 
+        # Name-derived multipliers only change on channel edits
+        cached = self._channel_multiplier_cache.get(channel.id)
+        if cached is not None:
+            return cached
+        multiplier = self._multiplier_from_name(channel)
+        self._channel_multiplier_cache[channel.id] = multiplier
+        return multiplier
+
+    @staticmethod
+    def _multiplier_from_name(channel: discord.abc.GuildChannel) -> float:
+        """Derive a channel's multiplier from keywords in its name."""
         name = channel.name.lower() if hasattr(channel, 'name') else ""
 
         if any(x in name for x in ["media", "image", "photo", "art", "gallery"]):
@@ -248,16 +313,34 @@ class AntiSpamService(ReputationMixin, RaidDetectionMixin, SpamHandlerMixin):
         - Clean image hash cache
         - Clean webhook state cache
         """
-        create_safe_task(self._cleanup_loop(), "AntiSpam Cleanup Loop")
+        self._cleanup_task = create_safe_task(self._cleanup_loop(), "AntiSpam Cleanup Loop")
 
     def _start_reputation_task(self) -> None:
         """
-        Start background task to update reputation scores.
+        Start background task to persist reputation scores.
 
-        Runs every REPUTATION_UPDATE_INTERVAL seconds to clear
-        reputation cache, forcing recalculation from database.
+        Runs every REPUTATION_UPDATE_INTERVAL seconds to apply pending
+        in-memory score changes to the database in one transaction.
         """
-        create_safe_task(self._reputation_loop(), "AntiSpam Reputation Loop")
+        self._reputation_task = create_safe_task(self._reputation_loop(), "AntiSpam Reputation Loop")
+
+    async def stop(self) -> None:
+        """Stop background tasks, flush reputation and stop the detector pool."""
+        for task in (self._cleanup_task, self._reputation_task):
+            if task and not task.done():
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+
+        # Pending reputation deltas would otherwise be lost on shutdown
+        await self.flush_reputation()
+
+        # Worker processes outlive the loop unless shut down explicitly
+        self._detector_executor.shutdown()
+
+        logger.debug("Anti-Spam Service Stopped")
 
     async def _cleanup_loop(self) -> None:
         """
@@ -287,18 +370,18 @@ class AntiSpamService(ReputationMixin, RaidDetectionMixin, SpamHandlerMixin):
 
     async def _reputation_loop(self) -> None:
         """
-        Periodically update reputation scores.
+        Periodically flush reputation scores.
 
-        Clears reputation cache to force recalculation from database.
-        This ensures reputation changes (from good behavior or violations)
-        are reflected in spam detection thresholds.
+        Scores are cached and updated in memory (see ReputationMixin), so
+        the cache is never cleared; this loop only applies pending deltas
+        in one transaction. A crash loses at most one interval.
 
         Runs every REPUTATION_UPDATE_INTERVAL seconds.
         """
         while True:
             await asyncio.sleep(REPUTATION_UPDATE_INTERVAL)
             try:
-                self.clear_reputation_cache()
+                await self.flush_reputation()
             except Exception as e:
                 logger.warning("Reputation Update Error", [
                     ("Error", str(e)[:50]),
@@ -309,85 +392,61 @@ class AntiSpamService(ReputationMixin, RaidDetectionMixin, SpamHandlerMixin):
         Remove old message records from memory.
 
         MEMORY MANAGEMENT:
-        - Removes message records older than 2x the longest detection window
-        - Enforces MAX_TRACKED_USERS_PER_GUILD limit with LRU eviction
-        - Limits image hashes per user to MAX_IMAGE_HASHES_PER_USER
-        - Enforces max webhook states to prevent unbounded growth
+        - Expires users / image hash lists / webhooks idle past their TTL
+          (per-user message lists are trimmed on append)
+        - MAX_TRACKED_USERS_PER_GUILD and MAX_WEBHOOK_STATES are enforced
+          on insert with O(1) LRU eviction (see expiry.ExpiringLRU)
+        - Expires guild-wide perceptual hash index entries
+        - Forgets idle channel rate estimators
+        - Prunes expired invite resolutions
         - Cleans raid detection records
 
         This prevents memory leaks in high-traffic servers.
         """
         now = datetime.now(NY_TZ)
-        cutoff = now - timedelta(seconds=max(
-            FLOOD_TIME_WINDOW,
-            DUPLICATE_TIME_WINDOW,
-            LINK_TIME_WINDOW,
-            ATTACHMENT_TIME_WINDOW,
-            INVITE_TIME_WINDOW,
-            IMAGE_DUPLICATE_TIME_WINDOW,
-        ) * 2)
-
-        # Clean user message states
+
+        # User states, image hashes and webhooks expire oldest-first in
+        # last-touch order, so each pass only touches what actually expired
+        expired_users = 0
         for guild_id, guild_states in list(self._user_states.items()):
-            for user_id, state in list(guild_states.items()):
-                state.messages = [
-                    m for m in state.messages
-                    if m.timestamp > cutoff
-                ]
-                if not state.messages:
-                    try:
-                        del guild_states[user_id]
-                    except KeyError:
-                        pass  # Already removed by another coroutine
-
-            if len(guild_states) > MAX_TRACKED_USERS_PER_GUILD:
-                sorted_users = sorted(
-                    guild_states.items(),
-                    key=lambda x: x[1].messages[-1].timestamp if x[1].messages else cutoff
-                )
-                excess = len(guild_states) - MAX_TRACKED_USERS_PER_GUILD
-                for user_id, _ in sorted_users[:excess]:
-                    try:
-                        del guild_states[user_id]
-                    except KeyError:
-                        pass  # Already removed
-                logger.debug("Anti-Spam Cache Eviction", [("Guild", str(guild_id)), ("Evicted", str(excess))])
-
-        # Clean image hashes
+            expired_users += guild_states.expire()
+            if not guild_states:
+                self._user_states.pop(guild_id, None)
+
+        for guild_id, guild_hashes in list(self._image_hashes.items()):
+            guild_hashes.expire()
+            if not guild_hashes:
+                self._image_hashes.pop(guild_id, None)
+
+        self._webhook_states.expire()
+
+        if expired_users:
+            logger.debug("Anti-Spam State Expired", [
+                ("Users", str(expired_users)),
+                ("Tracked", str(sum(len(g) for g in self._user_states.values()))),
+            ])
+
+        # Expire perceptual hash index entries (oldest-first, no full scan)
         image_cutoff = now - timedelta(seconds=IMAGE_DUPLICATE_TIME_WINDOW * 2)
-        for guild_hashes in list(self._image_hashes.values()):
-            for user_id, hashes in list(guild_hashes.items()):
-                valid_hashes = [
-                    (h, t) for h, t in hashes if t > image_cutoff
-                ]
-                if len(valid_hashes) > MAX_IMAGE_HASHES_PER_USER:
-                    valid_hashes.sort(key=lambda x: x[1], reverse=True)
-                    valid_hashes = valid_hashes[:MAX_IMAGE_HASHES_PER_USER]
-                guild_hashes[user_id] = valid_hashes
-                if not guild_hashes[user_id]:
-                    try:
-                        del guild_hashes[user_id]
-                    except KeyError:
-                        pass  # Already removed
-
-        # Clean webhook states with size limit
-        webhook_cutoff = now - timedelta(seconds=WEBHOOK_TIME_WINDOW * 2)
-        for webhook_id, state in list(self._webhook_states.items()):
-            state.messages = [t for t in state.messages if t > webhook_cutoff]
-            if not state.messages:
-                self._webhook_states.pop(webhook_id, None)
-
-        # Enforce max webhook states to prevent unbounded growth
-        MAX_WEBHOOK_STATES = 1000
-        if len(self._webhook_states) > MAX_WEBHOOK_STATES:
-            # Remove oldest webhook states
-            sorted_webhooks = sorted(
-                self._webhook_states.items(),
-                key=lambda x: x[1].messages[-1] if x[1].messages else datetime.min.replace(tzinfo=NY_TZ)
-            )
-            excess = len(self._webhook_states) - MAX_WEBHOOK_STATES
-            for webhook_id, _ in sorted_webhooks[:excess]:
-                self._webhook_states.pop(webhook_id, None)
+        for guild_id, index in list(self._phash_indexes.items()):
+            index.expire(image_cutoff)
+            if not len(index):
+                self._phash_indexes.pop(guild_id, None)
+
+        # Forget idle channel rate estimators
+        self._channel_rates.prune()
+
+        # Clean expired invite resolutions
+        pruned_invites = self._invite_resolver.prune()
+        invite_stats = self._invite_resolver.get_stats()
+        if invite_stats["api_calls_saved"]:
+            logger.debug("Invite Cache Stats", [
+                ("Entries", str(invite_stats["entries"])),
+                ("Pruned", str(pruned_invites)),
+                ("Hit Ratio", f"{invite_stats['hit_ratio']:.1%}"),
+                ("API Calls", str(invite_stats["api_calls"])),
+                ("API Calls Saved", str(invite_stats["api_calls_saved"])),
+            ])
 
         # Clean raid records
         await self.cleanup_raid_records(now)
@@ -424,12 +483,7 @@ class AntiSpamService(ReputationMixin, RaidDetectionMixin, SpamHandlerMixin):
                 return True
 
         if isinstance(message.author, discord.Member):
-            for role in message.author.roles:
-                if role.id in self._exempt_roles:
-                    return True
-
-            if message.author.guild_permissions.administrator:
-                return True
+            return self._member_classes.get(message.author, self._exempt_roles).exempt
 
         return False
 
@@ -446,59 +500,134 @@ class AntiSpamService(ReputationMixin, RaidDetectionMixin, SpamHandlerMixin):
         - Account age < NEW_MEMBER_ACCOUNT_AGE days, OR
         - Server join age < NEW_MEMBER_SERVER_AGE days
 
+        The cutoff instant is cached per member, so this is one dict lookup
+        and one comparison.
+
         Args:
             member: Member to check.
 
         Returns:
             True if member is considered new, False otherwise.
         """
-        now = datetime.now(NY_TZ)
+        member_class = self._member_classes.get(member, self._exempt_roles)
+        return member_class.is_new(datetime.now(NY_TZ))
 
-        if member.created_at:
-            account_age = (now - member.created_at.replace(tzinfo=NY_TZ)).days
-            if account_age < NEW_MEMBER_ACCOUNT_AGE:
-                return True
+    # =========================================================================
+    # Classification Cache Invalidation
+    # =========================================================================
 
-        if member.joined_at:
-            server_age = (now - member.joined_at.replace(tzinfo=NY_TZ)).days
-            if server_age < NEW_MEMBER_SERVER_AGE:
-                return True
+    def invalidate_member(self, guild_id: int, user_id: int) -> None:
+        """
+        Forget a member's cached exempt/new classification.
 
-        return False
+        Entry point for on_member_update (roles changed), on_member_join
+        and on_member_remove - a demoted moderator loses the exemption on
+        their next message instead of when MEMBER_CLASS_TTL runs out.
+
+        Args:
+            guild_id: Guild the member belongs to.
+            user_id: The member's user ID.
+        """
+        self._member_classes.invalidate_member(guild_id, user_id)
+
+    def invalidate_guild_roles(self, guild_id: int) -> None:
+        """
+        Forget every cached classification in a guild.
+
+        Entry point for on_guild_role_update / on_guild_role_delete, since
+        a permission change affects every holder of the role.
+
+        Args:
+            guild_id: Guild whose roles changed.
+        """
+        self._member_classes.invalidate_guild(guild_id)
+
+    def invalidate_channel(self, channel_id: int) -> None:
+        """
+        Forget a channel's cached multiplier.
+
+        Entry point for on_guild_channel_update (rename) and
+        on_guild_channel_delete.
+
+        Args:
+            channel_id: The renamed or deleted channel.
+        """
+        self._channel_multiplier_cache.pop(channel_id, None)
+
+    # =========================================================================
+    # Join Stream
+    # =========================================================================
+
+    def observe_join(self, member: discord.Member) -> List[RaidSignal]:
+        """
+        Feed a join into the guild's streaming raid detector.
+
+        Called from on_member_join alongside the raid detection mixin. Each
+        join is O(1) amortized - no rescans of recent joins and no sweep.
+
+        Args:
+            member: The member who joined.
+
+        Returns:
+            Raid signals crossed or extended by this join.
+        """
+        record = JoinRecord(
+            user_id=member.id,
+            username=member.name,
+            display_name=member.display_name,
+            account_created=member.created_at,
+            has_default_avatar=member.avatar is None,
+            avatar_hash=member.avatar.key if member.avatar else None,
+            join_time=member.joined_at or datetime.now(NY_TZ),
+        )
+        signals = self._join_streams[member.guild.id].observe(record)
+
+        for signal in signals:
+            if signal.first:
+                logger.tree("RAID CLUSTER DETECTED", [
+                    ("Guild", member.guild.name),
+                    ("Signal", signal.reason),
+                    ("Key", signal.key[:60]),
+                    ("Joins", str(signal.count)),
+                    ("Members", str(len(signal.user_ids))),
+                ], emoji="🚨")
+
+        return signals
+
+    def get_join_stream_stats(self, guild_id: int) -> Dict[str, int]:
+        """Get a guild's join rates (10s/60s/10m) and tracked cluster count."""
+        detector = self._join_streams.get(guild_id)
+        return detector.get_stats(datetime.now(NY_TZ)) if detector else {}
 
     # =========================================================================
     # Invite Spam Detection
     # =========================================================================
 
-    async def _check_invite_spam(
-        self, content: str, state: UserSpamState, now: datetime, guild_id: int
-    ) -> bool:
+    async def _resolve_external_invites(self, content: str, guild_id: int) -> List[str]:
         """
-        Check if message contains non-whitelisted invite spam.
+        Find the invites in a message that point outside this server.
 
         LOGIC:
         1. Extract all Discord invite codes from message
         2. Filter out whitelisted invites (configured safe servers)
-        3. Fetch each invite to check if it's for the same server
+        3. Resolve invites (cached, concurrent) to check if they're for the same server
         4. Same-server invites are allowed (e.g., voice channel invites)
-        5. Count external/invalid invites against limit
+        5. External and invalid invites are returned
 
         Args:
             content: Message content to check.
-            state: User's spam state for tracking invite count.
-            now: Current timestamp.
             guild_id: Guild ID to check for same-server invites.
 
         Returns:
-            True if invite spam detected (exceeded INVITE_LIMIT), False otherwise.
+            Invite codes that count against INVITE_LIMIT.
         """
         invites = extract_invites(content)
         if not invites:
-            return False
+            return []
 
         non_whitelisted = [i for i in invites if not is_whitelisted_invite(i)]
         if not non_whitelisted:
-            return False
+            return []
 
         logger.debug("Invite Check Started", [
             ("Total Invites", str(len(invites))),
@@ -506,79 +635,120 @@ class AntiSpamService(ReputationMixin, RaidDetectionMixin, SpamHandlerMixin):
             ("Guild ID", str(guild_id)),
         ])
 
+        # Resolve all codes concurrently through the cache (one REST call
+        # per unique uncached code instead of one per occurrence)
+        resolved = await self._invite_resolver.resolve_many(non_whitelisted)
+
         # Filter out invites that are for the same server
         external_invites = []
         same_server_count = 0
         invalid_count = 0
 
         for invite_code in non_whitelisted:
-            try:
-                invite = await self.bot.fetch_invite(invite_code)
-                if invite.guild and invite.guild.id == guild_id:
-                    # Same server invite (e.g., voice channel invite) - allow it
-                    same_server_count += 1
-                    logger.tree("Same-Server Invite Allowed", [
-                        ("Code", invite_code),
-                        ("Guild", invite.guild.name if invite.guild else "Unknown"),
-                        ("Channel", getattr(invite.channel, 'name', 'Unknown')),
-                    ], emoji="✅")
-                    continue
-                # External server invite
-                external_invites.append(invite_code)
-                logger.tree("External Invite Detected", [
-                    ("Code", invite_code),
-                    ("Target Guild", invite.guild.name if invite.guild else "Unknown"),
-                ], emoji="🔗")
-            except discord.NotFound:
+            invite = resolved.get(invite_code)
+            if invite is None:
+                # API error - be lenient, don't count it
+                continue
+            if not invite.found:
                 # Invalid/expired invite - still count as external
                 invalid_count += 1
                 external_invites.append(invite_code)
                 logger.debug("Invalid/Expired Invite", [
                     ("Code", invite_code),
                 ])
-            except discord.HTTPException as e:
-                # API error - be lenient, don't count it
-                logger.warning("Invite Fetch Failed", [
+                continue
+            if invite.guild_id == guild_id:
+                # Same server invite (e.g., voice channel invite) - allow it
+                same_server_count += 1
+                logger.tree("Same-Server Invite Allowed", [
                     ("Code", invite_code),
-                    ("Error", str(e)[:50]),
-                ])
+                    ("Guild", invite.guild_name or "Unknown"),
+                    ("Channel", invite.channel_name or "Unknown"),
+                ], emoji="✅")
+                continue
+            # External server invite
+            external_invites.append(invite_code)
+            logger.tree("External Invite Detected", [
+                ("Code", invite_code),
+                ("Target Guild", invite.guild_name or "Unknown"),
+            ], emoji="🔗")
+
+        logger.debug("Invites Resolved", [
+            ("External", str(len(external_invites))),
+            ("Same-Server", str(same_server_count)),
+            ("Invalid", str(invalid_count)),
+        ])
+        return external_invites
 
+    @staticmethod
+    def _invite_count_after(state: UserSpamState, now: datetime, new_invites: int) -> int:
+        """User's invite count within INVITE_TIME_WINDOW once new_invites are added."""
+        if state.last_invite_time and (now - state.last_invite_time).total_seconds() < INVITE_TIME_WINDOW:
+            return state.invite_count + new_invites
+        return new_invites
+
+    def _check_invite_spam(self, external_invites: List[str], state: UserSpamState, now: datetime) -> bool:
+        """
+        Check if a message's external invites push the user over INVITE_LIMIT.
+
+        Doesn't update the count - _record_invites does that for every
+        message, including ones another detector already flagged.
+
+        Args:
+            external_invites: From _resolve_external_invites.
+            state: User's spam state with the invite count so far.
+            now: Current timestamp.
+
+        Returns:
+            True if invite spam detected (reached INVITE_LIMIT), False otherwise.
+        """
         if not external_invites:
-            logger.debug("Invite Check Passed", [
-                ("Same-Server", str(same_server_count)),
-                ("Result", "All invites allowed"),
-            ])
             return False
 
-        if state.last_invite_time and (now - state.last_invite_time).total_seconds() < INVITE_TIME_WINDOW:
-            state.invite_count += len(external_invites)
-        else:
-            state.invite_count = len(external_invites)
-        state.last_invite_time = now
-
-        is_spam = state.invite_count >= INVITE_LIMIT
+        total = self._invite_count_after(state, now, len(external_invites))
+        is_spam = total >= INVITE_LIMIT
 
         logger.tree("Invite Spam Check", [
             ("External Invites", str(len(external_invites))),
-            ("Same-Server", str(same_server_count)),
-            ("Invalid", str(invalid_count)),
-            ("Total Count", str(state.invite_count)),
+            ("Total Count", str(total)),
             ("Limit", str(INVITE_LIMIT)),
             ("Is Spam", str(is_spam)),
         ], emoji="🚨" if is_spam else "📊")
 
         return is_spam
 
+    def _record_invites(self, external_invites: List[str], state: UserSpamState, now: datetime) -> None:
+        """Add a message's external invites to the user's windowed invite count."""
+        if not external_invites:
+            return
+        state.invite_count = self._invite_count_after(state, now, len(external_invites))
+        state.last_invite_time = now
+
+    def get_invite_cache_stats(self) -> Dict[str, float]:
+        """Get invite resolver counters (hit ratio, API calls saved)."""
+        return self._invite_resolver.get_stats()
+
     # =========================================================================
     # Image Duplicate Detection
     # =========================================================================
 
+    @staticmethod
+    def _image_fingerprints(message: discord.Message) -> List[str]:
+        """Metadata fingerprints of a message's image attachments."""
+        return [
+            hash_attachment(a) for a in message.attachments
+            if a.content_type and a.content_type.startswith("image/")
+        ]
+
     def _check_image_duplicate(self, message: discord.Message, now: datetime) -> bool:
         """
-        Check if user is posting duplicate images.
+        Check if user is posting duplicate images (metadata fingerprint).
 
-        Uses perceptual hashing to detect identical or near-identical images.
-        Tracks hashes per user per guild with time window.
+        Cheap first pass with no download: catches the exact same file
+        re-posted by one user. Re-encoded or cross-account copies are handled
+        by _check_perceptual_duplicate.
+        Tracks hashes per user per guild with time window; the hashes are
+        stored by _record_image_hashes for every message, whatever the verdict.
 
         ALGORITHM:
         1. Hash all image attachments in message
@@ -596,18 +766,13 @@ class AntiSpamService(ReputationMixin, RaidDetectionMixin, SpamHandlerMixin):
         if not message.attachments:
             return False
 
-        guild_id = message.guild.id
-        user_id = message.author.id
-
-        current_hashes = [
-            hash_attachment(a) for a in message.attachments
-            if a.content_type and a.content_type.startswith("image/")
-        ]
-
+        current_hashes = self._image_fingerprints(message)
         if not current_hashes:
             return False
 
-        user_hashes = self._image_hashes[guild_id][user_id]
+        user_hashes = self._image_hashes[message.guild.id].get(message.author.id)
+        if not user_hashes:
+            return False
         cutoff = now - timedelta(seconds=IMAGE_DUPLICATE_TIME_WINDOW)
 
         for current_hash in current_hashes:
@@ -617,12 +782,137 @@ class AntiSpamService(ReputationMixin, RaidDetectionMixin, SpamHandlerMixin):
             )
             if match_count >= IMAGE_DUPLICATE_LIMIT - 1:
                 return True
+        return False
+
+    def _record_image_hashes(self, message: discord.Message, now: datetime) -> None:
+        """Remember a message's image fingerprints for later duplicate checks."""
+        current_hashes = self._image_fingerprints(message)
+        if not current_hashes:
+            return
 
+        user_hashes = self._image_hashes[message.guild.id][message.author.id]
         for h in current_hashes:
             user_hashes.append((h, now))
+        if len(user_hashes) > MAX_IMAGE_HASHES_PER_USER:
+            del user_hashes[:-MAX_IMAGE_HASHES_PER_USER]
+
+    async def _hash_images(self, message: discord.Message) -> List[int]:
+        """
+        Download and perceptually hash a message's images.
+
+        Returns:
+            dHashes of the images that hashed in time (empty if Pillow is
+            missing, there are no images, or PHASH_TIMEOUT ran out).
+        """
+        if not self._image_hasher.enabled or not message.attachments:
+            return []
+
+        try:
+            return await asyncio.wait_for(
+                self._image_hasher.hash_attachments(message.attachments),
+                timeout=PHASH_TIMEOUT,
+            )
+        except asyncio.TimeoutError:
+            logger.debug("Image Hash Timeout", [
+                ("User", str(message.author.id)),
+                ("Attachments", str(len(message.attachments))),
+            ])
+            return []
+
+    def _check_perceptual_duplicate(
+        self,
+        message: discord.Message,
+        hashes: List[int],
+        now: datetime,
+        cross_user: bool,
+    ) -> bool:
+        """
+        Check if an image matches recent uploads by content, across all accounts.
+
+        Looks each dHash (from _hash_images) up in the guild-wide index.
+        Catches re-encoded/renamed copies and raids where many accounts post
+        the same image once each. The hashes are added to the index by
+        _record_perceptual_hashes.
+
+        Triggers when:
+        - The same user posted a near-identical image IMAGE_DUPLICATE_LIMIT times, or
+        - PHASH_CROSS_USER_ACCOUNTS distinct accounts posted it and the poster
+          is new or low-reputation (a popular meme shared by regulars is fine)
+
+        Args:
+            message: Message the images came from.
+            hashes: dHashes of its images.
+            now: Current timestamp.
+            cross_user: Whether the cross-account rule applies to this poster.
+
+        Returns:
+            True if duplicate image spam detected, False otherwise.
+        """
+        if not hashes:
+            return False
 
+        user_id = message.author.id
+        index = self._phash_indexes[message.guild.id]
+        cutoff = now - timedelta(seconds=IMAGE_DUPLICATE_TIME_WINDOW)
+
+        for value in hashes:
+            found = index.find_duplicate(value, user_id, cutoff, IMAGE_DUPLICATE_LIMIT, cross_user)
+            if found:
+                accounts, posts = found
+                if accounts > 1:
+                    logger.tree("CROSS-ACCOUNT IMAGE SPAM", [
+                        ("User", f"{message.author} ({user_id})"),
+                        ("Accounts", str(accounts)),
+                        ("Posts", str(posts)),
+                    ], emoji="🖼️")
+                return True
         return False
 
+    def _record_perceptual_hashes(self, message: discord.Message, hashes: List[int], now: datetime) -> None:
+        """Add a message's image hashes to the guild-wide index."""
+        if not hashes:
+            return
+        index = self._phash_indexes[message.guild.id]
+        for value in hashes:
+            index.add(value, message.author.id, now)
+
+    def get_detector_executor_stats(self) -> Dict[str, float]:
+        """Get detector pool counters (queue depth, offloaded, latency)."""
+        return self._detector_executor.get_stats()
+
+    def get_detector_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Get per-detector calls, hit rates and latency histograms."""
+        return self._detection_engine.get_stats()
+
+    def get_tracked_state_counts(self) -> Dict[str, int]:
+        """
+        Get in-memory anti-spam state sizes for capacity planning.
+
+        Returns:
+            Dict of tracked entry counts plus total expirations/evictions.
+        """
+        user_maps = list(self._user_states.values())
+        hash_maps = list(self._image_hashes.values())
+        return {
+            "guilds": len(user_maps),
+            "users": sum(len(m) for m in user_maps),
+            "message_records": sum(len(state.messages) for m in user_maps for _, state in m.items()),
+            "image_hash_users": sum(len(m) for m in hash_maps),
+            "webhooks": len(self._webhook_states),
+            "phash_entries": sum(len(index) for index in self._phash_indexes.values()),
+            "channel_rates": len(self._channel_rates),
+            "member_classes": len(self._member_classes),
+            "invite_cache": len(self._invite_resolver),
+            "expired": sum(m.expired for m in user_maps + hash_maps) + self._webhook_states.expired,
+            "evicted": sum(m.evicted for m in user_maps + hash_maps) + self._webhook_states.evicted,
+        }
+
+    def get_image_hash_stats(self) -> Dict[str, float]:
+        """Get perceptual hashing counters (hashed, failed, avg latency, index size)."""
+        stats = self._image_hasher.get_stats()
+        stats["indexed"] = sum(len(index) for index in self._phash_indexes.values())
+        return stats
+
     # =========================================================================
     # Webhook Spam Detection
     # =========================================================================
@@ -632,7 +922,8 @@ class AntiSpamService(ReputationMixin, RaidDetectionMixin, SpamHandlerMixin):
         Check if webhook is spamming.
 
         Webhooks can be abused for spam since they bypass user rate limits.
-        Tracks message timestamps per webhook ID.
+        Tracks the last WEBHOOK_MESSAGE_LIMIT + 1 message times per webhook
+        ID in a fixed-size ring (O(1), no allocation per message).
 
         EXEMPTIONS:
         - Whitelisted webhook IDs (configured trusted webhooks)
@@ -651,12 +942,12 @@ class AntiSpamService(ReputationMixin, RaidDetectionMixin, SpamHandlerMixin):
             return False
 
         state = self._webhook_states[message.webhook_id]
-        cutoff = now - timedelta(seconds=WEBHOOK_TIME_WINDOW)
+        mono = time.monotonic()
+        state.times.append(mono)
 
-        state.messages = [t for t in state.messages if t > cutoff]
-        state.messages.append(now)
-
-        return len(state.messages) > WEBHOOK_MESSAGE_LIMIT
+        # Ring holds the last LIMIT + 1 messages: over the limit iff the
+        # oldest of them is still inside the window
+        return len(state.times) > WEBHOOK_MESSAGE_LIMIT and state.times[0] > mono - WEBHOOK_TIME_WINDOW
 
     # =========================================================================
     # Auto-Slowmode
@@ -667,10 +958,12 @@ class AntiSpamService(ReputationMixin, RaidDetectionMixin, SpamHandlerMixin):
         Check if channel needs auto-slowmode due to message flood.
 
         AUTO-SLOWMODE LOGIC:
-        1. Track message timestamps per channel
-        2. If SLOWMODE_TRIGGER_MESSAGES messages in SLOWMODE_TIME_WINDOW seconds
+        1. Update the channel's EWMA message rate (O(1), no lock)
+        2. If the channel is hot (rate crossed SLOWMODE_TRIGGER_RATE and
+           hasn't dropped below the release rate) and not in cooldown
         3. Apply SLOWMODE_DURATION second slowmode
-        4. Cooldown prevents repeated slowmode triggers
+        4. Hysteresis + cooldown prevent repeated slowmode triggers; a
+           channel still hot when its cooldown ends is slowed again
 
         This helps prevent spam waves without manual intervention.
 
@@ -681,29 +974,36 @@ class AntiSpamService(ReputationMixin, RaidDetectionMixin, SpamHandlerMixin):
             return
 
         channel_id = message.channel.id
-        now = datetime.now(NY_TZ)
 
+        # Always record so the dashboard sees live rates, even during cooldown
+        if not self._channel_rates.record(channel_id, message.guild.id):
+            return
+
+        now = datetime.now(NY_TZ)
         if channel_id in self._slowmode_cooldowns:
             cooldown_end = self._slowmode_cooldowns[channel_id] + timedelta(seconds=SLOWMODE_COOLDOWN)
             if now < cooldown_end:
                 return
 
-        # Use lock to prevent race conditions when modifying _channel_messages
-        async with self._slowmode_lock:
-            self._channel_messages[channel_id].append(now)
+        self._slowmode_cooldowns[channel_id] = now
+        # Runs for SLOWMODE_DURATION - don't hold up this message's spam check
+        create_safe_task(self._apply_slowmode(message.channel), "Auto-Slowmode")
 
-            cutoff = now - timedelta(seconds=SLOWMODE_TIME_WINDOW)
-            self._channel_messages[channel_id] = [
-                t for t in self._channel_messages[channel_id] if t > cutoff
-            ]
+    def get_channel_heat(self, guild_id: Optional[int] = None, limit: int = 20) -> List[Dict]:
+        """
+        Get live message rates for the busiest channels (dashboard heat map).
 
-            should_slowmode = len(self._channel_messages[channel_id]) >= SLOWMODE_TRIGGER_MESSAGES
-            if should_slowmode:
-                self._slowmode_cooldowns[channel_id] = now
-                self._channel_messages[channel_id] = []
+        Args:
+            guild_id: Restrict to one guild (None for all).
+            limit: Max channels returned.
 
-        if should_slowmode:
-            await self._apply_slowmode(message.channel)
+        Returns:
+            List of dicts with channel_id, msgs_per_sec and hot flag.
+        """
+        return [
+            {"channel_id": channel_id, "msgs_per_sec": round(rate, 3), "hot": hot}
+            for channel_id, rate, hot in self._channel_rates.get_rates(guild_id, limit)
+        ]
 
     async def _apply_slowmode(self, channel: discord.TextChannel) -> None:
         """
@@ -737,7 +1037,8 @@ class AntiSpamService(ReputationMixin, RaidDetectionMixin, SpamHandlerMixin):
                 ("Channel", f"#{channel.name}"),
                 ("Channel ID", str(channel.id)),
                 ("Duration", f"{SLOWMODE_DURATION}s"),
-                ("Trigger", f"{SLOWMODE_TRIGGER_MESSAGES} msgs in {SLOWMODE_TIME_WINDOW}s"),
+                ("Trigger", f"{SLOWMODE_TRIGGER_RATE:.2f} msgs/s"),
+                ("Rate", f"{self._channel_rates.get_rate(channel.id):.2f} msgs/s"),
             ], emoji="🐌")
 
             await asyncio.sleep(SLOWMODE_DURATION)
@@ -774,21 +1075,17 @@ class AntiSpamService(ReputationMixin, RaidDetectionMixin, SpamHandlerMixin):
         """
         Check a message for spam using all detection methods.
 
-        DETECTION PIPELINE (in order):
+        DETECTION PIPELINE:
         1. Exemption check (bots, mods, admins)
         2. Webhook spam
-        3. Scam/phishing detection
-        4. Zalgo text detection
-        5. Invite spam (with same-server filtering)
-        6. Message flood
-        7. Duplicate message spam
-        8. Image duplicate spam
-        9. Mention spam
-        10. Emoji spam
-        11. Newline spam
-        12. Link flood
-        13. Attachment flood
-        14. Sticker spam
+        3. Registered detectors (checks.py), cheapest first, stopping at
+           the first hit:
+           - CHEAP: mention, emoji, newline spam
+           - MEMORY: message flood, image duplicate, link / attachment
+             flood, sticker spam
+           - CPU: scam/phishing, zalgo, duplicate text (one batched
+             analysis job, only computed if reached)
+           - NETWORK: invite spam, perceptual image duplicate
 
         ADAPTIVE THRESHOLDS:
         - New members have stricter limits
@@ -846,10 +1143,15 @@ class AntiSpamService(ReputationMixin, RaidDetectionMixin, SpamHandlerMixin):
         )
 
         state.messages.append(record)
+        _drop_older_than(
+            state.messages,
+            now - timedelta(seconds=HISTORY_RETENTION),
+            key=lambda m: m.timestamp,
+        )
 
         # Get multipliers
         is_new = isinstance(message.author, discord.Member) and self._is_new_member(message.author)
-        rep_multiplier = self.get_reputation_multiplier(user_id, guild_id)
+        rep_multiplier = await self.get_reputation_multiplier(user_id, guild_id)
         channel_multiplier = self._get_channel_multiplier(message.channel)
         total_multiplier = rep_multiplier * channel_multiplier
 
@@ -873,94 +1175,21 @@ class AntiSpamService(ReputationMixin, RaidDetectionMixin, SpamHandlerMixin):
             self.update_reputation(user_id, guild_id, REP_GAIN_MESSAGE)
             return None
 
-        spam_type = None
-
-        # 1. Scam/Phishing
-        if is_scam(content):
-            spam_type = "scam"
-
-        # 2. Zalgo
-        if not spam_type and is_zalgo(content):
-            spam_type = "zalgo"
-
-        # 3. Invite spam (skip for mods server)
-        if not spam_type and guild_id != self.config.mod_server_id and await self._check_invite_spam(content, state, now, guild_id):
-            spam_type = "invite_spam"
-
-        # 4. Message flood
-        if not spam_type:
-            recent_messages = [
-                m for m in state.messages
-                if (now - m.timestamp).total_seconds() < FLOOD_TIME_WINDOW
-            ]
-            if len(recent_messages) > flood_limit:
-                spam_type = "message_flood"
-
-        # 5. Duplicate spam
-        is_arabic = is_mostly_arabic(content)
-        is_emoji = is_emoji_only(content)
-        if not spam_type and record.content and len(record.content) >= DUPLICATE_MIN_LENGTH and not is_arabic and not is_emoji:
-            similar_count = 0
-            for m in state.messages:
-                if m is not record and (now - m.timestamp).total_seconds() < DUPLICATE_TIME_WINDOW:
-                    if is_similar(m.content, record.content):
-                        similar_count += 1
-            if similar_count >= duplicate_limit - 1:
-                spam_type = "duplicate"
-
-        # 6. Image duplicate
-        if not spam_type and self._check_image_duplicate(message, now):
-            spam_type = "image_duplicate"
-
-        # 7. Mention spam (skip if channel is whitelisted)
-        is_mention_exempt = (
-            self.config.mention_spam_exempt_channel_ids
-            and message.channel.id in self.config.mention_spam_exempt_channel_ids
+        ctx = DetectionContext(
+            message=message,
+            content=content,
+            record=record,
+            state=state,
+            now=now,
+            guild_id=guild_id,
+            total_multiplier=total_multiplier,
+            is_new=is_new,
+            rep_multiplier=rep_multiplier,
+            flood_limit=flood_limit,
+            duplicate_limit=duplicate_limit,
+            mention_limit=mention_limit,
         )
-        if not spam_type and not is_mention_exempt and record.mention_count >= mention_limit:
-            spam_type = "mention_spam"
-
-        # 8. Emoji spam
-        emoji_limit = int(EMOJI_LIMIT * total_multiplier)
-        if not spam_type and record.emoji_count >= emoji_limit:
-            spam_type = "emoji_spam"
-
-        # 9. Newline spam
-        newline_limit = int(NEWLINE_LIMIT * total_multiplier)
-        if not spam_type and not is_arabic and count_newlines(content) >= newline_limit:
-            spam_type = "newline_spam"
-
-        # 10. Link flood
-        if not spam_type and record.has_links:
-            link_limit = int(LINK_LIMIT * total_multiplier)
-            recent_links = [
-                m for m in state.messages
-                if m.has_links
-                and (now - m.timestamp).total_seconds() < LINK_TIME_WINDOW
-            ]
-            if len(recent_links) >= link_limit:
-                spam_type = "link_flood"
-
-        # 11. Attachment flood
-        if not spam_type and record.has_attachments:
-            attachment_limit = int(ATTACHMENT_LIMIT * total_multiplier)
-            recent_attachments = [
-                m for m in state.messages
-                if m.has_attachments
-                and (now - m.timestamp).total_seconds() < ATTACHMENT_TIME_WINDOW
-            ]
-            if len(recent_attachments) >= attachment_limit:
-                spam_type = "attachment_flood"
-
-        # 12. Sticker spam
-        if not spam_type and record.has_stickers:
-            recent_sticker_msgs = [
-                m for m in state.messages
-                if m.has_stickers
-                and (now - m.timestamp).total_seconds() < STICKER_SPAM_TIME_WINDOW
-            ]
-            if len(recent_sticker_msgs) >= STICKER_SPAM_LIMIT:
-                spam_type = "sticker_spam"
+        spam_type = await self._detection_engine.run(self, ctx)
 
         if not spam_type:
             self.update_reputation(user_id, guild_id, REP_GAIN_MESSAGE)
@@ -167,6 +167,9 @@ from src.api.routers import (
     bot_router,
     events_router,
 )
+from src.api.routers.ticket_html import ticket_html_router
+from src.api.routers.transcript_json import transcript_json_router
+from src.api.routers.attachments import attachments_router
 
 
 # =============================================================================
@@ -304,6 +307,9 @@ def create_app(bot: Optional[Any] = None) -> FastAPI:
     app.include_router(tickets_router, prefix="/api/azab")
     app.include_router(ticket_transcripts_router, prefix="/api/azab")
     app.include_router(transcripts_router, prefix="/api/azab")
+    app.include_router(ticket_html_router, prefix="/api/azab")
+    app.include_router(transcript_json_router, prefix="/api/azab")
+    app.include_router(attachments_router, prefix="/api/azab")
     app.include_router(case_transcripts_router, prefix="/api/azab")
     app.include_router(appeals_router, prefix="/api/azab")
     app.include_router(appeal_form_router, prefix="/api/azab")
@@ -21,6 +21,7 @@ class APIConfig:
     host: str = "0.0.0.0"
     port: int = 8081
     debug: bool = False
+    public_url: str = "https://trippixn.com"  # Origin the API is reached at (absolute links)
 
     # CORS - defaults to dashboard origin for security
     cors_origins: tuple[str, ...] = ("https://trippixn.com",)
@@ -72,6 +73,7 @@ def load_api_config() -> APIConfig:
         host=os.getenv("AZAB_API_HOST", "0.0.0.0"),
         port=int(os.getenv("AZAB_API_PORT", "8081")),
         debug=os.getenv("AZAB_API_DEBUG", "false").lower() == "true",
+        public_url=os.getenv("AZAB_API_PUBLIC_URL", "https://trippixn.com").rstrip("/"),
         cors_origins=cors_origins,
         jwt_secret=jwt_secret,
         jwt_expiry_hours=int(os.getenv("AZAB_JWT_EXPIRY_HOURS", "24")),
@@ -0,0 +1,174 @@
+"""
+AzabBot - Archived Attachment Router
+====================================
+
+Serves blobs from the attachment archive.
+
+DESIGN:
+    Transcript and evidence pages link here instead of Discord CDN URLs
+    (which expire). Blobs are immutable and named by their SHA-256, so the
+    digest is the ETag and responses are cacheable forever. Single-range
+    requests (video seeking, resumed downloads) get 206 with only the
+    requested bytes, read from disk in chunks off the event loop.
+
+    Blobs are user uploads served from the API origin, so the stored
+    content type is only trusted for INLINE_MEDIA_TYPES (raster images,
+    audio/video, PDF). Anything else (HTML, SVG, scripts) is sent as an
+    application/octet-stream download, and every response carries
+    nosniff, so an uploaded page can never run on this origin.
+
+Author: حَـــــنَّـــــا
+Server: discord.gg/syria
+"""
+
+import asyncio
+import re
+from pathlib import Path
+from typing import AsyncIterator, Dict, FrozenSet, Optional, Tuple
+
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import Response, StreamingResponse
+
+from src.core.database import get_db
+from src.api.services.transcript_artifacts import check_transcript_token
+from src.services.attachment_archive import BlobStore
+
+
+# =============================================================================
+# Constants
+# =============================================================================
+
+READ_CHUNK_BYTES: int = 256 * 1024
+CACHE_CONTROL: str = "private, max-age=31536000, immutable"
+
+# Content types safe to render inline (no SVG - it can carry script)
+INLINE_MEDIA_TYPES: FrozenSet[str] = frozenset({
+    "image/png", "image/jpeg", "image/gif", "image/webp", "image/avif", "image/bmp",
+    "video/mp4", "video/webm", "video/quicktime", "video/ogg",
+    "audio/mpeg", "audio/ogg", "audio/wav", "audio/webm", "audio/mp4", "audio/flac",
+    "application/pdf",
+})
+
+_SHA256 = re.compile(r"^[0-9a-f]{64}$")
+_RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+_store = BlobStore()
+
+router = APIRouter(prefix="/attachments", tags=["Attachments"])
+
+
+# =============================================================================
+# Helpers
+# =============================================================================
+
+def _parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single byte range.
+
+    Returns:
+        Inclusive (start, end), or None if unsatisfiable / unsupported.
+    """
+    match = _RANGE.match(header.strip())
+    if not match or not (match.group(1) or match.group(2)):
+        return None
+    first, last = match.group(1), match.group(2)
+    if not first:
+        length = int(last)
+        if length == 0:
+            return None
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or end < start:
+        return None
+    return start, end
+
+
+def _content_headers(content_type: Optional[str]) -> Tuple[str, Dict[str, str]]:
+    """
+    Media type and headers for a blob's stored content type.
+
+    Returns:
+        (media type, headers) - inline for INLINE_MEDIA_TYPES, otherwise
+        an octet-stream download.
+    """
+    media_type = (content_type or "").split(";", 1)[0].strip().lower()
+    if media_type in INLINE_MEDIA_TYPES:
+        return media_type, {"Content-Disposition": "inline"}
+    return "application/octet-stream", {"Content-Disposition": "attachment"}
+
+
+async def _read_range(path: Path, start: int, end: int) -> AsyncIterator[bytes]:
+    handle = await asyncio.to_thread(open, path, "rb")
+    try:
+        await asyncio.to_thread(handle.seek, start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = await asyncio.to_thread(handle.read, min(READ_CHUNK_BYTES, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+    finally:
+        await asyncio.to_thread(handle.close)
+
+
+# =============================================================================
+# Routes
+# =============================================================================
+
+@router.get("/{sha256}")
+async def get_archived_attachment(
+    request: Request,
+    sha256: str,
+    token: str = Query(..., description="Blob access token from the archive link"),
+) -> Response:
+    """
+    Serve an archived attachment, honouring Range and If-None-Match.
+
+    Args:
+        sha256: Blob digest.
+        token: Access token embedded in the archive link.
+    """
+    if not _SHA256.match(sha256):
+        raise HTTPException(status_code=404, detail="Attachment not found")
+    check_transcript_token(f"blob:{sha256}", token)
+
+    blob = await asyncio.to_thread(get_db().get_attachment_blob, sha256)
+    path = _store.path(sha256)
+    if not blob or not await asyncio.to_thread(path.is_file):
+        raise HTTPException(status_code=404, detail="Attachment not found")
+
+    size = blob["size"]
+    headers = {
+        "ETag": f'"{sha256}"',
+        "Cache-Control": CACHE_CONTROL,
+        "Accept-Ranges": "bytes",
+        "X-Content-Type-Options": "nosniff",
+    }
+    if request.headers.get("if-none-match", "").strip() in (f'"{sha256}"', "*"):
+        return Response(status_code=304, headers=headers)
+
+    media_type, content_headers = _content_headers(blob["content_type"])
+    headers.update(content_headers)
+    range_header = request.headers.get("range")
+    if range_header and "," not in range_header:  # Multi-range: serve the whole blob
+        byte_range = _parse_range(range_header, size)
+        if byte_range is None:
+            return Response(status_code=416, headers={**headers, "Content-Range": f"bytes */{size}"})
+        start, end = byte_range
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+        headers["Content-Length"] = str(end - start + 1)
+        return StreamingResponse(_read_range(path, start, end), status_code=206, media_type=media_type, headers=headers)
+
+    headers["Content-Length"] = str(size)
+    return StreamingResponse(_read_range(path, 0, size - 1), media_type=media_type, headers=headers)
+
+
+# =============================================================================
+# Module Export
+# =============================================================================
+
+attachments_router = router
+
+__all__ = ["router", "attachments_router"]
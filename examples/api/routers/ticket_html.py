@@ -0,0 +1,235 @@
+"""
+AzabBot - Streaming Ticket HTML Transcript Router
+=================================================
+
+Serves ticket HTML transcripts as chunked responses.
+
+DESIGN:
+    The page is rendered while it is sent: the head goes out first, then
+    stored messages are read one keyset page at a time, rendered and
+    flushed, then the foot. Only one page of rows and one rendered chunk
+    are in memory at once, and the first byte is sent before any message
+    is read. Tickets without stored messages fall back to the transcript
+    saved at close, sent in slices.
+
+    Closed tickets do not change until reopened, so they are served from
+    the transcript artifact store instead (rendered once, precompressed,
+    ETag revalidation); streaming is only used while a ticket is open.
+
+    The full page is only the first load of an open ticket. After that the
+    page's live script polls /delta for messages after the last one shown
+    and for edits/deletes since its previous poll, so each poll costs
+    O(new messages) instead of a full re-query and re-render.
+
+Author: حَـــــنَّـــــا
+Server: discord.gg/syria
+"""
+
+import asyncio
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional, Union
+from urllib.parse import quote
+
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import Response, StreamingResponse
+
+from src.core.database import get_db
+from src.core.logger import logger
+from src.api.dependencies import get_bot
+from src.api.services.transcript_artifacts import check_transcript_token, get_artifact_store
+from src.services.attachment_archive import rewrite_archived_attachments
+from src.services.tickets.transcript import (
+    MentionResolver,
+    html_message_from_row,
+    render_message_chunk,
+    render_message_html,
+    render_transcript_foot,
+    render_transcript_head,
+    resolve_cached_mentions,
+)
+
+
+# =============================================================================
+# Constants
+# =============================================================================
+
+PAGE_SIZE: int = 500                # Stored rows read per DB round trip
+SAVED_SLICE_CHARS: int = 64 * 1024  # Slice size when sending a saved transcript
+HTML_MEDIA_TYPE: str = "text/html; charset=utf-8"
+DELTA_CLOCK_SLACK: float = 5.0      # Re-sent edit window; covers the ingest batch delay
+
+
+router = APIRouter(prefix="/transcripts", tags=["Transcripts"])
+
+
+# =============================================================================
+# Streaming
+# =============================================================================
+
+async def _stream_stored(
+    ticket: dict,
+    message_count: int,
+    live_url: Optional[str] = None,
+) -> AsyncIterator[bytes]:
+    db = get_db()
+    bot = get_bot()
+    guild = bot.get_guild(ticket["guild_id"]) if bot else None
+    user = bot.get_user(ticket["user_id"]) if bot else None
+    mention_map: Dict[int, str] = {}
+
+    yield render_transcript_head(ticket, user, message_count, live_url).encode("utf-8")
+
+    after_id = 0
+    first = True
+    while True:
+        rows = await asyncio.to_thread(db.get_ticket_message_page, ticket["ticket_id"], after_id, PAGE_SIZE)
+        if not rows:
+            break
+        await asyncio.to_thread(rewrite_archived_attachments, rows, db)
+        if bot:
+            resolve_cached_mentions(rows, guild, bot, mention_map)
+        yield render_message_chunk(map(html_message_from_row, rows), mention_map, first).encode("utf-8")
+        first = False
+        after_id = rows[-1]["message_id"]
+        if len(rows) < PAGE_SIZE:
+            break
+
+    yield render_transcript_foot().encode("utf-8")
+
+
+async def _stream_saved(html_content: str) -> AsyncIterator[bytes]:
+    for start in range(0, len(html_content), SAVED_SLICE_CHARS):
+        yield html_content[start:start + SAVED_SLICE_CHARS].encode("utf-8")
+
+
+async def _render_closed(ticket: dict) -> Optional[bytes]:
+    """Render a closed ticket's page once for the artifact store."""
+    db = get_db()
+    ticket_id = ticket["ticket_id"]
+    message_count = await asyncio.to_thread(db.count_ticket_messages, ticket_id)
+    if message_count:
+        return b"".join([chunk async for chunk in _stream_stored(ticket, message_count)])
+
+    # Tickets closed before messages were stored only have the saved page
+    saved = await asyncio.to_thread(db.get_ticket_transcript, ticket_id)
+    return saved.encode("utf-8") if saved else None
+
+
+# =============================================================================
+# Routes
+# =============================================================================
+
+@router.get("/ticket/{ticket_id}/html")
+async def stream_ticket_transcript(
+    request: Request,
+    ticket_id: str,
+    token: str = Query(..., description="Transcript access token"),
+) -> Union[Response, StreamingResponse]:
+    """
+    Serve a ticket's HTML transcript.
+
+    Closed tickets are served from the artifact store; open tickets are
+    streamed from the stored messages.
+
+    Args:
+        ticket_id: The ticket ID.
+        token: Transcript access token from the transcript link.
+    """
+    db = get_db()
+    ticket: Optional[dict] = await asyncio.to_thread(db.get_ticket, ticket_id)
+    if not ticket:
+        raise HTTPException(status_code=404, detail="Transcript not found")
+
+    check_transcript_token(ticket_id, token, ticket.get("transcript_token"))
+
+    if ticket.get("status") == "closed":
+        store = get_artifact_store()
+        artifact = await store.get_or_render("ticket-html", ticket_id, lambda: _render_closed(ticket))
+        if not artifact:
+            raise HTTPException(status_code=404, detail="Transcript not found")
+        return store.respond(request, artifact)
+
+    message_count = await asyncio.to_thread(db.count_ticket_messages, ticket_id)
+    if message_count:
+        live_url = f"{request.url.path.rsplit('/', 1)[0]}/delta?token={quote(token, safe='')}"
+        body = _stream_stored(ticket, message_count, live_url)
+    else:
+        saved = await asyncio.to_thread(db.get_ticket_transcript, ticket_id)
+        if not saved:
+            raise HTTPException(status_code=404, detail="Transcript not found")
+        body = _stream_saved(saved)
+
+    logger.debug("Streaming Ticket Transcript", [
+        ("Ticket ID", ticket_id),
+        ("Messages", str(message_count)),
+        ("Source", "Stored messages" if message_count else "Saved HTML"),
+    ])
+
+    return StreamingResponse(body, media_type=HTML_MEDIA_TYPE, headers={"Cache-Control": "no-store"})
+
+
+@router.get("/ticket/{ticket_id}/delta")
+async def get_ticket_transcript_delta(
+    ticket_id: str,
+    token: str = Query(..., description="Transcript access token"),
+    after: int = Query(0, ge=0, description="Last message ID the viewer has"),
+    since: float = Query(0.0, ge=0, description="Time of the viewer's previous poll"),
+) -> Dict[str, Any]:
+    """
+    Live transcript delta for an open ticket.
+
+    Returns rendered message fragments after `after`, plus messages the
+    viewer already has that were edited or deleted since `since`.
+
+    Args:
+        ticket_id: The ticket ID.
+        token: Transcript access token from the transcript link.
+        after: Last message ID the viewer has (0 = none).
+        since: Unix time of the previous poll (the `since` it returned).
+    """
+    db = get_db()
+    ticket: Optional[dict] = await asyncio.to_thread(db.get_ticket, ticket_id)
+    if not ticket:
+        raise HTTPException(status_code=404, detail="Transcript not found")
+
+    check_transcript_token(ticket_id, token, ticket.get("transcript_token"))
+
+    polled_at = time.time()
+    rows = await asyncio.to_thread(db.get_ticket_message_page, ticket_id, after, PAGE_SIZE)
+    edited: List[Dict[str, Any]] = []
+    deleted: List[int] = []
+    if after and since:
+        edited, deleted = await asyncio.to_thread(db.get_ticket_message_changes, ticket_id, since, after)
+    if rows or edited:
+        await asyncio.to_thread(rewrite_archived_attachments, rows + edited, db)
+
+    mention_map: Dict[int, str] = {}
+    bot = get_bot()
+    if bot and (rows or edited):
+        resolve_cached_mentions(rows + edited, bot.get_guild(ticket["guild_id"]), bot, mention_map)
+
+    resolve = MentionResolver(mention_map)
+
+    def fragments(batch: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        return [
+            {"id": str(row["message_id"]), "html": render_message_html(html_message_from_row(row), resolve)}
+            for row in batch
+        ]
+
+    return {
+        "status": ticket.get("status"),
+        "messages": fragments(rows),
+        "edited": fragments(edited),
+        "deleted": [str(message_id) for message_id in deleted],
+        "more": len(rows) >= PAGE_SIZE,
+        "since": polled_at - DELTA_CLOCK_SLACK,
+    }
+
+
+# =============================================================================
+# Module Export
+# =============================================================================
+
+ticket_html_router = router
+
+__all__ = ["router", "ticket_html_router"]
@@ -0,0 +1,104 @@
+"""
+AzabBot - Transcript JSON Router
+================================
+
+Serves closed ticket and case JSON transcripts from the artifact store.
+
+DESIGN:
+    Both transcripts are written once (ticket close, case resolution) and
+    never change, so the first view copies the saved JSON into the
+    artifact store and every later view is a manifest lookup plus cached,
+    precompressed bytes - or a bodiless 304 when the viewer already has
+    it. The database is read for the access check only.
+
+Author: حَـــــنَّـــــا
+Server: discord.gg/syria
+"""
+
+import asyncio
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import Response
+
+from src.core.database import get_db
+from src.api.services.transcript_artifacts import check_transcript_token, get_artifact_store
+
+
+router = APIRouter(prefix="/transcripts", tags=["Transcripts"])
+
+
+# =============================================================================
+# Rendering
+# =============================================================================
+
+async def _load_saved(loader, owner_id: str) -> Optional[bytes]:
+    saved = await asyncio.to_thread(loader, owner_id)
+    return saved.encode("utf-8") if saved else None
+
+
+# =============================================================================
+# Routes
+# =============================================================================
+
+@router.get("/ticket/{ticket_id}/json")
+async def get_ticket_transcript_json(
+    request: Request,
+    ticket_id: str,
+    token: str = Query(..., description="Transcript access token"),
+) -> Response:
+    """
+    Serve a closed ticket's JSON transcript.
+
+    Args:
+        ticket_id: The ticket ID.
+        token: Transcript access token from the transcript link.
+    """
+    db = get_db()
+    ticket: Optional[dict] = await asyncio.to_thread(db.get_ticket, ticket_id)
+    if not ticket or ticket.get("status") != "closed":
+        raise HTTPException(status_code=404, detail="Transcript not found")
+
+    check_transcript_token(ticket_id, token, ticket.get("transcript_token"))
+
+    store = get_artifact_store()
+    artifact = await store.get_or_render(
+        "ticket-json", ticket_id, lambda: _load_saved(db.get_ticket_transcript_json, ticket_id)
+    )
+    if not artifact:
+        raise HTTPException(status_code=404, detail="Transcript not found")
+    return store.respond(request, artifact)
+
+
+@router.get("/case/{case_id}/json")
+async def get_case_transcript_json(
+    request: Request,
+    case_id: str,
+    token: str = Query(..., description="Transcript access token"),
+) -> Response:
+    """
+    Serve a case's JSON transcript.
+
+    Args:
+        case_id: The case ID.
+        token: Transcript access token from the transcript link.
+    """
+    check_transcript_token(case_id, token)
+
+    db = get_db()
+    store = get_artifact_store()
+    artifact = await store.get_or_render(
+        "case-json", case_id, lambda: _load_saved(db.get_case_transcript, case_id)
+    )
+    if not artifact:
+        raise HTTPException(status_code=404, detail="Transcript not found")
+    return store.respond(request, artifact)
+
+
+# =============================================================================
+# Module Export
+# =============================================================================
+
+transcript_json_router = router
+
+__all__ = ["router", "transcript_json_router"]
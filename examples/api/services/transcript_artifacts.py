@@ -0,0 +1,405 @@
+"""
+AzabBot - Transcript Artifact Store
+===================================
+
+Render-once, precompressed, content-addressed transcript files.
+
+DESIGN:
+    Closed ticket and case transcripts never change, but every view used
+    to re-read them from the database (and regenerate HTML/JSON). They are
+    now rendered once and stored on disk as artifacts:
+        data/transcripts/<kind>/<owner_id>/<version>-<sha256>.<ext>
+    with identity, gzip and (if the brotli package is installed) brotli
+    variants, plus a small manifest naming the current hash. Serving is:
+    - Manifest lookup (memory after the first view)
+    - Accept-Encoding negotiation: br > gzip > identity
+    - Strong ETag per variant; If-None-Match answers 304 with no body
+    - Cache-Control: no-cache - the view URL is not content-addressed (a
+      reopen + re-close or a template bump changes what it serves), so
+      browsers revalidate every time and the ETag makes that a 304
+    - Variant bytes from a byte-budgeted LRU, disk on a miss
+    Each kind carries a template version. Bumping it (e.g. when the HTML
+    template changes) makes old manifests stale, so the next view
+    re-renders from the database once.
+
+Author: حَـــــنَّـــــا
+Server: discord.gg/syria
+"""
+
+import asyncio
+import gzip
+import hashlib
+import hmac
+import json
+import os
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+from fastapi import HTTPException, Request
+from fastapi.responses import Response
+
+try:
+    import brotli
+except ImportError:  # brotli is optional - gzip and identity are always stored
+    brotli = None
+
+from src.core.database import DATA_DIR
+from src.core.logger import logger
+from src.api.services.auth import get_auth_service
+from src.services.tickets.transcript import TRANSCRIPT_TEMPLATE_VERSION
+
+
+# =============================================================================
+# Constants
+# =============================================================================
+
+ARTIFACT_DIR: Path = DATA_DIR / "transcripts"
+ARTIFACT_CACHE_BYTES: int = 64 * 1024 * 1024   # In-memory variant budget
+MANIFEST_CACHE_SIZE: int = 10_000
+GZIP_LEVEL: int = 9                             # Compressed once, served many times
+BROTLI_QUALITY: int = 11
+
+REVALIDATE_CACHE_CONTROL: str = "private, no-cache"
+
+# kind -> (template version, media type, file extension)
+ARTIFACT_KINDS: Dict[str, Tuple[int, str, str]] = {
+    "ticket-html": (TRANSCRIPT_TEMPLATE_VERSION, "text/html; charset=utf-8", "html"),
+    "ticket-json": (1, "application/json", "json"),
+    "case-json": (1, "application/json", "json"),
+}
+
+ENCODINGS: Tuple[str, ...] = ("br", "gzip", "identity")
+ENCODING_SUFFIX: Dict[str, str] = {"br": ".br", "gzip": ".gz", "identity": ""}
+
+
+# =============================================================================
+# Models
+# =============================================================================
+
+@dataclass(frozen=True)
+class Artifact:
+    """Manifest of a stored transcript artifact."""
+    kind: str
+    owner_id: str
+    version: int
+    sha256: str
+    media_type: str
+    encodings: Tuple[str, ...]
+    size: int
+    created_at: float
+
+    @property
+    def stem(self) -> str:
+        return f"{self.version}-{self.sha256}"
+
+    def etag(self, encoding: str) -> str:
+        suffix = "" if encoding == "identity" else f".{encoding}"
+        return f'"{self.sha256[:32]}{suffix}"'
+
+
+# =============================================================================
+# Store
+# =============================================================================
+
+class TranscriptArtifactStore:
+    """Content-addressed transcript artifacts with precompressed variants."""
+
+    def __init__(self, root: Path = ARTIFACT_DIR, cache_bytes: int = ARTIFACT_CACHE_BYTES) -> None:
+        self._root = root
+        self._cache_bytes = cache_bytes
+        self._manifests: "OrderedDict[Tuple[str, str], Artifact]" = OrderedDict()
+        self._bodies: "OrderedDict[Tuple[str, str, str], bytes]" = OrderedDict()
+        self._cached_bytes: int = 0
+        self._render_locks: Dict[Tuple[str, str], asyncio.Lock] = {}
+
+        # Stats
+        self.renders: int = 0
+        self.served: int = 0
+        self.not_modified: int = 0
+        self.disk_reads: int = 0
+
+    # =========================================================================
+    # Paths
+    # =========================================================================
+
+    def _dir(self, kind: str, owner_id: str) -> Path:
+        return self._root / kind / owner_id
+
+    def _variant_path(self, artifact: Artifact, encoding: str) -> Path:
+        ext = ARTIFACT_KINDS[artifact.kind][2]
+        return self._dir(artifact.kind, artifact.owner_id) / f"{artifact.stem}.{ext}{ENCODING_SUFFIX[encoding]}"
+
+    # =========================================================================
+    # Writing
+    # =========================================================================
+
+    def put(self, kind: str, owner_id: str, body: bytes) -> Artifact:
+        """
+        Store an artifact (blocking - call via put_async from the loop).
+
+        Args:
+            kind: Key of ARTIFACT_KINDS.
+            owner_id: Ticket or case ID.
+            body: Rendered transcript (identity encoding).
+
+        Returns:
+            The new manifest.
+        """
+        version, media_type, _ = ARTIFACT_KINDS[kind]
+        digest = hashlib.sha256(body).hexdigest()
+
+        variants = {"identity": body, "gzip": gzip.compress(body, GZIP_LEVEL, mtime=0)}
+        if brotli is not None:
+            variants["br"] = brotli.compress(body, quality=BROTLI_QUALITY)
+
+        artifact = Artifact(
+            kind=kind,
+            owner_id=owner_id,
+            version=version,
+            sha256=digest,
+            media_type=media_type,
+            encodings=tuple(e for e in ENCODINGS if e in variants),
+            size=len(body),
+            created_at=time.time(),
+        )
+
+        directory = self._dir(kind, owner_id)
+        directory.mkdir(parents=True, exist_ok=True)
+        for encoding, data in variants.items():
+            _atomic_write(self._variant_path(artifact, encoding), data)
+        _atomic_write(directory / "manifest.json", json.dumps(asdict(artifact)).encode("utf-8"))
+
+        self._remember(artifact)
+        self.renders += 1
+        logger.debug("Transcript Artifact Stored", [
+            ("Kind", kind),
+            ("Owner", owner_id),
+            ("Size", f"{len(body) / 1024:.1f} KB"),
+            ("Gzip", f"{len(variants['gzip']) / 1024:.1f} KB"),
+            ("Brotli", f"{len(variants['br']) / 1024:.1f} KB" if "br" in variants else "Unavailable"),
+        ])
+        return artifact
+
+    async def put_async(self, kind: str, owner_id: str, body: bytes) -> Artifact:
+        """Compress and write in a worker thread."""
+        return await asyncio.to_thread(self.put, kind, owner_id, body)
+
+    # =========================================================================
+    # Reading
+    # =========================================================================
+
+    def get(self, kind: str, owner_id: str) -> Optional[Artifact]:
+        """
+        Current artifact, or None if missing or rendered by an older template.
+        """
+        key = (kind, owner_id)
+        artifact = self._manifests.get(key)
+        if artifact is None:
+            try:
+                data = json.loads((self._dir(kind, owner_id) / "manifest.json").read_bytes())
+                artifact = Artifact(**{**data, "encodings": tuple(data["encodings"])})
+            except (OSError, ValueError, TypeError):
+                return None
+            self._remember(artifact)
+        else:
+            self._manifests.move_to_end(key)
+
+        if artifact.version != ARTIFACT_KINDS[kind][0]:
+            return None
+        return artifact
+
+    async def get_or_render(
+        self,
+        kind: str,
+        owner_id: str,
+        render: Callable[[], Awaitable[Optional[bytes]]],
+    ) -> Optional[Artifact]:
+        """
+        Current artifact, rendering it once if missing or stale.
+
+        Concurrent first views of the same transcript share one render.
+
+        Args:
+            kind: Key of ARTIFACT_KINDS.
+            owner_id: Ticket or case ID.
+            render: Coroutine factory returning the body (None = nothing to render).
+        """
+        artifact = self.get(kind, owner_id)
+        if artifact is not None:
+            return artifact
+
+        lock = self._render_locks.setdefault((kind, owner_id), asyncio.Lock())
+        async with lock:
+            artifact = self.get(kind, owner_id)
+            if artifact is None:
+                body = await render()
+                if body is not None:
+                    artifact = await self.put_async(kind, owner_id, body)
+        self._render_locks.pop((kind, owner_id), None)
+        return artifact
+
+    def discard(self, kind: str, owner_id: str) -> bool:
+        """
+        Drop an owner's artifact (blocking), e.g. when a ticket is reopened.
+
+        Returns:
+            True if anything was removed.
+        """
+        self._manifests.pop((kind, owner_id), None)
+        for key in [k for k in self._bodies if k[0] == kind and k[1] == owner_id]:
+            self._cached_bytes -= len(self._bodies.pop(key))
+
+        directory = self._dir(kind, owner_id)
+        if not directory.is_dir():
+            return False
+        for path in directory.iterdir():
+            path.unlink(missing_ok=True)
+        directory.rmdir()
+        return True
+
+    async def discard_async(self, kind: str, owner_id: str) -> bool:
+        """Remove files in a worker thread."""
+        return await asyncio.to_thread(self.discard, kind, owner_id)
+
+    def _body(self, artifact: Artifact, encoding: str) -> bytes:
+        key = (artifact.kind, artifact.owner_id, f"{artifact.stem}{ENCODING_SUFFIX[encoding]}")
+        body = self._bodies.get(key)
+        if body is not None:
+            self._bodies.move_to_end(key)
+            return body
+
+        body = self._variant_path(artifact, encoding).read_bytes()
+        self.disk_reads += 1
+        if len(body) <= self._cache_bytes // 8:
+            self._bodies[key] = body
+            self._cached_bytes += len(body)
+            while self._cached_bytes > self._cache_bytes:
+                _, evicted = self._bodies.popitem(last=False)
+                self._cached_bytes -= len(evicted)
+        return body
+
+    def _remember(self, artifact: Artifact) -> None:
+        self._manifests[(artifact.kind, artifact.owner_id)] = artifact
+        self._manifests.move_to_end((artifact.kind, artifact.owner_id))
+        while len(self._manifests) > MANIFEST_CACHE_SIZE:
+            self._manifests.popitem(last=False)
+
+    # =========================================================================
+    # Serving
+    # =========================================================================
+
+    def respond(self, request: Request, artifact: Artifact) -> Response:
+        """
+        Build the response for an artifact view.
+
+        Negotiates the encoding and answers If-None-Match with 304.
+        Clients must revalidate (see REVALIDATE_CACHE_CONTROL).
+        """
+        encoding = _negotiate(request.headers.get("accept-encoding", ""), artifact.encodings)
+        etag = artifact.etag(encoding)
+        headers = {
+            "ETag": etag,
+            "Cache-Control": REVALIDATE_CACHE_CONTROL,
+            "Vary": "Accept-Encoding",
+        }
+
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and _etag_matches(if_none_match, etag):
+            self.not_modified += 1
+            return Response(status_code=304, headers=headers)
+
+        if encoding != "identity":
+            headers["Content-Encoding"] = encoding
+        self.served += 1
+        return Response(content=self._body(artifact, encoding), media_type=artifact.media_type, headers=headers)
+
+    def get_stats(self) -> Dict[str, int]:
+        """Render / serve counters and cache sizes."""
+        return {
+            "renders": self.renders,
+            "served": self.served,
+            "not_modified": self.not_modified,
+            "disk_reads": self.disk_reads,
+            "manifests_cached": len(self._manifests),
+            "bytes_cached": self._cached_bytes,
+        }
+
+
+# =============================================================================
+# Helpers
+# =============================================================================
+
+def check_transcript_token(owner_id: str, token: str, stored_token: Optional[str] = None) -> None:
+    """
+    Raise 404 unless token grants access to owner_id's transcript.
+
+    Args:
+        owner_id: Ticket or case ID.
+        token: Token from the transcript link.
+        stored_token: Token saved with the record, if any.
+    """
+    expected = stored_token or get_auth_service().generate_transcript_token(owner_id)
+    if not expected or not hmac.compare_digest(token, expected):
+        raise HTTPException(status_code=404, detail="Transcript not found")
+
+
+def _atomic_write(path: Path, data: bytes) -> None:
+    tmp = path.with_name(f".{path.name}.tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+
+def _negotiate(accept_encoding: str, available: Tuple[str, ...]) -> str:
+    """Pick br > gzip > identity among encodings the client accepts (q > 0)."""
+    accepted = set()
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.strip().partition(";")
+        q = params.replace(" ", "").removeprefix("q=")
+        try:
+            if q and float(q) <= 0:
+                continue
+        except ValueError:
+            pass
+        accepted.add(name.strip())
+    for encoding in available:
+        if encoding == "identity" or encoding in accepted or "*" in accepted:
+            return encoding
+    return "identity"
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+    return etag in candidates
+
+
+# =============================================================================
+# Singleton
+# =============================================================================
+
+_store: Optional[TranscriptArtifactStore] = None
+
+
+def get_artifact_store() -> TranscriptArtifactStore:
+    """Get the transcript artifact store singleton."""
+    global _store
+    if _store is None:
+        _store = TranscriptArtifactStore()
+    return _store
+
+
+# =============================================================================
+# Module Export
+# =============================================================================
+
+__all__ = [
+    "ARTIFACT_KINDS",
+    "Artifact",
+    "TranscriptArtifactStore",
+    "get_artifact_store",
+    "check_transcript_token",
+]
@@ -0,0 +1,45 @@
+"""
+AzabBot - Attachment Archive Package
+====================================
+
+Content-addressed local copies of ticket attachments and case evidence.
+
+Structure:
+    - store.py: BlobStore, URL keys, retention tiers, archive links
+    - archiver.py: Bounded-concurrency download worker and retention pruning
+
+Author: حَـــــنَّـــــا
+Server: discord.gg/syria
+"""
+
+from .store import (
+    ARCHIVE_MAX_BYTES,
+    ARCHIVE_ROUTE,
+    ARCHIVE_TIERS,
+    BlobStore,
+    archive_url,
+    blob_token,
+    retention_tier,
+    rewrite_archived_attachments,
+    url_key,
+)
+from .archiver import (
+    AttachmentArchiver,
+    attachment_dict,
+    get_attachment_archiver,
+)
+
+__all__ = [
+    "ARCHIVE_MAX_BYTES",
+    "ARCHIVE_ROUTE",
+    "ARCHIVE_TIERS",
+    "BlobStore",
+    "archive_url",
+    "blob_token",
+    "retention_tier",
+    "rewrite_archived_attachments",
+    "url_key",
+    "AttachmentArchiver",
+    "attachment_dict",
+    "get_attachment_archiver",
+]
@@ -0,0 +1,410 @@
+"""
+AzabBot - Attachment Archiver
+=============================
+
+Bounded-concurrency worker that copies Discord attachments into the
+blob store.
+
+DESIGN:
+    Ticket messages submit their attachments without waiting (a bounded
+    queue, dropped and counted when full); evidence replies await
+    archive() directly because the case needs the result, and closing a
+    ticket awaits archive_missing() for whatever the queue has not
+    archived yet, so the transcript is rendered with archive links. Both share one
+    download semaphore, so at most ARCHIVE_CONCURRENCY files are in flight.
+    Each download streams to a temp file while it is hashed - nothing is
+    held in memory beyond one chunk - and an attachment already in the
+    index is never fetched twice. A prune pass deletes blobs past their
+    tier's retention and logs dedupe savings and fetch latency.
+
+Author: حَـــــنَّـــــا
+Server: discord.gg/syria
+"""
+
+import asyncio
+import hashlib
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+import aiohttp
+import discord
+
+from src.core.database import get_db
+from src.core.logger import logger
+from src.utils.async_utils import create_safe_task
+from src.utils.http import http_session, DOWNLOAD_TIMEOUT
+
+from .store import ARCHIVE_MAX_BYTES, ARCHIVE_TIERS, BlobStore, retention_tier, url_key
+
+
+# =============================================================================
+# Constants
+# =============================================================================
+
+ARCHIVE_QUEUE_SIZE: int = 2000        # Pending ticket attachments before new ones are dropped
+ARCHIVE_CONCURRENCY: int = 4          # Parallel downloads (workers + evidence)
+ARCHIVE_CHUNK_BYTES: int = 256 * 1024
+ARCHIVE_PRUNE_INTERVAL: int = 6 * 3600
+LATENCY_SAMPLES: int = 512
+
+
+# =============================================================================
+# Helpers
+# =============================================================================
+
+def attachment_dict(attachment: discord.Attachment) -> Dict[str, Any]:
+    """Attachment metadata in the shape stored with ticket messages."""
+    return {
+        "filename": attachment.filename,
+        "url": attachment.url,
+        "content_type": attachment.content_type,
+        "size": attachment.size,
+    }
+
+
+# =============================================================================
+# Archiver
+# =============================================================================
+
+class AttachmentArchiver:
+    """Downloads attachments into the content-addressed blob store."""
+
+    def __init__(self, store: Optional[BlobStore] = None) -> None:
+        self.db = get_db()
+        self.store = store or BlobStore()
+        self._queue: "asyncio.Queue[Tuple[str, str, Dict[str, Any], bool]]" = asyncio.Queue(ARCHIVE_QUEUE_SIZE)
+        self._semaphore = asyncio.Semaphore(ARCHIVE_CONCURRENCY)
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        self._tasks: List[asyncio.Task] = []
+        self._latencies: Deque[float] = deque(maxlen=LATENCY_SAMPLES)
+
+        # Stats
+        self.archived: int = 0
+        self.deduped: int = 0
+        self.already_archived: int = 0
+        self.bytes_downloaded: int = 0
+        self.bytes_deduped: int = 0
+        self.failed: int = 0
+        self.dropped: int = 0
+        self.skipped_large: int = 0
+        self.pruned: int = 0
+
+    # =========================================================================
+    # Lifecycle
+    # =========================================================================
+
+    def start(self) -> None:
+        """Start the workers and the prune loop (idempotent)."""
+        if self._tasks:
+            return
+        for i in range(ARCHIVE_CONCURRENCY):
+            self._tasks.append(create_safe_task(self._worker(), f"Attachment Archiver {i + 1}"))
+        self._tasks.append(create_safe_task(self._prune_loop(), "Attachment Archive Prune"))
+
+    async def stop(self) -> None:
+        """Cancel workers; queued attachments are abandoned (CDN links remain)."""
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._tasks.clear()
+
+    # =========================================================================
+    # Submission
+    # =========================================================================
+
+    def submit(self, owner_kind: str, owner_id: str, attachments: List[Dict[str, Any]]) -> int:
+        """
+        Queue attachments for background archiving without waiting.
+
+        Args:
+            owner_kind: "ticket" or "case".
+            owner_id: Ticket or case ID.
+            attachments: Dicts with url, filename, content_type, size.
+
+        Returns:
+            Number queued.
+        """
+        self.start()
+        queued = 0
+        for attachment in attachments:
+            if (attachment.get("size") or 0) > ARCHIVE_MAX_BYTES:
+                self.skipped_large += 1
+                continue
+            try:
+                self._queue.put_nowait((owner_kind, owner_id, attachment, False))
+                queued += 1
+            except asyncio.QueueFull:
+                self.dropped += 1
+        return queued
+
+    async def archive(
+        self,
+        owner_kind: str,
+        owner_id: str,
+        attachment: Dict[str, Any],
+        pinned: bool = False,
+    ) -> Optional[str]:
+        """
+        Archive one attachment now.
+
+        Args:
+            owner_kind: "ticket" or "case".
+            owner_id: Ticket or case ID.
+            attachment: Dict with url, filename, content_type, size.
+            pinned: Exempt the blob from retention (case evidence).
+
+        Returns:
+            The blob's SHA-256, or None if it could not be archived.
+        """
+        if (attachment.get("size") or 0) > ARCHIVE_MAX_BYTES:
+            self.skipped_large += 1
+            return None
+
+        key = url_key(attachment["url"])
+        filename = attachment.get("filename") or key.rsplit("/", 1)[-1]
+        known = (await asyncio.to_thread(self.db.get_archived_attachments, [key])).get(key)
+        if known:
+            self.already_archived += 1
+            if pinned:
+                blob = await asyncio.to_thread(self.db.get_attachment_blob, known)
+                if blob:
+                    await asyncio.to_thread(
+                        self.db.save_attachment_ref,
+                        key, known, blob["size"], blob["content_type"], blob["tier"],
+                        owner_kind, owner_id, filename, True,
+                    )
+            return known
+
+        # Same attachment requested twice at once (e.g. evidence + ticket) - one download
+        pending = self._in_flight.get(key)
+        if pending is not None:
+            if await asyncio.shield(pending) and not pinned:
+                return pending.result()
+            return await self.archive(owner_kind, owner_id, attachment, pinned)
+
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        try:
+            result = await self._download(attachment["url"])
+            sha256 = None
+            if result:
+                sha256, size = result
+                await asyncio.to_thread(
+                    self.db.save_attachment_ref,
+                    key, sha256, size, attachment.get("content_type"), retention_tier(size),
+                    owner_kind, owner_id, filename, pinned,
+                )
+            future.set_result(sha256)
+            return sha256
+        except Exception as e:
+            self.failed += 1
+            logger.warning("Attachment Archive Failed", [
+                ("Owner", f"{owner_kind} {owner_id}"),
+                ("File", (attachment.get("filename") or "")[:30]),
+                ("Error", str(e)[:50]),
+            ])
+            return None
+        finally:
+            # Also on cancellation, so callers sharing this download never hang
+            if not future.done():
+                future.set_result(None)
+            self._in_flight.pop(key, None)
+
+    async def archive_missing(
+        self,
+        owner_kind: str,
+        owner_id: str,
+        rows: List[Dict[str, Any]],
+        timeout: Optional[float] = None,
+    ) -> int:
+        """
+        Archive the attachments in message rows that are not archived yet.
+
+        Called before a closing ticket's transcript is rendered: some of its
+        attachments may still be queued, or were dropped or failed. Rows
+        already rewritten by rewrite_archived_attachments are skipped, and
+        a download the workers already started is shared.
+
+        Args:
+            owner_kind: "ticket" or "case".
+            owner_id: Ticket or case ID.
+            rows: Message rows whose "attachments" are dicts with a url.
+            timeout: Max seconds to wait (None = no limit).
+
+        Returns:
+            Number of attachments now archived (0 on timeout).
+        """
+        pending = [
+            att for row in rows for att in (row.get("attachments") or [])
+            if att.get("url") and "source_url" not in att
+        ]
+        if not pending:
+            return 0
+        try:
+            digests = await asyncio.wait_for(
+                asyncio.gather(*[self.archive(owner_kind, owner_id, att) for att in pending]),
+                timeout,
+            )
+        except asyncio.TimeoutError:
+            logger.warning("Attachment Archive Timed Out", [
+                ("Owner", f"{owner_kind} {owner_id}"),
+                ("Files", str(len(pending))),
+            ])
+            return 0
+        return sum(1 for sha256 in digests if sha256)
+
+    async def _worker(self) -> None:
+        while True:
+            owner_kind, owner_id, attachment, pinned = await self._queue.get()
+            try:
+                await self.archive(owner_kind, owner_id, attachment, pinned)
+            finally:
+                self._queue.task_done()
+
+    # =========================================================================
+    # Download
+    # =========================================================================
+
+    async def _download(self, url: str) -> Optional[Tuple[str, int]]:
+        """
+        Stream a file into the blob store while hashing it.
+
+        Returns:
+            (sha256, size), or None on HTTP failure / oversize.
+        """
+        async with self._semaphore:
+            start = time.perf_counter()
+            temp_path, handle = await asyncio.to_thread(self.store.new_temp)
+            digest = hashlib.sha256()
+            size = 0
+            committed = False
+            try:
+                async with http_session.get(url, timeout=DOWNLOAD_TIMEOUT) as resp:
+                    if resp.status != 200:
+                        self.failed += 1
+                        return None
+                    async for chunk in resp.content.iter_chunked(ARCHIVE_CHUNK_BYTES):
+                        size += len(chunk)
+                        if size > ARCHIVE_MAX_BYTES:
+                            self.skipped_large += 1
+                            return None
+                        digest.update(chunk)
+                        await asyncio.to_thread(handle.write, chunk)
+
+                await asyncio.to_thread(handle.close)
+                sha256 = digest.hexdigest()
+                is_new = await asyncio.to_thread(self.store.commit, temp_path, sha256)
+                committed = True
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                self.failed += 1
+                logger.debug("Attachment Download Failed", [
+                    ("URL", url.split("?")[0][-60:]),
+                    ("Error", str(e)[:50]),
+                ])
+                return None
+            finally:
+                if not committed:
+                    await asyncio.to_thread(_discard, handle, temp_path)
+
+        self._latencies.append((time.perf_counter() - start) * 1000)
+        self.bytes_downloaded += size
+        if is_new:
+            self.archived += 1
+        else:
+            self.deduped += 1
+            self.bytes_deduped += size
+        return sha256, size
+
+    # =========================================================================
+    # Retention
+    # =========================================================================
+
+    async def prune(self) -> int:
+        """Delete unpinned blobs past their tier's retention. Returns blobs deleted."""
+        now = time.time()
+        cutoffs = {tier: now - days * 86400 for tier, _, days in ARCHIVE_TIERS}
+        expired = await asyncio.to_thread(self.db.get_expired_attachment_blobs, cutoffs)
+        if expired:
+            await asyncio.to_thread(self.db.delete_attachment_blobs, expired)
+            for sha256 in expired:
+                await asyncio.to_thread(self.store.delete, sha256)
+            self.pruned += len(expired)
+        return len(expired)
+
+    async def _prune_loop(self) -> None:
+        await asyncio.to_thread(self.store.clear_temp)
+        while True:
+            try:
+                pruned = await self.prune()
+                totals = await asyncio.to_thread(self.db.get_attachment_archive_totals)
+                stats = self.get_stats()
+                logger.tree("Attachment Archive", [
+                    ("Blobs", f"{totals['blobs']} ({totals['stored_bytes'] / 1e6:.1f} MB)"),
+                    ("Attachments", str(totals["refs"])),
+                    ("Dedupe Saved", f"{(totals['referenced_bytes'] - totals['stored_bytes']) / 1e6:.1f} MB"),
+                    ("Fetch", f"avg {stats['fetch_avg_ms']}ms / p95 {stats['fetch_p95_ms']}ms"),
+                    ("Pruned", str(pruned)),
+                ], emoji="🗄️")
+            except Exception as e:
+                logger.warning("Attachment Archive Prune Failed", [
+                    ("Error", str(e)[:50]),
+                ])
+            await asyncio.sleep(ARCHIVE_PRUNE_INTERVAL)
+
+    # =========================================================================
+    # Stats
+    # =========================================================================
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Counters plus fetch latency over the last LATENCY_SAMPLES downloads."""
+        latencies = sorted(self._latencies)
+        return {
+            "archived": self.archived,
+            "deduped": self.deduped,
+            "already_archived": self.already_archived,
+            "bytes_downloaded": self.bytes_downloaded,
+            "bytes_deduped": self.bytes_deduped,
+            "failed": self.failed,
+            "dropped": self.dropped,
+            "skipped_large": self.skipped_large,
+            "pruned": self.pruned,
+            "queued": self._queue.qsize(),
+            "fetch_avg_ms": round(sum(latencies) / len(latencies), 1) if latencies else 0.0,
+            "fetch_p95_ms": round(latencies[int(len(latencies) * 0.95)], 1) if latencies else 0.0,
+        }
+
+
+def _discard(handle: Any, temp_path: Any) -> None:
+    handle.close()
+    temp_path.unlink(missing_ok=True)
+
+
+# =============================================================================
+# Singleton
+# =============================================================================
+
+_archiver: Optional[AttachmentArchiver] = None
+
+
+def get_attachment_archiver() -> AttachmentArchiver:
+    """Get the attachment archiver singleton."""
+    global _archiver
+    if _archiver is None:
+        _archiver = AttachmentArchiver()
+    return _archiver
+
+
+# =============================================================================
+# Module Export
+# =============================================================================
+
+__all__ = [
+    "AttachmentArchiver",
+    "attachment_dict",
+    "get_attachment_archiver",
+]
@@ -0,0 +1,188 @@
+"""
+AzabBot - Attachment Blob Store
+===============================
+
+Content-addressed storage for archived Discord attachments.
+
+DESIGN:
+    Blobs live at data/blobs/<aa>/<bb>/<sha256>, named by the SHA-256 of
+    their content, so the same image posted in ten tickets (or attached as
+    evidence to three cases) is stored once. Downloads stream into a temp
+    file in the same filesystem and are renamed into place only after the
+    digest is known; if the name already exists the temp file is dropped.
+
+    Attachments are identified by their CDN path (url_key) - the signed
+    query string Discord appends changes on every refresh, the path does
+    not. Renderers swap archived attachment URLs for ARCHIVE_ROUTE links,
+    which the attachments router serves with range support.
+
+    Retention is tiered by size: small files are kept for a year after
+    their last reference, large ones for a month. Case evidence is pinned
+    and never expires.
+
+Author: حَـــــنَّـــــا
+Server: discord.gg/syria
+"""
+
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Tuple, TYPE_CHECKING
+from urllib.parse import urlsplit
+
+from src.core.database import DATA_DIR
+from src.api.config import get_api_config
+from src.api.services.auth import get_auth_service
+
+if TYPE_CHECKING:
+    from src.core.database import Database
+
+
+# =============================================================================
+# Constants
+# =============================================================================
+
+BLOB_DIR: Path = DATA_DIR / "blobs"
+ARCHIVE_ROUTE: str = "/api/azab/attachments"
+ARCHIVE_MAX_BYTES: int = 100 * 1024 * 1024     # Larger attachments are not archived
+
+# (tier, max size in bytes, days kept after the last reference)
+ARCHIVE_TIERS: Tuple[Tuple[str, int, int], ...] = (
+    ("small", 1024 * 1024, 365),
+    ("medium", 16 * 1024 * 1024, 90),
+    ("large", ARCHIVE_MAX_BYTES, 30),
+)
+
+
+# =============================================================================
+# Helpers
+# =============================================================================
+
+def url_key(url: str) -> str:
+    """Stable attachment identity: the CDN path without the signed query."""
+    return urlsplit(url).path
+
+
+def retention_tier(size: int) -> str:
+    """Tier name for a blob of this size."""
+    for tier, max_size, _ in ARCHIVE_TIERS:
+        if size <= max_size:
+            return tier
+    return ARCHIVE_TIERS[-1][0]
+
+
+def blob_token(sha256: str) -> str:
+    """Access token for a blob link."""
+    return get_auth_service().generate_transcript_token(f"blob:{sha256}")
+
+
+def archive_url(sha256: str, absolute: bool = False) -> str:
+    """
+    Authenticated API link to an archived blob.
+
+    Transcripts are served by the API itself, so they use the relative
+    path; links stored or posted elsewhere (case evidence) need absolute.
+    """
+    path = f"{ARCHIVE_ROUTE}/{sha256}?token={blob_token(sha256)}"
+    return f"{get_api_config().public_url}{path}" if absolute else path
+
+
+def rewrite_archived_attachments(rows: Iterable[Dict[str, Any]], db: "Database") -> int:
+    """
+    Point archived attachments in message rows at the archive route.
+
+    The CDN URL is kept as source_url. Blocking (one DB query) - call via
+    asyncio.to_thread.
+
+    Args:
+        rows: Message rows whose "attachments" are dicts with a url.
+        db: Database with get_archived_attachments.
+
+    Returns:
+        Number of attachments rewritten.
+    """
+    attachments: List[Dict[str, Any]] = [
+        att for row in rows for att in (row.get("attachments") or []) if att.get("url")
+    ]
+    if not attachments:
+        return 0
+
+    archived = db.get_archived_attachments([url_key(att["url"]) for att in attachments])
+    rewritten = 0
+    for att in attachments:
+        sha256 = archived.get(url_key(att["url"]))
+        if sha256:
+            att["source_url"] = att["url"]
+            att["url"] = archive_url(sha256)
+            rewritten += 1
+    return rewritten
+
+
+# =============================================================================
+# Blob Store
+# =============================================================================
+
+class BlobStore:
+    """Files named by content hash under BLOB_DIR."""
+
+    def __init__(self, root: Path = BLOB_DIR) -> None:
+        self.root = root
+        self._tmp = root / "tmp"
+
+    def path(self, sha256: str) -> Path:
+        return self.root / sha256[:2] / sha256[2:4] / sha256
+
+    def exists(self, sha256: str) -> bool:
+        return self.path(sha256).is_file()
+
+    def new_temp(self) -> Tuple[Path, Any]:
+        """Open a temp file on the blob filesystem (blocking)."""
+        self._tmp.mkdir(parents=True, exist_ok=True)
+        fd, name = tempfile.mkstemp(dir=self._tmp, suffix=".part")
+        return Path(name), os.fdopen(fd, "wb")
+
+    def commit(self, temp_path: Path, sha256: str) -> bool:
+        """
+        Move a finished download into place (blocking).
+
+        Returns:
+            True if the blob is new, False if the content was already stored.
+        """
+        target = self.path(sha256)
+        if target.is_file():
+            temp_path.unlink(missing_ok=True)
+            return False
+        target.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(temp_path, target)
+        return True
+
+    def delete(self, sha256: str) -> None:
+        """Remove a blob file if present (blocking)."""
+        self.path(sha256).unlink(missing_ok=True)
+
+    def clear_temp(self) -> int:
+        """Remove partial downloads left by a crash (blocking)."""
+        if not self._tmp.is_dir():
+            return 0
+        removed = 0
+        for part in self._tmp.glob("*.part"):
+            part.unlink(missing_ok=True)
+            removed += 1
+        return removed
+
+
+# =============================================================================
+# Module Export
+# =============================================================================
+
+__all__ = [
+    "ARCHIVE_MAX_BYTES",
+    "ARCHIVE_ROUTE",
+    "ARCHIVE_TIERS",
+    "BlobStore",
+    "archive_url",
+    "blob_token",
+    "retention_tier",
+    "rewrite_archived_attachments",
+    "url_key",
+]
@@ -0,0 +1,22 @@
+"""
+AzabBot - Benchmarks
+====================
+
+Standalone micro-benchmarks for the hot paths. Not imported by the bot;
+each module prints its results when run from the repo root:
+
+    python -m benchmarks.transcript_rows
+    python -m benchmarks.transcript_html
+    python -m benchmarks.transcript_mentions
+    python -m benchmarks.transcript_views
+    python -m benchmarks.message_authors
+    python -m benchmarks.arabic_text
+    python -m benchmarks.raid_enforcement
+    python -m benchmarks.antispam_replay
+
+antispam_replay compares each run against its saved baseline in
+benchmarks/baselines/ and exits non-zero on a regression.
+
+Author: حَـــــنَّـــــا
+Server: discord.gg/syria
+"""
@@ -0,0 +1,698 @@
+"""
+AzabBot - Anti-Spam Replay Benchmark
+====================================
+
+Feeds recorded or synthetic message streams through the full
+AntiSpamService.check_message pipeline - no gateway, no Discord API -
+and reports throughput, latency percentiles, per-detector time and the
+verdict distribution. A join stream can be replayed through
+StreamingRaidDetector the same way.
+
+Every run is compared against the saved baseline in benchmarks/baselines/
+(if there is one for the same stream) and exits non-zero on a latency,
+throughput or detection regression. Throughput numbers are
+machine-specific: re-record with --save-baseline on the machine you
+compare on.
+
+USAGE:
+    python -m benchmarks.antispam_replay
+    python -m benchmarks.antispam_replay --save-baseline
+    python -m benchmarks.antispam_replay --input recorded.jsonl --baseline other.json
+    python -m benchmarks.antispam_replay --joins 30
+    python -m benchmarks.antispam_replay --joins 30 --save-baseline
+
+RECORDED FORMAT (one JSON object per line):
+    {"author_id": 1, "channel_id": 10, "content": "...",
+     "images": 0, "mentions": 0, "stickers": 0}
+
+LIMITATIONS:
+    Authors are lightweight fakes, not discord.Member, so member-only
+    paths (role exemptions, new-member limits) are not exercised.
+    Reputation reads/writes and perceptual-hash downloads are served
+    from memory, and the service is built with a database stand-in that
+    raises on any access, so a replay never opens the production
+    database or touches the network.
+
+Author: حَـــــنَّـــــا
+Server: discord.gg/syria
+"""
+
+import argparse
+import asyncio
+import inspect
+import json
+import random
+import sys
+import time
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from src.core.config import NY_TZ
+from src.services.antispam.image_hash import ImageHasher
+from src.services.antispam.join_stream import StreamingRaidDetector
+from src.services.antispam.models import JoinRecord
+from src.services.antispam.service import AntiSpamService
+
+
+# =============================================================================
+# Constants
+# =============================================================================
+
+REPLAY_GUILD_ID: int = 1
+EXTERNAL_GUILD_ID: int = 2
+DEFAULT_MESSAGES: int = 5000
+DEFAULT_SEED: int = 1337
+DEFAULT_JOIN_MINUTES: int = 30
+REGRESSION_TOLERANCE: float = 0.20  # Fail if p99 / throughput regress by more than 20%
+FLAGGED_TOLERANCE: float = 1.0      # Percentage points of raiders flagged that may be lost
+
+BASELINE_DIR: Path = Path(__file__).parent / "baselines"
+MESSAGE_BASELINE: Path = BASELINE_DIR / "antispam_replay.json"
+JOIN_BASELINE: Path = BASELINE_DIR / "join_replay.json"
+
+# Service methods timed individually (name -> label)
+TIMED_DETECTORS: Dict[str, str] = {
+    "_check_auto_slowmode": "auto_slowmode",
+    "_resolve_external_invites": "invite_resolution",
+    "_check_invite_spam": "invite_spam",
+    "_check_image_duplicate": "image_duplicate",
+    "_hash_images": "image_hashing",
+    "_check_perceptual_duplicate": "perceptual_duplicate",
+    "_check_webhook_spam": "webhook_spam",
+}
+
+
+# =============================================================================
+# Fake Discord Objects
+# =============================================================================
+
+@dataclass
+class FakeGuild:
+    id: int
+    name: str = "Replay Guild"
+
+
+@dataclass
+class FakeChannel:
+    id: int
+    name: str = "general"
+    category_id: Optional[int] = None
+
+
+@dataclass
+class FakeAuthor:
+    id: int
+    name: str = "user"
+    bot: bool = False
+    roles: List[Any] = field(default_factory=list)
+    created_at: Optional[datetime] = None
+    joined_at: Optional[datetime] = None
+
+    def __str__(self) -> str:
+        return f"{self.name}#{self.id}"
+
+
+@dataclass
+class FakeAttachment:
+    filename: str
+    size: int
+    content_type: str
+    proxy_url: str = "https://media.invalid/replay.png"
+    data: Optional[bytes] = None
+
+
+@dataclass
+class FakeMessage:
+    id: int
+    content: str
+    author: FakeAuthor
+    channel: FakeChannel
+    guild: FakeGuild
+    attachments: List[FakeAttachment] = field(default_factory=list)
+    stickers: List[Any] = field(default_factory=list)
+    mentions: List[Any] = field(default_factory=list)
+    role_mentions: List[Any] = field(default_factory=list)
+    webhook_id: Optional[int] = None
+
+
+@dataclass
+class FakeInvite:
+    guild: FakeGuild
+    channel: FakeChannel
+
+
+class FakeBot:
+    """Answers fetch_invite from memory: every code points at another guild."""
+
+    def __init__(self) -> None:
+        self.invite_lookups = 0
+
+    async def fetch_invite(self, code: str, with_counts: bool = False) -> FakeInvite:
+        self.invite_lookups += 1
+        await asyncio.sleep(0)
+        return FakeInvite(
+            guild=FakeGuild(EXTERNAL_GUILD_ID, "External"),
+            channel=FakeChannel(0, "welcome"),
+        )
+
+
+# =============================================================================
+# Replay Service
+# =============================================================================
+
+class _ReplayImageHasher(ImageHasher):
+    """Hashes the attachment's embedded bytes instead of downloading."""
+
+    async def _download(self, attachment: FakeAttachment) -> Optional[bytes]:  # type: ignore[override]
+        return attachment.data
+
+
+class _ReplayDB:
+    """Stands in for the database: a replay must never read or write it."""
+
+    def __getattr__(self, name: str) -> Any:
+        raise RuntimeError(f"replay touched the database ({name})")
+
+
+class ReplayAntiSpamService(AntiSpamService):
+    """
+    AntiSpamService with DB-backed and background side effects held in memory.
+
+    Detection logic is inherited unchanged.
+    """
+
+    def __init__(self, bot: FakeBot) -> None:
+        self._replay_reputation: Dict[Tuple[int, int], float] = defaultdict(float)
+        super().__init__(bot, db=_ReplayDB())  # type: ignore[arg-type]
+        self._image_hasher = _ReplayImageHasher(self._detector_executor)
+
+    def _load_exemptions(self) -> None:
+        pass
+
+    def _load_channel_multipliers(self) -> None:
+        pass
+
+    def _start_cleanup_task(self) -> None:
+        pass
+
+    def _start_reputation_task(self) -> None:
+        pass
+
+    def update_reputation(self, user_id: int, guild_id: int, delta: float) -> None:
+        self._replay_reputation[(guild_id, user_id)] += delta
+
+    async def get_reputation_multiplier(self, user_id: int, guild_id: int) -> float:
+        return 1.0
+
+
+def _instrument(service: AntiSpamService, timings: Dict[str, List[float]]) -> None:
+    """Wrap TIMED_DETECTORS on the instance to record per-call time (ms)."""
+    for attr, label in TIMED_DETECTORS.items():
+        original = getattr(service, attr)
+        samples = timings[label]
+
+        if inspect.iscoroutinefunction(original):
+            async def timed_async(*args: Any, _fn: Callable = original, _s: List[float] = samples) -> Any:
+                start = time.perf_counter()
+                try:
+                    return await _fn(*args)
+                finally:
+                    _s.append((time.perf_counter() - start) * 1000)
+            setattr(service, attr, timed_async)
+        else:
+            def timed_sync(*args: Any, _fn: Callable = original, _s: List[float] = samples) -> Any:
+                start = time.perf_counter()
+                try:
+                    return _fn(*args)
+                finally:
+                    _s.append((time.perf_counter() - start) * 1000)
+            setattr(service, attr, timed_sync)
+
+    # The batched text detectors run through the executor
+    executor = service._detector_executor
+    original_run = executor.run
+    samples = timings["content_analysis"]
+
+    async def timed_run(fn: Callable, *args: Any, offload: bool) -> Any:
+        start = time.perf_counter()
+        try:
+            return await original_run(fn, *args, offload=offload)
+        finally:
+            if fn.__name__ == "analyze_content":
+                samples.append((time.perf_counter() - start) * 1000)
+
+    executor.run = timed_run  # type: ignore[method-assign]
+
+
+# =============================================================================
+# Streams
+# =============================================================================
+
+_CHAT_EN = [
+    "anyone up for a game later?", "lol that's actually true", "good morning everyone",
+    "did you see the match yesterday", "i think the update broke something",
+    "what time is the event", "thanks for the help earlier!", "that's wild",
+]
+_CHAT_AR = [
+    "صباح الخير يا جماعة", "والله اشتقتلكم", "شو الأخبار اليوم؟", "يا الله شو حلو",
+    "كيفكن شباب", "تصبحوا على خير", "الله يعطيك العافية", "هههههه والله صح",
+]
+_SCAM = [
+    "free nitro giveaway claim now https://disc0rd-gift.example/claim",
+    "steam gift for you https://steamcommunnity.example/gift",
+]
+
+
+def _png_bytes(seed: int) -> Optional[bytes]:
+    """Small synthetic image so perceptual hashing has real input (needs Pillow)."""
+    try:
+        from PIL import Image
+        import io
+    except ImportError:
+        return None
+    rng = random.Random(seed)
+    img = Image.new("L", (64, 64))
+    img.putdata([(x * 4 + y * rng.randint(0, 3)) % 256 for y in range(64) for x in range(64)])
+    buffer = io.BytesIO()
+    img.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def synthetic_stream(count: int, seed: int = DEFAULT_SEED) -> List[Dict[str, Any]]:
+    """
+    Build a mixed stream: mostly normal English/Arabic chat with bursts of
+    floods, invite raids, scams and image spam interleaved.
+
+    Returns:
+        List of recorded-format message dicts.
+    """
+    rng = random.Random(seed)
+    channels = [10, 11, 12, 13]
+    raid_users = list(range(90_000, 90_040))
+    stream: List[Dict[str, Any]] = []
+
+    while len(stream) < count:
+        roll = rng.random()
+        if roll < 0.80:
+            stream.append({
+                "author_id": rng.randint(1000, 3000),
+                "channel_id": rng.choice(channels),
+                "content": rng.choice(_CHAT_AR if rng.random() < 0.45 else _CHAT_EN),
+            })
+        elif roll < 0.86:
+            # Flood: one user, same channel, rapid repeats
+            user = rng.randint(5000, 5100)
+            channel = rng.choice(channels)
+            text = rng.choice(_CHAT_EN)
+            stream.extend(
+                {"author_id": user, "channel_id": channel, "content": f"{text} {i % 2}"}
+                for i in range(12)
+            )
+        elif roll < 0.91:
+            # Invite raid: many accounts, one invite each
+            code = f"raid{rng.randint(0, 9)}"
+            stream.extend(
+                {"author_id": user, "channel_id": rng.choice(channels),
+                 "content": f"join us discord.gg/{code}"}
+                for user in rng.sample(raid_users, 8)
+            )
+        elif roll < 0.95:
+            stream.append({
+                "author_id": rng.randint(7000, 7100),
+                "channel_id": rng.choice(channels),
+                "content": rng.choice(_SCAM),
+            })
+        else:
+            # Image spam: the same image from several accounts
+            image_seed = rng.randint(0, 3)
+            stream.extend(
+                {"author_id": user, "channel_id": 12, "content": "", "images": 1,
+                 "image_seed": image_seed}
+                for user in rng.sample(raid_users, 4)
+            )
+
+    return stream[:count]
+
+
+def load_stream(path: Path) -> List[Dict[str, Any]]:
+    """Load a recorded stream (JSON lines)."""
+    with path.open(encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def _build_messages(records: List[Dict[str, Any]]) -> List[FakeMessage]:
+    guild = FakeGuild(REPLAY_GUILD_ID)
+    channels: Dict[int, FakeChannel] = {}
+    authors: Dict[int, FakeAuthor] = {}
+    images: Dict[int, Optional[bytes]] = {}
+    created = datetime.now(NY_TZ) - timedelta(days=365)
+    messages = []
+
+    for i, record in enumerate(records):
+        channel_id = record.get("channel_id", 10)
+        channel = channels.setdefault(channel_id, FakeChannel(channel_id, f"chat-{channel_id}"))
+        author_id = record["author_id"]
+        author = authors.setdefault(author_id, FakeAuthor(
+            author_id, f"user{author_id}", created_at=created, joined_at=created,
+        ))
+
+        attachments = []
+        for n in range(record.get("images", 0)):
+            image_seed = record.get("image_seed", i)
+            if image_seed not in images:
+                images[image_seed] = _png_bytes(image_seed)
+            attachments.append(FakeAttachment(
+                filename=f"img{i}_{n}.png", size=4096, content_type="image/png",
+                data=images[image_seed],
+            ))
+
+        messages.append(FakeMessage(
+            id=i,
+            content=record.get("content", ""),
+            author=author,
+            channel=channel,
+            guild=guild,
+            attachments=attachments,
+            stickers=[object()] * record.get("stickers", 0),
+            mentions=[object()] * record.get("mentions", 0),
+        ))
+
+    return messages
+
+
+# =============================================================================
+# Runner
+# =============================================================================
+
+def _percentile(samples: List[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+async def run_replay(records: List[Dict[str, Any]], stream: str) -> Dict[str, Any]:
+    """
+    Replay a stream through check_message and collect metrics.
+
+    Args:
+        records: Recorded-format message dicts.
+        stream: Name of the stream, e.g. "synthetic:5000:1337".
+
+    Returns:
+        Report dict (throughput, latency, per-detector time, verdicts).
+    """
+    bot = FakeBot()
+    service = ReplayAntiSpamService(bot)
+    await service._detector_executor.start()  # No-op if the service's warmup task won
+
+    timings: Dict[str, List[float]] = defaultdict(list)
+    _instrument(service, timings)
+    messages = _build_messages(records)
+
+    latencies: List[float] = []
+    verdicts: Counter = Counter()
+    wall_start = time.perf_counter()
+    for message in messages:
+        start = time.perf_counter()
+        verdict = await service.check_message(message)  # type: ignore[arg-type]
+        latencies.append((time.perf_counter() - start) * 1000)
+        verdicts[verdict or "clean"] += 1
+    elapsed = time.perf_counter() - wall_start
+
+    service._detector_executor.shutdown()
+
+    return {
+        "stream": stream,
+        "messages": len(messages),
+        "seconds": round(elapsed, 3),
+        "msgs_per_sec": round(len(messages) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(_percentile(latencies, 0.50), 3),
+        "p99_ms": round(_percentile(latencies, 0.99), 3),
+        "max_ms": round(max(latencies, default=0.0), 3),
+        "detectors": {
+            label: {
+                "calls": len(samples),
+                "total_ms": round(sum(samples), 2),
+                "p99_ms": round(_percentile(samples, 0.99), 3),
+            }
+            for label, samples in sorted(timings.items())
+        },
+        "registry": {
+            name: {key: stats[key] for key in ("calls", "hit_rate", "avg_ms")}
+            for name, stats in service.get_detector_stats().items()
+        },
+        "verdicts": dict(verdicts.most_common()),
+        "invite_lookups": bot.invite_lookups,
+    }
+
+
+# =============================================================================
+# Join Stream Replay
+# =============================================================================
+
+_NAME_PARTS = ["ahmad", "omar", "lina", "sara", "yousef", "rami", "nour", "hadi", "maya", "zain",
+               "karam", "dana", "fadi", "rana", "samer", "tala", "basel", "jana", "wael", "reem"]
+_NAME_SUFFIXES = ["", "_sy", "x", "official", "gaming", "dz", "tv", "art", "the", "real"]
+
+
+def synthetic_join_stream(
+    minutes: int,
+    organic_per_minute: int = 20,
+    seed: int = DEFAULT_SEED,
+) -> Tuple[List[JoinRecord], Dict[str, set]]:
+    """
+    Organic joins with three raid shapes mixed in:
+    - template: shared avatar, "freenitro1234"-style names, burst of 60
+    - confusable: default avatars, Cyrillic-lookalike names, burst of 40
+    - flood: 3,000 random-looking young accounts created the same hour,
+      joining within one minute
+
+    Returns:
+        (time-ordered joins, raid name -> set of raider user IDs)
+    """
+    rng = random.Random(seed)
+    start = datetime(2025, 1, 1, tzinfo=NY_TZ)
+    joins: List[JoinRecord] = []
+    raids: Dict[str, set] = defaultdict(set)
+    next_id = 1
+
+    def join(at: datetime, name: str, created: datetime, avatar: Optional[str], raid: str = "") -> None:
+        nonlocal next_id
+        joins.append(JoinRecord(
+            user_id=next_id, username=name, display_name=name, account_created=created,
+            has_default_avatar=avatar is None, avatar_hash=avatar, join_time=at,
+        ))
+        if raid:
+            raids[raid].add(next_id)
+        next_id += 1
+
+    for _ in range(minutes * organic_per_minute):
+        at = start + timedelta(seconds=rng.uniform(0, minutes * 60))
+        name = f"{rng.choice(_NAME_PARTS)}{rng.choice(_NAME_SUFFIXES)}{rng.randint(0, 9999) if rng.random() < 0.5 else ''}"
+        created = at - timedelta(days=rng.uniform(0.5, 3000), seconds=rng.uniform(0, 86400))
+        avatar = None if rng.random() < 0.3 else f"{rng.getrandbits(64):016x}"
+        join(at, name, created, avatar)
+
+    raid_at = start + timedelta(minutes=minutes * 0.25)
+    avatar = f"{rng.getrandbits(64):016x}"
+    for i in range(60):
+        join(raid_at + timedelta(seconds=i * 0.5), f"freenitro{rng.randint(100, 9999)}",
+             raid_at - timedelta(hours=rng.uniform(1, 48)), avatar, "template")
+
+    raid_at = start + timedelta(minutes=minutes * 0.5)
+    for i in range(40):
+        join(raid_at + timedelta(seconds=i * 1.5), f"ѕрammеr_{rng.randint(0, 99)}",
+             raid_at - timedelta(days=rng.uniform(0, 20)), None, "confusable")
+
+    raid_at = start + timedelta(minutes=minutes * 0.75)
+    created_hour = raid_at - timedelta(days=2)
+    for i in range(3000):
+        name = "".join(rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(8))
+        join(raid_at + timedelta(seconds=rng.uniform(0, 60)), name,
+             created_hour + timedelta(minutes=rng.uniform(0, 59)), None, "flood")
+
+    joins.sort(key=lambda j: j.join_time)
+    return joins, raids
+
+
+def run_join_replay(joins: List[JoinRecord], raids: Dict[str, set], stream: str) -> Dict[str, Any]:
+    """
+    Feed a join stream through StreamingRaidDetector.
+
+    Returns:
+        Throughput, per-join latency, and per-raid detection (joins until
+        the first signal, share of raiders flagged), plus organic false
+        positives.
+    """
+    detector = StreamingRaidDetector()
+    raider_of = {uid: name for name, members in raids.items() for uid in members}
+    flagged: set = set()
+    first_signal: Dict[str, int] = {}
+    seen: Counter = Counter()
+    latencies: List[float] = []
+
+    wall_start = time.perf_counter()
+    for record in joins:
+        raid = raider_of.get(record.user_id)
+        if raid:
+            seen[raid] += 1
+        start = time.perf_counter()
+        signals = detector.observe(record)
+        latencies.append((time.perf_counter() - start) * 1e6)
+        for signal in signals:
+            flagged.update(signal.user_ids)
+            if raid and raid not in first_signal:
+                first_signal[raid] = seen[raid]
+    elapsed = time.perf_counter() - wall_start
+
+    organic = len(joins) - len(raider_of)
+    return {
+        "stream": stream,
+        "joins": len(joins),
+        "joins_per_sec": round(len(joins) / elapsed, 1) if elapsed else 0.0,
+        "p50_us": round(_percentile(latencies, 0.50), 2),
+        "p99_us": round(_percentile(latencies, 0.99), 2),
+        "raids": {
+            name: {
+                "raiders": len(members),
+                "joins_to_detect": first_signal.get(name),
+                "flagged_pct": round(100 * len(members & flagged) / len(members), 1),
+            }
+            for name, members in raids.items()
+        },
+        "organic_false_positives": sum(1 for uid in flagged if uid not in raider_of),
+        "organic_joins": organic,
+    }
+
+
+# =============================================================================
+# Baselines
+# =============================================================================
+
+def compare_to_baseline(report: Dict[str, Any], baseline: Dict[str, Any]) -> List[str]:
+    """
+    Compare a message replay report against a saved baseline.
+
+    Returns:
+        List of regression descriptions (empty if within tolerance).
+    """
+    regressions = []
+    if baseline.get("p99_ms") and report["p99_ms"] > baseline["p99_ms"] * (1 + REGRESSION_TOLERANCE):
+        regressions.append(f"p99 {baseline['p99_ms']}ms -> {report['p99_ms']}ms")
+    if baseline.get("msgs_per_sec") and report["msgs_per_sec"] < baseline["msgs_per_sec"] * (1 - REGRESSION_TOLERANCE):
+        regressions.append(f"throughput {baseline['msgs_per_sec']} -> {report['msgs_per_sec']} msgs/s")
+    if baseline.get("verdicts") and baseline["verdicts"] != report["verdicts"]:
+        regressions.append("verdict distribution changed")
+    return regressions
+
+
+def compare_join_baseline(report: Dict[str, Any], baseline: Dict[str, Any]) -> List[str]:
+    """
+    Compare a join replay report against a saved baseline.
+
+    Detection may not get slower (more joins before the first signal),
+    flag fewer raiders, or flag more organic joins.
+
+    Returns:
+        List of regression descriptions (empty if within tolerance).
+    """
+    regressions = []
+    if baseline.get("joins_per_sec") and report["joins_per_sec"] < baseline["joins_per_sec"] * (1 - REGRESSION_TOLERANCE):
+        regressions.append(f"throughput {baseline['joins_per_sec']} -> {report['joins_per_sec']} joins/s")
+    for name, before in baseline.get("raids", {}).items():
+        after = report["raids"].get(name, {})
+        detect_before, detect_after = before.get("joins_to_detect"), after.get("joins_to_detect")
+        if detect_before is not None and (detect_after is None or detect_after > detect_before):
+            regressions.append(f"{name} raid detected after {detect_before} -> {detect_after} joins")
+        if after.get("flagged_pct", 0.0) < before.get("flagged_pct", 0.0) - FLAGGED_TOLERANCE:
+            regressions.append(f"{name} raid flagged {before['flagged_pct']}% -> {after.get('flagged_pct', 0.0)}%")
+    if report["organic_false_positives"] > baseline.get("organic_false_positives", 0):
+        regressions.append(
+            f"organic false positives {baseline.get('organic_false_positives', 0)} -> {report['organic_false_positives']}"
+        )
+    return regressions
+
+
+def _check_baseline(
+    report: Dict[str, Any],
+    path: Path,
+    save: bool,
+    compare: Callable[[Dict[str, Any], Dict[str, Any]], List[str]],
+) -> int:
+    """Save the report as the baseline, or compare it against the saved one."""
+    if save:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(report, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+        print(f"Baseline saved: {path}")
+        return 0
+
+    if not path.exists():
+        print(f"No baseline at {path} (record one with --save-baseline)")
+        return 0
+    baseline = json.loads(path.read_text(encoding="utf-8"))
+    if baseline.get("stream") != report["stream"]:
+        print(f"Baseline is for {baseline.get('stream')}, not {report['stream']} - not compared")
+        return 0
+
+    regressions = compare(report, baseline)
+    if regressions:
+        print("REGRESSIONS:")
+        for line in regressions:
+            print(f"  {line}")
+        return 1
+    print(f"Within baseline tolerance ({path.name})")
+    return 0
+
+
+# =============================================================================
+# CLI
+# =============================================================================
+
+
+def _print_report(report: Dict[str, Any]) -> None:
+    print(f"Messages:    {report['messages']} in {report['seconds']}s")
+    print(f"Throughput:  {report['msgs_per_sec']} msgs/s")
+    print(f"Latency:     p50 {report['p50_ms']}ms | p99 {report['p99_ms']}ms | max {report['max_ms']}ms")
+    print("Detectors:")
+    for label, stats in report["detectors"].items():
+        print(f"  {label:<22} {stats['calls']:>7} calls  {stats['total_ms']:>10.2f}ms  p99 {stats['p99_ms']}ms")
+    print("Registry (cost order):")
+    for name, stats in report.get("registry", {}).items():
+        print(f"  {name:<22} {stats['calls']:>7} calls  hit {stats['hit_rate']:.2%}  avg {stats['avg_ms']}ms")
+    print("Verdicts:")
+    for verdict, count in report["verdicts"].items():
+        print(f"  {verdict:<22} {count}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Replay benchmark for the anti-spam pipeline")
+    parser.add_argument("--messages", type=int, default=DEFAULT_MESSAGES, help="Synthetic stream length")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED, help="Synthetic stream seed")
+    parser.add_argument("--input", type=Path, help="Recorded JSONL stream instead of synthetic")
+    parser.add_argument("--joins", type=int, nargs="?", const=DEFAULT_JOIN_MINUTES, metavar="MINUTES",
+                        help="Replay a synthetic join stream instead")
+    parser.add_argument("--baseline", type=Path, help="Baseline file (default: benchmarks/baselines/)")
+    parser.add_argument("--save-baseline", action="store_true", help="Write this run's report as the baseline")
+    args = parser.parse_args(argv)
+
+    if args.joins:
+        stream = f"synthetic-joins:{args.joins}:{args.seed}"
+        report = run_join_replay(*synthetic_join_stream(args.joins, seed=args.seed), stream=stream)
+        print(json.dumps(report, indent=2, ensure_ascii=False))
+        return _check_baseline(report, args.baseline or JOIN_BASELINE, args.save_baseline, compare_join_baseline)
+
+    if args.input:
+        records, stream = load_stream(args.input), f"recorded:{args.input.name}"
+    else:
+        records, stream = synthetic_stream(args.messages, args.seed), f"synthetic:{args.messages}:{args.seed}"
+    report = asyncio.run(run_replay(records, stream))
+    _print_report(report)
+    return _check_baseline(report, args.baseline or MESSAGE_BASELINE, args.save_baseline, compare_to_baseline)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
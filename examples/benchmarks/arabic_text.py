@@ -0,0 +1,69 @@
+"""
+AzabBot - Arabic Text Helper Benchmark
+======================================
+
+Per-call cost of the Arabic text helpers vs the previous per-character
+implementations.
+
+Run with: python -m benchmarks.arabic_text
+
+Author: حَـــــنَّـــــا
+Server: discord.gg/syria
+"""
+
+import time
+from typing import Callable, Dict
+
+from src.services.antispam.arabic import (
+    MOSTLY_ARABIC_RATIO,
+    _analyze,
+    _analyze_memo,
+    analyze_arabic,
+    strip_tashkeel,
+)
+from src.services.antispam.constants import ARABIC_RANGE, ARABIC_TASHKEEL
+
+
+# =============================================================================
+# Benchmark
+# =============================================================================
+
+def _legacy_strip_tashkeel(text: str) -> str:
+    return ''.join(c for c in text if c not in ARABIC_TASHKEEL)
+
+
+def _legacy_is_mostly_arabic(text: str) -> bool:
+    arabic_chars = sum(1 for c in text if ord(c) in ARABIC_RANGE)
+    total_letters = sum(1 for c in text if c.isalpha())
+    return total_letters > 0 and (arabic_chars / total_letters) >= MOSTLY_ARABIC_RATIO
+
+
+def benchmark(rounds: int = 20_000) -> Dict[str, float]:
+    """Compare per-call cost (µs) against the previous per-character helpers."""
+    samples = [
+        "السَّلَامُ عَلَيْكُمْ وَرَحْمَةُ اللهِ",
+        "هههههههههه والله صار اله لسان",
+        "check this out https://example.com bro",
+        "مرحبـــــا يا شباب كيف الحال؟ " * 6,
+    ]
+
+    def per_call(fn: Callable[[str], object]) -> float:
+        start = time.perf_counter()
+        for _ in range(rounds):
+            for sample in samples:
+                fn(sample)
+        return (time.perf_counter() - start) / (rounds * len(samples)) * 1e6
+
+    _analyze_memo.cache_clear()
+    return {
+        "legacy_tashkeel_us": round(per_call(_legacy_strip_tashkeel), 3),
+        "tashkeel_us": round(per_call(strip_tashkeel), 3),
+        "legacy_mostly_arabic_us": round(per_call(_legacy_is_mostly_arabic), 3),
+        "analyze_uncached_us": round(per_call(_analyze), 3),
+        "analyze_memoized_us": round(per_call(analyze_arabic), 3),
+    }
+
+
+if __name__ == "__main__":
+    for name, value in benchmark().items():
+        print(f"{name:>26}: {value}")
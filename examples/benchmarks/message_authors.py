@@ -0,0 +1,154 @@
+"""
+AzabBot - Message Author Storage Benchmark
+==========================================
+
+Bytes per stored ticket message with inline author columns vs the
+normalized message_authors table.
+
+Run with: python -m benchmarks.message_authors
+
+Author: حَـــــنَّـــــا
+Server: discord.gg/syria
+"""
+
+import os
+import random
+import sqlite3
+import tempfile
+import time
+from typing import Dict, List, Tuple
+
+from src.core.database.ticket_messages import _ROW_COLUMNS, _ROW_SOURCE, author_version
+
+
+# =============================================================================
+# Constants
+# =============================================================================
+
+LEGACY_TABLE: str = """
+    CREATE TABLE ticket_messages (
+        id INTEGER PRIMARY KEY AUTOINCREMENT, ticket_id TEXT NOT NULL,
+        message_id INTEGER NOT NULL UNIQUE, author_id INTEGER NOT NULL,
+        author_name TEXT NOT NULL, author_display_name TEXT NOT NULL, author_avatar_url TEXT,
+        content TEXT, timestamp REAL NOT NULL, is_bot INTEGER DEFAULT 0, is_staff INTEGER DEFAULT 0,
+        attachments TEXT, embeds TEXT, edited_at REAL, deleted_at REAL, extra TEXT
+    )
+"""
+NORMALIZED_TABLES: Tuple[str, ...] = (
+    """CREATE TABLE message_authors (
+        id INTEGER PRIMARY KEY AUTOINCREMENT, author_id INTEGER NOT NULL, version INTEGER NOT NULL,
+        name TEXT NOT NULL, display_name TEXT NOT NULL, avatar_url TEXT, first_seen REAL NOT NULL,
+        UNIQUE(author_id, version)
+    )""",
+    """CREATE TABLE ticket_messages (
+        id INTEGER PRIMARY KEY AUTOINCREMENT, ticket_id TEXT NOT NULL,
+        message_id INTEGER NOT NULL UNIQUE, author_id INTEGER NOT NULL,
+        author_ref INTEGER NOT NULL REFERENCES message_authors(id),
+        content TEXT, timestamp REAL NOT NULL, is_bot INTEGER DEFAULT 0, is_staff INTEGER DEFAULT 0,
+        attachments TEXT, embeds TEXT, edited_at REAL, deleted_at REAL, extra TEXT
+    )""",
+)
+
+
+# =============================================================================
+# Benchmark
+# =============================================================================
+
+def _synthetic_authors(rng: random.Random, count: int) -> List[Tuple[int, str, str, str]]:
+    authors = []
+    for i in range(count):
+        author_id = rng.randrange(10**17, 10**18)
+        avatar = f"https://cdn.discordapp.com/avatars/{author_id}/a_{rng.getrandbits(128):032x}.webp?size=128"
+        authors.append((author_id, f"user_{i}", f"Display Name {i}", avatar))
+    return authors
+
+
+def _database_bytes(conn: sqlite3.Connection) -> int:
+    conn.execute("VACUUM")
+    return conn.execute("PRAGMA page_count").fetchone()[0] * conn.execute("PRAGMA page_size").fetchone()[0]
+
+
+def benchmark(tickets: int = 200, messages: int = 1000, seed: int = 7) -> Dict[str, float]:
+    """
+    Bytes per stored message, inline author columns vs message_authors.
+
+    Synthetic dataset: each ticket has an opener and two of ten staff
+    members, Discord-length avatar URLs and ~80-character messages. Also
+    times reading one 500-message page through each layout.
+    """
+    rng = random.Random(seed)
+    staff = _synthetic_authors(rng, 10)
+    rows = []
+    for t in range(tickets):
+        people = [_synthetic_authors(rng, 1)[0], *rng.sample(staff, 2)]
+        for n in range(messages):
+            author_id, name, display_name, avatar = rng.choice(people)
+            content = " ".join(rng.choice(("please", "ticket", "help", "thanks", "appeal", "mute", "reason"))
+                               for _ in range(12))
+            rows.append((f"T{t:05d}", t * messages + n + 1, author_id, name, display_name, avatar,
+                         content, 1_700_000_000.0 + n, 0, int(author_id != people[0][0])))
+
+    results: Dict[str, float] = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for layout in ("inline", "normalized"):
+            conn = sqlite3.connect(os.path.join(tmp, f"{layout}.db"))
+            if layout == "inline":
+                conn.execute(LEGACY_TABLE)
+                conn.executemany(
+                    """INSERT INTO ticket_messages
+                       (ticket_id, message_id, author_id, author_name, author_display_name,
+                        author_avatar_url, content, timestamp, is_bot, is_staff)
+                       VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                    rows
+                )
+                page_query = (
+                    "SELECT message_id, author_id, author_name, author_display_name, author_avatar_url, "
+                    "content, timestamp, is_bot, is_staff, attachments, embeds, edited_at, extra "
+                    "FROM ticket_messages WHERE ticket_id = ? AND message_id > ? AND deleted_at IS NULL "
+                    "ORDER BY message_id LIMIT 500"
+                )
+            else:
+                for ddl in NORMALIZED_TABLES:
+                    conn.execute(ddl)
+                refs: Dict[Tuple[int, int], int] = {}
+                for _, _, author_id, name, display_name, avatar, *_ in rows:
+                    key = (author_id, author_version(name, display_name, avatar))
+                    if key not in refs:
+                        refs[key] = conn.execute(
+                            """INSERT INTO message_authors
+                               (author_id, version, name, display_name, avatar_url, first_seen)
+                               VALUES (?, ?, ?, ?, ?, 0)""",
+                            (*key, name, display_name, avatar)
+                        ).lastrowid
+                conn.executemany(
+                    """INSERT INTO ticket_messages
+                       (ticket_id, message_id, author_id, author_ref, content, timestamp, is_bot, is_staff)
+                       VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
+                    [(*row[:3], refs[(row[2], author_version(*row[3:6]))], *row[6:]) for row in rows]
+                )
+                page_query = (
+                    f"SELECT {_ROW_COLUMNS} FROM {_ROW_SOURCE} "
+                    "WHERE m.ticket_id = ? AND m.message_id > ? AND m.deleted_at IS NULL "
+                    "ORDER BY m.message_id LIMIT 500"
+                )
+            conn.execute("CREATE INDEX idx_order ON ticket_messages(ticket_id, message_id)")
+            conn.commit()
+
+            size = _database_bytes(conn)
+            start = time.perf_counter()
+            for t in range(tickets):
+                conn.execute(page_query, (f"T{t:05d}", 0)).fetchall()
+            results[f"{layout}_bytes_per_message"] = round(size / len(rows), 1)
+            results[f"{layout}_mb"] = round(size / 1e6, 2)
+            results[f"{layout}_page_read_ms"] = round((time.perf_counter() - start) * 1000 / tickets, 3)
+            conn.close()
+
+    results["saved_pct"] = round(
+        100 * (1 - results["normalized_bytes_per_message"] / results["inline_bytes_per_message"]), 1
+    )
+    return results
+
+
+if __name__ == "__main__":
+    for name, value in benchmark().items():
+        print(f"{name:>28}: {value}")
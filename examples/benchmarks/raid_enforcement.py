@@ -0,0 +1,314 @@
+"""
+AzabBot - Raid Enforcement Benchmark
+====================================
+
+Simulated 100-account raid against stubbed Discord HTTP: the per-offender
+handle_spam path vs raid-mode bulk enforcement.
+
+Every stubbed REST call costs HTTP_LATENCY and goes through a fixed-window
+bucket shaped like Discord's per-route limits. A call over the limit counts
+as a 429 and waits for the window to reset, as discord.py does. Simulated
+time runs 1 / TIME_SCALE times faster than wall time; results are reported
+in simulated seconds.
+
+Run with: python -m benchmarks.raid_enforcement
+
+Author: حَـــــنَّـــــا
+Server: discord.gg/syria
+"""
+
+import asyncio
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.services.antispam import raid_enforcement
+from src.services.antispam.handlers import SpamHandlerMixin
+from src.services.antispam.raid_enforcement import RaidEnforcementMixin
+
+
+# =============================================================================
+# Stubbed Discord HTTP
+# =============================================================================
+
+TIME_SCALE: float = 0.02        # Wall seconds per simulated second
+HTTP_LATENCY: float = 0.08      # Simulated seconds per REST call
+MUTED_ROLE_ID: int = 5
+RAID_POLL: float = 0.01         # Wall seconds between "all DMs sent?" checks
+
+# route -> (requests, window seconds), roughly Discord's buckets
+ROUTE_LIMITS: Dict[str, Tuple[int, float]] = {
+    "delete_message": (5, 1.0),     # Per channel
+    "bulk_delete": (1, 1.0),        # Per channel
+    "add_role": (10, 10.0),         # Per guild
+    "send_message": (5, 5.0),       # Per channel
+    "dm": (5, 5.0),                 # Shared across DM channel opens
+    "case_thread": (5, 5.0),        # Per case forum
+}
+
+
+class StubHTTP:
+    """Counts REST calls and enforces fixed-window route limits."""
+
+    def __init__(self) -> None:
+        self.calls: Counter = Counter()
+        self.rate_limited: int = 0
+        self._windows: Dict[Tuple[str, Any], Tuple[float, int]] = {}
+
+    async def request(self, route: str, bucket: Any) -> None:
+        limit, window = ROUTE_LIMITS[route]
+        window *= TIME_SCALE
+        while True:
+            now = time.monotonic()
+            started, used = self._windows.get((route, bucket), (now, 0))
+            if now - started >= window:
+                started, used = now, 0
+            if used < limit:
+                self._windows[(route, bucket)] = (started, used + 1)
+                break
+            self.rate_limited += 1
+            await asyncio.sleep(started + window - now)
+        self.calls[route] += 1
+        await asyncio.sleep(HTTP_LATENCY * TIME_SCALE)
+
+
+@dataclass
+class StubGuild:
+    id: int
+    bot_member: Any
+    name: str = "Raid Guild"
+
+    def get_role(self, role_id: int) -> Any:
+        return SimpleNamespace(id=role_id, name="Muted")
+
+    def get_member(self, member_id: int) -> Any:
+        return self.bot_member
+
+
+@dataclass
+class StubMember:
+    id: int
+    guild: StubGuild
+    http: StubHTTP
+    muted_at: Optional[float] = None
+    dms: int = 0
+    nick: Optional[str] = None
+
+    @property
+    def name(self) -> str:
+        return f"raider{self.id}"
+
+    @property
+    def display_name(self) -> str:
+        return self.name
+
+    @property
+    def mention(self) -> str:
+        return f"<@{self.id}>"
+
+    def __str__(self) -> str:
+        return self.name
+
+    async def add_roles(self, role: Any, reason: Optional[str] = None) -> None:
+        await self.http.request("add_role", self.guild.id)
+        self.muted_at = time.monotonic()
+
+    async def send(self, embed: Any = None) -> None:
+        await self.http.request("dm", None)
+        self.dms += 1
+
+
+@dataclass
+class StubChannel:
+    id: int
+    guild: StubGuild
+    http: StubHTTP
+    name: str = "general"
+
+    async def delete_messages(self, messages: List["StubMessage"], reason: Optional[str] = None) -> None:
+        await self.http.request("bulk_delete", self.id)
+        for message in messages:
+            message.deleted_at = time.monotonic()
+
+    async def send(self, embed: Any = None, view: Any = None, delete_after: Optional[float] = None) -> Any:
+        await self.http.request("send_message", self.id)
+        return StubLogMessage(self)
+
+
+@dataclass
+class StubLogMessage:
+    channel: StubChannel
+
+    async def edit(self, embed: Any = None) -> None:
+        await self.channel.http.request("send_message", self.channel.id)
+
+
+@dataclass
+class StubMessage:
+    id: int
+    author: StubMember
+    channel: StubChannel
+    content: str
+    deleted_at: Optional[float] = None
+
+    @property
+    def guild(self) -> StubGuild:
+        return self.channel.guild
+
+    async def delete(self) -> None:
+        await self.channel.http.request("delete_message", self.channel.id)
+        self.deleted_at = time.monotonic()
+
+
+class StubLoggingService:
+    enabled = True
+
+    def __init__(self, channel: StubChannel) -> None:
+        self._channel = channel
+
+    async def _send_log(self, category: Any, embed: Any, user_id: Optional[int] = None) -> Any:
+        return await self._channel.send(embed=embed)
+
+
+class StubCaseLog:
+    def __init__(self, http: StubHTTP) -> None:
+        self.http = http
+        self.cases = 0
+
+    async def log_mute(self, user: Any, moderator: Any, duration: str, reason: str, **kwargs: Any) -> dict:
+        await self.http.request("case_thread", 0)  # Thread
+        await self.http.request("case_thread", 0)  # Case embed
+        self.cases += 1
+        return {"case_id": f"{self.cases:04d}", "thread_id": 900_000 + self.cases}
+
+
+class StubDB:
+    def add_mute(self, duration_seconds: int, **kwargs: Any) -> float:
+        return time.time() + duration_seconds
+
+    def log_moderation_action(self, **kwargs: Any) -> None:
+        pass
+
+
+class RaidHost(SpamHandlerMixin, RaidEnforcementMixin):
+    """The two punishment paths with Discord, the DB and logging stubbed."""
+
+    def __init__(self, http: StubHTTP, guild: StubGuild, log_channel: StubChannel) -> None:
+        self.config = SimpleNamespace(muted_role_id=MUTED_ROLE_ID)
+        self.db = StubDB()
+        self.bot = SimpleNamespace(
+            user=SimpleNamespace(id=guild.bot_member.id),
+            logging_service=StubLoggingService(log_channel),
+            case_log_service=StubCaseLog(http),
+        )
+        self._init_spam_handlers()
+        self._init_raid_enforcement()
+
+    def update_reputation(self, user_id: int, guild_id: int, delta: float) -> None:
+        pass
+
+
+# =============================================================================
+# Benchmark
+# =============================================================================
+
+@dataclass
+class _Raid:
+    http: StubHTTP = field(default_factory=StubHTTP)
+    messages: List[StubMessage] = field(default_factory=list)
+
+    @property
+    def members(self) -> List[StubMember]:
+        return [m.author for m in self.messages]
+
+
+def _build_raid(accounts: int, channels: int) -> Tuple[_Raid, RaidHost]:
+    raid = _Raid()
+    guild = StubGuild(id=1, bot_member=SimpleNamespace(id=1))
+    text_channels = [StubChannel(id=10 + i, guild=guild, http=raid.http) for i in range(channels)]
+    for i in range(accounts):
+        member = StubMember(id=1000 + i, guild=guild, http=raid.http)
+        raid.messages.append(StubMessage(
+            id=50_000 + i, author=member, channel=text_channels[i % channels],
+            content="free nitro https://disc0rd-gift.example/claim",
+        ))
+    host = RaidHost(raid.http, guild, StubChannel(id=99, guild=guild, http=raid.http, name="automod"))
+    return raid, host
+
+
+async def _legacy(raid: _Raid, host: RaidHost, duration: int) -> None:
+    """handle_spam's per-offender path: delete + mute (case, notice, DM) + log."""
+    async def punish(message: StubMessage) -> None:
+        await asyncio.gather(
+            host._delete_spam_message(message, "flood"),
+            host._apply_mute(message.author, duration, "Message Flood", message.channel, 1, message.content),
+        )
+        await host._log_spam(message, "flood", "mute", 1, duration)
+
+    await asyncio.gather(*(punish(m) for m in raid.messages))
+
+
+async def _raid_mode(raid: _Raid, host: RaidHost, duration: int) -> None:
+    """handle_spam's routing: per-offender until raid mode, then bulk enforcement."""
+    async def punish(message: StubMessage) -> None:
+        if host._raid_mode_active(message.guild.id, message.author.id):
+            await host._enforce_raid_spam(message, "Message Flood", 1, duration)
+        else:
+            await asyncio.gather(
+                host._delete_spam_message(message, "flood"),
+                host._apply_mute(message.author, duration, "Message Flood", message.channel, 1, message.content),
+            )
+            await host._log_spam(message, "flood", "mute", 1, duration)
+
+    await asyncio.gather(*(punish(m) for m in raid.messages))
+    # Lazy cases + DMs run after raid mode ends
+    while any(member.dms == 0 for member in raid.members):
+        await asyncio.sleep(RAID_POLL)
+
+
+def _run(mode: str, accounts: int, channels: int, duration: int) -> Dict[str, float]:
+    raid, host = _build_raid(accounts, channels)
+    scenario = _legacy if mode == "legacy" else _raid_mode
+
+    async def main() -> float:
+        start = time.monotonic()
+        await scenario(raid, host, duration)
+        return start
+
+    start = asyncio.run(main())
+    finished = time.monotonic()
+
+    def sim(at: Optional[float]) -> float:
+        return round(((at or finished) - start) / TIME_SCALE, 1)
+
+    return {
+        f"{mode}_rest_calls": sum(raid.http.calls.values()),
+        f"{mode}_rate_limited": raid.http.rate_limited,
+        f"{mode}_all_deleted_s": sim(max(m.deleted_at or finished for m in raid.messages)),
+        f"{mode}_all_muted_s": sim(max(m.muted_at or finished for m in raid.members)),
+        f"{mode}_finished_s": sim(finished),
+    }
+
+
+def benchmark(accounts: int = 100, channels: int = 4, duration: int = 3600) -> Dict[str, float]:
+    """Run both paths over the same raid; times are simulated seconds."""
+    scaled = {
+        name: getattr(raid_enforcement, name)
+        for name in ("RAID_DELETE_BATCH_DELAY", "RAID_MODE_QUIET_PERIOD", "RAID_SUMMARY_INTERVAL", "RAID_CASE_SPACING")
+    }
+    for name, value in scaled.items():
+        setattr(raid_enforcement, name, value * TIME_SCALE)
+    try:
+        results = _run("legacy", accounts, channels, duration)
+        results.update(_run("raid", accounts, channels, duration))
+    finally:
+        for name, value in scaled.items():
+            setattr(raid_enforcement, name, value)
+    return results
+
+
+if __name__ == "__main__":
+    for name, value in benchmark().items():
+        print(f"{name:>24}: {value}")
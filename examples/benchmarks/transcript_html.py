@@ -0,0 +1,85 @@
+"""
+AzabBot - HTML Transcript Streaming Benchmark
+=============================================
+
+Time-to-first-byte and peak memory of the HTML transcript: one full
+string vs streamed chunks.
+
+Run with: python -m benchmarks.transcript_html
+
+Author: حَـــــنَّـــــا
+Server: discord.gg/syria
+"""
+
+import time
+import tracemalloc
+from typing import Any, Dict, Iterator
+
+from src.services.tickets.transcript.html_generator import generate_html_transcript, iter_html_transcript
+
+
+# =============================================================================
+# Benchmark
+# =============================================================================
+
+def _bench_messages(count: int) -> Iterator[Dict[str, Any]]:
+    for i in range(count):
+        yield {
+            "author": f"User {i % 9}",
+            "avatar_url": "",
+            "content": f"Message {i}: " + "some support conversation text " * 4 + f"<@{1000 + i % 9}>",
+            "timestamp": "Jan 01, 2025 12:00 PM",
+            "attachments": [],
+            "embeds": [{
+                "title": "Case Update",
+                "description": "Embed description with details " * 3,
+                "color": 0xd4af37,
+                "fields": [{"name": "Field", "value": "Value " * 10, "inline": True}] * 3,
+            }] if i % 5 == 0 else [],
+            "is_bot": i % 5 == 0,
+            "is_staff": i % 3 == 0,
+        }
+
+
+def benchmark(messages: int = 5000) -> Dict[str, float]:
+    """
+    Time-to-first-byte and peak memory: full string vs streamed chunks.
+    """
+    ticket = {
+        "ticket_id": "T0001", "created_at": time.time(), "category": "support",
+        "status": "closed", "subject": "Benchmark ticket", "user_id": 1,
+    }
+    mention_map = {1000 + i: f"Member {i}" for i in range(9)}
+    results: Dict[str, float] = {}
+
+    # Full string: the first byte is available only once everything is built
+    tracemalloc.start()
+    start = time.perf_counter()
+    page = generate_html_transcript(ticket, list(_bench_messages(messages)), mention_map=mention_map)
+    body = page.encode('utf-8')
+    results["string_ttfb_ms"] = round((time.perf_counter() - start) * 1000, 1)
+    results["string_peak_mb"] = round(tracemalloc.get_traced_memory()[1] / 1e6, 1)
+    tracemalloc.stop()
+    size = len(body)
+    del page, body
+
+    # Streamed: messages are produced lazily, chunks discarded after "sending"
+    tracemalloc.start()
+    start = time.perf_counter()
+    chunks = iter_html_transcript(ticket, _bench_messages(messages), mention_map=mention_map, message_count=messages)
+    next(chunks).encode('utf-8')
+    next(chunks).encode('utf-8')    # First message chunk
+    results["stream_ttfb_ms"] = round((time.perf_counter() - start) * 1000, 1)
+    for chunk in chunks:
+        chunk.encode('utf-8')
+    results["stream_total_ms"] = round((time.perf_counter() - start) * 1000, 1)
+    results["stream_peak_mb"] = round(tracemalloc.get_traced_memory()[1] / 1e6, 1)
+    tracemalloc.stop()
+
+    results["page_mb"] = round(size / 1e6, 1)
+    return results
+
+
+if __name__ == "__main__":
+    for name, value in benchmark().items():
+        print(f"{name:>16}: {value}")
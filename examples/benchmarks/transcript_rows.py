@@ -0,0 +1,114 @@
+"""
+AzabBot - Transcript Row Collection Benchmark
+=============================================
+
+Close-path transcript collection: two full history reads vs the stored
+rows plus head/tail delta, against a stubbed paged channel history.
+
+Run with: python -m benchmarks.transcript_rows
+
+Author: حَـــــنَّـــــا
+Server: discord.gg/syria
+"""
+
+import asyncio
+import time
+from datetime import datetime
+from types import SimpleNamespace
+from typing import Any, Dict, List
+
+from src.services.tickets.transcript.stored import _fetch_range, collect_transcript_rows, row_from_message
+
+
+# =============================================================================
+# Stubs
+# =============================================================================
+
+def _fake_message(message_id: int) -> Any:
+    author = SimpleNamespace(
+        id=1000 + message_id % 7, name=f"user{message_id % 7}", display_name=f"User {message_id % 7}",
+        display_avatar=None, bot=False, top_role=None,
+    )
+    return SimpleNamespace(
+        id=message_id, author=author, content=f"message {message_id} with some text <@{1000 + message_id % 7}>",
+        created_at=datetime.fromtimestamp(1_700_000_000 + message_id), edited_at=None, attachments=[],
+        embeds=[], stickers=[], reactions=[], reference=None, type=None, pinned=False,
+    )
+
+
+class _StubChannel:
+    """Channel whose history pages like the REST API (100 per request)."""
+
+    def __init__(self, count: int, page_latency: float) -> None:
+        self.id = 1
+        self.guild = None
+        self._messages = [_fake_message(i) for i in range(2, count + 2)]
+        self._page_latency = page_latency
+        self.requests = 0
+
+    async def history(self, limit=None, after=None, before=None, oldest_first=True):
+        selected = [
+            m for m in self._messages
+            if (after is None or m.id > after.id) and (before is None or m.id < before.id)
+        ][:limit]
+        for page_start in range(0, max(len(selected), 1), 100):
+            self.requests += 1
+            await asyncio.sleep(self._page_latency)
+            for message in selected[page_start:page_start + 100]:
+                yield message
+
+
+class _StubDB:
+    def __init__(self, rows: List[Dict[str, Any]]) -> None:
+        self._rows = rows
+
+    def get_ticket_message_rows(self, ticket_id: str) -> List[Dict[str, Any]]:
+        return list(self._rows)
+
+    def get_archived_attachments(self, url_keys: List[str]) -> Dict[str, str]:
+        return {}
+
+    def get_ticket_message_gaps(self, ticket_id: str) -> List[Dict[str, Any]]:
+        return []
+
+
+# =============================================================================
+# Benchmark
+# =============================================================================
+
+def benchmark(messages: int = 2000, unsynced: int = 10, page_latency: float = 0.15) -> Dict[str, float]:
+    """
+    Close-path transcript collection against a stubbed paged history.
+
+    Legacy = two full history reads (HTML + JSON collectors); stored = one
+    DB read plus head/tail delta fetches, with `unsynced` tail messages
+    missing from the store.
+    """
+    channel = _StubChannel(messages, page_latency)
+    stored_rows = [row_from_message(m) for m in channel._messages[:messages - unsynced]]
+    ticket = {"ticket_id": "T0001"}
+
+    async def legacy() -> int:
+        rows = []
+        for _ in range(2):
+            rows = await _fetch_range(channel, None, None)
+        return len(rows)
+
+    async def stored() -> int:
+        rows = await collect_transcript_rows(channel, ticket, _StubDB(stored_rows))
+        return len(rows)
+
+    results: Dict[str, float] = {}
+    for name, fn in (("legacy", legacy), ("stored", stored)):
+        channel.requests = 0
+        start = time.perf_counter()
+        count = asyncio.run(fn())
+        results[f"{name}_ms"] = round((time.perf_counter() - start) * 1000, 1)
+        results[f"{name}_requests"] = channel.requests
+        results[f"{name}_messages"] = count
+    return results
+
+
+if __name__ == "__main__":
+    for name, value in benchmark().items():
+        print(f"{name:>18}: {value}")
@@ -0,0 +1,61 @@
+"""
+AzabBot - Transcript View Benchmark
+===================================
+
+Views per second served from stored transcript artifacts.
+
+Run with: python -m benchmarks.transcript_views
+
+Author: حَـــــنَّـــــا
+Server: discord.gg/syria
+"""
+
+import random
+import tempfile
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Dict
+
+from src.api.services.transcript_artifacts import TranscriptArtifactStore
+
+
+# =============================================================================
+# Benchmark
+# =============================================================================
+
+def benchmark(views: int = 20_000, transcripts: int = 200, size_kb: int = 300) -> Dict[str, float]:
+    """
+    Views per second through respond() for already-rendered transcripts.
+
+    Mix: 70% full views (brotli/gzip), 30% revalidations answered with 304.
+    """
+    rng = random.Random(7)
+    page = ("<div class='message'>support conversation text</div>\n" * (size_kb * 20)).encode("utf-8")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = TranscriptArtifactStore(Path(tmp))
+        start = time.perf_counter()
+        artifacts = [store.put("ticket-html", f"T{i:04d}", page + str(i).encode()) for i in range(transcripts)]
+        render_ms = (time.perf_counter() - start) * 1000 / transcripts
+
+        start = time.perf_counter()
+        for _ in range(views):
+            artifact = store.get("ticket-html", rng.choice(artifacts).owner_id)
+            headers = {"accept-encoding": rng.choice(("gzip, deflate, br", "gzip"))}
+            if rng.random() < 0.3:
+                headers["if-none-match"] = artifact.etag(artifact.encodings[0] if "br" in headers["accept-encoding"] else "gzip")
+            store.respond(SimpleNamespace(headers=headers), artifact)
+        elapsed = time.perf_counter() - start
+
+    return {
+        "render_ms_per_transcript": round(render_ms, 1),
+        "views_per_second": round(views / elapsed),
+        "not_modified": store.not_modified,
+        "disk_reads": store.disk_reads,
+    }
+
+
+if __name__ == "__main__":
+    for name, value in benchmark().items():
+        print(f"{name:>26}: {value}")
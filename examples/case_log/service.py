@@ -9,7 +9,6 @@ Server: discord.gg/syria
 """
 
 import asyncio
-import io
 from datetime import datetime, timedelta
 from typing import TYPE_CHECKING, Optional, Dict, Tuple, List
 
@@ -29,6 +28,7 @@ from src.utils.async_utils import create_safe_task
 from src.utils.discord_rate_limit import log_http_error
 from src.core.constants import DELETE_AFTER_MEDIUM, DELETE_AFTER_EXTENDED, QUERY_LIMIT_SMALL, PREVIOUS_NAMES_LIMIT
 from src.utils.user_cache import resolve
+from src.services.attachment_archive import archive_url, attachment_dict, get_attachment_archiver
 
 from .constants import (
     THREAD_CACHE_TTL,
@@ -629,14 +629,24 @@ class CaseLogService(
                 logger.warning(f"Failed to send evidence reminder: {e}")
             return False
 
-        # Upload attachments to assets thread for permanent storage
+        # Archive attachments (content-addressed, pinned); files the archive
+        # cannot fetch fall back to a re-upload in the assets thread
         evidence_urls = []
         thread = message.channel
+        archiver = get_attachment_archiver()
 
         try:
+            digests = await asyncio.gather(*[
+                archiver.archive("case", case["case_id"], attachment_dict(att), pinned=True)
+                for att in valid_attachments
+            ])
+            failed = [att for att, sha in zip(valid_attachments, digests) if not sha]
+            evidence_urls = [archive_url(sha, absolute=True) for sha in digests if sha]
+            archived = len(evidence_urls)
+
             # Get assets thread for permanent storage
             assets_channel = None
-            if self.config.assets_channel_id:
+            if failed and self.config.assets_channel_id:
                 try:
                     assets_channel = self.bot.get_channel(self.config.assets_channel_id)
                     if not assets_channel:
@@ -644,14 +654,9 @@ class CaseLogService(
                 except (discord.NotFound, discord.HTTPException):
                     pass
 
-            for attachment in valid_attachments:
-                # Download the attachment
-                file_data = await attachment.read()
-                file = discord.File(
-                    fp=io.BytesIO(file_data),
-                    filename=attachment.filename,
-                    description=f"Evidence for case #{case['case_id']}",
-                )
+            uploaded_urls = []
+            for attachment in failed:
+                file = await attachment.to_file(description=f"Evidence for case #{case['case_id']}")
 
                 # Upload to assets channel if available (permanent), otherwise case thread
                 target_thread = assets_channel if assets_channel else thread
@@ -660,15 +665,18 @@ class CaseLogService(
                     file=file,
                 )
                 if evidence_msg and evidence_msg.attachments:
-                    evidence_urls.append(evidence_msg.attachments[0].url)
+                    uploaded_urls.append(evidence_msg.attachments[0].url)
+            evidence_urls.extend(uploaded_urls)
 
             if evidence_urls:
                 # Update the case with evidence URLs
                 self.db.update_case_evidence(case["case_id"], evidence_urls)
 
                 # Also post a reference in the case thread
-                evidence_links = "\n".join([f"[Evidence {i+1}]({url})" for i, url in enumerate(evidence_urls)])
-                await thread.send(f"📎 **Evidence submitted** ({len(evidence_urls)} file(s)):\n{evidence_links}")
+                evidence_links = [f"[Evidence {i+1}]({url})" for i, url in enumerate(evidence_urls)]
+                await thread.send(
+                    f"📎 **Evidence submitted** ({len(evidence_urls)} file(s)):\n" + "\n".join(evidence_links)
+                )
 
                 # Send confirmation
                 await message.reply(
@@ -687,7 +695,8 @@ class CaseLogService(
                     ("Case ID", case["case_id"]),
                     ("Files", str(len(evidence_urls))),
                     ("By", str(message.author)),
-                    ("Storage", "Assets Channel" if assets_channel else "Case Thread"),
+                    ("Archived", str(archived)),
+                    ("Re-uploaded", f"{len(uploaded_urls)} ({'Assets Channel' if assets_channel else 'Case Thread'})" if uploaded_urls else "0"),
                 ], emoji="✅")
 
                 return True
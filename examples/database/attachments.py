@@ -0,0 +1,170 @@
+"""
+AzabBot - Database Attachment Archive Operations Module
+======================================================
+
+Index of the content-addressed attachment archive: one row per stored
+blob (keyed by SHA-256) and one per archived Discord attachment.
+
+Author: حَـــــنَّـــــا
+Server: discord.gg/syria
+"""
+
+import time
+from typing import Any, Dict, List, Optional, Sequence, TYPE_CHECKING
+
+from src.core.logger import logger
+
+if TYPE_CHECKING:
+    from src.core.database.manager import DatabaseManager
+
+
+_IN_CHUNK: int = 500  # Keys per IN (...) query (SQLite variable limit)
+
+
+class AttachmentArchiveMixin:
+    """Mixin for attachment blob / reference bookkeeping."""
+
+    def save_attachment_ref(
+        self: "DatabaseManager",
+        url_key: str,
+        sha256: str,
+        size: int,
+        content_type: Optional[str],
+        tier: str,
+        owner_kind: str,
+        owner_id: str,
+        filename: str,
+        pinned: bool = False,
+    ) -> None:
+        """
+        Record an archived attachment and its blob in one transaction.
+
+        A blob already stored for another attachment only has its last
+        reference time (and pin) updated.
+
+        Args:
+            url_key: Stable attachment identity (CDN path without query).
+            sha256: Hex digest of the content.
+            size: Content size in bytes.
+            content_type: MIME type reported by Discord.
+            tier: Retention tier name.
+            owner_kind: "ticket" or "case".
+            owner_id: Ticket or case ID.
+            filename: Original filename.
+            pinned: Never expire (case evidence).
+        """
+        now = time.time()
+        with self.transaction() as tx:
+            tx.execute(
+                """INSERT INTO attachment_blobs
+                   (sha256, size, content_type, tier, pinned, created_at, last_ref_at)
+                   VALUES (?, ?, ?, ?, ?, ?, ?)
+                   ON CONFLICT(sha256) DO UPDATE SET
+                       last_ref_at = excluded.last_ref_at,
+                       pinned = MAX(pinned, excluded.pinned)""",
+                (sha256, size, content_type, tier, int(pinned), now, now)
+            )
+            tx.execute(
+                """INSERT OR IGNORE INTO attachment_refs
+                   (url_key, sha256, owner_kind, owner_id, filename, archived_at)
+                   VALUES (?, ?, ?, ?, ?, ?)""",
+                (url_key, sha256, owner_kind, owner_id, filename, now)
+            )
+
+    def get_archived_attachments(
+        self: "DatabaseManager",
+        url_keys: Sequence[str],
+    ) -> Dict[str, str]:
+        """
+        Look up which attachments are archived.
+
+        Args:
+            url_keys: Attachment identities.
+
+        Returns:
+            Map of url_key to blob SHA-256 for the archived ones.
+        """
+        found: Dict[str, str] = {}
+        keys = list(dict.fromkeys(url_keys))
+        for start in range(0, len(keys), _IN_CHUNK):
+            chunk = keys[start:start + _IN_CHUNK]
+            rows = self.fetchall(
+                f"SELECT url_key, sha256 FROM attachment_refs WHERE url_key IN ({','.join('?' * len(chunk))})",
+                tuple(chunk)
+            )
+            found.update((row["url_key"], row["sha256"]) for row in rows)
+        return found
+
+    def get_attachment_blob(self: "DatabaseManager", sha256: str) -> Optional[Dict[str, Any]]:
+        """Get a blob's size / content type / tier, or None if not stored."""
+        row = self.fetchone(
+            "SELECT sha256, size, content_type, tier, pinned, created_at, last_ref_at "
+            "FROM attachment_blobs WHERE sha256 = ?",
+            (sha256,)
+        )
+        return dict(row) if row else None
+
+    def get_expired_attachment_blobs(
+        self: "DatabaseManager",
+        cutoffs: Dict[str, float],
+    ) -> List[str]:
+        """
+        Get unpinned blobs whose last reference is older than their tier's cutoff.
+
+        Args:
+            cutoffs: Map of tier name to unix time cutoff.
+
+        Returns:
+            SHA-256 digests to delete.
+        """
+        expired: List[str] = []
+        for tier, cutoff in cutoffs.items():
+            rows = self.fetchall(
+                "SELECT sha256 FROM attachment_blobs WHERE pinned = 0 AND tier = ? AND last_ref_at < ?",
+                (tier, cutoff)
+            )
+            expired.extend(row["sha256"] for row in rows)
+        return expired
+
+    def delete_attachment_blobs(self: "DatabaseManager", digests: Sequence[str]) -> int:
+        """Delete blobs and every reference to them. Returns blobs deleted."""
+        if not digests:
+            return 0
+        with self.transaction() as tx:
+            params = [(sha,) for sha in digests]
+            tx.executemany("DELETE FROM attachment_refs WHERE sha256 = ?", params)
+            tx.executemany("DELETE FROM attachment_blobs WHERE sha256 = ?", params)
+
+        logger.debug("Attachment Blobs Deleted", [
+            ("Count", str(len(digests))),
+        ])
+        return len(digests)
+
+    def get_attachment_archive_totals(self: "DatabaseManager") -> Dict[str, int]:
+        """
+        Archive size figures.
+
+        Returns:
+            blobs / stored_bytes (on disk) and refs / referenced_bytes (what
+            storing every attachment separately would take).
+        """
+        blobs = self.fetchone(
+            "SELECT COUNT(*) AS n, COALESCE(SUM(size), 0) AS bytes FROM attachment_blobs"
+        )
+        refs = self.fetchone(
+            """SELECT COUNT(*) AS n, COALESCE(SUM(b.size), 0) AS bytes
+               FROM attachment_refs r JOIN attachment_blobs b ON b.sha256 = r.sha256"""
+        )
+        return {
+            "blobs": blobs["n"] if blobs else 0,
+            "stored_bytes": blobs["bytes"] if blobs else 0,
+            "refs": refs["n"] if refs else 0,
+            "referenced_bytes": refs["bytes"] if refs else 0,
+        }
+
+
+# =============================================================================
+# Module Export
+# =============================================================================
+
+__all__ = ["AttachmentArchiveMixin"]
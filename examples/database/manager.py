@@ -42,6 +42,10 @@ from src.core.database.timeouts import TimeoutsMixin
 from src.core.database.snapshots import SnapshotsMixin
 from src.core.database.token_blacklist import TokenBlacklistMixin
 from src.core.database.join_positions import JoinPositionsMixin
+from src.core.database.reputation import ReputationMixin, reputation_decay
+from src.core.database.ticket_activity import TicketActivityMixin
+from src.core.database.ticket_messages import TicketMessagesMixin
+from src.core.database.attachments import AttachmentArchiveMixin
 
 # Import type definitions from models module
 from src.core.database.models import (
@@ -113,6 +117,10 @@ class DatabaseManager(
     SnapshotsMixin,
     TokenBlacklistMixin,
     JoinPositionsMixin,
+    ReputationMixin,
+    TicketActivityMixin,
+    TicketMessagesMixin,
+    AttachmentArchiveMixin,
 ):
     """
     Centralized database manager with thread-safe operations.
@@ -147,6 +155,9 @@ class DatabaseManager(
         self._prisoner_stats_ttl: int = 60  # 60 seconds
         self._prisoner_stats_lock = asyncio.Lock()  # Protect concurrent cache access
 
+        # message_authors IDs by (author_id, version), see TicketMessagesMixin
+        self._message_author_ids: Dict[Tuple[int, int], int] = {}
+
         DATA_DIR.mkdir(parents=True, exist_ok=True)
         self._connect()
         self._init_tables()
@@ -183,6 +194,7 @@ class DatabaseManager(
             self._conn.execute("PRAGMA mmap_size=268435456")  # 256MB memory-mapped I/O
             self._conn.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT}")
             self._conn.row_factory = sqlite3.Row
+            self._conn.create_function("reputation_decay", 4, reputation_decay, deterministic=True)
         except sqlite3.Error as e:
             logger.error("Database Connection Failed", [("Error", str(e))])
             raise
@@ -290,6 +302,11 @@ class DatabaseManager(
             self._cursor.execute(query, params)
             return self._cursor
 
+        def executemany(self, query: str, params_list: List[Tuple]) -> sqlite3.Cursor:
+            """Execute a query for each parameter tuple within this transaction."""
+            self._cursor.executemany(query, params_list)
+            return self._cursor
+
         def fetchone(self) -> Optional[sqlite3.Row]:
             """Fetch one result from the last query."""
             return self._cursor.fetchone() if self._cursor else None
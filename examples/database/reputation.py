@@ -0,0 +1,103 @@
+"""
+AzabBot - Database Reputation Operations Module
+===============================================
+
+Anti-spam reputation score storage.
+
+Author: حَـــــنَّـــــا
+Server: discord.gg/syria
+"""
+
+from typing import List, Optional, Tuple, TYPE_CHECKING
+
+from src.core.logger import logger
+
+if TYPE_CHECKING:
+    from src.core.database.manager import DatabaseManager
+
+
+def reputation_decay(score: float, since: float, now: float, half_life: float) -> float:
+    """
+    Decay a score from `since` to `now`, halving every half_life seconds.
+
+    Registered as an SQL function on the connection (see DatabaseManager._connect).
+    """
+    if now <= since:
+        return score
+    return score * 0.5 ** ((now - since) / half_life)
+
+
+class ReputationMixin:
+    """Mixin for anti-spam reputation score operations."""
+
+    def get_user_reputation(
+        self: "DatabaseManager",
+        user_id: int,
+        guild_id: int,
+    ) -> Optional[Tuple[float, float]]:
+        """
+        Get a user's stored reputation score.
+
+        Args:
+            user_id: Discord user ID.
+            guild_id: Guild ID.
+
+        Returns:
+            (score, updated_at), or None if the user has no row yet. The
+            score decays from updated_at - callers apply the decay.
+        """
+        row = self.fetchone(
+            "SELECT score, updated_at FROM user_reputation WHERE user_id = ? AND guild_id = ?",
+            (user_id, guild_id)
+        )
+        return (row["score"], row["updated_at"]) if row else None
+
+    def apply_reputation_deltas(
+        self: "DatabaseManager",
+        deltas: List[Tuple[int, int, float, float]],
+        half_life: float,
+    ) -> int:
+        """
+        Add many reputation deltas to the stored scores in one transaction.
+
+        DESIGN: Each stored score is decayed from its updated_at to the
+        delta's time (halving every half_life seconds) before the delta is
+        added, so scores fade toward neutral whether or not the user is
+        active. The decay runs inside the upsert (reputation_decay is
+        registered on the connection), so the whole batch is one
+        executemany.
+
+        Args:
+            deltas: List of (user_id, guild_id, delta, as of unix time).
+            half_life: Seconds for a score to decay halfway to 0.
+
+        Returns:
+            Number of rows written.
+        """
+        if not deltas:
+            return 0
+
+        with self.transaction() as tx:
+            tx.executemany(
+                """INSERT INTO user_reputation (user_id, guild_id, score, updated_at)
+                   VALUES (?, ?, ?, ?)
+                   ON CONFLICT(user_id, guild_id) DO UPDATE SET
+                       score = excluded.score + reputation_decay(
+                           user_reputation.score, user_reputation.updated_at, excluded.updated_at, ?
+                       ),
+                       updated_at = MAX(user_reputation.updated_at, excluded.updated_at)""",
+                [(user_id, guild_id, delta, at, half_life) for user_id, guild_id, delta, at in deltas]
+            )
+
+        logger.debug("Reputation Deltas Applied", [
+            ("Rows", str(len(deltas))),
+        ])
+
+        return len(deltas)
+
+
+# =============================================================================
+# Module Export
+# =============================================================================
+
+__all__ = ["ReputationMixin", "reputation_decay"]
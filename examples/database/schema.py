@@ -11,6 +11,9 @@ Server: discord.gg/syria
 import sqlite3
 from typing import TYPE_CHECKING
 
+from src.core.logger import logger
+from src.core.database.ticket_messages import author_version
+
 if TYPE_CHECKING:
     from src.core.database.manager import DatabaseManager
 
@@ -577,6 +580,22 @@ class SchemaMixin:
             "CREATE INDEX IF NOT EXISTS idx_spam_violations_user ON spam_violations(user_id, guild_id)"
         )
 
+        # -----------------------------------------------------------------
+        # User Reputation Table
+        # DESIGN: Anti-spam reputation scores, decaying toward 0 from
+        # updated_at. Deltas accumulate in memory and are applied in one
+        # transaction per REPUTATION_UPDATE_INTERVAL
+        # -----------------------------------------------------------------
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS user_reputation (
+                user_id INTEGER NOT NULL,
+                guild_id INTEGER NOT NULL,
+                score REAL NOT NULL DEFAULT 0,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (user_id, guild_id)
+            )
+        """)
+
         # -----------------------------------------------------------------
         # Snipe Cache Table
         # -----------------------------------------------------------------
@@ -781,6 +800,7 @@ class SchemaMixin:
             "transcript_token TEXT",  # Public access token for transcript viewer
             "description TEXT",  # User-provided ticket description
             "answers_json TEXT",  # Raw modal answers as JSON {label: value}
+            "reopened_at REAL",  # Last reopen (reopened tickets are never ghost-closed)
         ]:
             try:
                 cursor.execute(f"ALTER TABLE tickets ADD COLUMN {col}")
@@ -800,37 +820,138 @@ class SchemaMixin:
         )
 
         # -----------------------------------------------------------------
-        # Ticket Messages Table (incremental storage for real-time transcripts)
+        # Message Authors Table (deduplicated author info for ticket_messages)
+        # DESIGN: One row per author per version (hash of name / display
+        # name / avatar), so messages reference it instead of repeating
+        # the strings on every row
         # -----------------------------------------------------------------
         cursor.execute("""
-            CREATE TABLE IF NOT EXISTS ticket_messages (
+            CREATE TABLE IF NOT EXISTS message_authors (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                author_id INTEGER NOT NULL,
+                version INTEGER NOT NULL,
+                name TEXT NOT NULL,
+                display_name TEXT NOT NULL,
+                avatar_url TEXT,
+                first_seen REAL NOT NULL,
+                UNIQUE(author_id, version)
+            )
+        """)
+
+        # -----------------------------------------------------------------
+        # Ticket Messages Table (incremental storage for real-time transcripts)
+        # -----------------------------------------------------------------
+        ticket_messages_table = """
+            CREATE TABLE IF NOT EXISTS {name} (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 ticket_id TEXT NOT NULL,
                 message_id INTEGER NOT NULL UNIQUE,
                 author_id INTEGER NOT NULL,
-                author_name TEXT NOT NULL,
-                author_display_name TEXT NOT NULL,
-                author_avatar_url TEXT,
+                author_ref INTEGER NOT NULL REFERENCES message_authors(id),
                 content TEXT,
                 timestamp REAL NOT NULL,
                 is_bot INTEGER DEFAULT 0,
                 is_staff INTEGER DEFAULT 0,
                 attachments TEXT,
                 embeds TEXT,
+                edited_at REAL,
+                deleted_at REAL,
+                extra TEXT,
                 FOREIGN KEY (ticket_id) REFERENCES tickets(ticket_id)
             )
-        """)
-        # Add embeds column if missing (migration)
-        try:
-            cursor.execute("ALTER TABLE ticket_messages ADD COLUMN embeds TEXT")
-        except sqlite3.OperationalError:
-            pass
+        """
+        cursor.execute(ticket_messages_table.format(name="ticket_messages"))
+        # Add embeds / edit / delete columns if missing (migration)
+        for col in [
+            "embeds TEXT",
+            "edited_at REAL",
+            "deleted_at REAL",
+            "extra TEXT",  # JSON: type, role_color, reply_to, stickers
+        ]:
+            try:
+                cursor.execute(f"ALTER TABLE ticket_messages ADD COLUMN {col}")
+            except sqlite3.OperationalError:
+                pass
+
+        # Migration: Move inline author columns into message_authors
+        # SQLite can't drop NOT NULL columns in place, so recreate table
+        # (foreign keys off while rebuilding, as SQLite's procedure requires)
+        cursor.execute("PRAGMA table_info(ticket_messages)")
+        if any(c[1] == "author_name" for c in cursor.fetchall()):
+            conn.commit()
+            cursor.execute("PRAGMA foreign_keys=OFF")
+            conn.create_function("author_version", 3, author_version, deterministic=True)
+            cursor.execute("""
+                INSERT OR IGNORE INTO message_authors
+                    (author_id, version, name, display_name, avatar_url, first_seen)
+                SELECT author_id,
+                       author_version(author_name, author_display_name, author_avatar_url),
+                       author_name, author_display_name, author_avatar_url, MIN(timestamp)
+                FROM ticket_messages
+                GROUP BY author_id, author_name, author_display_name, author_avatar_url
+            """)
+            cursor.execute(ticket_messages_table.format(name="ticket_messages_new"))
+            cursor.execute("""
+                INSERT INTO ticket_messages_new
+                    (id, ticket_id, message_id, author_id, author_ref, content, timestamp,
+                     is_bot, is_staff, attachments, embeds, edited_at, deleted_at, extra)
+                SELECT m.id, m.ticket_id, m.message_id, m.author_id, a.id, m.content, m.timestamp,
+                       m.is_bot, m.is_staff, m.attachments, m.embeds, m.edited_at, m.deleted_at, m.extra
+                FROM ticket_messages m
+                JOIN message_authors a
+                  ON a.author_id = m.author_id
+                 AND a.version = author_version(m.author_name, m.author_display_name, m.author_avatar_url)
+            """)
+            migrated = cursor.rowcount
+            cursor.execute("DROP TABLE ticket_messages")
+            cursor.execute("ALTER TABLE ticket_messages_new RENAME TO ticket_messages")
+            authors = cursor.execute("SELECT COUNT(*) FROM message_authors").fetchone()[0]
+            # Reclaim the freed pages now rather than carrying them in every backup
+            conn.commit()
+            cursor.execute("PRAGMA foreign_keys=ON")
+            cursor.execute("VACUUM")
+            logger.tree("Ticket Message Authors Migrated", [
+                ("Messages", str(migrated)),
+                ("Author Versions", str(authors)),
+            ], emoji="🗜️")
         cursor.execute(
             "CREATE INDEX IF NOT EXISTS idx_ticket_messages_ticket ON ticket_messages(ticket_id)"
         )
         cursor.execute(
             "CREATE INDEX IF NOT EXISTS idx_ticket_messages_timestamp ON ticket_messages(ticket_id, timestamp)"
         )
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_ticket_messages_order ON ticket_messages(ticket_id, message_id)"
+        )
+        # Partial indexes: edits/deletes are rare, so live transcript polls
+        # find them without scanning the ticket's rows
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_ticket_messages_edited ON ticket_messages(ticket_id, edited_at) "
+            "WHERE edited_at IS NOT NULL"
+        )
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_ticket_messages_deleted ON ticket_messages(ticket_id, deleted_at) "
+            "WHERE deleted_at IS NOT NULL"
+        )
+
+        # -----------------------------------------------------------------
+        # Ticket Message Gaps Table
+        # DESIGN: Message-ID ranges the store may be missing (failed write
+        # batches, bot downtime); backfilled from Discord, then deleted
+        # -----------------------------------------------------------------
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS ticket_message_gaps (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                ticket_id TEXT NOT NULL,
+                after_id INTEGER NOT NULL,
+                before_id INTEGER,
+                reason TEXT NOT NULL,
+                created_at REAL NOT NULL
+            )
+        """)
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_ticket_message_gaps_ticket ON ticket_message_gaps(ticket_id)"
+        )
 
         # -----------------------------------------------------------------
         # Ticket History Table (archived tickets with transcripts)
@@ -994,6 +1115,44 @@ class SchemaMixin:
             "CREATE INDEX IF NOT EXISTS idx_token_blacklist_expires ON token_blacklist(expires_at)"
         )
 
+        # -----------------------------------------------------------------
+        # Attachment Archive Tables
+        # DESIGN: Content-addressed blobs (data/blobs/<sha256>) outlive the
+        # 24h Discord CDN links in transcripts and evidence. One blob row
+        # per distinct content, one ref row per archived attachment
+        # -----------------------------------------------------------------
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS attachment_blobs (
+                sha256 TEXT PRIMARY KEY,
+                size INTEGER NOT NULL,
+                content_type TEXT,
+                tier TEXT NOT NULL,
+                pinned INTEGER DEFAULT 0,
+                created_at REAL NOT NULL,
+                last_ref_at REAL NOT NULL
+            )
+        """)
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_attachment_blobs_expiry "
+            "ON attachment_blobs(tier, last_ref_at) WHERE pinned = 0"
+        )
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS attachment_refs (
+                url_key TEXT PRIMARY KEY,
+                sha256 TEXT NOT NULL,
+                owner_kind TEXT NOT NULL,
+                owner_id TEXT NOT NULL,
+                filename TEXT,
+                archived_at REAL NOT NULL
+            )
+        """)
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_attachment_refs_sha ON attachment_refs(sha256)"
+        )
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_attachment_refs_owner ON attachment_refs(owner_kind, owner_id)"
+        )
+
         # -----------------------------------------------------------------
         # Guild Daily Snapshots Table
         # DESIGN: Stores daily member/online counts for dashboard charts
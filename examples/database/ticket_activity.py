@@ -0,0 +1,136 @@
+"""
+AzabBot - Database Ticket Activity Operations Module
+====================================================
+
+Bulk reads and writes behind the in-memory open-ticket index.
+
+Author: حَـــــنَّـــــا
+Server: discord.gg/syria
+"""
+
+from typing import Any, Dict, List, Optional, Tuple, TYPE_CHECKING
+
+from src.core.logger import logger
+
+if TYPE_CHECKING:
+    from src.core.database.manager import DatabaseManager
+
+
+# Opener activity (a stored message, or the modal description / answers
+# submitted at creation) and any human reply from someone else - the
+# inputs to ghost-close eligibility
+_ACTIVITY_FLAGS: str = """
+    (COALESCE(t.description, '') != '' OR t.answers_json IS NOT NULL OR EXISTS(
+        SELECT 1 FROM ticket_messages m
+        WHERE m.ticket_id = t.ticket_id AND m.author_id = t.user_id
+    )) AS owner_active,
+    EXISTS(
+        SELECT 1 FROM ticket_messages m
+        WHERE m.ticket_id = t.ticket_id AND m.author_id != t.user_id AND m.is_bot = 0
+    ) AS staff_replied
+"""
+
+
+class TicketActivityMixin:
+    """Mixin for open-ticket index loading and batched activity writes."""
+
+    def get_open_tickets(self: "DatabaseManager") -> List[Dict[str, Any]]:
+        """
+        Get every open or claimed ticket in one query.
+
+        Returns:
+            List of dicts with ticket_id, user_id, guild_id, thread_id,
+            status, claimed_by, warned_at, last_activity_at, created_at,
+            reopened_at, owner_active (the opener wrote or submitted the
+            modal) and staff_replied (someone else replied).
+        """
+        rows = self.fetchall(
+            f"""SELECT t.ticket_id, t.user_id, t.guild_id, t.thread_id, t.status,
+                       t.claimed_by, t.warned_at, t.last_activity_at, t.created_at,
+                       t.reopened_at, {_ACTIVITY_FLAGS}
+                FROM tickets t WHERE t.status IN ('open', 'claimed')"""
+        )
+        return [dict(row) for row in rows]
+
+    def get_ticket_activity_flags(self: "DatabaseManager", ticket_id: str) -> Dict[str, bool]:
+        """
+        Get owner_active / staff_replied for one ticket (as in get_open_tickets).
+
+        Used when indexing a single ticket row outside the bulk load.
+        """
+        row: Optional[Any] = self.fetchone(
+            f"SELECT {_ACTIVITY_FLAGS} FROM tickets t WHERE t.ticket_id = ?",
+            (ticket_id,)
+        )
+        if not row:
+            return {"owner_active": False, "staff_replied": False}
+        return {"owner_active": bool(row["owner_active"]), "staff_replied": bool(row["staff_replied"])}
+
+    def save_ticket_activity(
+        self: "DatabaseManager",
+        activity: List[Tuple[str, float]],
+    ) -> int:
+        """
+        Write many last-activity timestamps in one statement batch.
+
+        DESIGN: The timestamp only moves forward, and a warning is cleared
+        only if it was issued before the activity - so a flush that lands
+        after the auto-close loop warned a ticket (for inactivity that
+        started after the flushed message) keeps that warning.
+
+        Args:
+            activity: List of (ticket_id, last_activity_at).
+
+        Returns:
+            Number of rows written.
+        """
+        if not activity:
+            return 0
+
+        self.executemany(
+            """UPDATE tickets SET
+                   last_activity_at = MAX(COALESCE(last_activity_at, 0), ?),
+                   warned_at = CASE WHEN warned_at <= ? THEN NULL ELSE warned_at END
+               WHERE ticket_id = ?""",
+            [(at, at, ticket_id) for ticket_id, at in activity]
+        )
+
+        logger.debug("Ticket Activity Flushed", [
+            ("Rows", str(len(activity))),
+        ])
+
+        return len(activity)
+
+
+    def set_ticket_warned(self: "DatabaseManager", ticket_id: str, warned_at: float) -> None:
+        """
+        Record that an inactivity warning was sent.
+
+        Args:
+            ticket_id: The ticket ID.
+            warned_at: Unix time of the warning.
+        """
+        self.execute(
+            "UPDATE tickets SET warned_at = ? WHERE ticket_id = ?",
+            (warned_at, ticket_id)
+        )
+
+    def set_ticket_reopened(self: "DatabaseManager", ticket_id: str, reopened_at: float) -> None:
+        """
+        Record a reopen, which makes the ticket ineligible for ghost-close.
+
+        Args:
+            ticket_id: The ticket ID.
+            reopened_at: Unix time of the reopen.
+        """
+        self.execute(
+            "UPDATE tickets SET reopened_at = ? WHERE ticket_id = ?",
+            (reopened_at, ticket_id)
+        )
+
+
+# =============================================================================
+# Module Export
+# =============================================================================
+
+__all__ = ["TicketActivityMixin"]
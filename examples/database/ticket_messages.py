@@ -0,0 +1,348 @@
+"""
+AzabBot - Database Ticket Message Operations Module
+===================================================
+
+Batched writes for incrementally stored ticket messages.
+
+DESIGN:
+    Author name, display name and avatar URL live in message_authors, one
+    row per (author_id, version) where version hashes those three fields,
+    so a ticket with 1,000 messages from three people stores three author
+    rows instead of 1,000 copies of a long CDN URL. A rename or new avatar
+    adds a version; older messages keep the author as they were. Reads
+    join on message_authors' primary key and return the same row shape.
+
+Author: حَـــــنَّـــــا
+Server: discord.gg/syria
+"""
+
+import hashlib
+import json
+import sqlite3
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple, TYPE_CHECKING
+
+from src.core.logger import logger
+from src.core.database.base import _safe_json_loads
+
+if TYPE_CHECKING:
+    from src.core.database.manager import DatabaseManager
+
+
+_ROW_COLUMNS: str = (
+    "m.message_id, m.author_id, a.name AS author_name, a.display_name AS author_display_name, "
+    "a.avatar_url AS author_avatar_url, m.content, m.timestamp, m.is_bot, m.is_staff, "
+    "m.attachments, m.embeds, m.edited_at, m.extra"
+)
+_ROW_SOURCE: str = "ticket_messages m JOIN message_authors a ON a.id = m.author_ref"
+
+AUTHOR_CACHE_SIZE: int = 10_000  # (author_id, version) -> message_authors.id entries kept in memory
+
+
+def author_version(name: Optional[str], display_name: Optional[str], avatar_url: Optional[str]) -> int:
+    """
+    Version key for an author's name / display name / avatar.
+
+    Signed 64-bit so it fits an SQLite INTEGER. Also registered as an SQL
+    function by the schema migration, so both sides hash identically.
+    """
+    raw = "\x1f".join((name or "", display_name or "", avatar_url or "")).encode()
+    return int.from_bytes(hashlib.blake2b(raw, digest_size=8).digest(), "big", signed=True)
+
+
+def _dumps(value: Any) -> Optional[str]:
+    return json.dumps(value) if value else None
+
+
+def _row_to_message(row: sqlite3.Row) -> Dict[str, Any]:
+    message = dict(row)
+    message["is_bot"] = bool(message["is_bot"])
+    message["is_staff"] = bool(message["is_staff"])
+    message["attachments"] = _safe_json_loads(message["attachments"])
+    message["embeds"] = _safe_json_loads(message["embeds"])
+    message["extra"] = _safe_json_loads(message["extra"], {})
+    return message
+
+
+class TicketMessagesMixin:
+    """Mixin for batched ticket message writes and transcript reads."""
+
+    def write_ticket_message_batch(
+        self: "DatabaseManager",
+        stores: Sequence[Tuple],
+        edits: Sequence[Tuple[int, str, Optional[List[Dict[str, Any]]], float]],
+        deletes: Sequence[Tuple[int, float]],
+    ) -> int:
+        """
+        Apply a batch of ticket message changes in one transaction.
+
+        Stores are applied before edits and edits before deletes, so an edit
+        or delete of a message stored in the same batch lands on its row.
+        Author fields are written to message_authors (once per version)
+        and the message row references them.
+
+        Args:
+            stores: Tuples of (ticket_id, message_id, author_id, author_name,
+                author_display_name, author_avatar_url, content, timestamp,
+                is_bot, is_staff, attachments, embeds, extra); attachments
+                and embeds are lists of dicts, extra a dict (or None), and
+                are serialized here.
+            edits: Tuples of (message_id, content, embeds, edited_at).
+            deletes: Tuples of (message_id, deleted_at).
+
+        Returns:
+            Number of changes written.
+        """
+        new_authors: Dict[Tuple[int, int], int] = {}
+        with self.transaction() as tx:
+            if stores:
+                refs = self._message_author_refs(tx, stores, new_authors)
+                tx.executemany(
+                    """INSERT INTO ticket_messages
+                       (ticket_id, message_id, author_id, author_ref, content, timestamp,
+                        is_bot, is_staff, attachments, embeds, extra)
+                       VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                       ON CONFLICT(message_id) DO NOTHING""",
+                    [(*row[:3], ref, *row[6:10], _dumps(row[10]), _dumps(row[11]), _dumps(row[12]))
+                     for row, ref in zip(stores, refs)]
+                )
+            if edits:
+                tx.executemany(
+                    """UPDATE ticket_messages SET content = ?, embeds = ?, edited_at = ?
+                       WHERE message_id = ?""",
+                    [(content, _dumps(embeds), edited_at, message_id)
+                     for message_id, content, embeds, edited_at in edits]
+                )
+            if deletes:
+                tx.executemany(
+                    "UPDATE ticket_messages SET deleted_at = ? WHERE message_id = ?",
+                    [(deleted_at, message_id) for message_id, deleted_at in deletes]
+                )
+
+        # Only cache IDs once committed (a rollback would have discarded them)
+        if new_authors:
+            if len(self._message_author_ids) + len(new_authors) > AUTHOR_CACHE_SIZE:
+                self._message_author_ids.clear()
+            self._message_author_ids.update(new_authors)
+
+        total = len(stores) + len(edits) + len(deletes)
+        logger.debug("Ticket Messages Flushed", [
+            ("Stored", str(len(stores))),
+            ("Edited", str(len(edits))),
+            ("Deleted", str(len(deletes))),
+        ])
+        return total
+
+    def _message_author_refs(
+        self: "DatabaseManager",
+        tx: "DatabaseManager.Transaction",
+        stores: Sequence[Tuple],
+        new_authors: Dict[Tuple[int, int], int],
+    ) -> List[int]:
+        """
+        message_authors IDs for a batch of stores, inserting unseen versions.
+
+        Known versions come from the in-memory cache; only an author's
+        first message (or first after a profile change) touches the table.
+        Newly resolved IDs are added to new_authors for the caller to cache.
+        """
+        refs: List[int] = []
+        for row in stores:
+            author_id, name, display_name, avatar_url = row[2:6]
+            key = (author_id, author_version(name, display_name, avatar_url))
+            ref = self._message_author_ids.get(key) or new_authors.get(key)
+            if ref is None:
+                tx.execute(
+                    """INSERT OR IGNORE INTO message_authors
+                       (author_id, version, name, display_name, avatar_url, first_seen)
+                       VALUES (?, ?, ?, ?, ?, ?)""",
+                    (*key, name, display_name, avatar_url, row[7])
+                )
+                ref = tx.execute(
+                    "SELECT id FROM message_authors WHERE author_id = ? AND version = ?",
+                    key
+                ).fetchone()["id"]
+                new_authors[key] = ref
+            refs.append(ref)
+        return refs
+
+    def get_ticket_message_rows(
+        self: "DatabaseManager",
+        ticket_id: str,
+    ) -> List[Dict[str, Any]]:
+        """
+        Get a ticket's stored messages for transcript building.
+
+        Deleted messages are left out (as in the channel history); edits
+        are already applied to content/embeds.
+
+        Args:
+            ticket_id: The ticket ID.
+
+        Returns:
+            Message dicts ordered by message ID, with attachments / embeds
+            as lists and extra as a dict.
+        """
+        rows = self.fetchall(
+            f"""SELECT {_ROW_COLUMNS} FROM {_ROW_SOURCE}
+                WHERE m.ticket_id = ? AND m.deleted_at IS NULL
+                ORDER BY m.message_id""",
+            (ticket_id,)
+        )
+        return [_row_to_message(row) for row in rows]
+
+    def get_ticket_message_page(
+        self: "DatabaseManager",
+        ticket_id: str,
+        after_message_id: int = 0,
+        limit: int = 500,
+    ) -> List[Dict[str, Any]]:
+        """
+        Get one page of a ticket's stored messages (keyset pagination).
+
+        Used to stream large transcripts without loading every row.
+
+        Args:
+            ticket_id: The ticket ID.
+            after_message_id: Return messages after this ID (0 = from start).
+            limit: Page size.
+
+        Returns:
+            Message dicts as in get_ticket_message_rows.
+        """
+        rows = self.fetchall(
+            f"""SELECT {_ROW_COLUMNS} FROM {_ROW_SOURCE}
+                WHERE m.ticket_id = ? AND m.message_id > ? AND m.deleted_at IS NULL
+                ORDER BY m.message_id LIMIT ?""",
+            (ticket_id, after_message_id, limit)
+        )
+        return [_row_to_message(row) for row in rows]
+
+    def get_ticket_message_changes(
+        self: "DatabaseManager",
+        ticket_id: str,
+        since: float,
+        up_to_message_id: int,
+    ) -> Tuple[List[Dict[str, Any]], List[int]]:
+        """
+        Get a ticket's message edits and deletes since a time.
+
+        Used by live transcript polls; only messages a viewer already has
+        (message ID <= up_to_message_id) are returned.
+
+        Args:
+            ticket_id: The ticket ID.
+            since: Unix time of the viewer's previous poll.
+            up_to_message_id: Last message ID the viewer has.
+
+        Returns:
+            (edited message dicts as in get_ticket_message_rows, deleted message IDs)
+        """
+        edited = self.fetchall(
+            f"""SELECT {_ROW_COLUMNS} FROM {_ROW_SOURCE}
+                WHERE m.ticket_id = ? AND m.edited_at > ? AND m.message_id <= ? AND m.deleted_at IS NULL
+                ORDER BY m.message_id""",
+            (ticket_id, since, up_to_message_id)
+        )
+        deleted = self.fetchall(
+            """SELECT message_id FROM ticket_messages
+               WHERE ticket_id = ? AND deleted_at > ? AND message_id <= ?""",
+            (ticket_id, since, up_to_message_id)
+        )
+        return [_row_to_message(row) for row in edited], [row["message_id"] for row in deleted]
+
+    def count_ticket_messages(self: "DatabaseManager", ticket_id: str) -> int:
+        """Count a ticket's stored (non-deleted) messages."""
+        row = self.fetchone(
+            "SELECT COUNT(*) AS n FROM ticket_messages WHERE ticket_id = ? AND deleted_at IS NULL",
+            (ticket_id,)
+        )
+        return row["n"] if row else 0
+
+    def get_ticket_message_ids(
+        self: "DatabaseManager",
+        ticket_id: str,
+        after_id: int,
+        before_id: Optional[int],
+    ) -> List[int]:
+        """Stored (non-deleted) message IDs strictly between after_id and before_id."""
+        rows = self.fetchall(
+            """SELECT message_id FROM ticket_messages
+               WHERE ticket_id = ? AND message_id > ? AND message_id < COALESCE(?, 9223372036854775807)
+                 AND deleted_at IS NULL""",
+            (ticket_id, after_id, before_id)
+        )
+        return [row["message_id"] for row in rows]
+
+    # =========================================================================
+    # Ingest Gaps
+    # =========================================================================
+
+    def add_ticket_message_gaps(
+        self: "DatabaseManager",
+        gaps: Sequence[Tuple[str, int, Optional[int], str]],
+    ) -> None:
+        """
+        Record message-ID ranges the store may be missing.
+
+        Args:
+            gaps: Tuples of (ticket_id, after_id, before_id, reason); the
+                range is exclusive and before_id None means "until now".
+        """
+        if not gaps:
+            return
+        now = time.time()
+        self.executemany(
+            """INSERT INTO ticket_message_gaps (ticket_id, after_id, before_id, reason, created_at)
+               VALUES (?, ?, ?, ?, ?)""",
+            [(*gap, now) for gap in gaps]
+        )
+
+    def add_offline_ticket_message_gaps(self: "DatabaseManager", before_id: int) -> int:
+        """
+        Record a gap after the last stored message of every open ticket.
+
+        Called at startup: messages sent while the bot was down sit between
+        the last stored ID and before_id (a snowflake for "now").
+
+        Returns:
+            Number of gaps recorded.
+        """
+        cursor = self.execute(
+            """INSERT INTO ticket_message_gaps (ticket_id, after_id, before_id, reason, created_at)
+               SELECT m.ticket_id, MAX(m.message_id), ?, 'offline', ?
+               FROM ticket_messages m JOIN tickets t ON t.ticket_id = m.ticket_id
+               WHERE t.status IN ('open', 'claimed')
+               GROUP BY m.ticket_id""",
+            (before_id, time.time())
+        )
+        return cursor.rowcount
+
+    def get_ticket_message_gaps(self: "DatabaseManager", ticket_id: str) -> List[Dict[str, Any]]:
+        """Recorded gaps for a ticket, oldest range first."""
+        rows = self.fetchall(
+            """SELECT id, after_id, before_id, reason FROM ticket_message_gaps
+               WHERE ticket_id = ? ORDER BY after_id""",
+            (ticket_id,)
+        )
+        return [dict(row) for row in rows]
+
+    def get_ticket_ids_with_gaps(self: "DatabaseManager") -> List[str]:
+        """Tickets with at least one recorded gap."""
+        rows = self.fetchall("SELECT DISTINCT ticket_id FROM ticket_message_gaps")
+        return [row["ticket_id"] for row in rows]
+
+    def delete_ticket_message_gaps(self: "DatabaseManager", gap_ids: Sequence[int]) -> None:
+        """Forget gaps that have been backfilled."""
+        if gap_ids:
+            self.executemany(
+                "DELETE FROM ticket_message_gaps WHERE id = ?",
+                [(gap_id,) for gap_id in gap_ids]
+            )
+
+
+# =============================================================================
+# Module Export
+# =============================================================================
+
+__all__ = ["TicketMessagesMixin", "author_version"]
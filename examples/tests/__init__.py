@@ -0,0 +1,10 @@
+"""
+AzabBot - Tests
+===============
+
+Behaviour tests for the storage, transcript and anti-spam components.
+Run from the repo root with: python -m pytest tests
+
+Author: حَـــــنَّـــــا
+Server: discord.gg/syria
+"""
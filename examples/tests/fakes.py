@@ -0,0 +1,167 @@
+"""
+AzabBot - Test Fakes
+====================
+
+Minimal stand-ins for Discord channels/messages, the ticket message
+store and an in-memory SQLite database, shared by the tests.
+
+Author: حَـــــنَّـــــا
+Server: discord.gg/syria
+"""
+
+import asyncio
+import sqlite3
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+
+# =============================================================================
+# Discord
+# =============================================================================
+
+def fake_message(message_id: int, content: Optional[str] = None, author_id: int = 1001) -> Any:
+    """Message with the attributes the ticket ingest/transcript code reads."""
+    author = SimpleNamespace(
+        id=author_id, name=f"user{author_id}", display_name=f"User {author_id}",
+        display_avatar=None, bot=False, top_role=None,
+    )
+    return SimpleNamespace(
+        id=message_id, author=author,
+        content=f"message {message_id}" if content is None else content,
+        created_at=datetime.fromtimestamp(1_700_000_000 + message_id, tz=timezone.utc), edited_at=None,
+        attachments=[], embeds=[], stickers=[], reactions=[], reference=None, type=None, pinned=False,
+    )
+
+
+class FakeChannel:
+    """Channel whose history() filters like the API and counts page requests."""
+
+    def __init__(self, messages: Iterable[Any], channel_id: int = 1) -> None:
+        self.id = channel_id
+        self.guild = None
+        self.messages = list(messages)
+        self.requests: List[Tuple[Optional[int], Optional[int]]] = []
+
+    async def history(self, limit=None, after=None, before=None, oldest_first=True):
+        after_id = after.id if after else None
+        before_id = before.id if before else None
+        self.requests.append((after_id, before_id))
+        selected = sorted(
+            (m for m in self.messages
+             if (after_id is None or m.id > after_id) and (before_id is None or m.id < before_id)),
+            key=lambda m: m.id, reverse=not oldest_first,
+        )
+        for message in selected[:limit]:
+            await asyncio.sleep(0)
+            yield message
+
+
+# =============================================================================
+# Ticket Message Store
+# =============================================================================
+
+class FakeTicketMessageDB:
+    """In-memory subset of the ticket message / gap database methods."""
+
+    def __init__(self) -> None:
+        self.rows: Dict[int, Dict[str, Any]] = {}          # message_id -> row
+        self.gaps: List[Dict[str, Any]] = []
+        self.batches: List[Tuple[list, list, list]] = []
+        self.fail_writes: int = 0                          # Batches left to fail
+
+    # Writes -------------------------------------------------------------
+
+    def write_ticket_message_batch(self, stores: list, edits: list, deletes: list) -> None:
+        if self.fail_writes:
+            self.fail_writes -= 1
+            raise RuntimeError("database is locked")
+        self.batches.append((stores, edits, deletes))
+        for (ticket_id, message_id, author_id, name, display_name, avatar, content, timestamp,
+             is_bot, is_staff, attachments, embeds, extra) in stores:
+            self.rows.setdefault(message_id, {
+                "ticket_id": ticket_id, "message_id": message_id, "author_id": author_id,
+                "author_name": name, "author_display_name": display_name, "author_avatar_url": avatar,
+                "content": content, "timestamp": timestamp, "is_bot": is_bot, "is_staff": is_staff,
+                "attachments": attachments or [], "embeds": embeds or [], "extra": extra or {},
+                "edited_at": None, "deleted_at": None,
+            })
+        for message_id, content, embeds, edited_at in edits:
+            if message_id in self.rows:
+                self.rows[message_id].update(content=content, embeds=embeds or [], edited_at=edited_at)
+        for message_id, deleted_at in deletes:
+            if message_id in self.rows:
+                self.rows[message_id]["deleted_at"] = deleted_at
+
+    def add_ticket_message_gaps(self, gaps: List[Tuple[str, int, Optional[int], str]]) -> None:
+        for ticket_id, after_id, before_id, reason in gaps:
+            self.gaps.append({
+                "id": len(self.gaps) + 1, "ticket_id": ticket_id,
+                "after_id": after_id, "before_id": before_id, "reason": reason,
+            })
+
+    def delete_ticket_message_gaps(self, gap_ids: List[int]) -> None:
+        self.gaps = [gap for gap in self.gaps if gap["id"] not in gap_ids]
+
+    # Reads --------------------------------------------------------------
+
+    def _live(self, ticket_id: str) -> List[Dict[str, Any]]:
+        return [
+            row for _, row in sorted(self.rows.items())
+            if row["ticket_id"] == ticket_id and row["deleted_at"] is None
+        ]
+
+    def get_ticket_message_rows(self, ticket_id: str) -> List[Dict[str, Any]]:
+        return [
+            {k: v for k, v in row.items() if k not in ("ticket_id", "deleted_at")}
+            for row in self._live(ticket_id)
+        ]
+
+    def get_ticket_message_ids(self, ticket_id: str, after_id: int, before_id: Optional[int]) -> List[int]:
+        return [
+            row["message_id"] for row in self._live(ticket_id)
+            if row["message_id"] > after_id and (before_id is None or row["message_id"] < before_id)
+        ]
+
+    def get_ticket_message_gaps(self, ticket_id: str) -> List[Dict[str, Any]]:
+        return [gap for gap in self.gaps if gap["ticket_id"] == ticket_id]
+
+    def get_archived_attachments(self, url_keys: List[str]) -> Dict[str, str]:
+        return {}
+
+
+# =============================================================================
+# SQLite
+# =============================================================================
+
+class SQLiteTestDB:
+    """
+    In-memory SQLite with DatabaseManager's fetchone / transaction surface,
+    for exercising real SQL from the database mixins. Mix a mixin in and
+    pass its tables' DDL.
+    """
+
+    def __init__(self, *ddl: str) -> None:
+        self.conn = sqlite3.connect(":memory:", check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        for statement in ddl:
+            self.conn.execute(statement)
+
+    def fetchone(self, query: str, params: Tuple = ()) -> Optional[sqlite3.Row]:
+        return self.conn.execute(query, params).fetchone()
+
+    def transaction(self) -> "SQLiteTestDB":
+        return self
+
+    def __enter__(self) -> "SQLiteTestDB":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> bool:
+        if exc_type is None:
+            self.conn.commit()
+        else:
+            self.conn.rollback()
+        return False
+
+    def executemany(self, query: str, params_list: List[Tuple]) -> sqlite3.Cursor:
+        return self.conn.executemany(query, params_list)
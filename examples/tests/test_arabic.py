@@ -0,0 +1,44 @@
+"""
+AzabBot - Arabic Normalization Tests
+====================================
+
+Author: حَـــــنَّـــــا
+Server: discord.gg/syria
+"""
+
+from src.services.antispam.arabic import MEMO_MAX_LENGTH, analyze_arabic, normalize_arabic, strip_tashkeel
+
+
+def test_strip_tashkeel_keeps_letters():
+    assert strip_tashkeel("السَّلَامُ عَلَيْكُمْ") == "السلام عليكم"
+
+
+def test_normalize_unifies_letters_and_collapses_elongation():
+    assert normalize_arabic("مرحبـــــا") == "مرحبا"
+    assert normalize_arabic("أهلاً") == normalize_arabic("اهلا")
+    assert normalize_arabic("مدرسة") == "مدرسه"
+    assert normalize_arabic("هههههه baaaad") == "ه bad"
+
+
+def test_normalize_leaves_digits_punctuation_and_urls_alone():
+    for text in (
+        "pay 1000 now",
+        "call 0999111222",
+        "wait...!!!",
+        "www.example.com",
+        "see https://aaa.example.com/zzz?id=111",
+    ):
+        assert normalize_arabic(text) == text
+    assert normalize_arabic("soooo www.example.com") == "so www.example.com"
+
+
+def test_mostly_arabic_ratio():
+    assert analyze_arabic("والله صار اله لسان ok").mostly_arabic
+    assert not analyze_arabic("check this out https://example.com").mostly_arabic
+    assert not analyze_arabic("12345 !!!").mostly_arabic
+
+
+def test_long_texts_are_normalized_without_memo():
+    text = "مرحبـــــا يا شباب " * 20
+    assert len(text) > MEMO_MAX_LENGTH
+    assert normalize_arabic(text) == "مرحبا يا شباب " * 20
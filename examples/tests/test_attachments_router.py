@@ -0,0 +1,25 @@
+"""
+AzabBot - Archived Attachment Router Tests
+==========================================
+
+Which stored content types are served inline vs as downloads.
+
+Author: حَـــــنَّـــــا
+Server: discord.gg/syria
+"""
+
+from src.api.routers.attachments import _content_headers
+
+
+def test_media_and_pdf_are_served_inline():
+    for content_type in ("image/png", "IMAGE/JPEG; charset=binary", "video/mp4", "audio/ogg", "application/pdf"):
+        media_type, headers = _content_headers(content_type)
+        assert media_type == content_type.split(";")[0].lower()
+        assert headers == {"Content-Disposition": "inline"}
+
+
+def test_active_content_is_downloaded_as_octet_stream():
+    for content_type in ("text/html", "image/svg+xml", "application/javascript", "text/xml", "", None):
+        media_type, headers = _content_headers(content_type)
+        assert media_type == "application/octet-stream"
+        assert headers == {"Content-Disposition": "attachment"}
@@ -0,0 +1,82 @@
+"""
+AzabBot - Detector Executor Tests
+=================================
+
+Offloaded vs inline detector verdicts, and the broken-pool fallback.
+
+Author: حَـــــنَّـــــا
+Server: discord.gg/syria
+"""
+
+import asyncio
+from concurrent.futures.process import BrokenProcessPool
+
+from src.services.antispam.detectors import analyze_content
+from src.services.antispam.executor import DetectorExecutor
+
+
+SAMPLES = [
+    ("hello there", ("hello there", "hello there!")),
+    ("free nitro claim now https://discord-gift.example/abc", ()),
+    ("buy cheap followers " * 100, ("buy cheap followers " * 99,)),
+    ("والله صار اله لسان", ("والله صار اله لسان",)),
+    ("z̷̢̛a̶̡͝l̵̨̛g̸̢͝o̷̡͠ text", ()),
+    ("🔥🔥🔥", ("🔥🔥🔥",)),
+    ("", ()),
+]
+
+
+class _BrokenPool:
+    """Pool whose workers have all died."""
+
+    def submit(self, *args, **kwargs):
+        raise BrokenProcessPool("worker died")
+
+    def shutdown(self, wait=True, cancel_futures=False):
+        pass
+
+
+def _jobs():
+    for content, history in SAMPLES:
+        yield content, content.lower().strip(), history
+
+
+def test_offloaded_and_inline_verdicts_match():
+    async def scenario():
+        executor = DetectorExecutor(workers=1)
+        await executor.start()
+        try:
+            available = executor.available
+            offloaded = [await executor.run(analyze_content, *job, offload=True) for job in _jobs()]
+            stats = executor.get_stats()
+            inline = [await executor.run(analyze_content, *job, offload=False) for job in _jobs()]
+        finally:
+            executor.shutdown()
+        return available, stats, offloaded, inline
+
+    available, stats, offloaded, inline = asyncio.run(scenario())
+
+    # Otherwise the "offloaded" verdicts came from the thread fallback
+    assert available
+    assert stats["offloaded"] == len(SAMPLES)
+    assert stats["fallbacks"] == 0
+    assert offloaded == inline
+
+
+def test_failed_rebuild_falls_back_to_threads():
+    def no_processes():
+        raise OSError("Too many open files")
+
+    async def scenario():
+        executor = DetectorExecutor(workers=1)
+        executor._pool = _BrokenPool()
+        executor._create_pool = no_processes
+        first = await executor.run(analyze_content, *next(_jobs()), offload=True)
+        second = await executor.run(analyze_content, *next(_jobs()), offload=True)
+        return executor, first, second
+
+    executor, first, second = asyncio.run(scenario())
+
+    assert first == second == analyze_content(*next(_jobs()))
+    assert not executor.available
+    assert executor.get_stats()["fallbacks"] == 2
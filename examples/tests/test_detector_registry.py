@@ -0,0 +1,114 @@
+"""
+AzabBot - Detector Registry Tests
+=================================
+
+Cost ordering, short-circuiting, lazy feature providers and recorders
+running whatever the verdict, on a fresh registry of toy detectors.
+
+Author: حَـــــنَّـــــا
+Server: discord.gg/syria
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from src.services.antispam.registry import CostClass, DetectionEngine, DetectorRegistry
+
+
+def _registry(calls: list, fire: set) -> DetectorRegistry:
+    """Registered out of cost order on purpose; `fire` names the hits."""
+    registry = DetectorRegistry()
+
+    @registry.provider("lookup")
+    async def provide_lookup(service, ctx):
+        calls.append("provide:lookup")
+        ctx.lookup = "resolved"
+
+    @registry.detector("network", CostClass.NETWORK, needs=("lookup",))
+    async def detect_network(service, ctx):
+        calls.append("network")
+        return "network" in fire
+
+    @registry.detector("cheap_b", CostClass.CHEAP, spam_type="cheap")
+    def detect_cheap_b(service, ctx):
+        calls.append("cheap_b")
+        return "cheap_b" in fire
+
+    @registry.detector("memory", CostClass.MEMORY)
+    def detect_memory(service, ctx):
+        calls.append("memory")
+        return "memory" in fire
+
+    @registry.detector("cheap_a", CostClass.CHEAP)
+    def detect_cheap_a(service, ctx):
+        calls.append("cheap_a")
+        return "cheap_a" in fire
+
+    @registry.recorder("history")
+    def record_history(service, ctx):
+        calls.append("record:history")
+
+    @registry.recorder("lookups", needs=("lookup",))
+    async def record_lookups(service, ctx):
+        calls.append(f"record:lookups:{ctx.lookup}")
+
+    return registry
+
+
+def _check(fire: set) -> tuple:
+    calls = []
+    engine = DetectionEngine(_registry(calls, fire))
+
+    async def scenario():
+        ctx = SimpleNamespace(features=set())
+        verdict = await engine.run(None, ctx)
+        await asyncio.sleep(0)  # Let background recording finish
+        return verdict
+
+    return asyncio.run(scenario()), calls, engine
+
+
+def test_detectors_run_cheapest_first_then_recorders():
+    verdict, calls, engine = _check(fire=set())
+
+    assert verdict is None
+    assert calls == [
+        "cheap_b", "cheap_a", "memory", "provide:lookup", "network",
+        "record:history", "record:lookups:resolved",
+    ]
+    assert [d["name"] for d in engine.describe()] == ["cheap_b", "cheap_a", "memory", "network"]
+
+
+def test_first_hit_short_circuits_but_still_records():
+    verdict, calls, engine = _check(fire={"cheap_a", "memory"})
+
+    assert verdict == "cheap_a"
+    # No dearer detector runs, but the recorders (and the feature one of
+    # them needs) still see the message
+    assert calls == ["cheap_b", "cheap_a", "record:history", "provide:lookup", "record:lookups:resolved"]
+
+    stats = engine.get_stats()
+    assert "memory" not in stats and "network" not in stats
+    assert stats["cheap_a"]["hits"] == 1
+    assert stats["recorder:lookups"]["calls"] == 1
+    assert stats["feature:lookup"]["calls"] == 1
+
+
+def test_verdict_uses_the_registered_spam_type():
+    verdict, _, _ = _check(fire={"cheap_b"})
+    assert verdict == "cheap"
+
+
+def test_feature_is_provided_once_per_message():
+    _, calls, _ = _check(fire={"network"})
+    assert calls.count("provide:lookup") == 1
+
+
+def test_duplicate_names_are_rejected():
+    registry = DetectorRegistry()
+    registry.detector("x", CostClass.CHEAP)(lambda service, ctx: False)
+
+    with pytest.raises(ValueError):
+        registry.detector("x", CostClass.MEMORY)(lambda service, ctx: False)
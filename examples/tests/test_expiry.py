@@ -0,0 +1,86 @@
+"""
+AzabBot - Expiring LRU Tests
+============================
+
+Touch-order expiry, the size cap, amortized expiry on insert, and
+get() not refreshing deadlines.
+
+Author: حَـــــنَّـــــا
+Server: discord.gg/syria
+"""
+
+from src.services.antispam import expiry
+from src.services.antispam.expiry import EXPIRE_ON_INSERT, ExpiringLRU
+
+
+class FakeClock:
+    """Stands in for the time module inside expiry."""
+
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+def _lru(monkeypatch, ttl: float = 60, max_entries: int = 100):
+    clock = FakeClock()
+    monkeypatch.setattr(expiry, "time", clock)
+    return ExpiringLRU(ttl, max_entries, list), clock
+
+
+def test_missing_key_is_created_like_defaultdict(monkeypatch):
+    lru, _ = _lru(monkeypatch)
+
+    lru[1].append("a")
+    lru[1].append("b")
+
+    assert lru.get(1) == ["a", "b"]
+    assert lru.get(2) is None and 2 not in lru
+
+
+def test_expire_drops_only_idle_entries(monkeypatch):
+    lru, clock = _lru(monkeypatch)
+    lru[1], lru[2], lru[3]
+
+    clock.now += 40
+    lru[1]  # Touch refreshes the deadline
+    clock.now += 30
+
+    assert lru.expire() == 2
+    assert list(lru) == [1]
+    assert lru.get_stats() == {"entries": 1, "expired": 2, "evicted": 0}
+
+
+def test_get_does_not_refresh(monkeypatch):
+    lru, clock = _lru(monkeypatch)
+    lru[1]
+
+    clock.now += 40
+    lru.get(1)
+    clock.now += 30
+
+    assert lru.expire() == 1
+
+
+def test_size_cap_evicts_least_recently_used(monkeypatch):
+    lru, _ = _lru(monkeypatch, max_entries=3)
+    lru[1], lru[2], lru[3]
+    lru[1]
+
+    lru[4]
+
+    assert list(lru) == [3, 1, 4]
+    assert lru.evicted == 1
+
+
+def test_insert_reclaims_a_bounded_number_of_stale_entries(monkeypatch):
+    lru, clock = _lru(monkeypatch)
+    for key in range(EXPIRE_ON_INSERT * 2):
+        lru[key]
+
+    clock.now += 61
+    lru["new"]
+
+    assert len(lru) == EXPIRE_ON_INSERT + 1
+    assert lru.expired == EXPIRE_ON_INSERT
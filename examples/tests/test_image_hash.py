@@ -0,0 +1,69 @@
+"""
+AzabBot - Perceptual Image Hash Tests
+=====================================
+
+Near-duplicate lookup, blank-image filtering, and the meme case: one
+image shared by established members vs. by a wave of new accounts.
+
+Author: حَـــــنَّـــــا
+Server: discord.gg/syria
+"""
+
+from datetime import datetime, timedelta
+
+from src.services.antispam.image_hash import (
+    PHASH_CROSS_USER_ACCOUNTS,
+    PerceptualHashIndex,
+    is_near_constant,
+)
+
+
+MEME = 0x9A3C_55E1_0F72_B4D8
+OWN_LIMIT = 3
+T0 = datetime(2026, 1, 1, 12, 0)
+SINCE = T0 - timedelta(minutes=5)
+
+
+def _posted_by(users, value: int = MEME) -> PerceptualHashIndex:
+    index = PerceptualHashIndex()
+    for i, user_id in enumerate(users):
+        index.add(value, user_id, T0 + timedelta(seconds=i))
+    return index
+
+
+def test_near_identical_copy_matches():
+    index = _posted_by([1])
+    recompressed = MEME ^ 0b1011  # 3 bits off
+
+    assert [uid for uid, _ in index.query(recompressed, SINCE)] == [1]
+    assert index.query(MEME ^ 0xFF, SINCE) == []  # 8 bits off
+    assert index.query(MEME, T0 + timedelta(minutes=1)) == []  # Too old
+
+
+def test_blank_and_solid_images_are_near_constant():
+    assert is_near_constant(0)
+    assert is_near_constant((1 << 64) - 1)
+    assert is_near_constant(0b101)
+    assert not is_near_constant(MEME)
+
+
+def test_meme_shared_by_established_members_is_not_spam():
+    others = list(range(1, PHASH_CROSS_USER_ACCOUNTS + 5))
+    index = _posted_by(others)
+
+    assert index.find_duplicate(MEME, 100, SINCE, OWN_LIMIT, cross_user=False) is None
+
+
+def test_meme_from_new_account_wave_is_spam():
+    index = _posted_by(range(1, PHASH_CROSS_USER_ACCOUNTS))
+
+    found = index.find_duplicate(MEME, 100, SINCE, OWN_LIMIT, cross_user=True)
+
+    assert found == (PHASH_CROSS_USER_ACCOUNTS, PHASH_CROSS_USER_ACCOUNTS)
+
+
+def test_same_user_repeating_an_image_is_spam_either_way():
+    index = _posted_by([7] * (OWN_LIMIT - 1))
+
+    assert index.find_duplicate(MEME, 7, SINCE, OWN_LIMIT, cross_user=False) == (1, OWN_LIMIT)
+    assert index.find_duplicate(MEME, 8, SINCE, OWN_LIMIT, cross_user=False) is None
@@ -0,0 +1,153 @@
+"""
+AzabBot - Invite Resolver Tests
+===============================
+
+Cache hits/misses, negative and error entries, TTL expiry and
+single-flight lookups, against a stubbed fetch_invite.
+
+Author: حَـــــنَّـــــا
+Server: discord.gg/syria
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+import discord
+
+from src.services.antispam import invite_cache
+from src.services.antispam.invite_cache import INVITE_CACHE_TTL, INVITE_NEGATIVE_TTL, InviteResolver
+
+
+class FakeClock:
+    """Stands in for the time module inside invite_cache."""
+
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+class FakeBot:
+    """fetch_invite stub: "gone" is NotFound, "flaky" is an API error."""
+
+    def __init__(self) -> None:
+        self.calls = []
+        self.gate = None  # asyncio.Event holding fetches until set
+
+    async def fetch_invite(self, code, with_counts=False):
+        self.calls.append(code)
+        if self.gate is not None:
+            await self.gate.wait()
+        response = SimpleNamespace(status=404 if code == "gone" else 500, reason="")
+        if code == "gone":
+            raise discord.NotFound(response, "Unknown Invite")
+        if code == "flaky":
+            raise discord.HTTPException(response, "Internal Server Error")
+        return SimpleNamespace(
+            guild=SimpleNamespace(id=42, name="Other Server"),
+            channel=SimpleNamespace(name="welcome"),
+        )
+
+
+def _run(coro):
+    return asyncio.run(coro)
+
+
+def test_second_lookup_is_a_cache_hit():
+    bot = FakeBot()
+
+    async def scenario():
+        resolver = InviteResolver(bot)
+        first = await resolver.resolve("abc")
+        second = await resolver.resolve("abc")
+        return resolver, first, second
+
+    resolver, first, second = _run(scenario())
+
+    assert first is second
+    assert first.found and first.guild_id == 42 and first.channel_name == "welcome"
+    assert bot.calls == ["abc"]
+    stats = resolver.get_stats()
+    assert (stats["hits"], stats["misses"], stats["api_calls"]) == (1, 1, 1)
+
+
+def test_not_found_is_cached_but_api_errors_are_not():
+    bot = FakeBot()
+
+    async def scenario():
+        resolver = InviteResolver(bot)
+        gone = [await resolver.resolve("gone") for _ in range(2)]
+        flaky = [await resolver.resolve("flaky") for _ in range(2)]
+        return resolver, gone, flaky
+
+    resolver, gone, flaky = _run(scenario())
+
+    assert not gone[0].found and gone[0] is gone[1]
+    assert flaky == [None, None]
+    assert bot.calls == ["gone", "flaky", "flaky"]
+    assert resolver.get_stats()["api_errors"] == 2
+
+
+def test_entries_expire_after_their_ttl(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(invite_cache, "time", clock)
+    bot = FakeBot()
+
+    async def scenario():
+        resolver = InviteResolver(bot)
+        await resolver.resolve("abc")
+        await resolver.resolve("gone")
+
+        clock.now += INVITE_NEGATIVE_TTL - 1
+        await resolver.resolve("abc")
+        await resolver.resolve("gone")
+        assert bot.calls == ["abc", "gone"]
+
+        clock.now += 1
+        await resolver.resolve("gone")
+        assert bot.calls == ["abc", "gone", "gone"]
+
+        clock.now += INVITE_CACHE_TTL
+        assert resolver.prune() == 2
+        await resolver.resolve("abc")
+        assert bot.calls == ["abc", "gone", "gone", "abc"]
+
+    _run(scenario())
+
+
+def test_concurrent_lookups_share_one_fetch():
+    bot = FakeBot()
+
+    async def scenario():
+        bot.gate = asyncio.Event()
+        resolver = InviteResolver(bot)
+        lookups = [asyncio.ensure_future(resolver.resolve("abc")) for _ in range(10)]
+        await asyncio.sleep(0)
+
+        # A caller giving up must not cancel the lookup for the others
+        lookups[0].cancel()
+        bot.gate.set()
+        results = await asyncio.gather(*lookups[1:])
+        return resolver, results
+
+    resolver, results = _run(scenario())
+
+    assert bot.calls == ["abc"]
+    assert all(r is results[0] and r.found for r in results)
+    stats = resolver.get_stats()
+    assert (stats["misses"], stats["coalesced"], stats["inflight"]) == (1, 9, 0)
+    assert resolver.api_calls_saved == 9
+
+
+def test_resolve_many_dedupes_codes():
+    bot = FakeBot()
+
+    async def scenario():
+        return await InviteResolver(bot).resolve_many(["abc", "gone", "abc", "flaky"])
+
+    results = _run(scenario())
+
+    assert list(results) == ["abc", "gone", "flaky"]
+    assert results["abc"].found and not results["gone"].found and results["flaky"] is None
+    assert sorted(bot.calls) == ["abc", "flaky", "gone"]
@@ -0,0 +1,101 @@
+"""
+AzabBot - Streaming Raid Detector Tests
+=======================================
+
+Windowed join rates, name skeletons, avatar/name clusters with their
+straggler signals, and cluster expiry.
+
+Author: حَـــــنَّـــــا
+Server: discord.gg/syria
+"""
+
+from datetime import datetime, timedelta
+from typing import Optional
+
+from src.services.antispam.join_stream import (
+    CLUSTER_THRESHOLDS,
+    CLUSTER_WINDOW,
+    RATE_THRESHOLDS,
+    StreamingRaidDetector,
+    WindowedCounter,
+    name_skeleton,
+)
+from src.services.antispam.models import JoinRecord
+
+START = datetime(2026, 1, 1, 12, 0, 0)
+
+
+def _join(user_id: int, seconds: float, username: str = "", avatar: Optional[str] = None, age_days: int = 400) -> JoinRecord:
+    joined = START + timedelta(seconds=seconds)
+    return JoinRecord(
+        user_id=user_id,
+        username=username,
+        display_name="",
+        account_created=joined - timedelta(days=age_days, hours=user_id),
+        has_default_avatar=avatar is None,
+        avatar_hash=avatar,
+        join_time=joined,
+    )
+
+
+def test_windowed_counter_slides_each_window():
+    counter = WindowedCounter((10, 60))
+    for second in range(30):
+        counter.add(second)
+
+    assert counter.counts(29) == {10: 10, 60: 30}
+    assert counter.counts(65) == {10: 0, 60: 24}
+    assert counter.counts(500) == {10: 0, 60: 0}
+
+
+def test_name_skeleton_folds_lookalikes_and_digits():
+    assert name_skeleton("Fr3e_Nitr0.99") == name_skeleton("frenitr")
+    assert name_skeleton("ѕраm_bot") == "spambot"
+    assert name_skeleton("Ámélie") == "amelie"
+
+
+def test_rate_alert_fires_once_per_burst():
+    detector = StreamingRaidDetector()
+    threshold = RATE_THRESHOLDS[10]
+
+    signals = [s for i in range(threshold * 2) for s in detector.observe(_join(i, i * 0.1))]
+
+    rate = [s for s in signals if s.reason == "rate:10s"]
+    assert len(rate) == 1
+    assert rate[0].count == threshold and rate[0].user_ids == ()
+
+
+def test_avatar_cluster_flags_members_then_stragglers():
+    detector = StreamingRaidDetector()
+    threshold = CLUSTER_THRESHOLDS["avatar"]
+
+    signals = [
+        detector.observe(_join(i, i * 20, avatar="a1b2c3"))
+        for i in range(threshold + 1)
+    ]
+
+    assert all(not s for s in signals[:threshold - 1])
+    first = [s for s in signals[threshold - 1] if s.reason == "avatar"][0]
+    assert first.first and first.user_ids == tuple(range(threshold))
+    straggler = [s for s in signals[threshold] if s.reason == "avatar"][0]
+    assert not straggler.first and straggler.user_ids == (threshold,)
+
+
+def test_template_names_cluster_across_lookalikes():
+    detector = StreamingRaidDetector()
+    names = ["raidbot01", "RAIDBOT_77", "rаidbot.3", "raid-bot9", "R.a.i.d.b.o.t"]
+
+    signals = [s for i, name in enumerate(names) for s in detector.observe(_join(i, i * 10, username=name))]
+
+    assert [s.key for s in signals if s.first] == ["name:raidbot"]
+
+
+def test_idle_clusters_expire():
+    detector = StreamingRaidDetector()
+    for i in range(CLUSTER_THRESHOLDS["avatar"] - 1):
+        detector.observe(_join(i, i, avatar="a1b2c3"))
+
+    late = detector.observe(_join(99, CLUSTER_WINDOW * 3, avatar="a1b2c3"))
+
+    assert late == []
+    assert detector.get_stats(START + timedelta(seconds=CLUSTER_WINDOW * 3))["clusters"] == 1
@@ -0,0 +1,137 @@
+"""
+AzabBot - Content Moderation Gateway Tests
+==========================================
+
+Verdict caching, micro-batching, coalescing, fallback and cancellation,
+offline against LocalClassifier.
+
+Author: حَـــــنَّـــــا
+Server: discord.gg/syria
+"""
+
+import asyncio
+
+from src.services.antispam.moderation import LocalClassifier, ModerationGateway
+
+
+TERMS = {"insult": ["stupid", "غبي"], "threat": ["i will find you"]}
+
+
+class FailingClassifier(LocalClassifier):
+    """Backend that is always down."""
+
+    name = "failing"
+
+    async def classify_batch(self, texts):
+        self.requests += 1
+        raise ConnectionError("backend down")
+
+
+def _run(coro):
+    return asyncio.run(coro)
+
+
+def test_repeated_text_is_served_from_cache():
+    classifier = LocalClassifier(TERMS)
+
+    async def scenario():
+        gateway = ModerationGateway(classifier, batch_window=0.01)
+        first = await gateway.classify("you are STUPID")
+        # Same text after normalization (case, whitespace, elongation)
+        second = await gateway.classify("you   are stuuuupid")
+        return gateway, first, second
+
+    gateway, first, second = _run(scenario())
+
+    assert first.flagged and first.category == "insult" and first.source == "local"
+    assert second.flagged and second.source == "cache"
+    assert classifier.requests == 1
+    assert gateway.get_stats()["cache_hit_rate"] == 0.5
+
+
+def test_texts_in_one_window_share_a_request():
+    classifier = LocalClassifier(TERMS)
+
+    async def scenario():
+        gateway = ModerationGateway(classifier, batch_window=0.05)
+        texts = [f"hello number {i}" for i in range(8)] + ["غبي", "غبي", "i will find you"]
+        return gateway, await asyncio.gather(*(gateway.classify(t) for t in texts))
+
+    gateway, verdicts = _run(scenario())
+
+    assert classifier.requests == 1
+    assert [v.flagged for v in verdicts] == [False] * 8 + [True, True, True]
+    assert verdicts[-1].category == "threat"
+    stats = gateway.get_stats()
+    assert stats["coalesced"] == 1
+    assert stats["avg_batch"] == 10
+
+
+def test_full_batch_flushes_before_the_window():
+    classifier = LocalClassifier(TERMS)
+
+    async def scenario():
+        gateway = ModerationGateway(classifier, batch_window=60, batch_max_size=4)
+        texts = [f"message {i}" for i in range(4)]
+        return await asyncio.wait_for(asyncio.gather(*(gateway.classify(t) for t in texts)), timeout=1)
+
+    assert len(_run(scenario())) == 4
+    assert classifier.requests == 1
+
+
+def test_outage_falls_back_without_caching():
+    primary = FailingClassifier()
+    fallback = LocalClassifier(TERMS)
+
+    async def scenario():
+        gateway = ModerationGateway(primary, fallback=fallback, batch_window=0.01)
+        first = await gateway.classify("stupid")
+        second = await gateway.classify("stupid")
+        return gateway, first, second
+
+    gateway, first, second = _run(scenario())
+
+    assert first.flagged and first.source == "local"
+    assert second.source == "local"  # Fallback verdicts are not cached
+    assert primary.requests == 2
+    assert gateway.get_stats()["failures"] == 2
+
+
+def test_cancelled_batch_resolves_waiters():
+    classifier = LocalClassifier(TERMS, latency=30)
+
+    async def scenario():
+        gateway = ModerationGateway(classifier, batch_window=0)
+        waiter = asyncio.ensure_future(gateway.classify("stupid"))
+        while not gateway._batch_tasks:
+            await asyncio.sleep(0.01)
+        for task in list(gateway._batch_tasks):
+            task.cancel()
+        verdict = await asyncio.wait_for(waiter, timeout=1)
+        await asyncio.sleep(0)
+        return gateway, verdict
+
+    gateway, verdict = _run(scenario())
+
+    assert verdict is None
+    assert not gateway._inflight and not gateway._batch_tasks
+    assert len(gateway.cache) == 0
+
+
+def test_cancelled_caller_does_not_cancel_the_batch():
+    classifier = LocalClassifier(TERMS, latency=0.05)
+
+    async def scenario():
+        gateway = ModerationGateway(classifier, batch_window=0.01)
+        impatient = asyncio.ensure_future(gateway.classify("stupid"))
+        patient = asyncio.ensure_future(gateway.classify("stupid"))
+        await asyncio.sleep(0.02)
+        impatient.cancel()
+        verdict = await patient
+        await gateway.stop()
+        return gateway, verdict
+
+    gateway, verdict = _run(scenario())
+
+    assert verdict.flagged
+    assert len(gateway.cache) == 1
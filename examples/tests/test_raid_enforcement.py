@@ -0,0 +1,165 @@
+"""
+AzabBot - Raid Enforcement Tests
+================================
+
+Per-session wind-down, lazy cases with their DMs, and bulk deletes kept
+apart by kind (raid vs webhook spam), against stubbed Discord objects.
+
+Author: حَـــــنَّـــــا
+Server: discord.gg/syria
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+from src.services.antispam import raid_enforcement
+from src.services.antispam.handlers import WEBHOOK_BULK_DELETE
+from src.services.antispam.raid_enforcement import RAID_BULK_DELETE, RaidEnforcementMixin
+
+
+class StubChannel:
+    def __init__(self, channel_id: int, guild) -> None:
+        self.id = channel_id
+        self.name = f"chan{channel_id}"
+        self.guild = guild
+        self.bulk_deletes = []
+
+    async def delete_messages(self, messages, reason=None) -> None:
+        self.bulk_deletes.append(([m.id for m in messages], reason))
+
+
+class StubMember:
+    def __init__(self, member_id: int, guild, gate: asyncio.Event = None) -> None:
+        self.id = member_id
+        self.guild = guild
+        self.gate = gate  # add_roles blocks until set
+
+    async def add_roles(self, role, reason=None) -> None:
+        if self.gate is not None:
+            await self.gate.wait()
+
+
+class RaidHost(RaidEnforcementMixin):
+    """Raid pipeline with the case log, DMs and the DB recorded in memory."""
+
+    def __init__(self) -> None:
+        self.config = SimpleNamespace(muted_role_id=5)
+        self.db = SimpleNamespace(add_mute=lambda **kw: 1234.0, log_moderation_action=lambda **kw: None)
+        self.bot = SimpleNamespace(user=SimpleNamespace(id=1), logging_service=None)
+        self.events = []
+        self._init_raid_enforcement()
+
+    async def _open_spam_case(self, member, spam_type, duration, violation_count, content) -> None:
+        self.events.append(("case", member.id))
+
+    async def _send_mute_dm(self, member, spam_type, violation_count, duration_str, expires_at) -> bool:
+        self.events.append(("dm", member.id, duration_str, expires_at))
+        return True
+
+
+def _guild(guild_id: int):
+    return SimpleNamespace(id=guild_id, name=f"guild{guild_id}", get_role=lambda role_id: object())
+
+
+def _message(message_id: int, author, channel):
+    return SimpleNamespace(id=message_id, author=author, channel=channel, guild=channel.guild, content="spam")
+
+
+def _fast_raids(monkeypatch) -> list:
+    snipes = []
+
+    async def block_from_snipe(message_id, reason, user_id, channel_name=None) -> None:
+        snipes.append((message_id, reason))
+
+    monkeypatch.setattr(raid_enforcement, "block_from_snipe", block_from_snipe)
+    monkeypatch.setattr(raid_enforcement, "RAID_MODE_OFFENDERS", 1)
+    monkeypatch.setattr(raid_enforcement, "RAID_DELETE_BATCH_DELAY", 0.01)
+    monkeypatch.setattr(raid_enforcement, "RAID_MODE_QUIET_PERIOD", 0.05)
+    monkeypatch.setattr(raid_enforcement, "RAID_SUMMARY_INTERVAL", 0.01)
+    monkeypatch.setattr(raid_enforcement, "RAID_CASE_SPACING", 0)
+    return snipes
+
+
+def _run(coro):
+    return asyncio.run(coro)
+
+
+def test_raid_winds_down_without_waiting_on_other_guilds(monkeypatch):
+    _fast_raids(monkeypatch)
+
+    async def scenario():
+        host = RaidHost()
+        stuck = asyncio.Event()
+        quiet, busy = _guild(1), _guild(2)
+        quiet_channel, busy_channel = StubChannel(10, quiet), StubChannel(20, busy)
+
+        # Guild 2's mute hangs on a rate limit (holding one worker); guild 1's
+        # go through the other worker
+        host._raid_mode_active(busy.id, 200)
+        await host._enforce_raid_spam(_message(2000, StubMember(200, busy, gate=stuck), busy_channel), "Flood", 3, 600)
+        for i in range(3):
+            host._raid_mode_active(quiet.id, 100 + i)
+            await host._enforce_raid_spam(_message(1000 + i, StubMember(100 + i, quiet), quiet_channel), "Flood", 3, 600)
+
+        await asyncio.sleep(0.3)
+        finished = list(host.events)
+        busy_session = host._raid_sessions.get(busy.id)
+        stuck.set()
+        await asyncio.sleep(0.1)
+        return host, finished, busy_session
+
+    host, finished, busy_session = _run(scenario())
+
+    assert [e[:2] for e in finished] == [
+        ("case", 100), ("dm", 100), ("case", 101), ("dm", 101), ("case", 102), ("dm", 102),
+    ]
+    assert finished[1][2:] == ("10m", 1234.0)
+    assert busy_session is None  # Detached, still waiting on its own mutes
+    assert {e[1] for e in host.events if e[0] == "dm"} == {100, 101, 102, 200}
+
+
+def test_unmuted_offenders_get_a_case_but_no_dm(monkeypatch):
+    _fast_raids(monkeypatch)
+
+    async def scenario():
+        host = RaidHost()
+        guild = _guild(1)
+        guild.get_role = lambda role_id: None  # Muted role deleted mid-raid
+        channel = StubChannel(10, guild)
+        host._raid_mode_active(guild.id, 100)
+        await host._enforce_raid_spam(_message(1000, StubMember(100, guild), channel), "Flood", 3, 600)
+        await asyncio.sleep(0.2)
+        return host
+
+    assert _run(scenario()).events == [("case", 100)]
+
+
+def test_webhook_and_raid_deletes_are_batched_and_labelled_apart(monkeypatch):
+    snipes = _fast_raids(monkeypatch)
+
+    async def scenario():
+        host = RaidHost()
+        guild = _guild(1)
+        channel = StubChannel(10, guild)
+        member = StubMember(100, guild)
+
+        host._raid_mode_active(guild.id, member.id)
+        await host._enforce_raid_spam(_message(1, member, channel), "Flood", 1, 0)
+        session = host._raid_sessions[guild.id]
+        for message_id in range(2, 2 + raid_enforcement.RAID_DELETE_CHUNK + 5):
+            host._queue_bulk_delete(_message(message_id, member, channel), WEBHOOK_BULK_DELETE)
+
+        await asyncio.sleep(0.05)
+        return host, channel, session
+
+    host, channel, session = _run(scenario())
+
+    reasons = sorted((len(ids), reason) for ids, reason in channel.bulk_deletes)
+    assert reasons == [
+        (1, "Anti-spam: raid spam"),
+        (5, "Anti-spam: webhook spam"),
+        (raid_enforcement.RAID_DELETE_CHUNK, "Anti-spam: webhook spam"),
+    ]
+    assert snipes.count((1, RAID_BULK_DELETE.reason)) == 1
+    assert sum(1 for _, reason in snipes if reason == WEBHOOK_BULK_DELETE.reason) == 105
+    assert session.deleted == 1  # Webhook spam isn't part of the raid summary
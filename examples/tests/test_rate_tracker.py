@@ -0,0 +1,58 @@
+"""
+AzabBot - Channel Rate Tracker Tests
+====================================
+
+EWMA rate, hot/cool hysteresis, and staying hot for the caller's cooldown.
+
+Author: حَـــــنَّـــــا
+Server: discord.gg/syria
+"""
+
+from src.services.antispam.rate_tracker import (
+    SLOWMODE_RELEASE_RATIO,
+    SLOWMODE_TRIGGER_RATE,
+    ChannelRateTracker,
+)
+
+
+def _flood(tracker: ChannelRateTracker, start: float, seconds: float, rate: float) -> list:
+    """Record `rate` msgs/sec for `seconds`; returns record()'s results."""
+    step = 1.0 / rate
+    return [tracker.record(1, 9, now=start + i * step) for i in range(int(seconds * rate))]
+
+
+def test_channel_turns_hot_at_the_trigger_rate():
+    tracker = ChannelRateTracker()
+
+    calm = _flood(tracker, 0, 60, SLOWMODE_TRIGGER_RATE * 0.5)
+    assert not any(calm)
+
+    flood = _flood(tracker, 60, 60, SLOWMODE_TRIGGER_RATE * 3)
+    assert flood[-1]
+    assert tracker.get_rates(guild_id=9)[0][2] is True
+
+
+def test_hot_channel_keeps_reporting_hot_until_released():
+    tracker = ChannelRateTracker()
+    flood = _flood(tracker, 0, 60, SLOWMODE_TRIGGER_RATE * 3)
+    first_hot = flood.index(True)
+
+    # Every message after the transition still reports hot, so a caller
+    # whose cooldown ends mid-flood can apply slowmode again
+    assert all(flood[first_hot:])
+
+    # Hovering between release and trigger rate stays hot (no flapping)
+    hover = _flood(tracker, 60, 120, SLOWMODE_TRIGGER_RATE * (1 + SLOWMODE_RELEASE_RATIO) / 2)
+    assert all(hover)
+
+    # Dropping well below the release rate cools it down
+    assert not _flood(tracker, 180, 120, SLOWMODE_TRIGGER_RATE * SLOWMODE_RELEASE_RATIO * 0.2)[-1]
+
+
+def test_prune_forgets_idle_channels():
+    tracker = ChannelRateTracker()
+    tracker.record(1, 9, now=0)
+    tracker.record(2, 9)
+
+    assert tracker.prune() == 1
+    assert len(tracker) == 1
@@ -0,0 +1,116 @@
+"""
+AzabBot - Reputation Tests
+==========================
+
+Pending deltas flushed through the real upsert, and decayed read-back.
+
+Author: حَـــــنَّـــــا
+Server: discord.gg/syria
+"""
+
+import asyncio
+
+from src.core.database.reputation import ReputationMixin as ReputationDBMixin, reputation_decay
+from src.services.antispam.reputation import REPUTATION_HALF_LIFE, ReputationMixin
+
+from tests.fakes import SQLiteTestDB
+
+
+USER_REPUTATION_DDL = """
+    CREATE TABLE user_reputation (
+        user_id INTEGER NOT NULL,
+        guild_id INTEGER NOT NULL,
+        score REAL NOT NULL DEFAULT 0,
+        updated_at REAL NOT NULL,
+        PRIMARY KEY (user_id, guild_id)
+    )
+"""
+
+
+class ReputationDB(ReputationDBMixin, SQLiteTestDB):
+    def __init__(self) -> None:
+        super().__init__(USER_REPUTATION_DDL)
+        self.conn.create_function("reputation_decay", 4, reputation_decay, deterministic=True)
+        self.fail_writes = False
+
+    def apply_reputation_deltas(self, deltas, half_life):
+        if self.fail_writes:
+            raise OSError("disk I/O error")
+        return super().apply_reputation_deltas(deltas, half_life)
+
+    def age(self, seconds: float) -> None:
+        """Pretend every stored score was written `seconds` earlier."""
+        self.conn.execute("UPDATE user_reputation SET updated_at = updated_at - ?", (seconds,))
+        self.conn.commit()
+
+
+class Reputation(ReputationMixin):
+    def __init__(self, db: ReputationDB) -> None:
+        self.db = db
+        self._init_reputation()
+
+
+def _run(coro):
+    return asyncio.run(coro)
+
+
+def _close(a: float, b: float) -> bool:
+    return abs(a - b) < 0.01
+
+
+def test_updates_queue_deltas_without_reading():
+    db = ReputationDB()
+    reputation = Reputation(db)
+
+    reputation.update_reputation(1, 9, -20)
+    reputation.update_reputation(1, 9, 5)
+    reputation.update_reputation(2, 9, 3)
+
+    stats = reputation.get_reputation_stats()
+    assert (stats["loads"], stats["pending"]) == (0, 2)
+    assert _run(reputation.flush_reputation()) == 2
+    assert _close(db.get_user_reputation(1, 9)[0], -15)
+    assert _close(db.get_user_reputation(2, 9)[0], 3)
+
+
+def test_flush_decays_stored_scores_before_adding_deltas():
+    db = ReputationDB()
+    writer = Reputation(db)
+    writer.update_reputation(1, 9, -20)
+    _run(writer.flush_reputation())
+
+    db.age(REPUTATION_HALF_LIFE)
+    writer.update_reputation(1, 9, 5)
+    _run(writer.flush_reputation())
+
+    assert _close(db.get_user_reputation(1, 9)[0], -5)  # -20 halved, then +5
+
+
+def test_fresh_reader_sees_decayed_score():
+    db = ReputationDB()
+    writer = Reputation(db)
+    writer.update_reputation(1, 9, 40)
+    _run(writer.flush_reputation())
+    db.age(2 * REPUTATION_HALF_LIFE)
+
+    reader = Reputation(db)
+    score = _run(reader._get_reputation(1, 9))
+    multiplier = _run(reader.get_reputation_multiplier(1, 9))
+
+    assert _close(score, 10)
+    assert 1.0 < multiplier < 1.5
+    assert _run(reader.get_reputation_multiplier(5, 9)) == 1.0  # No row: neutral
+
+
+def test_failed_flush_keeps_deltas_for_the_next_one():
+    db = ReputationDB()
+    reputation = Reputation(db)
+    reputation.update_reputation(1, 9, -20)
+
+    db.fail_writes = True
+    assert _run(reputation.flush_reputation()) == 0
+    reputation.update_reputation(1, 9, -5)
+
+    db.fail_writes = False
+    assert _run(reputation.flush_reputation()) == 1
+    assert _close(db.get_user_reputation(1, 9)[0], -25)
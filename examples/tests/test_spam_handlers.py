@@ -0,0 +1,184 @@
+"""
+AzabBot - Spam Handler Tests
+============================
+
+Auto-mute's critical section and concurrent fan-out, and webhook spam
+removing the webhook once while its messages are bulk-deleted.
+
+Author: حَـــــنَّـــــا
+Server: discord.gg/syria
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+import discord
+
+from src.services.antispam import handlers
+from src.services.antispam.handlers import WEBHOOK_ACTION_RETRY, WEBHOOK_BULK_DELETE, SpamHandlerMixin
+from src.services.antispam.models import WebhookState
+
+
+class StubMember:
+    def __init__(self, events: list, role_fails: bool = False) -> None:
+        self.id = 100
+        self.name = "spammer"
+        self.nick = None
+        self.guild = SimpleNamespace(id=1, name="guild", get_role=lambda role_id: object())
+        self.events = events
+        self.role_fails = role_fails
+
+    async def add_roles(self, role, reason=None) -> None:
+        if self.role_fails:
+            raise discord.Forbidden(SimpleNamespace(status=403, reason=""), "Missing Permissions")
+        self.events.append("role")
+
+
+class MuteHost(SpamHandlerMixin):
+    """Auto-mute with the case, notice and DM recorded in memory."""
+
+    def __init__(self, events: list) -> None:
+        self.config = SimpleNamespace(muted_role_id=5)
+        self.db = SimpleNamespace(
+            add_mute=lambda **kw: events.append("record") or 1234.0,
+            log_moderation_action=lambda **kw: events.append("audit"),
+        )
+        self.bot = SimpleNamespace(user=SimpleNamespace(id=1))
+        self.events = events
+        self.dm_sent = asyncio.Event()
+        self._init_spam_handlers()
+
+    async def _open_spam_case(self, member, spam_type, duration, violation_count, content):
+        # Only finishes if the DM runs alongside it, not after it
+        await asyncio.wait_for(self.dm_sent.wait(), timeout=1)
+        self.events.append("case")
+        return {"thread_id": 77}
+
+    async def _send_mute_notice(self, member, spam_type, channel, violation_count, duration_str, expires_at, case_info):
+        self.events.append(("notice", case_info["thread_id"]))
+
+    async def _send_mute_dm(self, member, spam_type, violation_count, duration_str, expires_at):
+        self.events.append("dm")
+        self.dm_sent.set()
+        return True
+
+
+class WebhookHost(SpamHandlerMixin):
+    """Webhook spam handling with fetch_webhook and the delete buffer stubbed."""
+
+    def __init__(self, fail: bool = False) -> None:
+        self.fail = fail
+        self.removals = 0
+        self.queued = []
+        self._webhook_states = {7: WebhookState()}
+        self.bot = SimpleNamespace(fetch_webhook=self._fetch_webhook, logging_service=None)
+
+    async def _fetch_webhook(self, webhook_id):
+        self.removals += 1
+        if self.fail:
+            raise discord.Forbidden(SimpleNamespace(status=403, reason=""), "Missing Permissions")
+        return SimpleNamespace(delete=self._delete)
+
+    async def _delete(self, reason=None) -> None:
+        pass
+
+    def _queue_bulk_delete(self, message, kind) -> None:
+        self.queued.append((message.id, kind))
+
+
+class FakeClock:
+    """Stands in for the time module inside handlers."""
+
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def perf_counter(self) -> float:
+        return self.now
+
+
+def _webhook_message(message_id: int):
+    return SimpleNamespace(id=message_id, webhook_id=7, content="spam", channel=SimpleNamespace(id=10, name="general"))
+
+
+def _run(coro):
+    return asyncio.run(coro)
+
+
+def test_role_and_record_land_before_the_fan_out(monkeypatch):
+    monkeypatch.setattr(handlers, "event_logger", SimpleNamespace(log_timeout=lambda **kw: None))
+    events = []
+
+    async def scenario():
+        host = MuteHost(events)
+        await host._apply_mute(StubMember(events), 600, "Message Flood", channel=None, violation_count=2)
+        return host
+
+    host = _run(scenario())
+
+    assert events[:2] == ["role", "record"]
+    assert events.index("dm") < events.index("case") < events.index(("notice", 77))
+    assert "audit" in events
+    stats = host.get_mute_timing_stats()
+    assert stats["mutes"] == 1
+    assert {"Add Role", "Mute Record", "Case + Notice", "DM User", "Fan-out"} <= set(stats["steps_ms"])
+
+
+def test_failed_role_skips_the_fan_out():
+    events = []
+
+    async def scenario():
+        host = MuteHost(events)
+        await host._apply_mute(StubMember(events, role_fails=True), 600, "Message Flood", channel=None, violation_count=2)
+        return host
+
+    host = _run(scenario())
+
+    assert events == []
+    assert host.get_mute_timing_stats()["mutes"] == 0
+
+
+def test_webhook_is_removed_once_and_later_messages_suppressed():
+    host = WebhookHost()
+
+    async def scenario():
+        for message_id in range(5):
+            await host.handle_webhook_spam(_webhook_message(message_id))
+
+    _run(scenario())
+
+    state = host._webhook_states[7]
+    assert host.removals == 1
+    assert state.removed and state.suppressed == 4
+    assert host.queued == [(i, WEBHOOK_BULK_DELETE) for i in range(5)]
+
+
+def test_failed_webhook_removal_is_retried_after_the_backoff(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(handlers, "time", clock)
+    host = WebhookHost(fail=True)
+
+    async def scenario():
+        await host.handle_webhook_spam(_webhook_message(1))
+        clock.now += WEBHOOK_ACTION_RETRY / 2
+        await host.handle_webhook_spam(_webhook_message(2))
+        clock.now += WEBHOOK_ACTION_RETRY
+        await host.handle_webhook_spam(_webhook_message(3))
+
+    _run(scenario())
+
+    state = host._webhook_states[7]
+    assert host.removals == 2
+    assert not state.removed and state.suppressed == 1
+    assert len(host.queued) == 3
+
+
+def test_webhook_ring_keeps_one_more_than_the_limit():
+    state = WebhookState()
+    for second in range(100):
+        state.times.append(float(second))
+
+    assert len(state.times) == state.times.maxlen
+    assert state.times[0] == 100 - state.times.maxlen
@@ -0,0 +1,57 @@
+"""
+AzabBot - Ticket Auto-Close Deadline Tests
+==========================================
+
+Ghost eligibility from index rows, the next auto-close deadline, and the
+periods quoted in close reasons.
+
+Author: حَـــــنَّـــــا
+Server: discord.gg/syria
+"""
+
+from src.services.tickets.auto_close import CLOSE_AFTER, CLOSE_NOTICE, WARN_AFTER, format_period, next_deadline
+from src.services.tickets.constants import GHOST_TICKET_CLOSE_SECONDS
+from src.services.tickets.ticket_index import IndexedTicket
+
+
+CREATED = 1_700_000_000.0
+
+
+def _entry(**row) -> IndexedTicket:
+    base = {
+        "ticket_id": "T0001", "thread_id": 1, "user_id": 2, "guild_id": 3, "status": "open",
+        "created_at": CREATED, "last_activity_at": CREATED,
+    }
+    return IndexedTicket.from_row({**base, **row})
+
+
+def test_new_silent_ticket_is_ghost_closed():
+    assert next_deadline(_entry()) == (CREATED + GHOST_TICKET_CLOSE_SECONDS, "ghost")
+
+
+def test_opener_activity_staff_reply_or_reopen_prevent_ghost_close():
+    for flags in ({"owner_active": 1}, {"staff_replied": 1}, {"reopened_at": CREATED + 60}):
+        entry = _entry(**flags)
+        assert not entry.ghost_eligible
+        assert next_deadline(entry) == (CREATED + WARN_AFTER, "warn")
+
+
+def test_claimed_ticket_is_not_ghost_closed():
+    assert next_deadline(_entry(status="claimed", claimed_by=9))[1] == "warn"
+
+
+def test_close_waits_for_activity_and_notice():
+    warned_at = CREATED + WARN_AFTER
+    entry = _entry(owner_active=1, warned_at=warned_at)
+    assert next_deadline(entry) == (max(CREATED + CLOSE_AFTER, warned_at + CLOSE_NOTICE), "close")
+
+    late_activity = _entry(owner_active=1, warned_at=warned_at, last_activity_at=warned_at + 10)
+    assert next_deadline(late_activity)[0] == warned_at + 10 + CLOSE_AFTER
+
+
+def test_close_reason_period_follows_the_setting():
+    assert format_period(3600) == "1 hour"
+    assert format_period(7200) == "2 hours"
+    assert format_period(5400) == "90 minutes"
+    assert format_period(2 * 86400) == "2 days"
+    assert format_period(45) == "45 seconds"
@@ -0,0 +1,118 @@
+"""
+AzabBot - Open Ticket Index Tests
+=================================
+
+Index load and lookups, the pre-load database fallback, in-memory
+activity, and batched activity flushes, against a stubbed database.
+
+Author: حَـــــنَّـــــا
+Server: discord.gg/syria
+"""
+
+import asyncio
+
+from src.services.tickets.ticket_index import TicketIndexMixin
+
+
+CREATED = 1_700_000_000.0
+
+
+def _row(ticket_id: str, thread_id: int, **extra) -> dict:
+    return {
+        "ticket_id": ticket_id, "thread_id": thread_id, "user_id": 2, "guild_id": 3, "status": "open",
+        "created_at": CREATED, "last_activity_at": CREATED, "owner_active": 0, **extra,
+    }
+
+
+class StubDB:
+    def __init__(self, rows: list) -> None:
+        self.rows = rows
+        self.lookups = 0
+        self.saved = []
+        self.fail = False
+
+    def get_open_tickets(self) -> list:
+        return list(self.rows)
+
+    def get_ticket_by_thread(self, thread_id: int):
+        self.lookups += 1
+        return next((r for r in self.rows if r["thread_id"] == thread_id), None)
+
+    def save_ticket_activity(self, batch: list) -> None:
+        if self.fail:
+            raise RuntimeError("database is locked")
+        self.saved.append(sorted(batch))
+
+
+class IndexHost(TicketIndexMixin):
+    def __init__(self, rows: list) -> None:
+        self.db = StubDB(rows)
+        self.scheduled = []
+        self._init_ticket_index()
+
+    def _schedule_ticket(self, entry) -> None:
+        self.scheduled.append(entry.ticket_id)
+
+
+def _run(coro):
+    return asyncio.run(coro)
+
+
+def test_loaded_index_answers_without_the_database():
+    host = IndexHost([_row("T1", 10), _row("T2", 20, status="claimed", claimed_by=9)])
+
+    assert _run(host.load_ticket_index()) == 2
+    assert host.get_open_ticket(20).claimed_by == 9
+    assert host.get_open_ticket(99) is None
+    assert host.db.lookups == 0
+    assert host.scheduled == ["T1", "T2"]
+
+
+def test_lookups_fall_back_to_the_database_until_loaded():
+    host = IndexHost([_row("T1", 10), _row("T2", 20, status="closed")])
+
+    assert host.get_open_ticket(10).ticket_id == "T1"
+    assert host.get_open_ticket(20) is None
+    assert host.get_open_ticket(10) is not None  # Indexed by the first fallback
+    assert host.db.lookups == 2
+
+
+def test_reindexing_a_moved_ticket_drops_the_old_channel():
+    host = IndexHost([_row("T1", 10)])
+    _run(host.load_ticket_index())
+
+    host._index_ticket(_row("T1", 11))
+    host._unindex_ticket("T2")
+
+    assert host.get_open_ticket(10) is None
+    assert host.get_open_ticket(11).ticket_id == "T1"
+
+
+def test_activity_is_kept_in_memory_and_flushed_in_one_batch():
+    host = IndexHost([_row("T1", 10, warned_at=CREATED + 5), _row("T2", 20)])
+    _run(host.load_ticket_index())
+    t1, t2 = host.get_open_ticket(10), host.get_open_ticket(20)
+
+    host._touch_ticket(t1, CREATED + 100, author_id=2)
+    host._touch_ticket(t1, CREATED + 50, author_id=7)  # Out of order, doesn't rewind
+    host._touch_ticket(t2, CREATED + 200, author_id=7)
+
+    assert not t1.warned and t1.owner_active and not t1.ghost_eligible
+    assert t1.last_activity == CREATED + 100
+    assert _run(host.flush_ticket_activity()) == 2
+    assert host.db.saved == [[("T1", CREATED + 100), ("T2", CREATED + 200)]]
+    assert _run(host.flush_ticket_activity()) == 0
+
+
+def test_failed_flush_keeps_the_newest_timestamps():
+    host = IndexHost([_row("T1", 10)])
+    _run(host.load_ticket_index())
+    entry = host.get_open_ticket(10)
+    host._touch_ticket(entry, CREATED + 100, author_id=2)
+    host.db.fail = True
+
+    assert _run(host.flush_ticket_activity()) == 0
+
+    host.db.fail = False
+    assert _run(host.flush_ticket_activity()) == 1
+    assert host.db.saved == [[("T1", CREATED + 100)]]
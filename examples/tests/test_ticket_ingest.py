@@ -0,0 +1,99 @@
+"""
+AzabBot - Ticket Message Ingestor Tests
+=======================================
+
+Batched writes, gap recording for failed batches and gap backfill.
+
+Author: حَـــــنَّـــــا
+Server: discord.gg/syria
+"""
+
+import asyncio
+
+from src.services.tickets.ingest import TicketMessageIngestor, delete_op, store_op
+
+from tests.fakes import FakeChannel, FakeTicketMessageDB, fake_message
+
+
+def _run(coro):
+    return asyncio.run(coro)
+
+
+def test_writes_are_batched_and_waiters_released():
+    db = FakeTicketMessageDB()
+
+    async def scenario():
+        ingestor = TicketMessageIngestor(db, max_queue=100, batch_size=50, batch_window=0.05)
+        ingestor.start()
+        for i in range(1, 21):
+            await ingestor.submit(store_op("T1", fake_message(i)))
+        assert await ingestor.wait_for_ticket("T1", timeout=2)
+        await ingestor.stop()
+        return ingestor.get_stats()
+
+    stats = _run(scenario())
+
+    assert sorted(db.rows) == list(range(1, 21))
+    assert stats["written"] == 20
+    assert len(db.batches) < 20
+
+
+def test_failed_batch_records_gap_per_ticket():
+    db = FakeTicketMessageDB()
+    db.fail_writes = 1
+
+    async def scenario():
+        ingestor = TicketMessageIngestor(db, max_queue=100, batch_size=50, batch_window=0.05)
+        ingestor.start()
+        for i in (5, 6, 9):
+            await ingestor.submit(store_op("T1", fake_message(i)))
+        await ingestor.submit(store_op("T2", fake_message(7)))
+        await ingestor.submit(delete_op("T2", 3))
+        assert await ingestor.wait_for_ticket("T1", timeout=2)
+        assert await ingestor.wait_for_ticket("T2", timeout=2)
+        await ingestor.stop()
+        return ingestor.get_stats()
+
+    stats = _run(scenario())
+
+    assert not db.rows
+    spans = {gap["ticket_id"]: (gap["after_id"], gap["before_id"]) for gap in db.gaps}
+    assert spans == {"T1": (4, 10), "T2": (2, 8)}
+    assert stats["failed"] == 5
+    assert stats["gaps_recorded"] == 2
+
+
+def test_backfill_restores_gap_and_forgets_it():
+    db = FakeTicketMessageDB()
+    messages = [fake_message(i) for i in range(1, 11)]
+    db.write_ticket_message_batch([store_op("T1", m).row for m in messages[:3]], [], [])
+    # Stored copy of 8 that Discord no longer has
+    db.write_ticket_message_batch([store_op("T1", fake_message(8)).row], [], [])
+    db.add_ticket_message_gaps([("T1", 3, None, "offline")])
+    channel = FakeChannel(m for m in messages if m.id != 8)
+
+    async def scenario():
+        ingestor = TicketMessageIngestor(db, max_queue=100, batch_size=50, batch_window=0.01)
+        ingestor.start()
+        fetched = await ingestor.backfill_gaps(channel, "T1")
+        await ingestor.stop()
+        return fetched, ingestor.get_stats()
+
+    fetched, stats = _run(scenario())
+
+    assert fetched == 6
+    assert [row["message_id"] for row in db.get_ticket_message_rows("T1")] == [1, 2, 3, 4, 5, 6, 7, 9, 10]
+    assert db.get_ticket_message_gaps("T1") == []
+    assert stats["gaps_backfilled"] == 1
+
+
+def test_backfill_without_gaps_reads_nothing():
+    db = FakeTicketMessageDB()
+    channel = FakeChannel([fake_message(1)])
+
+    async def scenario():
+        ingestor = TicketMessageIngestor(db)
+        return await ingestor.backfill_gaps(channel, "T1")
+
+    assert _run(scenario()) == 0
+    assert channel.requests == []
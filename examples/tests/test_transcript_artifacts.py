@@ -0,0 +1,89 @@
+"""
+AzabBot - Transcript Artifact Store Tests
+=========================================
+
+Render-once storage, encoding negotiation, revalidation and discard.
+
+Author: حَـــــنَّـــــا
+Server: discord.gg/syria
+"""
+
+import asyncio
+import gzip
+from types import SimpleNamespace
+
+from src.api.services.transcript_artifacts import (
+    REVALIDATE_CACHE_CONTROL,
+    TranscriptArtifactStore,
+)
+
+
+PAGE = b"<html>" + b"<div class='message'>hello</div>" * 200 + b"</html>"
+
+
+def _request(**headers):
+    return SimpleNamespace(headers=headers)
+
+
+def test_put_then_get_survives_a_fresh_store(tmp_path):
+    artifact = TranscriptArtifactStore(tmp_path).put("ticket-html", "T0001", PAGE)
+
+    reloaded = TranscriptArtifactStore(tmp_path).get("ticket-html", "T0001")
+
+    assert reloaded == artifact
+    assert "gzip" in artifact.encodings and "identity" in artifact.encodings
+
+
+def test_gzip_negotiated_and_revalidated_with_304(tmp_path):
+    store = TranscriptArtifactStore(tmp_path)
+    artifact = store.put("ticket-html", "T0001", PAGE)
+
+    response = store.respond(_request(**{"accept-encoding": "gzip"}), artifact)
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["cache-control"] == REVALIDATE_CACHE_CONTROL
+    assert gzip.decompress(response.body) == PAGE
+
+    etag = response.headers["etag"]
+    revalidated = store.respond(_request(**{"accept-encoding": "gzip", "if-none-match": etag}), artifact)
+    assert revalidated.status_code == 304
+    assert revalidated.body == b""
+    assert store.not_modified == 1
+
+
+def test_identity_when_client_accepts_no_compression(tmp_path):
+    store = TranscriptArtifactStore(tmp_path)
+    artifact = store.put("ticket-json", "T0001", b'{"messages": []}')
+
+    response = store.respond(_request(**{"accept-encoding": "gzip;q=0"}), artifact)
+
+    assert "content-encoding" not in response.headers
+    assert response.body == b'{"messages": []}'
+
+
+def test_concurrent_first_views_render_once(tmp_path):
+    store = TranscriptArtifactStore(tmp_path)
+    renders = []
+
+    async def render():
+        renders.append(1)
+        await asyncio.sleep(0.01)
+        return PAGE
+
+    async def views():
+        return await asyncio.gather(*[store.get_or_render("ticket-html", "T0001", render) for _ in range(5)])
+
+    artifacts = asyncio.run(views())
+
+    assert len(renders) == 1
+    assert len({a.sha256 for a in artifacts}) == 1
+
+
+def test_discard_forces_a_rerender(tmp_path):
+    store = TranscriptArtifactStore(tmp_path)
+    store.put("ticket-html", "T0001", PAGE)
+
+    assert store.discard("ticket-html", "T0001")
+    assert store.get("ticket-html", "T0001") is None
+    assert not (tmp_path / "ticket-html" / "T0001").exists()
+    assert not store.discard("ticket-html", "T0001")
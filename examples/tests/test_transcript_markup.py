@@ -0,0 +1,103 @@
+"""
+AzabBot - Transcript Markup Tests
+=================================
+
+MentionResolver / scan_mentions, and streamed vs whole-page HTML.
+
+Author: حَـــــنَّـــــا
+Server: discord.gg/syria
+"""
+
+import re
+
+from src.services.tickets.transcript.html_generator import generate_html_transcript, iter_html_transcript
+from src.services.tickets.transcript.mentions import MentionResolver, scan_mentions
+
+
+MENTION_MAP = {1001: "Hanna", 2001: "Mods <3", 3001: "general"}
+
+
+# =============================================================================
+# Mentions
+# =============================================================================
+
+def test_resolves_each_markup_kind():
+    resolve = MentionResolver(MENTION_MAP)
+
+    html = resolve("&lt;@1001&gt; &lt;@&amp;2001&gt; &lt;#3001&gt; &lt;a:wave:42&gt;")
+
+    assert '<span class="mention">@Hanna</span>' in html
+    assert '<span class="mention role">@Mods &lt;3</span>' in html
+    assert '<span class="mention channel">#general</span>' in html
+    assert 'src="https://cdn.discordapp.com/emojis/42.gif?size=48"' in html
+
+
+def test_unknown_targets_fall_back():
+    html = MentionResolver({})("&lt;@!9&gt; &lt;@&amp;9&gt; &lt;#9&gt;")
+
+    assert "@Unknown User" in html
+    assert "@deleted-role" in html
+    assert "#deleted-channel" in html
+
+
+def test_text_without_markup_is_returned_unchanged():
+    text = "no markup &amp; nothing to resolve"
+    assert MentionResolver(MENTION_MAP)(text) is text
+
+
+def test_invalid_timestamp_is_left_as_is():
+    token = "&lt;t:9999999999999&gt;"
+    assert MentionResolver({})(token) == token
+
+
+def test_relative_timestamp_renders_absolute_label_for_the_client():
+    resolve = MentionResolver({})
+
+    relative = resolve("&lt;t:1700000000:R&gt;")
+    absolute = resolve("&lt;t:1700000000:f&gt;")
+
+    assert 'data-unix="1700000000" data-relative' in relative
+    assert "ago" not in relative
+    assert relative.replace(" data-relative", "") == absolute
+    assert "data-relative" not in absolute
+
+
+def test_scan_mentions_splits_kinds():
+    users, roles, channels = scan_mentions(["<@1> <@!2> hi", "<@&3> in <#4>", "plain"])
+
+    assert users == {1, 2}
+    assert roles == {3}
+    assert channels == {4}
+
+
+# =============================================================================
+# HTML Streaming
+# =============================================================================
+
+def _messages(count: int):
+    return [
+        {
+            "id": i, "author": f"User {i % 3}", "avatar_url": "", "content": f"hello &lt;@1001&gt; {i}",
+            "timestamp": "Jan 01, 2025 12:00 PM", "attachments": [], "embeds": [],
+            "is_bot": False, "is_staff": i % 2 == 0,
+        }
+        for i in range(count)
+    ]
+
+
+def _without_render_time(page: str) -> str:
+    # The footer carries the render minute
+    return re.sub(r"Generated [^•]+•", "Generated •", page)
+
+
+def test_streamed_chunks_join_to_the_full_page():
+    ticket = {"ticket_id": "T0001", "created_at": 1_700_000_000, "category": "support",
+              "status": "closed", "subject": "Streaming", "user_id": 1}
+    messages = _messages(120)
+
+    page = generate_html_transcript(ticket, messages, mention_map=MENTION_MAP)
+    chunks = list(iter_html_transcript(ticket, iter(messages), mention_map=MENTION_MAP,
+                                       message_count=len(messages), chunk_size=50))
+
+    assert len(chunks) == 2 + 3
+    assert _without_render_time("".join(chunks)) == _without_render_time(page)
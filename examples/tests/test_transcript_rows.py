@@ -0,0 +1,90 @@
+"""
+AzabBot - Transcript Row Collection Tests
+=========================================
+
+collect_transcript_rows: stored rows plus the head/tail delta, recorded
+gaps replaced by Discord's copy, and the full-history fallback.
+
+Author: حَـــــنَّـــــا
+Server: discord.gg/syria
+"""
+
+import asyncio
+
+from src.services.tickets.ingest import store_op
+from src.services.tickets.transcript.stored import collect_transcript_rows
+
+from tests.fakes import FakeChannel, FakeTicketMessageDB, fake_message
+
+
+TICKET = {"ticket_id": "T0001"}
+
+
+def _stored_db(messages) -> FakeTicketMessageDB:
+    db = FakeTicketMessageDB()
+    db.write_ticket_message_batch([store_op("T0001", m).row for m in messages], [], [])
+    return db
+
+
+def _collect(channel: FakeChannel, db: FakeTicketMessageDB):
+    return asyncio.run(collect_transcript_rows(channel, TICKET, db))
+
+
+def test_fetches_only_head_and_tail_around_stored_rows():
+    messages = [fake_message(i) for i in range(10, 30)]
+    channel = FakeChannel(messages)
+    db = _stored_db(messages[:15])
+
+    rows = _collect(channel, db)
+
+    assert [row["message_id"] for row in rows] == list(range(10, 30))
+    assert set(channel.requests) == {(channel.id, 10), (24, None)}
+
+
+def test_middle_gap_is_replaced_by_discord_copy():
+    messages = [fake_message(i) for i in range(10, 20)]
+    channel = FakeChannel(messages)
+    # 13 and 14 never reached the store, 12 was stored before an edit it missed
+    stale = fake_message(12, content="before edit")
+    db = _stored_db([stale] + [m for m in messages if m.id not in (12, 13, 14)])
+    messages[2].content = "after edit"
+    db.add_ticket_message_gaps([("T0001", 11, 15, "write_failed")])
+
+    rows = _collect(channel, db)
+
+    assert [row["message_id"] for row in rows] == list(range(10, 20))
+    assert rows[2]["content"] == "after edit"
+    assert (11, 15) in channel.requests
+
+
+def test_message_deleted_inside_gap_is_dropped():
+    messages = [fake_message(i) for i in range(10, 20)]
+    db = _stored_db(messages)
+    db.add_ticket_message_gaps([("T0001", 14, 17, "write_failed")])
+    channel = FakeChannel(m for m in messages if m.id != 15)
+
+    rows = _collect(channel, db)
+
+    assert 15 not in [row["message_id"] for row in rows]
+    assert len(rows) == 9
+
+
+def test_open_ended_gap_runs_to_the_end():
+    messages = [fake_message(i) for i in range(10, 20)]
+    db = _stored_db(messages[:3])
+    db.add_ticket_message_gaps([("T0001", 12, None, "offline")])
+    channel = FakeChannel(messages)
+
+    rows = _collect(channel, db)
+
+    assert [row["message_id"] for row in rows] == list(range(10, 20))
+
+
+def test_no_stored_rows_reads_full_history():
+    messages = [fake_message(i) for i in range(10, 15)]
+    channel = FakeChannel(messages)
+
+    rows = _collect(channel, FakeTicketMessageDB())
+
+    assert [row["message_id"] for row in rows] == list(range(10, 15))
+    assert channel.requests == [(None, None)]
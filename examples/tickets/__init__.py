@@ -18,12 +18,33 @@ from .collectors import (
     resolve_mentions,
 )
 from .html_generator import (
+    TRANSCRIPT_TEMPLATE_VERSION,
     generate_html_transcript,
+    iter_html_transcript,
+    render_transcript_head,
+    render_transcript_foot,
+    render_message_chunk,
+    render_message_html,
     create_transcript_file,
+    create_streamed_transcript_file,
+    write_transcript_file,
+)
+from .mentions import (
+    MentionResolver,
+    resolve_markup,
+    scan_mentions,
 )
 from .json_builder import (
     build_json_transcript,
 )
+from .stored import (
+    collect_transcript_rows,
+    collect_row_mentions,
+    html_message_from_row,
+    resolve_cached_mentions,
+    row_from_message,
+    transcript_message_from_row,
+)
 
 # Backwards compatibility aliases
 _resolve_mentions = resolve_mentions
@@ -36,11 +57,30 @@ __all__ = [
     # Collectors
     "collect_transcript_messages",
     "resolve_mentions",
+    # Markup
+    "MentionResolver",
+    "resolve_markup",
+    "scan_mentions",
     # HTML
+    "TRANSCRIPT_TEMPLATE_VERSION",
     "generate_html_transcript",
+    "iter_html_transcript",
+    "render_transcript_head",
+    "render_transcript_foot",
+    "render_message_chunk",
+    "render_message_html",
     "create_transcript_file",
+    "create_streamed_transcript_file",
+    "write_transcript_file",
     # JSON
     "build_json_transcript",
+    # Stored messages + Discord delta
+    "collect_transcript_rows",
+    "collect_row_mentions",
+    "html_message_from_row",
+    "resolve_cached_mentions",
+    "row_from_message",
+    "transcript_message_from_row",
     # Backwards compat
     "_resolve_mentions",
 ]
@@ -0,0 +1,283 @@
+"""
+AzabBot - Ticket Auto-Close Mixin
+=================================
+
+Deadline-driven inactivity warnings, auto-close and ghost-ticket close.
+
+DESIGN:
+    Each open ticket has exactly one next event, derived from its state
+    in the open-ticket index:
+        ghost  created_at + GHOST_TICKET_CLOSE_SECONDS  (new and unclaimed, no
+               modal answers, no message from anyone, never reopened)
+        warn   last_activity + INACTIVE_WARNING_DAYS
+        close  max(last_activity + INACTIVE_CLOSE_DAYS,
+                   warned_at + (INACTIVE_CLOSE_DAYS - INACTIVE_WARNING_DAYS))
+    Deadlines sit in a min-heap and the loop sleeps until the earliest one
+    (or until an earlier one is pushed), so an idle bot does no work and
+    events fire on time instead of on the next polling tick.
+
+    Activity only ever moves a ticket's deadline later, so the message
+    path never touches the heap: it updates the index entry, and when the
+    old deadline fires it is re-derived and pushed again if it moved.
+    Only changes that move a deadline earlier (new or reopened ticket)
+    push a new entry. Superseded entries are skipped when popped, which
+    keeps at most a couple of heap entries per ticket.
+
+    Restarts: load_ticket_index() rebuilds every deadline from
+    tickets.last_activity_at / warned_at / created_at, and anything that
+    came due while the bot was down fires immediately.
+
+Author: حَـــــنَّـــــا
+Server: discord.gg/syria
+"""
+
+import asyncio
+import heapq
+import time
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+import discord
+
+from src.core.logger import logger
+from src.utils.discord_rate_limit import log_http_error
+
+from .constants import (
+    INACTIVE_WARNING_DAYS,
+    INACTIVE_CLOSE_DAYS,
+    GHOST_TICKET_CLOSE_SECONDS,
+    AUTO_CLOSE_RETRY_DELAY,
+    AUTO_CLOSE_MAX_SLEEP,
+)
+from .embeds import build_inactivity_warning
+
+if TYPE_CHECKING:
+    from .service import TicketService
+    from .ticket_index import IndexedTicket
+
+
+# =============================================================================
+# Constants
+# =============================================================================
+
+DAY: int = 86400
+WARN_AFTER: int = INACTIVE_WARNING_DAYS * DAY
+CLOSE_AFTER: int = INACTIVE_CLOSE_DAYS * DAY
+CLOSE_NOTICE: int = (INACTIVE_CLOSE_DAYS - INACTIVE_WARNING_DAYS) * DAY
+
+
+# =============================================================================
+# Helpers
+# =============================================================================
+
+def format_period(seconds: int) -> str:
+    """Whole-unit period for user-facing text, e.g. "1 hour" or "90 minutes"."""
+    for unit, size in (("day", DAY), ("hour", 3600), ("minute", 60)):
+        if seconds >= size and seconds % size == 0:
+            count = seconds // size
+            return f"{count} {unit}{'s' if count != 1 else ''}"
+    return f"{seconds} second{'s' if seconds != 1 else ''}"
+
+
+# =============================================================================
+# Deadlines
+# =============================================================================
+
+def next_deadline(entry: "IndexedTicket") -> Tuple[float, str]:
+    """
+    Next auto-close event for an open ticket.
+
+    Returns:
+        (unix time, kind) with kind "ghost", "warn" or "close".
+    """
+    if entry.ghost_eligible and entry.status == "open":
+        return entry.created_at + GHOST_TICKET_CLOSE_SECONDS, "ghost"
+    if entry.warned_at is None:
+        return entry.last_activity + WARN_AFTER, "warn"
+    return max(entry.last_activity + CLOSE_AFTER, entry.warned_at + CLOSE_NOTICE), "close"
+
+
+# =============================================================================
+# Auto-Close Mixin
+# =============================================================================
+
+class AutoCloseMixin:
+    """Mixin for the deadline-driven auto-close scheduler."""
+
+    def _init_auto_close(self: "TicketService") -> None:
+        """Initialize scheduler state. Called from TicketService.__init__."""
+        self._deadline_heap: List[Tuple[float, str]] = []      # (due, ticket_id)
+        self._deadline_at: Dict[str, float] = {}               # ticket_id -> live heap entry
+        self._deadline_wakeup = asyncio.Event()
+        self._auto_close_counts: Dict[str, int] = {"ghost": 0, "warn": 0, "close": 0, "rescheduled": 0}
+
+    # =========================================================================
+    # Scheduling
+    # =========================================================================
+
+    def _schedule_ticket(self: "TicketService", entry: "IndexedTicket") -> None:
+        """
+        Make sure the ticket's next deadline is queued.
+
+        Cheap enough for the message path: if the queued deadline is
+        already earlier, nothing happens (it is re-derived when it fires).
+        """
+        due, _ = next_deadline(entry)
+        queued = self._deadline_at.get(entry.ticket_id)
+        if queued is not None and queued <= due:
+            return
+
+        self._deadline_at[entry.ticket_id] = due
+        heapq.heappush(self._deadline_heap, (due, entry.ticket_id))
+        if self._deadline_heap[0][1] == entry.ticket_id:
+            self._deadline_wakeup.set()
+
+    def _pop_due_tickets(self: "TicketService", now: float) -> List[Tuple["IndexedTicket", str]]:
+        """Pop every deadline due by now, re-queueing those that moved later."""
+        due_tickets: List[Tuple["IndexedTicket", str]] = []
+        heap = self._deadline_heap
+        while heap and heap[0][0] <= now:
+            due, ticket_id = heapq.heappop(heap)
+            if self._deadline_at.get(ticket_id) != due:
+                continue  # Superseded by an earlier push
+            del self._deadline_at[ticket_id]
+
+            entry = self._ticket_index.get(self._ticket_threads.get(ticket_id, 0))
+            if entry is None:
+                continue  # Closed since it was queued
+
+            actual, kind = next_deadline(entry)
+            if actual > now:
+                self._auto_close_counts["rescheduled"] += 1
+                self._schedule_ticket(entry)
+                continue
+            due_tickets.append((entry, kind))
+        return due_tickets
+
+    async def _auto_close_loop(self: "TicketService") -> None:
+        """Sleep until the earliest deadline, run what is due, repeat."""
+        while self._running:
+            self._deadline_wakeup.clear()
+
+            for entry, kind in self._pop_due_tickets(time.time()):
+                try:
+                    await self._run_deadline(entry, kind)
+                except Exception as e:
+                    logger.error("Ticket Auto-Close Action Failed", [
+                        ("Ticket ID", entry.ticket_id),
+                        ("Action", kind),
+                        ("Error", str(e)[:50]),
+                    ])
+                    self._retry_deadline(entry)
+
+            # Capped so wall-clock jumps are picked up within the hour
+            delay = AUTO_CLOSE_MAX_SLEEP
+            if self._deadline_heap:
+                delay = min(max(self._deadline_heap[0][0] - time.time(), 0), AUTO_CLOSE_MAX_SLEEP)
+            try:
+                await asyncio.wait_for(self._deadline_wakeup.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+
+    def _retry_deadline(self: "TicketService", entry: "IndexedTicket") -> None:
+        """Queue a failed action again after AUTO_CLOSE_RETRY_DELAY."""
+        due = time.time() + AUTO_CLOSE_RETRY_DELAY
+        self._deadline_at[entry.ticket_id] = due
+        heapq.heappush(self._deadline_heap, (due, entry.ticket_id))
+
+    # =========================================================================
+    # Actions
+    # =========================================================================
+
+    async def _run_deadline(self: "TicketService", entry: "IndexedTicket", kind: str) -> None:
+        """Carry out a due ghost close, inactivity warning or auto-close."""
+        if kind == "warn":
+            await self._send_inactivity_warning(entry)
+            return
+
+        guild = self.bot.get_guild(entry.guild_id)
+        if not guild or not guild.me:
+            self._retry_deadline(entry)
+            return
+
+        if kind == "ghost":
+            reason = f"No message from the ticket opener within {format_period(GHOST_TICKET_CLOSE_SECONDS)}"
+        else:
+            reason = f"Closed automatically after {INACTIVE_CLOSE_DAYS} days of inactivity"
+
+        logger.tree("Auto-Closing Ticket", [
+            ("Ticket ID", entry.ticket_id),
+            ("Trigger", "Ghost ticket" if kind == "ghost" else "Inactivity"),
+            ("Idle", f"{(time.time() - entry.last_activity) / 3600:.1f}h"),
+        ], emoji="⏰")
+
+        success, message = await self.close_ticket(
+            ticket_id=entry.ticket_id,
+            closed_by=guild.me,
+            reason=reason,
+            auto_close=True,
+        )
+        if success:
+            self._auto_close_counts[kind] += 1
+        elif message != "Ticket is already closed.":
+            logger.warning("Ticket Auto-Close Failed", [
+                ("Ticket ID", entry.ticket_id),
+                ("Reason", message),
+            ])
+            self._retry_deadline(entry)
+
+    async def _send_inactivity_warning(self: "TicketService", entry: "IndexedTicket") -> None:
+        channel = await self._get_ticket_channel(entry.thread_id)
+        if not channel:
+            logger.warning("Inactivity Warning Deferred (No Channel)", [
+                ("Ticket ID", entry.ticket_id),
+                ("Thread ID", str(entry.thread_id)),
+            ])
+            self._retry_deadline(entry)
+            return
+
+        days_inactive = int((time.time() - entry.last_activity) // DAY)
+        embed = build_inactivity_warning(
+            user_id=entry.user_id,
+            days_inactive=days_inactive,
+            days_until_close=INACTIVE_CLOSE_DAYS - INACTIVE_WARNING_DAYS,
+        )
+        try:
+            await channel.send(content=f"<@{entry.user_id}>", embed=embed)
+        except discord.HTTPException as e:
+            log_http_error(e, "Inactivity Warning", [("Ticket ID", entry.ticket_id)])
+            self._retry_deadline(entry)
+            return
+
+        warned_at = time.time()
+        self.mark_ticket_warned(entry.ticket_id, warned_at)
+        await asyncio.to_thread(self.db.set_ticket_warned, entry.ticket_id, warned_at)
+        self._auto_close_counts["warn"] += 1
+        self._schedule_ticket(entry)
+
+        logger.tree("Inactivity Warning Sent", [
+            ("Ticket ID", entry.ticket_id),
+            ("Inactive", f"{days_inactive} days"),
+        ], emoji="⚠️")
+
+    # =========================================================================
+    # Stats
+    # =========================================================================
+
+    def get_auto_close_stats(self: "TicketService") -> Dict[str, Any]:
+        """Scheduler snapshot: queued deadlines, next due, actions taken."""
+        next_due: Optional[float] = None
+        if self._deadline_heap:
+            next_due = round(self._deadline_heap[0][0] - time.time(), 1)
+        return {
+            "scheduled": len(self._deadline_at),
+            "heap": len(self._deadline_heap),
+            "next_due_in": next_due,
+            **self._auto_close_counts,
+        }
+
+
+# =============================================================================
+# Module Export
+# =============================================================================
+
+__all__ = ["AutoCloseMixin", "format_period", "next_deadline"]
@@ -136,10 +136,19 @@ STATUS_COLOR = {
 MAX_OPEN_TICKETS_PER_USER = 1
 INACTIVE_WARNING_DAYS = 3      # Warn after 3 days of inactivity
 INACTIVE_CLOSE_DAYS = 5        # Close after 5 days of inactivity
+GHOST_TICKET_CLOSE_SECONDS = 3600  # Close unclaimed tickets whose opener never wrote
+AUTO_CLOSE_RETRY_DELAY = 300   # Seconds before retrying a failed auto-close action
+AUTO_CLOSE_MAX_SLEEP = 3600    # Longest scheduler sleep (bounds wall-clock drift)
 DELETE_AFTER_CLOSE_DAYS = 1    # Delete thread 24 hours after closing
-MAX_TRANSCRIPT_MESSAGES = 500  # Max messages to include in transcript
+MAX_TRANSCRIPT_MESSAGES = 500  # Max messages for the legacy history-only collector (stored transcripts are uncapped)
 MAX_TRANSCRIPT_USER_LOOKUPS = 15  # Max API calls for unresolved mentions
 CLAIM_REMINDER_COOLDOWN = 300  # 5 minutes between claim reminders per staff per ticket
+ACTIVITY_FLUSH_INTERVAL = 30   # Seconds between batched last-activity writes
+MESSAGE_QUEUE_SIZE = 5000      # Pending message writes before producers wait
+MESSAGE_BATCH_SIZE = 200       # Max message writes per transaction
+MESSAGE_BATCH_WINDOW = 0.25    # Seconds to gather a batch after the first write
+MESSAGE_DRAIN_TIMEOUT = 10     # Max seconds close waits for a ticket's pending writes
+ATTACHMENT_DRAIN_TIMEOUT = 30  # Max seconds close waits to archive a ticket's attachments
 
 
 # =============================================================================
@@ -171,10 +180,19 @@ __all__ = [
     "MAX_OPEN_TICKETS_PER_USER",
     "INACTIVE_WARNING_DAYS",
     "INACTIVE_CLOSE_DAYS",
+    "GHOST_TICKET_CLOSE_SECONDS",
+    "AUTO_CLOSE_RETRY_DELAY",
+    "AUTO_CLOSE_MAX_SLEEP",
     "DELETE_AFTER_CLOSE_DAYS",
     "MAX_TRANSCRIPT_MESSAGES",
     "MAX_TRANSCRIPT_USER_LOOKUPS",
     "CLAIM_REMINDER_COOLDOWN",
+    "ACTIVITY_FLUSH_INTERVAL",
+    "MESSAGE_QUEUE_SIZE",
+    "MESSAGE_BATCH_SIZE",
+    "MESSAGE_BATCH_WINDOW",
+    "MESSAGE_DRAIN_TIMEOUT",
+    "ATTACHMENT_DRAIN_TIMEOUT",
     # Timeouts (from core)
     "TICKET_CATEGORY_COOLDOWN",
     "AUTO_CLOSE_CHECK_INTERVAL",
@@ -4,22 +4,48 @@ AzabBot - Ticket HTML Transcript Generator
 
 Generates responsive HTML transcripts with gold/green theme.
 
+DESIGN:
+    The page used to be one f-string holding the CSS and every rendered
+    message, so a large ticket produced several multi-megabyte copies
+    (message parts, joined body, page, encoded bytes). Rendering is now a
+    generator - head, then HTML_CHUNK_MESSAGES messages at a time, then
+    foot - which the transcript route streams as a chunked response and
+    write_transcript_file streams to disk. generate_html_transcript joins
+    the same chunks for callers that need a string.
+
+    Open tickets served by the API carry LIVE_UPDATE_SCRIPT, which appends
+    delta fragments (render_message_html) rather than reloading the page.
+    Every page carries RELATIVE_TIME_SCRIPT, which fills in relative
+    (<t:...:R>) timestamps at view time.
+
 Author: حَـــــنَّـــــا
 Server: discord.gg/syria
 """
 
 import html as html_lib
 import io
+import json
+import tempfile
 import time
 from datetime import datetime
-from typing import Optional, List, Dict, Any
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Union
 
 import discord
 
 from src.core.config import NY_TZ
 from src.core.logger import logger
 from ..constants import TICKET_CATEGORIES
-from .collectors import resolve_mentions
+from .mentions import MentionResolver
+
+
+# =============================================================================
+# Constants
+# =============================================================================
+
+HTML_CHUNK_MESSAGES: int = 100          # Messages rendered per streamed chunk
+SPOOL_MAX_BYTES: int = 1024 * 1024      # Transcript files spill to disk past this
+TRANSCRIPT_TEMPLATE_VERSION: int = 5    # Bump on any markup/CSS change - stored artifacts re-render
 
 
 # =============================================================================
@@ -357,6 +383,19 @@ body {
     color: var(--bot);
 }
 
+.emoji {
+    width: 1.375em;
+    height: 1.375em;
+    vertical-align: -0.3em;
+    object-fit: contain;
+}
+
+.timestamp-markup {
+    background: rgba(113, 113, 122, 0.2);
+    padding: 1px 4px;
+    border-radius: 4px;
+}
+
 .empty-message {
     color: var(--text-muted);
     font-style: italic;
@@ -546,42 +585,105 @@ body {
 
 
 # =============================================================================
-# Auto-refresh Script
+# Relative Time Script
+# =============================================================================
+
+# Relative timestamps are rendered with their absolute label and data-unix;
+# the text is computed here against the viewer's clock and refreshed every
+# minute. Without script the absolute label stays.
+RELATIVE_TIME_SCRIPT = '''
+<script>
+    (() => {
+        const units = [['year', 31536000], ['month', 2592000], ['day', 86400],
+                       ['hour', 3600], ['minute', 60], ['second', 1]];
+        const format = new Intl.RelativeTimeFormat('en', { numeric: 'always' });
+        const relative = unix => {
+            const delta = unix - Date.now() / 1000;
+            const [unit, size] = units.find(([, s]) => Math.abs(delta) >= s) || units[units.length - 1];
+            return format.format(Math.trunc(delta / size), unit);
+        };
+        window.azabRelativeTimes = (root = document) => {
+            root.querySelectorAll('.timestamp-markup[data-relative]').forEach(el => {
+                el.textContent = relative(parseInt(el.dataset.unix, 10));
+            });
+        };
+        window.azabRelativeTimes();
+        setInterval(() => window.azabRelativeTimes(), 60000);
+    })();
+</script>
+'''
+
+
+# =============================================================================
+# Live Update Script
 # =============================================================================
 
-AUTO_REFRESH_SCRIPT = '''
+# Open tickets poll the delta route for messages after the last one shown
+# (plus edits/deletes since the last poll) and append the rendered
+# fragments, instead of re-fetching and re-rendering the whole page.
+LIVE_UPDATE_SCRIPT = '''
 <script>
-    // Auto-refresh every 10 seconds for live updates
-    let refreshInterval = setInterval(() => {
-        fetch(window.location.href)
-            .then(r => r.text())
-            .then(html => {
-                const parser = new DOMParser();
-                const doc = parser.parseFromString(html, 'text/html');
-                const newMessages = doc.querySelector('.messages-list');
-                const newCount = doc.querySelector('.message-count');
-                if (newMessages && newCount) {
-                    document.querySelector('.messages-list').innerHTML = newMessages.innerHTML;
-                    document.querySelector('.message-count').textContent = newCount.textContent;
-                    // Scroll to bottom if near bottom
+    (() => {
+        const deltaUrl = __DELTA_URL__;
+        let since = __RENDERED_AT__;
+        let timer = null;
+
+        const list = () => document.querySelector('.messages-list');
+        const lastId = () => {
+            const items = list().querySelectorAll('.message[data-id]');
+            return items.length ? items[items.length - 1].dataset.id : '0';
+        };
+        const fragment = html => {
+            const t = document.createElement('template');
+            t.innerHTML = html;
+            return t.content;
+        };
+        const setCount = delta => {
+            const el = document.querySelector('.message-count');
+            el.textContent = (parseInt(el.textContent, 10) + delta) + ' messages';
+        };
+
+        const poll = () => {
+            if (document.hidden) { timer = setTimeout(poll, 5000); return; }
+            fetch(deltaUrl + '&after=' + lastId() + '&since=' + since)
+                .then(r => r.ok ? r.json() : Promise.reject(r.status))
+                .then(d => {
                     const container = document.querySelector('.messages');
-                    if (container.scrollHeight - container.scrollTop - container.clientHeight < 200) {
-                        container.scrollTop = container.scrollHeight;
+                    const atBottom = container.scrollHeight - container.scrollTop - container.clientHeight < 200;
+                    d.messages.forEach(m => list().appendChild(fragment(m.html)));
+                    d.edited.forEach(m => {
+                        const el = list().querySelector('.message[data-id="' + m.id + '"]');
+                        if (el) el.replaceWith(fragment(m.html));
+                    });
+                    let removed = 0;
+                    d.deleted.forEach(id => {
+                        const el = list().querySelector('.message[data-id="' + id + '"]');
+                        if (el) { el.remove(); removed++; }
+                    });
+                    setCount(d.messages.length - removed);
+                    if (window.azabRelativeTimes) window.azabRelativeTimes(list());
+                    if (atBottom && d.messages.length) container.scrollTop = container.scrollHeight;
+                    since = d.since;
+                    if (d.status === 'closed') {
+                        const badge = document.querySelector('.status-badge');
+                        if (badge) { badge.className = 'status-badge status-closed'; badge.textContent = 'Closed'; }
+                        return;
                     }
-                }
-            })
-            .catch(() => {});
-    }, 10000);
-
-    // Show live indicator
-    document.addEventListener('DOMContentLoaded', () => {
-        const indicator = document.querySelector('.live-indicator');
-        if (indicator) {
-            setInterval(() => {
-                indicator.style.opacity = indicator.style.opacity === '1' ? '0.5' : '1';
-            }, 1000);
-        }
-    });
+                    timer = setTimeout(poll, d.more ? 0 : 5000);
+                })
+                .catch(() => { timer = setTimeout(poll, 15000); });
+        };
+
+        document.addEventListener('DOMContentLoaded', () => {
+            timer = setTimeout(poll, 5000);
+            const indicator = document.querySelector('.live-indicator');
+            if (indicator) {
+                setInterval(() => {
+                    indicator.style.opacity = indicator.style.opacity === '1' ? '0.5' : '1';
+                }, 1000);
+            }
+        });
+    })();
 </script>
 '''
 
@@ -600,6 +702,9 @@ def generate_html_transcript(
     """
     Generate a modern, responsive HTML transcript with gold/green theme.
 
+    Builds the whole page in memory - use iter_html_transcript to stream
+    large transcripts instead.
+
     Args:
         ticket: Ticket data from database
         messages: List of message dictionaries
@@ -610,25 +715,94 @@ def generate_html_transcript(
     Returns:
         HTML string of the transcript
     """
+    html_output = ''.join(iter_html_transcript(ticket, messages, user, closed_by, mention_map))
+
+    logger.debug("HTML Transcript Generated", [
+        ("Ticket ID", ticket["ticket_id"]),
+        ("Messages", str(len(messages))),
+        ("Status", ticket["status"]),
+    ])
+
+    return html_output
+
+
+def iter_html_transcript(
+    ticket: dict,
+    messages: Iterable[Dict[str, Any]],
+    user: Optional[discord.User] = None,
+    closed_by: Optional[discord.Member] = None,
+    mention_map: Optional[Dict[int, str]] = None,
+    message_count: Optional[int] = None,
+    chunk_size: int = HTML_CHUNK_MESSAGES,
+) -> Iterator[str]:
+    """
+    Render a transcript incrementally: head, message chunks, foot.
+
+    Only one chunk of rendered messages is held at a time, so memory
+    stays flat regardless of ticket size. Joined, the chunks are
+    identical to generate_html_transcript's output.
+
+    Args:
+        ticket: Ticket data from database
+        messages: Message dictionaries (any iterable, e.g. a paged DB read)
+        user: The ticket creator
+        closed_by: The staff member who closed the ticket
+        mention_map: Map of user/channel/role IDs to names for mention resolution
+        message_count: Count for the header (required if messages has no len())
+        chunk_size: Messages per yielded chunk
+
+    Yields:
+        HTML fragments.
+    """
     if mention_map is None:
         mention_map = {}
+    if message_count is None:
+        message_count = len(messages)  # type: ignore[arg-type]
+
+    yield render_transcript_head(ticket, user, message_count)
 
+    resolve = MentionResolver(mention_map)
+    chunk: List[str] = []
+    first = True
+    for msg in messages:
+        chunk.append(_render_message(msg, resolve))
+        if len(chunk) >= chunk_size:
+            yield ('' if first else '\n') + '\n'.join(chunk)
+            chunk.clear()
+            first = False
+    if chunk:
+        yield ('' if first else '\n') + '\n'.join(chunk)
+
+    yield render_transcript_foot()
+
+
+def render_transcript_head(
+    ticket: dict,
+    user: Optional[discord.User],
+    message_count: int,
+    live_url: Optional[str] = None,
+) -> str:
+    """
+    Everything up to the first message (document head, CSS, header, meta).
+
+    live_url is the delta route for this ticket (with its token); open
+    tickets served with one get the live update script.
+    """
     created_dt = datetime.fromtimestamp(ticket["created_at"], tz=NY_TZ)
-    now_dt = datetime.now(NY_TZ)
-    closed_dt = datetime.fromtimestamp(
-        ticket.get("closed_at", time.time()), tz=NY_TZ
-    ) if ticket.get("closed_at") else now_dt
 
     cat_info = TICKET_CATEGORIES.get(ticket["category"], TICKET_CATEGORIES["support"])
     is_open = ticket["status"] != "closed"
 
-    # Auto-refresh script (only for open tickets)
-    auto_refresh = AUTO_REFRESH_SCRIPT if is_open else ""
+    # Live update script (only for open tickets served by the API)
+    live_script = ""
+    if is_open and live_url:
+        live_script = (
+            LIVE_UPDATE_SCRIPT
+            .replace("__DELTA_URL__", json.dumps(live_url).replace("</", "<\\/"))
+            .replace("__RENDERED_AT__", f"{time.time():.3f}")
+        )
 
-    # Build messages HTML
-    messages_html = _render_messages(messages, mention_map)
-
-    html_output = f'''<!DOCTYPE html>
+    return f'''<!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="UTF-8">
@@ -641,7 +815,7 @@ def generate_html_transcript(
     <link rel="preconnect" href="https://fonts.gstatic.com" crossorigin>
     <link href="https://fonts.googleapis.com/css2?family=Inter:wght@400;500;600;700&display=swap" rel="stylesheet">
     <style>{TRANSCRIPT_CSS}</style>
-    {auto_refresh}
+    {live_script}
 </head>
 <body>
     <div class="app">
@@ -691,10 +865,16 @@ def generate_html_transcript(
                         <span>💬</span>
                         <span>Conversation</span>
                     </div>
-                    <span class="message-count">{len(messages)} messages</span>
+                    <span class="message-count">{message_count} messages</span>
                 </div>
                 <div class="messages-list">
-{messages_html}
+'''
+
+
+def render_transcript_foot() -> str:
+    """Everything after the last message."""
+    now_dt = datetime.now(NY_TZ)
+    return f'''
                 </div>
             </section>
 
@@ -703,55 +883,71 @@ def generate_html_transcript(
             </footer>
         </main>
     </div>
-</body>
+{RELATIVE_TIME_SCRIPT}</body>
 </html>'''
 
-    logger.debug("HTML Transcript Generated", [
-        ("Ticket ID", ticket["ticket_id"]),
-        ("Messages", str(len(messages))),
-        ("Status", ticket["status"]),
-    ])
-
-    return html_output
 
+def render_message_chunk(messages: Iterable[Dict[str, Any]], mention_map: Dict[int, str], first: bool = True) -> str:
+    """
+    Render a run of messages as one fragment for streaming.
 
-def _render_messages(messages: List[Dict[str, Any]], mention_map: Dict[int, str]) -> str:
-    """Render messages to HTML."""
-    html_parts = []
+    Args:
+        messages: Message dictionaries
+        mention_map: Map of IDs to names for mention resolution
+        first: False for every chunk after the first (adds the separator)
+    """
+    resolve = MentionResolver(mention_map)
+    rendered = '\n'.join(_render_message(msg, resolve) for msg in messages)
+    return rendered if first or not rendered else '\n' + rendered
 
-    for msg in messages:
-        author = msg.get("author", "Unknown")
-        content = msg.get("content", "")
-        timestamp = msg.get("timestamp", "")
-        attachments = msg.get("attachments", [])
-        embeds = msg.get("embeds", [])
-        avatar_url = msg.get("avatar_url", "")
-
-        # Determine author class and role badge
-        author_class = "user"
-        role_badge = ""
-        if msg.get("is_bot", False):
-            author_class = "bot"
-            role_badge = '<span class="role-badge bot">BOT</span>'
-        elif msg.get("is_staff", False):
-            author_class = "staff"
-            role_badge = '<span class="role-badge staff">STAFF</span>'
-
-        # Escape HTML in content, then resolve mentions
-        if content:
-            safe_content = html_lib.escape(content)
-            safe_content = resolve_mentions(safe_content, mention_map)
-        else:
-            safe_content = '<span class="empty-message">(no text content)</span>'
 
-        # Render attachments
-        attachments_html = _render_attachments(attachments)
+def render_message_html(msg: Dict[str, Any], resolve: MentionResolver) -> str:
+    """Render one message fragment (live transcript deltas)."""
+    return _render_message(msg, resolve)
 
-        # Render embeds
-        embeds_html = _render_embeds(embeds, mention_map)
 
-        html_parts.append(f'''
-                    <div class="message">
+def _render_messages(messages: List[Dict[str, Any]], mention_map: Dict[int, str]) -> str:
+    """Render messages to HTML."""
+    resolve = MentionResolver(mention_map)
+    return '\n'.join(_render_message(msg, resolve) for msg in messages)
+
+
+def _render_message(msg: Dict[str, Any], resolve: MentionResolver) -> str:
+    """Render one message to HTML."""
+    author = msg.get("author", "Unknown")
+    content = msg.get("content", "")
+    timestamp = msg.get("timestamp", "")
+    attachments = msg.get("attachments", [])
+    embeds = msg.get("embeds", [])
+    avatar_url = msg.get("avatar_url", "")
+
+    # Determine author class and role badge
+    author_class = "user"
+    role_badge = ""
+    if msg.get("is_bot", False):
+        author_class = "bot"
+        role_badge = '<span class="role-badge bot">BOT</span>'
+    elif msg.get("is_staff", False):
+        author_class = "staff"
+        role_badge = '<span class="role-badge staff">STAFF</span>'
+
+    # Escape HTML in content, then resolve mentions
+    if content:
+        safe_content = html_lib.escape(content)
+        safe_content = resolve(safe_content)
+    else:
+        safe_content = '<span class="empty-message">(no text content)</span>'
+
+    # Render attachments
+    attachments_html = _render_attachments(attachments)
+
+    # Render embeds
+    embeds_html = _render_embeds(embeds, resolve)
+
+    data_id = f' data-id="{msg["id"]}"' if msg.get("id") else ""
+
+    return f'''
+                    <div class="message"{data_id}>
                         <img class="avatar" src="{avatar_url or 'https://cdn.discordapp.com/embed/avatars/0.png'}" alt="" loading="lazy" onerror="this.src='https://cdn.discordapp.com/embed/avatars/0.png'">
                         <div class="message-body">
                             <div class="message-meta">
@@ -762,19 +958,21 @@ def _render_messages(messages: List[Dict[str, Any]], mention_map: Dict[int, str]
                             <div class="content">{safe_content}</div>
 {attachments_html}{embeds_html}
                         </div>
-                    </div>''')
+                    </div>'''
 
-    return '\n'.join(html_parts)
 
-
-def _render_attachments(attachments: List[str]) -> str:
-    """Render attachments to HTML."""
+def _render_attachments(attachments: List[Union[str, Dict[str, Any]]]) -> str:
+    """Render attachments (URLs, or dicts with url / filename) to HTML."""
     if not attachments:
         return ""
 
     parts = ['                            <div class="attachments">']
     for att in attachments:
-        filename = att.split("/")[-1].split("?")[0] if att else "attachment"
+        if isinstance(att, dict):
+            filename = att.get("filename") or "attachment"
+            att = att["url"]
+        else:
+            filename = att.split("/")[-1].split("?")[0] if att else "attachment"
         is_image = any(filename.lower().endswith(ext) for ext in ['.png', '.jpg', '.jpeg', '.gif', '.webp'])
         if is_image:
             parts.append(f'                                <a href="{att}" target="_blank"><img class="attachment-image" src="{att}" alt="{html_lib.escape(filename)}" loading="lazy"></a>')
@@ -784,7 +982,7 @@ def _render_attachments(attachments: List[str]) -> str:
     return '\n'.join(parts)
 
 
-def _render_embeds(embeds: List[dict], mention_map: Dict[int, str]) -> str:
+def _render_embeds(embeds: List[dict], resolve: MentionResolver) -> str:
     """Render embeds to HTML."""
     if not embeds:
         return ""
@@ -825,7 +1023,7 @@ def _render_embeds(embeds: List[dict], mention_map: Dict[int, str]) -> str:
         # Description
         if embed.get("description"):
             desc = html_lib.escape(embed["description"])
-            desc = resolve_mentions(desc, mention_map)
+            desc = resolve(desc)
             embed_parts.append(f'                                <div class="embed-description">{desc}</div>')
 
         # Fields
@@ -835,7 +1033,7 @@ def _render_embeds(embeds: List[dict], mention_map: Dict[int, str]) -> str:
                 inline_class = "inline" if field.get("inline") else ""
                 field_name = html_lib.escape(field.get("name", ""))
                 field_value = html_lib.escape(field.get("value", ""))
-                field_value = resolve_mentions(field_value, mention_map)
+                field_value = resolve(field_value)
                 embed_parts.append(f'                                    <div class="embed-field {inline_class}">')
                 embed_parts.append(f'                                        <div class="embed-field-name">{field_name}</div>')
                 embed_parts.append(f'                                        <div class="embed-field-value">{field_value}</div>')
@@ -888,8 +1086,65 @@ def create_transcript_file(
     return discord.File(buffer, filename=f"transcript_{ticket_id}.html")
 
 
+def write_transcript_file(
+    target: Union[str, Path, io.BufferedIOBase],
+    chunks: Iterable[str],
+) -> int:
+    """
+    Stream rendered chunks to a path or binary file object.
+
+    Args:
+        target: Output path or writable binary file
+        chunks: Fragments from iter_html_transcript
+
+    Returns:
+        Bytes written.
+    """
+    if isinstance(target, (str, Path)):
+        with open(target, "wb") as f:
+            return write_transcript_file(f, chunks)
+
+    written = 0
+    for chunk in chunks:
+        written += target.write(chunk.encode('utf-8'))
+    return written
+
+
+def create_streamed_transcript_file(
+    ticket_id: str,
+    chunks: Iterable[str],
+) -> discord.File:
+    """
+    Create a Discord file object from streamed chunks.
+
+    Small transcripts stay in memory; large ones spill to a temp file
+    instead of being built as one string.
+    """
+    spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES)
+    file_size = write_transcript_file(spool, chunks)
+    spool.seek(0)
+
+    logger.debug("Transcript File Created", [
+        ("Ticket ID", ticket_id),
+        ("Filename", f"transcript_{ticket_id}.html"),
+        ("Size", f"{file_size / 1024:.1f} KB"),
+        ("Streamed", "Yes"),
+    ])
+
+    return discord.File(spool, filename=f"transcript_{ticket_id}.html")
+
+
 __all__ = [
     "generate_html_transcript",
+    "iter_html_transcript",
+    "render_transcript_head",
+    "render_transcript_foot",
+    "render_message_chunk",
+    "render_message_html",
     "create_transcript_file",
+    "create_streamed_transcript_file",
+    "write_transcript_file",
+    "HTML_CHUNK_MESSAGES",
+    "TRANSCRIPT_TEMPLATE_VERSION",
     "TRANSCRIPT_CSS",
 ]
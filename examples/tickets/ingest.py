@@ -0,0 +1,449 @@
+"""
+AzabBot - Ticket Message Ingestion
+==================================
+
+Bounded, batched queue for storing ticket messages, edits and deletes.
+
+DESIGN:
+    Each ticket message used to be serialized and committed on its own
+    with a synchronous INSERT on the event loop, so a busy support thread
+    meant a stream of single-row commits. Messages now go through a queue:
+    - Handlers normalize the message into a plain tuple and enqueue it
+    - One writer drains up to MESSAGE_BATCH_SIZE writes (waiting at most
+      MESSAGE_BATCH_WINDOW after the first) and applies them with
+      executemany in a single transaction, in a worker thread
+    - The queue is bounded: when the writer falls behind, producers wait
+      on put() instead of growing memory without limit
+    - Edits and deletes ride the same queue, so they are applied after
+      the insert of the message they target
+    - Pending writes are counted per ticket, so close waits only for its
+      own ticket's writes before the transcript is built
+    A failed batch is logged and dropped; waiters are still released so a
+    close never hangs on a broken write. The message-ID range it covered
+    is recorded per ticket as a gap (as is everything after each open
+    ticket's last stored message at startup), and backfill_gaps() later
+    re-reads those ranges from Discord through this same queue.
+
+Author: حَـــــنَّـــــا
+Server: discord.gg/syria
+"""
+
+import asyncio
+import time
+from typing import TYPE_CHECKING, Any, Dict, List, NamedTuple, Optional, Tuple
+
+import discord
+
+from src.core.logger import logger
+from src.utils.async_utils import create_safe_task
+
+from .constants import (
+    MESSAGE_QUEUE_SIZE,
+    MESSAGE_BATCH_SIZE,
+    MESSAGE_BATCH_WINDOW,
+)
+
+if TYPE_CHECKING:
+    from src.core.database import Database
+
+
+# =============================================================================
+# Models
+# =============================================================================
+
+class IngestOp(NamedTuple):
+    """One queued write."""
+    kind: str           # "store", "edit" or "delete"
+    ticket_id: str
+    row: Tuple          # Parameters for write_ticket_message_batch
+
+
+# =============================================================================
+# Normalization
+# =============================================================================
+
+def serialize_attachments(message: discord.Message) -> Optional[List[Dict[str, Any]]]:
+    """Attachment metadata as plain dicts (None if there are none)."""
+    if not message.attachments:
+        return None
+    return [
+        {
+            "filename": att.filename,
+            "url": att.url,
+            "content_type": att.content_type,
+            "size": att.size,
+        }
+        for att in message.attachments
+    ]
+
+
+def serialize_embeds(message: discord.Message) -> Optional[List[Dict[str, Any]]]:
+    """Embeds as plain dicts (None if there are none)."""
+    if not message.embeds:
+        return None
+
+    embeds = []
+    for embed in message.embeds:
+        embed_data = {
+            "title": embed.title,
+            "description": embed.description,
+            "url": embed.url,
+            "color": embed.color.value if embed.color else None,
+            "timestamp": embed.timestamp.isoformat() if embed.timestamp else None,
+        }
+        # Author
+        if embed.author:
+            embed_data["author"] = {
+                "name": embed.author.name,
+                "url": embed.author.url,
+                "icon_url": embed.author.icon_url,
+            }
+        # Footer
+        if embed.footer:
+            embed_data["footer"] = {
+                "text": embed.footer.text,
+                "icon_url": embed.footer.icon_url,
+            }
+        # Image
+        if embed.image:
+            embed_data["image"] = {"url": embed.image.url}
+        # Thumbnail
+        if embed.thumbnail:
+            embed_data["thumbnail"] = {"url": embed.thumbnail.url}
+        # Fields
+        if embed.fields:
+            embed_data["fields"] = [
+                {"name": f.name, "value": f.value, "inline": f.inline}
+                for f in embed.fields
+            ]
+        embeds.append(embed_data)
+    return embeds
+
+
+MESSAGE_TYPES: Dict[discord.MessageType, str] = {
+    discord.MessageType.reply: "reply",
+    discord.MessageType.new_member: "join",
+    discord.MessageType.premium_guild_subscription: "boost",
+    discord.MessageType.pins_add: "pin",
+    discord.MessageType.thread_starter_message: "thread_starter",
+}
+
+
+def serialize_extra(message: discord.Message) -> Optional[Dict[str, Any]]:
+    """
+    Transcript details beyond the core columns (None if all are defaults).
+
+    Keys: type, role_color, reply_to, stickers.
+    """
+    extra: Dict[str, Any] = {}
+
+    msg_type = MESSAGE_TYPES.get(message.type)
+    if msg_type:
+        extra["type"] = msg_type
+
+    top_role = getattr(message.author, "top_role", None)
+    if top_role and top_role.color and top_role.color.value != 0:
+        extra["role_color"] = f"#{top_role.color.value:06x}"
+
+    if message.reference and message.reference.message_id:
+        ref_msg = message.reference.resolved
+        if ref_msg and isinstance(ref_msg, discord.Message):
+            extra["reply_to"] = {
+                "message_id": str(ref_msg.id),
+                "author_name": ref_msg.author.display_name,
+                "content": ref_msg.content[:100] if ref_msg.content else "",
+            }
+
+    if message.stickers:
+        extra["stickers"] = [
+            {
+                "id": str(sticker.id),
+                "name": sticker.name,
+                "format_type": sticker.format.value if hasattr(sticker.format, "value") else 1,
+            }
+            for sticker in message.stickers
+        ]
+
+    return extra or None
+
+
+def message_row(ticket_id: str, message: discord.Message) -> Tuple:
+    """Column values for a ticket_messages row (see write_ticket_message_batch)."""
+    author = message.author
+
+    # Staff = has manage_messages permission
+    is_staff = False
+    if hasattr(author, "guild_permissions"):
+        is_staff = author.guild_permissions.manage_messages
+
+    return (
+        ticket_id,
+        message.id,
+        author.id,
+        author.name,
+        author.display_name,
+        str(author.display_avatar.url) if author.display_avatar else None,
+        message.content,
+        message.created_at.timestamp(),
+        author.bot,
+        is_staff,
+        serialize_attachments(message),
+        serialize_embeds(message),
+        serialize_extra(message),
+    )
+
+
+def store_op(ticket_id: str, message: discord.Message) -> IngestOp:
+    """Normalize a new ticket message into a queued insert."""
+    return IngestOp("store", ticket_id, message_row(ticket_id, message))
+
+
+def edit_op(ticket_id: str, message: discord.Message) -> IngestOp:
+    """Normalize an edited ticket message into a queued update."""
+    edited_at = message.edited_at.timestamp() if message.edited_at else time.time()
+    return IngestOp("edit", ticket_id, (message.id, message.content, serialize_embeds(message), edited_at))
+
+
+def delete_op(ticket_id: str, message_id: int) -> IngestOp:
+    """Queued soft delete (the row is kept and flagged)."""
+    return IngestOp("delete", ticket_id, (message_id, time.time()))
+
+
+# =============================================================================
+# Ingestor
+# =============================================================================
+
+class TicketMessageIngestor:
+    """Single-writer batched queue for ticket message storage."""
+
+    def __init__(
+        self,
+        db: "Database",
+        max_queue: int = MESSAGE_QUEUE_SIZE,
+        batch_size: int = MESSAGE_BATCH_SIZE,
+        batch_window: float = MESSAGE_BATCH_WINDOW,
+    ) -> None:
+        self._db = db
+        self._queue: "asyncio.Queue[IngestOp]" = asyncio.Queue(maxsize=max_queue)
+        self._batch_size = batch_size
+        self._batch_window = batch_window
+        self._task: Optional[asyncio.Task] = None
+        self._pending: Dict[str, int] = {}                  # ticket_id -> queued writes
+        self._drained: Dict[str, asyncio.Event] = {}        # ticket_id -> set when pending hits 0
+
+        # Stats
+        self._written: int = 0
+        self._batches: int = 0
+        self._failed: int = 0
+        self._producer_waits: int = 0
+        self._gaps_recorded: int = 0
+        self._gaps_backfilled: int = 0
+
+    def start(self) -> None:
+        """Start the writer task."""
+        if self._task is None or self._task.done():
+            self._task = create_safe_task(self._writer_loop(), "Ticket Message Writer")
+
+    async def stop(self) -> None:
+        """Write everything queued, then stop the writer."""
+        if self._task is None:
+            return
+        await self._queue.join()
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    # =========================================================================
+    # Producers
+    # =========================================================================
+
+    async def submit(self, op: IngestOp) -> None:
+        """
+        Queue a write, waiting for room if the queue is full (backpressure).
+
+        Args:
+            op: Normalized write from store_op / edit_op / delete_op.
+        """
+        self._pending[op.ticket_id] = self._pending.get(op.ticket_id, 0) + 1
+        if self._queue.full():
+            self._producer_waits += 1
+        await self._queue.put(op)
+
+    async def wait_for_ticket(self, ticket_id: str, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until every write queued so far for a ticket has been applied.
+
+        Args:
+            ticket_id: The ticket ID.
+            timeout: Max seconds to wait (None = no limit).
+
+        Returns:
+            True if drained, False on timeout.
+        """
+        if not self._pending.get(ticket_id):
+            return True
+        event = self._drained.setdefault(ticket_id, asyncio.Event())
+        try:
+            await asyncio.wait_for(event.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    # =========================================================================
+    # Writer
+    # =========================================================================
+
+    async def _writer_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self._batch_window
+            while len(batch) < self._batch_size:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            try:
+                await self._write(batch)
+            finally:
+                for op in batch:
+                    self._release(op.ticket_id)
+                    self._queue.task_done()
+
+    async def _write(self, batch: List[IngestOp]) -> None:
+        stores = [op.row for op in batch if op.kind == "store"]
+        edits = [op.row for op in batch if op.kind == "edit"]
+        deletes = [op.row for op in batch if op.kind == "delete"]
+        try:
+            await asyncio.to_thread(self._db.write_ticket_message_batch, stores, edits, deletes)
+        except Exception as e:
+            self._failed += len(batch)
+            logger.error("Ticket Message Batch Failed", [
+                ("Writes", str(len(batch))),
+                ("Error", str(e)[:50]),
+            ])
+            await self._record_failed_batch(batch)
+            return
+        self._written += len(batch)
+        self._batches += 1
+
+    async def _record_failed_batch(self, batch: List[IngestOp]) -> None:
+        """Record each ticket's message-ID span in a failed batch as a gap."""
+        spans: Dict[str, Tuple[int, int]] = {}
+        for op in batch:
+            message_id = op.row[1] if op.kind == "store" else op.row[0]
+            low, high = spans.get(op.ticket_id, (message_id, message_id))
+            spans[op.ticket_id] = (min(low, message_id), max(high, message_id))
+        gaps = [(ticket_id, low - 1, high + 1, "write_failed") for ticket_id, (low, high) in spans.items()]
+        try:
+            await asyncio.to_thread(self._db.add_ticket_message_gaps, gaps)
+            self._gaps_recorded += len(gaps)
+        except Exception as e:
+            logger.error("Ticket Message Gap Not Recorded", [
+                ("Tickets", str(len(gaps))),
+                ("Error", str(e)[:50]),
+            ])
+
+    # =========================================================================
+    # Backfill
+    # =========================================================================
+
+    async def backfill_gaps(self, channel: discord.abc.Messageable, ticket_id: str) -> int:
+        """
+        Re-read a ticket's recorded gaps from Discord into the store.
+
+        Each gap range is authoritative from Discord: messages are queued
+        as stores (plus edits, for edited ones), and stored messages in the
+        range that Discord no longer has are queued as deletes. The gaps
+        are forgotten once those writes are applied; a write that fails
+        again records a new gap.
+
+        Args:
+            channel: The ticket channel.
+            ticket_id: The ticket ID.
+
+        Returns:
+            Number of messages re-read.
+        """
+        gaps = await asyncio.to_thread(self._db.get_ticket_message_gaps, ticket_id)
+        if not gaps:
+            return 0
+
+        fetched = 0
+        for gap in gaps:
+            after_id, before_id = gap["after_id"], gap["before_id"]
+            stored_ids = set(await asyncio.to_thread(
+                self._db.get_ticket_message_ids, ticket_id, after_id, before_id,
+            ))
+            async for message in channel.history(
+                limit=None,
+                after=discord.Object(after_id),
+                before=discord.Object(before_id) if before_id else None,
+                oldest_first=True,
+            ):
+                fetched += 1
+                stored_ids.discard(message.id)
+                await self.submit(store_op(ticket_id, message))
+                if message.edited_at:
+                    await self.submit(edit_op(ticket_id, message))
+            for message_id in stored_ids:
+                await self.submit(delete_op(ticket_id, message_id))
+
+        await self.wait_for_ticket(ticket_id)
+        await asyncio.to_thread(self._db.delete_ticket_message_gaps, [gap["id"] for gap in gaps])
+        self._gaps_backfilled += len(gaps)
+
+        logger.tree("Ticket Message Gaps Backfilled", [
+            ("Ticket ID", ticket_id),
+            ("Gaps", str(len(gaps))),
+            ("Messages", str(fetched)),
+        ], emoji="🧩")
+        return fetched
+
+    def _release(self, ticket_id: str) -> None:
+        remaining = self._pending.get(ticket_id, 0) - 1
+        if remaining > 0:
+            self._pending[ticket_id] = remaining
+            return
+        self._pending.pop(ticket_id, None)
+        event = self._drained.pop(ticket_id, None)
+        if event is not None:
+            event.set()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Queue depth and write counters."""
+        return {
+            "queued": self._queue.qsize(),
+            "tickets_pending": len(self._pending),
+            "written": self._written,
+            "batches": self._batches,
+            "avg_batch": round(self._written / self._batches, 1) if self._batches else 0.0,
+            "failed": self._failed,
+            "producer_waits": self._producer_waits,
+            "gaps_recorded": self._gaps_recorded,
+            "gaps_backfilled": self._gaps_backfilled,
+        }
+
+
+# =============================================================================
+# Module Export
+# =============================================================================
+
+__all__ = [
+    "IngestOp",
+    "MESSAGE_TYPES",
+    "TicketMessageIngestor",
+    "delete_op",
+    "edit_op",
+    "message_row",
+    "serialize_attachments",
+    "serialize_embeds",
+    "serialize_extra",
+    "store_op",
+]
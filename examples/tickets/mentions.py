@@ -0,0 +1,177 @@
+"""
+AzabBot - Transcript Markup Resolver
+====================================
+
+Single-pass resolution of Discord markup in rendered transcript text.
+
+DESIGN:
+    Every message body, embed description and embed field used to run a
+    separate substitution per mention kind. Now one compiled alternation
+    covers the whole grammar in HTML-escaped text:
+        &lt;@id&gt; / &lt;@!id&gt;      user mention
+        &lt;@&amp;id&gt;                role mention
+        &lt;#id&gt;                     channel mention
+        &lt;a?:name:id&gt;             custom emoji
+        &lt;t:unix(:style)?&gt;        timestamp (t T d D f F R)
+    A MentionResolver is created once per render over the mention map and
+    memoizes each token's replacement, so repeated mentions (the same
+    staff member, the same emoji) are formatted once. Text without "&lt;"
+    skips the regex entirely.
+
+    Timestamps render an absolute label and carry data-unix. Stored
+    transcripts are served long after they were rendered, so relative
+    ("R") text is computed by the page's script at view time; without
+    script the absolute label stays.
+
+    The raw-text scan used to collect the mention map (MENTION_SCAN_PATTERN)
+    is a single pass as well.
+
+Author: حَـــــنَّـــــا
+Server: discord.gg/syria
+"""
+
+import html as html_lib
+import re
+from datetime import datetime
+from typing import Dict, Iterable, Match, Pattern, Set, Tuple
+
+from src.core.config import NY_TZ
+
+
+# =============================================================================
+# Patterns
+# =============================================================================
+
+MARKUP_PATTERN: Pattern = re.compile(
+    r'&lt;(?:'
+    r'@!?(?P<user>\d+)'
+    r'|@&amp;(?P<role>\d+)'
+    r'|#(?P<channel>\d+)'
+    r'|(?P<animated>a?):(?P<emoji_name>\w{2,32}):(?P<emoji_id>\d+)'
+    r'|t:(?P<unix>-?\d{1,13})(?::(?P<style>[tTdDfFR]))?'
+    r')&gt;'
+)
+
+# Raw (unescaped) text: "@" user, "@!" user, "@&" role, "#" channel
+MENTION_SCAN_PATTERN: Pattern = re.compile(r'<(@[!&]?|#)(\d+)>')
+
+EMOJI_CDN: str = "https://cdn.discordapp.com/emojis"
+
+TIMESTAMP_FORMATS: Dict[str, str] = {
+    "t": "%I:%M %p",
+    "T": "%I:%M:%S %p",
+    "d": "%m/%d/%Y",
+    "D": "%B %d, %Y",
+    "f": "%B %d, %Y %I:%M %p",
+    "F": "%A, %B %d, %Y %I:%M %p",
+}
+
+# =============================================================================
+# Resolver
+# =============================================================================
+
+class MentionResolver:
+    """
+    Resolves Discord markup in escaped text using one regex pass.
+
+    Create one per render; replacements are memoized per token, so the
+    mention map should not change while the resolver is in use.
+    """
+
+    __slots__ = ("_mention_map", "_memo")
+
+    def __init__(self, mention_map: Dict[int, str]) -> None:
+        """
+        Args:
+            mention_map: Map of user/role/channel ID to display name.
+        """
+        self._mention_map = mention_map
+        self._memo: Dict[str, str] = {}
+
+    def __call__(self, text: str) -> str:
+        """Resolve all markup in HTML-escaped text."""
+        if "&lt;" not in text:
+            return text
+        return MARKUP_PATTERN.sub(self._replace, text)
+
+    def _replace(self, match: Match) -> str:
+        token = match.group(0)
+        replacement = self._memo.get(token)
+        if replacement is None:
+            replacement = self._memo[token] = self._render(match)
+        return replacement
+
+    def _render(self, match: Match) -> str:
+        user_id = match.group("user")
+        if user_id:
+            name = self._mention_map.get(int(user_id))
+            return f'<span class="mention">@{html_lib.escape(name) if name else "Unknown User"}</span>'
+
+        role_id = match.group("role")
+        if role_id:
+            name = self._mention_map.get(int(role_id))
+            return f'<span class="mention role">@{html_lib.escape(name) if name else "deleted-role"}</span>'
+
+        channel_id = match.group("channel")
+        if channel_id:
+            name = self._mention_map.get(int(channel_id))
+            return f'<span class="mention channel">#{html_lib.escape(name) if name else "deleted-channel"}</span>'
+
+        emoji_id = match.group("emoji_id")
+        if emoji_id:
+            name = match.group("emoji_name")
+            ext = "gif" if match.group("animated") else "webp"
+            return (
+                f'<img class="emoji" src="{EMOJI_CDN}/{emoji_id}.{ext}?size=48" '
+                f'alt=":{name}:" title=":{name}:" loading="lazy">'
+            )
+
+        return self._render_timestamp(int(match.group("unix")), match.group("style") or "f", match.group(0))
+
+    def _render_timestamp(self, unix: int, style: str, token: str) -> str:
+        try:
+            dt = datetime.fromtimestamp(unix, tz=NY_TZ)
+        except (OverflowError, OSError, ValueError):
+            return token
+        full = dt.strftime(TIMESTAMP_FORMATS["F"])
+        # Relative text depends on when the page is viewed - the client fills it in
+        relative = ' data-relative' if style == "R" else ''
+        label = dt.strftime(TIMESTAMP_FORMATS["f" if style == "R" else style])
+        return f'<span class="timestamp-markup" data-unix="{unix}"{relative} title="{full}">{label}</span>'
+
+
+def resolve_markup(text: str, mention_map: Dict[int, str]) -> str:
+    """One-off resolve (renders should create a MentionResolver instead)."""
+    return MentionResolver(mention_map)(text)
+
+
+def scan_mentions(texts: Iterable[str]) -> Tuple[Set[int], Set[int], Set[int]]:
+    """
+    Collect mentioned IDs from raw (unescaped) texts in one pass each.
+
+    Returns:
+        (user IDs, role IDs, channel IDs)
+    """
+    users: Set[int] = set()
+    roles: Set[int] = set()
+    channels: Set[int] = set()
+    targets = {"@": users, "@!": users, "@&": roles, "#": channels}
+    for text in texts:
+        if "<" not in text:
+            continue
+        for prefix, snowflake in MENTION_SCAN_PATTERN.findall(text):
+            targets[prefix].add(int(snowflake))
+    return users, roles, channels
+
+
+# =============================================================================
+# Module Export
+# =============================================================================
+
+__all__ = [
+    "MARKUP_PATTERN",
+    "MENTION_SCAN_PATTERN",
+    "MentionResolver",
+    "resolve_markup",
+    "scan_mentions",
+]
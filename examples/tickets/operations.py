@@ -7,6 +7,7 @@ Core ticket operations: create, close, reopen, claim, transfer, etc.
 Author: حَـــــنَّـــــا
 """
 
+import asyncio
 import time
 from typing import TYPE_CHECKING, Optional, Tuple
 
@@ -20,8 +21,16 @@ from src.utils.discord_rate_limit import log_http_error
 from src.utils.async_utils import create_safe_task
 from src.utils.mention_resolver import ensure_member_cached
 from src.api.services.auth import get_auth_service
-
-from .constants import TICKET_CATEGORIES, MAX_OPEN_TICKETS_PER_USER, TRANSCRIPT_EMOJI
+from src.api.services.transcript_artifacts import get_artifact_store
+from src.services.attachment_archive import get_attachment_archiver, rewrite_archived_attachments
+
+from .constants import (
+    TICKET_CATEGORIES,
+    MAX_OPEN_TICKETS_PER_USER,
+    TRANSCRIPT_EMOJI,
+    MESSAGE_DRAIN_TIMEOUT,
+    ATTACHMENT_DRAIN_TIMEOUT,
+)
 from .embeds import (
     build_claim_notification,
     build_close_notification,
@@ -36,9 +45,13 @@ from .embeds import (
 from .views import TicketControlPanelView, CloseRequestView
 from .buttons import UserAddedView, TransferNotificationView
 from .transcript import (
-    collect_transcript_messages,
+    collect_transcript_rows,
+    collect_row_mentions,
+    html_message_from_row,
     generate_html_transcript,
+    iter_html_transcript,
     create_transcript_file,
+    create_streamed_transcript_file,
     build_json_transcript,
 )
 
@@ -251,6 +264,7 @@ class OperationsMixin:
 
             # Build and send control panel
             ticket_data = self.db.get_ticket(ticket_id)
+            self._index_ticket(ticket_data)
             user_ticket_count = self.db.get_user_ticket_count(user.id, user.guild.id)
             control_embed = build_control_panel_embed(ticket_data, user, user_ticket_count=user_ticket_count)
             control_view = TicketControlPanelView.from_ticket(ticket_data)
@@ -381,6 +395,7 @@ class OperationsMixin:
         # Close in database (stores the token)
         if not self.db.close_ticket(ticket_id, closed_by.id, reason, transcript_token, auto_close=auto_close):
             return (False, "Failed to close ticket.")
+        self._unindex_ticket(ticket_id)
 
         # Clear claim reminder cooldowns (no longer needed)
         await self.clear_claim_reminder_cooldowns(ticket_id)
@@ -414,8 +429,32 @@ class OperationsMixin:
             # Lock channel FIRST to prevent messages during close processing
             await self._lock_ticket_on_close(channel, ticket, closed_by.guild)
 
-            # Collect transcript with mention map
-            transcript_messages, mention_map = await collect_transcript_messages(channel, self.bot)
+            # Wait for this ticket's queued message writes (not the whole queue)
+            if not await self._message_ingestor.wait_for_ticket(ticket_id, MESSAGE_DRAIN_TIMEOUT):
+                logger.warning("Ticket Message Writes Still Pending", [
+                    ("Ticket ID", ticket_id),
+                    ("Timeout", f"{MESSAGE_DRAIN_TIMEOUT}s"),
+                ])
+
+            # Fill ranges the store is known to be missing (failed writes,
+            # downtime); anything left is merged from Discord by the collector
+            try:
+                await self._message_ingestor.backfill_gaps(channel, ticket_id)
+            except discord.HTTPException as e:
+                log_http_error(e, "Ticket Message Backfill", [("Ticket ID", ticket_id)])
+
+            # Collect transcript from the message store (+ Discord delta) with mention map
+            transcript_rows = await collect_transcript_rows(channel, ticket, self.db)
+
+            # Archive attachments the queue has not (still queued, dropped or
+            # failed) so the stored transcript never links expiring CDN URLs
+            if await get_attachment_archiver().archive_missing(
+                "ticket", ticket_id, transcript_rows, ATTACHMENT_DRAIN_TIMEOUT
+            ):
+                await asyncio.to_thread(rewrite_archived_attachments, transcript_rows, self.db)
+
+            mention_map = await collect_row_mentions(transcript_rows, channel.guild, self.bot)
+            transcript_messages = [html_message_from_row(row) for row in transcript_rows]
 
             # Save transcript to database (both HTML and JSON)
             if transcript_messages and ticket_user:
@@ -438,9 +477,18 @@ class OperationsMixin:
                         user=ticket_user,
                         claimed_by=claimed_by_member,
                         closed_by=closed_by,
+                        rows=transcript_rows,
+                        mention_map=mention_map,
                     )
-                    if json_transcript:
-                        self.db.save_ticket_transcript_json(ticket_id, json_transcript.to_json())
+                    json_content = json_transcript.to_json() if json_transcript else None
+                    if json_content:
+                        self.db.save_ticket_transcript_json(ticket_id, json_content)
+
+                    # Render-once artifacts: views are served precompressed from disk
+                    artifact_store = get_artifact_store()
+                    await artifact_store.put_async("ticket-html", ticket_id, html_content.encode("utf-8"))
+                    if json_content:
+                        await artifact_store.put_async("ticket-json", ticket_id, json_content.encode("utf-8"))
 
                     logger.tree("Transcript Saved", [
                         ("Ticket ID", ticket_id),
@@ -568,6 +616,16 @@ class OperationsMixin:
         # Reopen in database
         if not self.db.reopen_ticket(ticket_id):
             return (False, "Failed to reopen ticket.")
+        self.db.set_ticket_reopened(ticket_id, time.time())
+        reopened = self.db.get_ticket(ticket_id)
+        if reopened:
+            self._index_ticket(reopened)
+
+        # The stored transcript is final only while closed; the next close
+        # (or view) renders a fresh one
+        artifact_store = get_artifact_store()
+        for kind in ("ticket-html", "ticket-json"):
+            await artifact_store.discard_async(kind, ticket_id)
 
         # Cancel pending deletion
         await self._cancel_channel_deletion(ticket_id)
@@ -640,6 +698,7 @@ class OperationsMixin:
         # Claim in database
         if not self.db.claim_ticket(ticket_id, staff.id):
             return (False, "Failed to claim ticket.")
+        self._index_ticket_claimed(ticket_id, staff.id)
 
         # Clear claim reminder cooldowns (no longer needed)
         await self.clear_claim_reminder_cooldowns(ticket_id)
@@ -859,6 +918,7 @@ class OperationsMixin:
         # Update claimed_by in database (use transfer_ticket, not claim_ticket)
         if not self.db.transfer_ticket(ticket_id, new_staff.id):
             return (False, "Failed to transfer ticket.")
+        self._index_ticket_claimed(ticket_id, new_staff.id)
 
         # Get ticket user for control panel and logging
         try:
@@ -1015,18 +1075,19 @@ class OperationsMixin:
         except (discord.NotFound, discord.HTTPException):
             return (False, "Could not fetch ticket user.", None)
 
-        messages, mention_map = await collect_transcript_messages(channel, self.bot)
+        rows = await collect_transcript_rows(channel, ticket, self.db)
+        mention_map = await collect_row_mentions(rows, channel.guild, self.bot)
+        messages = [html_message_from_row(row) for row in rows]
         if not messages:
             return (False, "No messages found in ticket.", None)
 
-        html_content = generate_html_transcript(
+        # Stream into a spooled file instead of building the page as one string
+        file = create_streamed_transcript_file(ticket_id, iter_html_transcript(
             ticket=ticket,
             messages=messages,
             user=ticket_user,
             mention_map=mention_map,
-        )
-
-        file = create_transcript_file(ticket_id, html_content)
+        ))
         return (True, "Transcript generated.", file)
 
 
@@ -10,8 +10,8 @@ Server: discord.gg/syria
 
 import asyncio
 import time
-from datetime import datetime, timedelta
-from typing import TYPE_CHECKING, Optional, Dict
+from datetime import datetime, timedelta, timezone
+from typing import TYPE_CHECKING, Any, Optional, Dict
 
 import discord
 
@@ -19,28 +19,32 @@ from src.core.logger import logger
 from src.core.config import get_config, EmbedColors
 from src.core.database import get_db
 from src.core.constants import (
-    AUTO_CLOSE_CHECK_INTERVAL,
     THREAD_DELETE_DELAY,
     CLOSE_REQUEST_COOLDOWN)
 from src.utils.async_utils import create_safe_task
 from src.utils.discord_rate_limit import log_http_error
+from src.services.attachment_archive import attachment_dict, get_attachment_archiver
 
 from .constants import (
     INACTIVE_WARNING_DAYS,
     INACTIVE_CLOSE_DAYS,
-    CLAIM_REMINDER_COOLDOWN)
+    GHOST_TICKET_CLOSE_SECONDS,
+    CLAIM_REMINDER_COOLDOWN,
+    MESSAGE_BATCH_SIZE)
 from .buttons.helpers import _is_ticket_staff
 
 # Import mixins
 from .auto_close import AutoCloseMixin
 from .ticket_helpers import HelpersMixin
 from .operations import OperationsMixin
+from .ticket_index import TicketIndexMixin
+from .ingest import TicketMessageIngestor, delete_op, edit_op, store_op
 
 if TYPE_CHECKING:
     from src.bot import AzabBot
 
 
-class TicketService(AutoCloseMixin, HelpersMixin, OperationsMixin):
+class TicketService(AutoCloseMixin, HelpersMixin, OperationsMixin, TicketIndexMixin):
     """
     Service for managing support tickets.
 
@@ -74,6 +78,9 @@ class TicketService(AutoCloseMixin, HelpersMixin, OperationsMixin):
         # Locks for thread-safe dict access
         self._cooldowns_lock = asyncio.Lock()
         self._deletions_lock = asyncio.Lock()
+        self._init_auto_close()
+        self._init_ticket_index()
+        self._message_ingestor = TicketMessageIngestor(self.db)
 
         if self.enabled:
             logger.tree("Ticket Service Initialized", [
@@ -102,10 +109,26 @@ class TicketService(AutoCloseMixin, HelpersMixin, OperationsMixin):
             logger.info("Ticket service disabled (no channel configured)")
             return
 
+        # Index open tickets (and rebuild auto-close deadlines) before the
+        # scheduler and message handling use it
+        indexed = await self.load_ticket_index()
+
         self._running = True
         self._auto_close_task = create_safe_task(
-            self._auto_close_loop(), "Ticket Auto-Close Loop"
+            self._auto_close_loop(), "Ticket Auto-Close Scheduler"
+        )
+        self._activity_flush_task = create_safe_task(
+            self._activity_flush_loop(), "Ticket Activity Flush Loop"
         )
+        self._message_ingestor.start()
+
+        # Messages sent while the bot was down are missing from the store;
+        # record the ranges and re-read them from Discord in the background
+        offline_gaps = await asyncio.to_thread(
+            self.db.add_offline_ticket_message_gaps,
+            discord.utils.time_snowflake(datetime.now(timezone.utc)),
+        )
+        create_safe_task(self._backfill_message_gaps(), "Ticket Message Backfill")
 
         # Verify ticket panel exists (resend if deleted)
         await self.verify_panel()
@@ -116,7 +139,11 @@ class TicketService(AutoCloseMixin, HelpersMixin, OperationsMixin):
         logger.tree("Ticket Service Started", [
             ("Auto-close", f"Enabled (warn: {INACTIVE_WARNING_DAYS}d, close: {INACTIVE_CLOSE_DAYS}d)"),
             ("Auto-delete", f"Enabled ({THREAD_DELETE_DELAY}s after close)"),
-            ("Check interval", f"{AUTO_CLOSE_CHECK_INTERVAL}s"),
+            ("Ghost close", f"{GHOST_TICKET_CLOSE_SECONDS // 60}m without opener message"),
+            ("Deadlines", str(self.get_auto_close_stats()["scheduled"])),
+            ("Open tickets", str(indexed)),
+            ("Message writes", f"Batched (up to {MESSAGE_BATCH_SIZE}/txn)"),
+            ("Offline gaps", str(offline_gaps)),
             ("Recovered deletions", str(recovered)),
         ], emoji="🎫")
 
@@ -130,6 +157,17 @@ class TicketService(AutoCloseMixin, HelpersMixin, OperationsMixin):
             except asyncio.CancelledError:
                 pass
 
+        if self._activity_flush_task and not self._activity_flush_task.done():
+            self._activity_flush_task.cancel()
+            try:
+                await self._activity_flush_task
+            except asyncio.CancelledError:
+                pass
+        await self.flush_ticket_activity()
+
+        # Write queued messages before shutdown
+        await self._message_ingestor.stop()
+
         # Cancel pending deletions
         async with self._deletions_lock:
             for task in self._pending_deletions.values():
@@ -139,6 +177,31 @@ class TicketService(AutoCloseMixin, HelpersMixin, OperationsMixin):
 
         logger.debug("Ticket Service Stopped")
 
+    async def _backfill_message_gaps(self) -> int:
+        """
+        Backfill every open ticket with recorded message gaps, one at a time.
+
+        Closed tickets are skipped - their channel is going away and their
+        gaps are backfilled (or merged into the transcript) at close.
+
+        Returns:
+            Tickets backfilled.
+        """
+        backfilled = 0
+        for ticket_id in await asyncio.to_thread(self.db.get_ticket_ids_with_gaps):
+            entry = self._ticket_index.get(self._ticket_threads.get(ticket_id, 0))
+            if entry is None:
+                continue
+            channel = await self._get_ticket_channel(entry.thread_id)
+            if not channel:
+                continue
+            try:
+                await self._message_ingestor.backfill_gaps(channel, ticket_id)
+                backfilled += 1
+            except discord.HTTPException as e:
+                log_http_error(e, "Ticket Message Backfill", [("Ticket ID", ticket_id)])
+        return backfilled
+
     async def _recover_pending_deletions(self) -> int:
         """
         Recover pending ticket deletions after bot restart.
@@ -398,30 +461,30 @@ class TicketService(AutoCloseMixin, HelpersMixin, OperationsMixin):
         Handle a new message in a ticket channel.
 
         DESIGN: Incremental storage approach for real-time transcripts.
-        - Stores each message individually (fast INSERT)
+        - Queues each message for a batched INSERT (see ingest.py)
         - Transcript is generated on-demand when viewed
         - No regeneration overhead on every message
+        - Ticket state comes from the open-ticket index (no DB reads);
+          activity and warning clears are flushed in batches
 
         Args:
             message: The Discord message sent in the ticket channel
         """
-        # Get ticket from channel ID
-        ticket = self.db.get_ticket_by_thread(message.channel.id)
-        if not ticket:
+        # Get open ticket from channel ID (one dict lookup)
+        entry = self.get_open_ticket(message.channel.id)
+        if entry is None:
             return
 
-        if ticket["status"] == "closed":
-            return
-
-        # Update activity timestamp
-        self.db.update_ticket_activity(ticket["ticket_id"])
+        # Snapshot before touching, so handlers see the pre-message state
+        ticket = entry.as_ticket()
 
-        # Clear warning flag if ticket becomes active again
-        if ticket.get("warned"):
-            self.db.clear_ticket_warning(ticket["ticket_id"])
+        # Update activity timestamp and clear warning flag (in memory);
+        # the bot's own messages (panel updates, warnings) are not activity
+        if not self.bot.user or message.author.id != self.bot.user.id:
+            self._touch_ticket(entry, message.created_at.timestamp(), message.author.id)
 
         # Store message incrementally
-        self._store_message(ticket["ticket_id"], message)
+        await self._store_message(ticket["ticket_id"], message)
 
         # Check if staff member is typing in unclaimed ticket (remind to claim)
         await self._check_claim_reminder(message, ticket)
@@ -429,80 +492,54 @@ class TicketService(AutoCloseMixin, HelpersMixin, OperationsMixin):
         # AI follow-up response for unclaimed tickets (ticket OP only)
         await self._check_ai_followup(message, ticket)
 
-    def _store_message(self, ticket_id: str, message: discord.Message) -> None:
+    async def _store_message(self, ticket_id: str, message: discord.Message) -> None:
         """
-        Store a single message for incremental transcript building.
+        Queue a single message for incremental transcript building.
+
+        Waits only if the ingestion queue is full (backpressure).
+        Attachments are queued for archiving (CDN links expire).
 
         Args:
             ticket_id: The ticket ID
             message: The Discord message to store
         """
-        # Build attachments list
-        attachments = []
-        for att in message.attachments:
-            attachments.append({
-                "filename": att.filename,
-                "url": att.url,
-                "content_type": att.content_type,
-                "size": att.size,
-            })
-
-        # Build embeds list
-        embeds = []
-        for embed in message.embeds:
-            embed_data = {
-                "title": embed.title,
-                "description": embed.description,
-                "url": embed.url,
-                "color": embed.color.value if embed.color else None,
-                "timestamp": embed.timestamp.isoformat() if embed.timestamp else None,
-            }
-            # Author
-            if embed.author:
-                embed_data["author"] = {
-                    "name": embed.author.name,
-                    "url": embed.author.url,
-                    "icon_url": embed.author.icon_url,
-                }
-            # Footer
-            if embed.footer:
-                embed_data["footer"] = {
-                    "text": embed.footer.text,
-                    "icon_url": embed.footer.icon_url,
-                }
-            # Image
-            if embed.image:
-                embed_data["image"] = {"url": embed.image.url}
-            # Thumbnail
-            if embed.thumbnail:
-                embed_data["thumbnail"] = {"url": embed.thumbnail.url}
-            # Fields
-            if embed.fields:
-                embed_data["fields"] = [
-                    {"name": f.name, "value": f.value, "inline": f.inline}
-                    for f in embed.fields
-                ]
-            embeds.append(embed_data)
-
-        # Check if author is staff (has manage_messages permission)
-        is_staff = False
-        if hasattr(message.author, 'guild_permissions'):
-            is_staff = message.author.guild_permissions.manage_messages
-
-        # Store in database
-        self.db.store_ticket_message(
-            ticket_id=ticket_id,
-            message_id=message.id,
-            author_id=message.author.id,
-            author_name=message.author.name,
-            author_display_name=message.author.display_name,
-            author_avatar_url=str(message.author.display_avatar.url) if message.author.display_avatar else None,
-            content=message.content,
-            timestamp=message.created_at.timestamp(),
-            is_bot=message.author.bot,
-            is_staff=is_staff,
-            attachments=attachments if attachments else None,
-            embeds=embeds if embeds else None)
+        await self._message_ingestor.submit(store_op(ticket_id, message))
+        if message.attachments:
+            get_attachment_archiver().submit(
+                "ticket", ticket_id, [attachment_dict(att) for att in message.attachments]
+            )
+
+    async def handle_ticket_message_edit(self, message: discord.Message) -> None:
+        """
+        Handle an edited message in a ticket channel (called by on_message_edit).
+
+        Args:
+            message: The message after the edit
+        """
+        entry = self.get_open_ticket(message.channel.id)
+        if entry is None:
+            return
+        await self._message_ingestor.submit(edit_op(entry.ticket_id, message))
+
+    async def handle_ticket_message_delete(self, channel_id: int, message_id: int) -> None:
+        """
+        Handle a deleted message in a ticket channel (called by on_message_delete).
+
+        Takes IDs so raw delete events (uncached messages) work too. The
+        stored row is kept and flagged as deleted.
+
+        Args:
+            channel_id: The ticket channel ID
+            message_id: The deleted message ID
+        """
+        entry = self.get_open_ticket(channel_id)
+        if entry is None:
+            return
+        await self._message_ingestor.submit(delete_op(entry.ticket_id, message_id))
+
+    def get_message_ingest_stats(self) -> Dict[str, Any]:
+        """Snapshot of message ingestion queue counters."""
+        return self._message_ingestor.get_stats()
 
     async def _check_claim_reminder(self, message: discord.Message, ticket: dict) -> None:
         """
@@ -0,0 +1,338 @@
+"""
+AzabBot - Stored Ticket Transcript Source
+=========================================
+
+Transcript messages from the local ticket_messages store plus the
+Discord delta the store missed.
+
+DESIGN:
+    Closing a ticket used to read the whole channel history over REST
+    twice (collect_transcript_messages for HTML, build_json_transcript for
+    JSON), 100 messages per request and capped at MAX_TRANSCRIPT_MESSAGES,
+    even though every message had already been stored incrementally. Now:
+    - Stored rows are read in one query (edits applied, deletes left out)
+    - Only message-ID ranges the store can't cover are fetched:
+        head: channel creation .. first stored message
+        tail: last stored message .. now
+        gaps: ranges recorded by the ingestor (failed write batches, bot
+              downtime) that have not been backfilled yet; Discord's
+              copy replaces the stored rows in each range
+      Normally head and tail are a single empty page each and there are
+      no gaps; a ticket with no stored rows (opened before incremental
+      storage) falls back to full history
+    - Delta messages are normalized to the same row shape as the store,
+      so HTML, JSON and mention collection all read one list
+    There is no message cap - long tickets are transcribed in full.
+
+    Stored rows carry no reactions or pin state (neither is captured at
+    ingest); delta messages do.
+
+Author: حَـــــنَّـــــا
+Server: discord.gg/syria
+"""
+
+import asyncio
+import time
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import discord
+
+from src.core.config import NY_TZ
+from src.core.logger import logger
+from src.services.attachment_archive import rewrite_archived_attachments
+from ..constants import MAX_TRANSCRIPT_USER_LOOKUPS
+from ..ingest import message_row
+from .mentions import scan_mentions
+from .models import (
+    TicketTranscriptMessage,
+    TicketTranscriptAttachment,
+    TicketTranscriptEmbed,
+    TicketTranscriptReaction,
+    TicketTranscriptReplyTo,
+    TicketTranscriptSticker,
+)
+
+if TYPE_CHECKING:
+    from src.core.database import Database
+
+
+# =============================================================================
+# Constants
+# =============================================================================
+
+ROW_FIELDS: Tuple[str, ...] = (
+    "message_id", "author_id", "author_name", "author_display_name",
+    "author_avatar_url", "content", "timestamp", "is_bot", "is_staff",
+    "attachments", "embeds", "extra",
+)
+
+
+# =============================================================================
+# Row Normalization
+# =============================================================================
+
+def row_from_message(message: discord.Message) -> Dict[str, Any]:
+    """Normalize a Discord message to the stored row shape (plus live-only state)."""
+    row = dict(zip(ROW_FIELDS, message_row("", message)[1:]))
+    row["attachments"] = row["attachments"] or []
+    row["embeds"] = row["embeds"] or []
+    row["extra"] = row["extra"] or {}
+    row["edited_at"] = message.edited_at.timestamp() if message.edited_at else None
+    row["pinned"] = message.pinned
+    row["reactions"] = [
+        {
+            "emoji": str(reaction.emoji),
+            "emoji_id": str(reaction.emoji.id) if getattr(reaction.emoji, "id", None) else None,
+            "emoji_name": getattr(reaction.emoji, "name", None),
+            "count": reaction.count,
+            "is_animated": getattr(reaction.emoji, "animated", False),
+        }
+        for reaction in message.reactions
+    ]
+    return row
+
+
+# =============================================================================
+# Collection
+# =============================================================================
+
+async def _fetch_range(
+    thread: discord.abc.Messageable,
+    after: Optional[int],
+    before: Optional[int],
+) -> List[Dict[str, Any]]:
+    rows = []
+    async for message in thread.history(
+        limit=None,
+        after=discord.Object(after) if after else None,
+        before=discord.Object(before) if before else None,
+        oldest_first=True,
+    ):
+        rows.append(row_from_message(message))
+    return rows
+
+
+async def _merge_gaps(
+    thread: discord.abc.Messageable,
+    stored: List[Dict[str, Any]],
+    gaps: List[Dict[str, Any]],
+) -> List[Dict[str, Any]]:
+    """Replace stored rows inside each gap range with Discord's copy."""
+    fetched = await asyncio.gather(*[
+        _fetch_range(thread, gap["after_id"], gap["before_id"]) for gap in gaps
+    ])
+
+    def in_gap(message_id: int) -> bool:
+        return any(
+            gap["after_id"] < message_id and (gap["before_id"] is None or message_id < gap["before_id"])
+            for gap in gaps
+        )
+
+    by_id = {row["message_id"]: row for row in stored if not in_gap(row["message_id"])}
+    for rows in fetched:
+        by_id.update((row["message_id"], row) for row in rows)
+    return [by_id[message_id] for message_id in sorted(by_id)]
+
+
+async def collect_transcript_rows(
+    thread: discord.abc.Messageable,
+    ticket: dict,
+    db: "Database",
+) -> List[Dict[str, Any]]:
+    """
+    Collect every transcript message for a ticket, oldest first.
+
+    Args:
+        thread: The ticket channel
+        ticket: Ticket data from database
+        db: Database with get_ticket_message_rows
+
+    Returns:
+        Message rows (see ROW_FIELDS) ordered by message ID.
+    """
+    start = time.perf_counter()
+    stored = await asyncio.to_thread(db.get_ticket_message_rows, ticket["ticket_id"])
+    gaps = await asyncio.to_thread(db.get_ticket_message_gaps, ticket["ticket_id"])
+    if stored and gaps:
+        stored = await _merge_gaps(thread, stored, gaps)
+
+    if stored:
+        first_id = stored[0]["message_id"]
+        last_id = stored[-1]["message_id"]
+        head, tail = await asyncio.gather(
+            _fetch_range(thread, thread.id, first_id),
+            _fetch_range(thread, last_id, None),
+        )
+        rows = head + stored + tail
+    else:
+        # Nothing stored (ticket predates incremental storage) - full history
+        rows = await _fetch_range(thread, None, None)
+
+    # Archived attachments link to the archive, not the expiring CDN URL
+    archived = await asyncio.to_thread(rewrite_archived_attachments, rows, db)
+
+    logger.debug("Transcript Rows Collected", [
+        ("Ticket ID", ticket.get("ticket_id", "Unknown")),
+        ("Stored", str(len(stored))),
+        ("Fetched", str(len(rows) - len(stored))),
+        ("Gaps", str(len(gaps))),
+        ("Archived Files", str(archived)),
+        ("Time", f"{(time.perf_counter() - start) * 1000:.0f}ms"),
+    ])
+    return rows
+
+
+def _row_texts(rows: Iterable[Dict[str, Any]]) -> Iterator[str]:
+    """Texts of rows that can hold mentions (content, embed descriptions / fields)."""
+    for row in rows:
+        yield row.get("content") or ""
+        for embed in row.get("embeds") or []:
+            yield embed.get("description") or ""
+            for field in embed.get("fields") or []:
+                yield field.get("value") or ""
+
+
+def resolve_cached_mentions(
+    rows: Iterable[Dict[str, Any]],
+    guild: Optional[discord.Guild],
+    bot: discord.Client,
+    mention_map: Dict[int, str],
+) -> List[int]:
+    """
+    Add cache-resolvable mentions in rows to mention_map (no API calls).
+
+    Returns:
+        User IDs that are not in the cache.
+    """
+    users, roles, channels = scan_mentions(_row_texts(rows))
+
+    unresolved: List[int] = []
+    for user_id in users - mention_map.keys():
+        member = guild.get_member(user_id) if guild else None
+        user = member or bot.get_user(user_id)
+        if user:
+            mention_map[user_id] = user.display_name
+        else:
+            unresolved.append(user_id)
+    if guild:
+        for role_id in roles:
+            role = guild.get_role(role_id)
+            if role:
+                mention_map[role_id] = role.name
+        for channel_id in channels:
+            channel = guild.get_channel(channel_id)
+            if channel:
+                mention_map[channel_id] = channel.name
+    return unresolved
+
+
+async def collect_row_mentions(
+    rows: Iterable[Dict[str, Any]],
+    guild: Optional[discord.Guild],
+    bot: discord.Client,
+    max_api_lookups: int = MAX_TRANSCRIPT_USER_LOOKUPS,
+) -> Dict[int, str]:
+    """
+    Build the mention map for message rows.
+
+    Users, roles and channels are resolved from cache; unresolved users
+    are fetched from the API up to max_api_lookups.
+
+    Returns:
+        Map of user/role/channel ID to display name.
+    """
+    mention_map: Dict[int, str] = {}
+    unresolved = resolve_cached_mentions(rows, guild, bot, mention_map)
+
+    for user_id in unresolved[:max_api_lookups]:
+        try:
+            user = await bot.fetch_user(user_id)
+            mention_map[user_id] = user.display_name
+        except (discord.NotFound, discord.HTTPException):
+            pass
+
+    return mention_map
+
+
+# =============================================================================
+# Output Shapes
+# =============================================================================
+
+def html_message_from_row(row: Dict[str, Any]) -> Dict[str, Any]:
+    """Row -> message dict for generate_html_transcript."""
+    return {
+        "id": row["message_id"],
+        "author": row["author_display_name"] or row["author_name"],
+        "avatar_url": row["author_avatar_url"] or "",
+        "content": row["content"] or "",
+        "timestamp": datetime.fromtimestamp(row["timestamp"], tz=NY_TZ).strftime("%b %d, %Y %I:%M %p"),
+        "attachments": [{"url": att["url"], "filename": att.get("filename")} for att in row["attachments"]],
+        "embeds": row["embeds"],
+        "is_bot": row["is_bot"],
+        "is_staff": row["is_staff"],
+    }
+
+
+def transcript_message_from_row(row: Dict[str, Any]) -> TicketTranscriptMessage:
+    """Row -> TicketTranscriptMessage for the JSON transcript."""
+    extra = row["extra"]
+    reply_to = extra.get("reply_to")
+    return TicketTranscriptMessage(
+        author_id=row["author_id"],
+        author_name=row["author_name"],
+        author_display_name=row["author_display_name"],
+        author_avatar_url=row["author_avatar_url"],
+        author_role_color=extra.get("role_color"),
+        content=row["content"] or "",
+        timestamp=row["timestamp"],
+        attachments=[
+            TicketTranscriptAttachment(
+                filename=att["filename"],
+                url=att["url"],
+                content_type=att.get("content_type"),
+                size=att.get("size", 0),
+            )
+            for att in row["attachments"]
+        ],
+        embeds=[
+            TicketTranscriptEmbed(
+                title=embed.get("title"),
+                description=embed.get("description"),
+                color=embed.get("color"),
+                url=embed.get("url"),
+                image_url=(embed.get("image") or {}).get("url"),
+                thumbnail_url=(embed.get("thumbnail") or {}).get("url"),
+                author_name=(embed.get("author") or {}).get("name"),
+                author_icon_url=(embed.get("author") or {}).get("icon_url"),
+                footer_text=(embed.get("footer") or {}).get("text"),
+                footer_icon_url=(embed.get("footer") or {}).get("icon_url"),
+                fields=embed.get("fields"),
+            )
+            for embed in row["embeds"]
+        ],
+        reactions=[TicketTranscriptReaction(**reaction) for reaction in row.get("reactions", [])],
+        reply_to=TicketTranscriptReplyTo(**reply_to) if reply_to else None,
+        stickers=[TicketTranscriptSticker(**sticker) for sticker in extra.get("stickers", [])],
+        is_bot=row["is_bot"],
+        is_staff=row["is_staff"],
+        is_pinned=row.get("pinned", False),
+        is_edited=row.get("edited_at") is not None,
+        edited_at=row.get("edited_at"),
+        type=extra.get("type", "default"),
+    )
+
+
+# =============================================================================
+# Module Export
+# =============================================================================
+
+__all__ = [
+    "ROW_FIELDS",
+    "collect_row_mentions",
+    "collect_transcript_rows",
+    "html_message_from_row",
+    "resolve_cached_mentions",
+    "row_from_message",
+    "transcript_message_from_row",
+]
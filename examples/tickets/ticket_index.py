@@ -0,0 +1,267 @@
+"""
+AzabBot - Open Ticket Index Mixin
+=================================
+
+In-memory index of open tickets keyed by channel ID.
+
+DESIGN:
+    handle_ticket_message used to cost three or four synchronous SQLite
+    round trips on the event loop per message (lookup by thread, activity
+    update, warning clear, message insert), and the lookup ran for every
+    message in every ticket channel. Open tickets now live in memory:
+    - Loaded once at start() with a single query
+    - Kept current by create / claim / transfer / close / reopen, which
+      already hold the fresh row after their own DB write
+    - Ticket messages touch memory only: last activity moves forward, the
+      warning clears, and the ticket is marked dirty
+    - Indexing a ticket queues its auto-close deadline (see auto_close.py)
+    - flush_ticket_activity() writes all dirty timestamps in one
+      executemany every ACTIVITY_FLUSH_INTERVAL, off the event loop
+    A message in a non-ticket channel costs one dict miss. Until the
+    index is loaded, lookups fall back to the database.
+
+    Crash-safety: at most one flush interval of activity timestamps is
+    lost, which only delays the inactivity warning by that long.
+
+Author: حَـــــنَّـــــا
+Server: discord.gg/syria
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Dict, Optional
+
+from src.core.logger import logger
+
+from .constants import ACTIVITY_FLUSH_INTERVAL
+
+if TYPE_CHECKING:
+    from .service import TicketService
+
+
+# =============================================================================
+# Models
+# =============================================================================
+
+@dataclass
+class IndexedTicket:
+    """Live state of an open or claimed ticket."""
+    ticket_id: str
+    thread_id: int
+    user_id: int
+    guild_id: int
+    status: str
+    claimed_by: Optional[int]
+    warned_at: Optional[float]
+    last_activity: float
+    created_at: float
+    owner_active: bool          # Opener wrote or submitted the creation modal
+    ghost_eligible: bool        # New, no opener activity, no replies, never reopened
+
+    @property
+    def warned(self) -> bool:
+        return self.warned_at is not None
+
+    @classmethod
+    def from_row(cls, row: Dict[str, Any]) -> "IndexedTicket":
+        owner_active = bool(row.get("owner_active"))
+        return cls(
+            ticket_id=row["ticket_id"],
+            thread_id=row["thread_id"],
+            user_id=row["user_id"],
+            guild_id=row["guild_id"],
+            status=row["status"],
+            claimed_by=row.get("claimed_by"),
+            warned_at=row.get("warned_at") or None,
+            last_activity=row.get("last_activity_at") or row.get("created_at") or time.time(),
+            created_at=row.get("created_at") or time.time(),
+            owner_active=owner_active,
+            ghost_eligible=(
+                row["status"] == "open"
+                and not owner_active
+                and not row.get("staff_replied")
+                and not row.get("reopened_at")
+            ),
+        )
+
+    def as_ticket(self) -> Dict[str, Any]:
+        """Ticket dict in the shape the message handlers expect."""
+        return {
+            "ticket_id": self.ticket_id,
+            "thread_id": self.thread_id,
+            "user_id": self.user_id,
+            "guild_id": self.guild_id,
+            "status": self.status,
+            "claimed_by": self.claimed_by,
+            "warned": self.warned,
+            "last_activity_at": self.last_activity,
+        }
+
+
+# =============================================================================
+# Ticket Index Mixin
+# =============================================================================
+
+class TicketIndexMixin:
+    """Mixin for the in-memory open-ticket index with batched activity writes."""
+
+    def _init_ticket_index(self: "TicketService") -> None:
+        """Initialize the index. Called from TicketService.__init__."""
+        self._ticket_index: Dict[int, IndexedTicket] = {}      # thread_id -> ticket
+        self._ticket_threads: Dict[str, int] = {}              # ticket_id -> thread_id
+        self._activity_dirty: Dict[str, float] = {}            # ticket_id -> last activity
+        self._ticket_index_loaded: bool = False
+        self._activity_flush_task: Optional[asyncio.Task] = None
+        self._index_fallbacks: int = 0
+        self._activity_flushed: int = 0
+
+    async def load_ticket_index(self: "TicketService") -> int:
+        """
+        Load every open ticket into the index.
+
+        Returns:
+            Number of tickets indexed.
+        """
+        rows = await asyncio.to_thread(self.db.get_open_tickets)
+        self._ticket_index.clear()
+        self._ticket_threads.clear()
+        for row in rows:
+            self._index_ticket(row)
+        self._ticket_index_loaded = True
+        return len(rows)
+
+    # =========================================================================
+    # Lookups
+    # =========================================================================
+
+    def get_open_ticket(self: "TicketService", thread_id: int) -> Optional[IndexedTicket]:
+        """
+        Get the open ticket for a channel.
+
+        Args:
+            thread_id: Ticket channel ID.
+
+        Returns:
+            The indexed ticket, or None if the channel has no open ticket.
+        """
+        entry = self._ticket_index.get(thread_id)
+        if entry is not None or self._ticket_index_loaded:
+            return entry
+
+        # Not loaded yet (message during startup) - ask the database
+        self._index_fallbacks += 1
+        ticket = self.db.get_ticket_by_thread(thread_id)
+        if not ticket or ticket["status"] == "closed":
+            return None
+        return self._index_ticket(ticket)
+
+    # =========================================================================
+    # Updates (called by operations after their DB write)
+    # =========================================================================
+
+    def _index_ticket(self: "TicketService", ticket: Dict[str, Any]) -> IndexedTicket:
+        """
+        Add or replace a ticket from a fresh database row.
+
+        Rows from get_ticket() lack the activity flags the bulk load
+        computes, so they are looked up here (an indexed EXISTS pair).
+        """
+        if "owner_active" not in ticket:
+            ticket = {**ticket, **self.db.get_ticket_activity_flags(ticket["ticket_id"])}
+        entry = IndexedTicket.from_row(ticket)
+        previous = self._ticket_threads.get(entry.ticket_id)
+        if previous is not None and previous != entry.thread_id:
+            self._ticket_index.pop(previous, None)
+        self._ticket_index[entry.thread_id] = entry
+        self._ticket_threads[entry.ticket_id] = entry.thread_id
+        self._schedule_ticket(entry)
+        return entry
+
+    def _unindex_ticket(self: "TicketService", ticket_id: str) -> None:
+        """Drop a closed ticket. Pending activity is still flushed."""
+        thread_id = self._ticket_threads.pop(ticket_id, None)
+        if thread_id is not None:
+            self._ticket_index.pop(thread_id, None)
+
+    def _index_ticket_claimed(self: "TicketService", ticket_id: str, claimed_by: int) -> None:
+        """Record a claim or transfer."""
+        entry = self._ticket_index.get(self._ticket_threads.get(ticket_id, 0))
+        if entry is not None:
+            entry.status = "claimed"
+            entry.claimed_by = claimed_by
+
+    def mark_ticket_warned(self: "TicketService", ticket_id: str, at: float) -> None:
+        """Record an inactivity warning (called by the auto-close scheduler)."""
+        entry = self._ticket_index.get(self._ticket_threads.get(ticket_id, 0))
+        if entry is not None:
+            entry.warned_at = at
+
+    def _touch_ticket(self: "TicketService", entry: IndexedTicket, at: float, author_id: int) -> None:
+        """Record activity in memory; persisted on the next flush."""
+        if at > entry.last_activity:
+            entry.last_activity = at
+        if author_id == entry.user_id:
+            entry.owner_active = True
+        entry.ghost_eligible = False  # Opener wrote or someone replied
+        entry.warned_at = None
+        self._activity_dirty[entry.ticket_id] = entry.last_activity
+        self._schedule_ticket(entry)
+
+    # =========================================================================
+    # Persistence
+    # =========================================================================
+
+    async def flush_ticket_activity(self: "TicketService") -> int:
+        """
+        Persist all dirty activity timestamps in one batched update.
+
+        Returns:
+            Number of tickets written.
+        """
+        if not self._activity_dirty:
+            return 0
+
+        # Swap first so activity during the write lands in the next batch
+        batch, self._activity_dirty = self._activity_dirty, {}
+        try:
+            await asyncio.to_thread(self.db.save_ticket_activity, list(batch.items()))
+        except Exception as e:
+            for ticket_id, at in batch.items():
+                if at > self._activity_dirty.get(ticket_id, 0):
+                    self._activity_dirty[ticket_id] = at
+            logger.warning("Ticket Activity Flush Failed", [
+                ("Pending", str(len(self._activity_dirty))),
+                ("Error", str(e)[:50]),
+            ])
+            return 0
+
+        self._activity_flushed += len(batch)
+        return len(batch)
+
+    async def _activity_flush_loop(self: "TicketService") -> None:
+        """Flush activity timestamps every ACTIVITY_FLUSH_INTERVAL seconds."""
+        while self._running:
+            await asyncio.sleep(ACTIVITY_FLUSH_INTERVAL)
+            try:
+                await self.flush_ticket_activity()
+            except Exception as e:
+                logger.warning("Ticket Activity Loop Error", [
+                    ("Error", str(e)[:50]),
+                ])
+
+    def get_ticket_index_stats(self: "TicketService") -> Dict[str, int]:
+        """Snapshot of index counters."""
+        return {
+            "open": len(self._ticket_index),
+            "dirty": len(self._activity_dirty),
+            "fallbacks": self._index_fallbacks,
+            "flushed": self._activity_flushed,
+        }
+
+
+# =============================================================================
+# Module Export
+# =============================================================================
+
+__all__ = ["IndexedTicket", "TicketIndexMixin"]